@@ -1,36 +1,62 @@
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse, StreamingResponse
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 from starlette.concurrency import run_in_threadpool
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Type, get_args, get_origin
 import json
 
 from app.api.v1.schemas.analysis import (
     BiasAuditRequest, EqualizedOddsRequest, IntersectionalRequest, ExplainRequest,
     EmpathyRequest, CorrectionValidationRequest, CorrectionRequest, DisclosureRequest,
-    ComprehensiveAuditRequest, AssessmentRequest, TierAssessmentRequest
+    ComprehensiveAuditRequest, AssessmentRequest, TierAssessmentRequest, SignificanceRequest,
+    SliceDiscoveryRequest, EmpathyBatchRequest, DisclosureBatchRequest
 )
 from app.schemas.integrity import IntegrityScoreRequest, IntegrityScoreResponse
 from app.services.bias_analysis import (
     analyze_disparate_impact, analyze_equalized_odds, analyze_intersectional,
-    analyze_statistical_significance, explain_decision, analyze_empathy,
-    validate_correction_process, submit_correction_request, analyze_ai_disclosure,
+    analyze_statistical_significance, explain_decision, analyze_empathy, analyze_empathy_batch,
+    validate_correction_process, submit_correction_request, analyze_ai_disclosure, analyze_ai_disclosure_batch,
     comprehensive_audit, assess_organization, assess_tier, list_frameworks,
-    get_differential_fairness, get_atkinson_index, get_theil_index
+    get_differential_fairness, get_atkinson_index, get_theil_index,
+    analyze_differential_fairness, analyze_atkinson_index, analyze_theil_index
 )
 from app.services.scoring import calculate_integrity_score
-from app.services.privacy_audit import audit_privacy
+from app.services.privacy_audit import audit_privacy, audit_privacy_values
 from app.services.labor_audit import audit_labor
-from app.services.evidence_scanner import scan_evidence
+from app.services.evidence_scanner import scan_evidence, StreamingEvidenceScan
+from app.services.evidence_index import index_evidence, remove_evidence, evidence_coverage, evidence_occurrences
 from app.services.red_team import red_team_audit
 from app.services.fairness_metrics import statistical_parity_difference, epsilon_differential_fairness
-from app.services.drift_monitoring import analyze_drift
+from app.services.group_stats import GroupStatsCache
+from app.services.slice_discovery import analyze_slice_discovery
+from app.services.streaming_audit import create_audit_session, add_audit_chunk, finalize_audit_session
+from app.services.drift_monitoring import (
+    analyze_drift, register_baseline, compare_to_baseline, get_baseline_profile, delete_baseline
+)
+from app.services.multivariate_drift import analyze_multivariate_drift
+from app.services.streaming_drift import (
+    create_drift_stream, add_drift_baseline, add_drift_current, drift_stream_report, close_drift_stream
+)
+from app.services.drift_monitors import (
+    register_drift_monitor, ingest_drift_observations, run_drift_monitors, drift_monitor_status,
+    list_drift_monitors, list_drift_alerts, delete_drift_monitor
+)
 from app.services.hash_chain import HashChain
-from app.services.chain_verification import verify_hash_chain
+from app.services.chain_verification import verify_hash_chain, StreamingChainVerifier
 from app.services.explainability import explain_from_data, explain_from_data_stream
-from app.core.signing import sign_data, verify_signature, get_public_key_pem, is_signing_available
+from app.core.signing import verify_signature, get_public_key_pem, is_signing_available
+from app.services.merkle_log import (
+    sign_audit_hash, seal_merkle_batch, merkle_log_status, merkle_inclusion_proof, merkle_consistency_proof,
+    verify_merkle_inclusion
+)
+from app.core.config import MAX_TABULAR_ROWS
+from app.core.columnar import (
+    ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPES, ColumnarDecodeError, TabularData,
+    as_frame, decode_columnar, is_columnar_available, is_columnar_media_type
+)
 
 limiter = Limiter(key_func=get_remote_address)
 router = APIRouter()
@@ -41,6 +67,11 @@ router = APIRouter()
 class PrivacyRequest(BaseModel):
     columns: List[str]
 
+class PrivacyValuesRequest(BaseModel):
+    data: List[Dict[str, Any]] = Field(..., max_length=50000)
+    sample_size: int = Field(default=200, ge=1, le=10_000)
+    min_match_rate: float = Field(default=0.05, gt=0.0, le=1.0)
+
 class LaborRequest(BaseModel):
     total_decisions: int
     human_interventions: int
@@ -49,10 +80,25 @@ class LaborRequest(BaseModel):
 class EvidenceRequest(BaseModel):
     text: str
 
+class EvidenceIndexRequest(BaseModel):
+    organization_id: str
+    documents: Dict[str, str] = Field(..., max_length=1_000)
+    """document_id -> document text; unchanged documents are not re-scanned."""
+
+class EvidenceRemoveRequest(BaseModel):
+    organization_id: str
+    document_ids: List[str]
+
+class EvidenceCoverageRequest(BaseModel):
+    organization_id: str
+    document_ids: Optional[List[str]] = None
+    include_documents: bool = True
+
 class RedTeamRequest(BaseModel):
     data: List[Dict[str, Any]]
     protected_attribute: str
     other_columns: List[str]
+    include_matrix: bool = False
 
 class DriftRequest(BaseModel):
     baseline_data: List[float]
@@ -60,10 +106,62 @@ class DriftRequest(BaseModel):
     feature_name: str
     n_bins: int = Field(default=10, ge=2, le=100)
 
+class DriftProfileRequest(BaseModel):
+    data: List[Dict[str, Any]] = Field(..., max_length=50000)
+    features: Optional[List[str]] = None
+    """Numeric features. With neither list set, every numeric column is
+    profiled numerically and every other column categorically."""
+    categorical_features: Optional[List[str]] = None
+    n_bins: int = Field(default=10, ge=2, le=100)
+    name: Optional[str] = None
+
+class DriftCompareRequest(BaseModel):
+    data: List[Dict[str, Any]] = Field(..., max_length=50000)
+    features: Optional[List[str]] = None
+    """Defaults to every profiled feature."""
+
+class MultivariateDriftRequest(BaseModel):
+    baseline_data: List[Dict[str, Any]] = Field(..., max_length=50000)
+    current_data: List[Dict[str, Any]] = Field(..., max_length=50000)
+    features: Optional[List[str]] = None
+    """Defaults to every numeric column of the baseline."""
+    methods: Optional[List[str]] = None
+    """mmd and/or domain_classifier (default: both)."""
+    max_samples: int = Field(default=5_000, ge=100, le=10_000)
+    """Rows sampled per window."""
+    time_budget_seconds: float = Field(default=10, gt=0, le=60)
+    n_permutations: int = Field(default=500, ge=1, le=10_000)
+    random_state: Optional[int] = 0
+
+class DriftStreamRequest(BaseModel):
+    features: Optional[List[str]] = None
+    """Required unless profile_id is given (then defaults to the profile's features)."""
+    n_bins: int = Field(default=10, ge=2, le=100)
+    sketch_k: int = Field(default=1024, ge=64, le=16_384)
+    profile_id: Optional[str] = None
+
+class DriftChunkRequest(BaseModel):
+    data: List[Dict[str, Any]] = Field(..., max_length=50000)
+
+class DriftMonitorRequest(BaseModel):
+    system_id: str
+    feature: str
+    baseline_data: Optional[List[float]] = None
+    profile_id: Optional[str] = None
+    """Use the feature's baseline from a registered profile instead of baseline_data."""
+    n_bins: int = Field(default=10, ge=2, le=100)
+    min_window_rows: int = Field(default=100, ge=1)
+
+class DriftObservationsRequest(BaseModel):
+    data: List[Dict[str, Any]] = Field(..., max_length=50000)
+
 class SPDRequest(BaseModel):
     data: List[Dict]
     protected_attribute: str
     outcome_variable: str
+    compact: bool = False
+    top_n: int = Field(default=10, ge=1, le=1000)
+    include_matrix: bool = False
 
 class EpsilonFairnessRequest(BaseModel):
     data: List[Dict]
@@ -71,6 +169,9 @@ class EpsilonFairnessRequest(BaseModel):
     outcome_variable: str
     epsilon: float = Field(default=0.8, gt=0.0)
     min_group_size: int = Field(default=10, ge=2)
+    compact: bool = False
+    top_n: int = Field(default=10, ge=1, le=1000)
+    include_matrix: bool = False
 
 class HashChainVerifyRequest(BaseModel):
     records: List[Dict[str, Any]]
@@ -80,6 +181,18 @@ class HashChainCreateRequest(BaseModel):
     previous_hash: Optional[str] = None
     sequence_number: int = 0
 
+class HashChainBatchCreateRequest(BaseModel):
+    entries: List[Dict[str, Any]] = Field(..., min_length=1, max_length=50000)
+    previous_hash: Optional[str] = None
+    sequence_number: int = 0
+    include_proofs: bool = False
+
+class MerkleVerifyRequest(BaseModel):
+    chain_hash: str
+    leaf_index: int = Field(..., ge=0)
+    proof: List[str]
+    tree_head: Dict[str, Any]
+
 class ExplainabilityRequest(BaseModel):
     data: List[Dict[str, Any]]
     target_column: str
@@ -98,16 +211,126 @@ class SignatureVerifyRequest(BaseModel):
     data: str
     signature: str
 
+class AuditSessionRequest(BaseModel):
+    protected_attribute: str
+    outcome_variable: Optional[str] = None
+    actual_outcome: Optional[str] = None
+    predicted_outcome: Optional[str] = None
+    threshold: float = Field(default=0.1)
+    previous_hash: Optional[str] = None
+    metrics: Optional[List[str]] = None
+    """Defaults to disparate_impact and/or equalized_odds; see streaming_audit.AUDIT_METRICS."""
+    epsilon: float = Field(default=0.5, ge=0.0)
+
+class AuditChunkRequest(BaseModel):
+    data: List[Dict] = Field(..., max_length=50000)
+
 class BatchAnalysisRequest(BaseModel):
     analyses: List[Dict[str, Any]] = Field(..., max_length=20)
     """Each item: {"type": "disparate_impact"|"equalized_odds"|..., "params": {...}}"""
+    data: Optional[List[Dict[str, Any]]] = Field(default=None, max_length=50000)
+    """Optional dataset shared by every analysis whose params omit "data"."""
+
+
+# --- Tabular body negotiation (JSON rows or Arrow/Parquet columns) ---
+
+def _query_fields(request: Request, model_cls: Type[BaseModel]) -> Dict[str, Any]:
+    """Collect non-data request fields from the query string for columnar bodies."""
+    fields: Dict[str, Any] = {}
+    for name, field in model_cls.model_fields.items():
+        values = request.query_params.getlist(name)
+        if name == "data" or not values:
+            continue
+        origin = get_origin(field.annotation)
+        args = get_args(field.annotation)
+        if origin is list and args and args[0] is str:
+            fields[name] = values
+        elif origin in (list, dict):
+            try:
+                fields[name] = json.loads(values[-1])
+            except ValueError:
+                fields[name] = values[-1]  # let pydantic report the type error
+        else:
+            fields[name] = values[-1]
+    return fields
+
+
+async def read_tabular_body(request: Request, model_cls: Type[BaseModel]) -> Tuple[BaseModel, TabularData]:
+    """
+    Parse a tabular analysis request according to its Content-Type.
+
+    JSON bodies are validated against model_cls exactly as before. Arrow IPC
+    stream and Parquet bodies carry the table itself; the remaining fields are
+    read from the query string (repeat the key for list fields, JSON-encode
+    object fields). Either way the data is capped at MAX_TABULAR_ROWS rows,
+    checked from the columnar metadata before the table is decoded. Returns
+    the validated model and the data to analyze.
+    """
+    content_type = request.headers.get("content-type", "")
+
+    if not is_columnar_media_type(content_type):
+        try:
+            payload = await request.json()
+        except ValueError:
+            raise RequestValidationError([
+                {"type": "json_invalid", "loc": ("body",), "msg": "JSON decode error", "input": {}}
+            ])
+        try:
+            body = model_cls.model_validate(payload)
+        except ValidationError as e:
+            raise RequestValidationError([
+                {**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)
+            ])
+        if len(body.data) > MAX_TABULAR_ROWS:
+            raise HTTPException(status_code=400, detail=f"Data too large ({len(body.data)} rows). Maximum is {MAX_TABULAR_ROWS}.")
+        return body, body.data
+
+    if not is_columnar_available():
+        raise HTTPException(status_code=415, detail="Columnar ingestion not available on this engine")
+
+    try:
+        body = model_cls.model_validate({**_query_fields(request, model_cls), "data": []})
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**err, "loc": ("query", *err["loc"])} for err in e.errors(include_url=False)
+        ])
+
+    try:
+        frame = await run_in_threadpool(decode_columnar, await request.body(), content_type, MAX_TABULAR_ROWS)
+    except ColumnarDecodeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return body, frame
+
+
+def tabular_openapi(model_cls: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenAPI request body for endpoints negotiated by read_tabular_body."""
+    binary = {"schema": {"type": "string", "format": "binary"}}
+    content = {"application/json": {"schema": model_cls.model_json_schema()}}
+    content[ARROW_STREAM_MEDIA_TYPE] = binary
+    for media_type in PARQUET_MEDIA_TYPES:
+        content[media_type] = binary
+    return {"requestBody": {"required": True, "content": content}}
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for endpoints that read their request body while the
+    response streams. The stock response listens for http.disconnect while
+    streaming, which would consume the body messages; here the body reader
+    sees a disconnect itself (request.stream() raises ClientDisconnect).
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
 
 
 # --- Task Monitoring & Async Integration ---
 
 from app.tasks.explainability import compute_explanation_task
 from app.tasks.analysis import (
-    task_disparate_impact, task_equalized_odds, task_intersectional, task_drift
+    task_disparate_impact, task_equalized_odds, task_intersectional, task_drift, task_multivariate_drift
 )
 from celery.result import AsyncResult
 
@@ -130,12 +353,23 @@ async def drift_analysis_async(body: DriftRequest, request: Request):
     )
     return {"task_id": task.id, "status": "PENDING"}
 
+@router.post("/analyze/drift/multivariate/async")
+@limiter.limit("10/minute")
+async def multivariate_drift_async(body: MultivariateDriftRequest, request: Request):
+    task = await run_in_threadpool(
+        task_multivariate_drift.delay,
+        body.baseline_data, body.current_data, body.features, body.methods,
+        body.max_samples, body.time_budget_seconds, body.n_permutations, body.random_state
+    )
+    return {"task_id": task.id, "status": "PENDING"}
+
 @router.post("/analyze/async")
 @limiter.limit("30/minute")
 async def disparate_impact_async(body: BiasAuditRequest, request: Request):
     task = await run_in_threadpool(
         task_disparate_impact.delay,
-        body.data, body.protected_attribute, body.outcome_variable, body.previous_hash
+        body.data, body.protected_attribute, body.outcome_variable, body.previous_hash,
+        body.confidence_interval, body.confidence_level, body.n_bootstrap, body.random_state
     )
     return {"task_id": task.id, "status": "PENDING"}
 
@@ -145,7 +379,7 @@ async def equalized_odds_async(body: EqualizedOddsRequest, request: Request):
     task = await run_in_threadpool(
         task_equalized_odds.delay,
         body.data, body.protected_attribute, body.actual_outcome, 
-        body.predicted_outcome, body.threshold, body.previous_hash
+        body.predicted_outcome, body.threshold, body.previous_hash, body.include_matrix
     )
     return {"task_id": task.id, "status": "PENDING"}
 
@@ -178,6 +412,16 @@ async def explain_async(body: ExplainabilityRequest, request: Request):
 async def get_privacy_audit(body: PrivacyRequest, request: Request):
     return await run_in_threadpool(audit_privacy, body.columns)
 
+@router.post("/audit/privacy/values", openapi_extra=tabular_openapi(PrivacyValuesRequest))
+@limiter.limit("10/minute")
+async def get_privacy_value_audit(request: Request):
+    """Detect PII and SPI in sampled column values, whatever the columns are named."""
+    body, data = await read_tabular_body(request, PrivacyValuesRequest)
+    result = await run_in_threadpool(audit_privacy_values, data, body.sample_size, body.min_match_rate)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
 @router.post("/audit/labor")
 @limiter.limit("30/minute")
 async def get_labor_audit(body: LaborRequest, request: Request):
@@ -188,10 +432,63 @@ async def get_labor_audit(body: LaborRequest, request: Request):
 async def get_evidence_verification(body: EvidenceRequest, request: Request):
     return await run_in_threadpool(scan_evidence, body.text)
 
-@router.post("/audit/red-team")
+@router.post("/audit/verify-document/stream", openapi_extra={
+    "requestBody": {"required": True, "content": {"text/plain": {"schema": {"type": "string"}},
+                                                  "application/octet-stream": {"schema": {"type": "string", "format": "binary"}}}}
+})
+@limiter.limit("20/minute")
+async def get_evidence_verification_stream(request: Request):
+    """
+    Scan a document of any size, sent as the raw request body (UTF-8 text).
+    The body is scanned as it arrives, so it is not subject to MAX_BODY_SIZE
+    and is never held in memory as a whole.
+    """
+    scan = StreamingEvidenceScan()
+    async for chunk in request.stream():
+        if chunk:
+            await run_in_threadpool(scan.feed_bytes, chunk)
+    await run_in_threadpool(scan.feed_bytes, b"", True)
+    result = scan.report()
+    result["bytes_received"] = scan.bytes_received
+    return result
+
+@router.post("/audit/evidence/index")
+@limiter.limit("30/minute")
+async def index_evidence_documents(body: EvidenceIndexRequest, request: Request):
+    """Add or update documents in an organization's evidence index."""
+    result = await run_in_threadpool(index_evidence, body.organization_id, body.documents)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.post("/audit/evidence/remove")
+@limiter.limit("30/minute")
+async def remove_evidence_documents(body: EvidenceRemoveRequest, request: Request):
+    return await run_in_threadpool(remove_evidence, body.organization_id, body.document_ids)
+
+@router.post("/audit/evidence/coverage")
+@limiter.limit("60/minute")
+async def get_evidence_coverage(body: EvidenceCoverageRequest, request: Request):
+    """POPIA Section 71 marker coverage across indexed documents, answered from the index."""
+    result = await run_in_threadpool(evidence_coverage, body.organization_id, body.document_ids, body.include_documents)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.get("/audit/evidence/occurrences")
+@limiter.limit("60/minute")
+async def get_evidence_occurrences(organization_id: str, marker: str, request: Request):
+    """Indexed documents containing a marker, with occurrence offsets."""
+    result = await run_in_threadpool(evidence_occurrences, organization_id, marker)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.post("/audit/red-team", openapi_extra=tabular_openapi(RedTeamRequest))
 @limiter.limit("10/minute")
-async def get_red_team_audit(body: RedTeamRequest, request: Request):
-    return await run_in_threadpool(red_team_audit, body.data, body.protected_attribute, body.other_columns)
+async def get_red_team_audit(request: Request):
+    body, data = await read_tabular_body(request, RedTeamRequest)
+    return await run_in_threadpool(red_team_audit, data, body.protected_attribute, body.other_columns, body.include_matrix)
 
 @router.post("/audit-trail/verify")
 @limiter.limit("10/minute")
@@ -199,6 +496,35 @@ async def verify_audit_chain(body: HashChainVerifyRequest, request: Request):
     """Verify integrity of a hash chain of audit records."""
     return await run_in_threadpool(HashChain.verify_chain, body.records)
 
+@router.post("/audit-trail/verify/stream", openapi_extra={
+    "requestBody": {"required": True, "content": {"application/x-ndjson": {"schema": {"type": "string"}}}}
+})
+@limiter.limit("10/minute")
+async def verify_audit_chain_stream(request: Request, expected_previous_hash: Optional[str] = None):
+    """
+    Verify a hash chain of any length sent as NDJSON (one audit record per
+    line). Records are verified as they arrive, and the response streams one
+    NDJSON line per broken link as soon as it is found, then a summary line.
+    expected_previous_hash anchors a chain segment that does not start at
+    the genesis hash.
+    """
+    verifier = StreamingChainVerifier(expected_previous_hash=expected_previous_hash)
+
+    async def reports():
+        try:
+            async for chunk in request.stream():
+                for report in await run_in_threadpool(verifier.feed_bytes, chunk):
+                    yield json.dumps({"type": "broken_link", **report}) + "\n"
+            for report in await run_in_threadpool(verifier.feed_bytes, b"", True):
+                yield json.dumps({"type": "broken_link", **report}) + "\n"
+            yield json.dumps({"type": "summary", **verifier.summary()}) + "\n"
+        except ValueError as e:
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+        finally:
+            await run_in_threadpool(verifier.close)
+
+    return DuplexStreamingResponse(reports(), media_type="application/x-ndjson")
+
 @router.post("/integrity/calculate", response_model=IntegrityScoreResponse)
 @limiter.limit("30/minute")
 async def get_integrity_score(body: IntegrityScoreRequest, request: Request):
@@ -207,55 +533,84 @@ async def get_integrity_score(body: IntegrityScoreRequest, request: Request):
 
 # --- Bias analysis endpoints ---
 
-@router.post("/analyze")
+@router.post("/analyze", openapi_extra=tabular_openapi(BiasAuditRequest))
 @limiter.limit("30/minute")
-async def disparate_impact(body: BiasAuditRequest, request: Request):
-    result = await run_in_threadpool(analyze_disparate_impact, body.data, body.protected_attribute, body.outcome_variable, body.previous_hash)
+async def disparate_impact(request: Request):
+    body, data = await read_tabular_body(request, BiasAuditRequest)
+    result = await run_in_threadpool(
+        analyze_disparate_impact, data, body.protected_attribute, body.outcome_variable, body.previous_hash,
+        confidence_interval=body.confidence_interval, confidence_level=body.confidence_level,
+        n_bootstrap=body.n_bootstrap, random_state=body.random_state,
+    )
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
-    result["signature"] = sign_data(result["audit_hash"])
+    result.update(sign_audit_hash(result["audit_hash"]))
     return result
 
-@router.post("/analyze/equalized-odds")
+@router.post("/analyze/equalized-odds", openapi_extra=tabular_openapi(EqualizedOddsRequest))
 @limiter.limit("30/minute")
-async def equalized_odds(body: EqualizedOddsRequest, request: Request):
-    result = await run_in_threadpool(analyze_equalized_odds, body.data, body.protected_attribute, body.actual_outcome, body.predicted_outcome, body.threshold, body.previous_hash)
+async def equalized_odds(request: Request):
+    body, data = await read_tabular_body(request, EqualizedOddsRequest)
+    result = await run_in_threadpool(analyze_equalized_odds, data, body.protected_attribute, body.actual_outcome, body.predicted_outcome, body.threshold, body.previous_hash, body.include_matrix)
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
-    result["signature"] = sign_data(result["audit_hash"])
+    result.update(sign_audit_hash(result["audit_hash"]))
     return result
 
-@router.post("/analyze/intersectional")
+@router.post("/analyze/intersectional", openapi_extra=tabular_openapi(IntersectionalRequest))
 @limiter.limit("20/minute")
-async def intersectional_analysis(body: IntersectionalRequest, request: Request):
-    result = await run_in_threadpool(analyze_intersectional, body.data, body.protected_attributes, body.outcome_variable, body.min_group_size, body.previous_hash)
+async def intersectional_analysis(request: Request):
+    body, data = await read_tabular_body(request, IntersectionalRequest)
+    result = await run_in_threadpool(analyze_intersectional, data, body.protected_attributes, body.outcome_variable, body.min_group_size, body.previous_hash)
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
-    result["signature"] = sign_data(result["audit_hash"])
+    result.update(sign_audit_hash(result["audit_hash"]))
     return result
 
-@router.post("/analyze/statistical")
+@router.post("/analyze/statistical", openapi_extra=tabular_openapi(SignificanceRequest))
 @limiter.limit("30/minute")
-async def statistical_significance(body: BiasAuditRequest, request: Request):
-    result = await run_in_threadpool(analyze_statistical_significance, body.data, body.protected_attribute, body.outcome_variable)
+async def statistical_significance(request: Request):
+    body, data = await read_tabular_body(request, SignificanceRequest)
+    result = await run_in_threadpool(
+        analyze_statistical_significance, data, body.protected_attribute, body.outcome_variable,
+        method=body.method, n_permutations=body.n_permutations,
+        time_budget_seconds=body.time_budget_seconds, random_state=body.random_state,
+    )
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     return result
 
-@router.post("/analyze/theil-index")
+@router.post("/analyze/theil-index", openapi_extra=tabular_openapi(BiasAuditRequest))
 @limiter.limit("30/minute")
-async def theil_index(body: BiasAuditRequest, request: Request):
-    return await run_in_threadpool(get_theil_index, body.data, body.protected_attribute, body.outcome_variable)
+async def theil_index(request: Request):
+    body, data = await read_tabular_body(request, BiasAuditRequest)
+    return await run_in_threadpool(get_theil_index, data, body.protected_attribute, body.outcome_variable)
 
-@router.post("/analyze/atkinson-index")
+@router.post("/analyze/atkinson-index", openapi_extra=tabular_openapi(BiasAuditRequest))
 @limiter.limit("30/minute")
-async def atkinson_index(body: BiasAuditRequest, request: Request):
-    return await run_in_threadpool(get_atkinson_index, body.data, body.protected_attribute, body.outcome_variable)
+async def atkinson_index(request: Request):
+    body, data = await read_tabular_body(request, BiasAuditRequest)
+    return await run_in_threadpool(get_atkinson_index, data, body.protected_attribute, body.outcome_variable)
 
-@router.post("/analyze/differential-fairness")
+@router.post("/analyze/differential-fairness", openapi_extra=tabular_openapi(IntersectionalRequest))
 @limiter.limit("20/minute")
-async def differential_fairness(body: IntersectionalRequest, request: Request):
-    return await run_in_threadpool(get_differential_fairness, body.data, body.protected_attributes, body.outcome_variable)
+async def differential_fairness(request: Request):
+    body, data = await read_tabular_body(request, IntersectionalRequest)
+    return await run_in_threadpool(get_differential_fairness, data, body.protected_attributes, body.outcome_variable)
+
+@router.post("/analyze/slices", openapi_extra=tabular_openapi(SliceDiscoveryRequest))
+@limiter.limit("20/minute")
+async def slice_discovery(request: Request):
+    body, data = await read_tabular_body(request, SliceDiscoveryRequest)
+    result = await run_in_threadpool(
+        analyze_slice_discovery, data, body.outcome_variable, body.features, body.predicted_outcome,
+        min_support=body.min_support, max_order=body.max_order, top_k=body.top_k,
+        n_bins=body.n_bins, previous_hash=body.previous_hash,
+    )
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    result.update(sign_audit_hash(result["audit_hash"]))
+    return result
 
 
 # --- Rights enforcement endpoints ---
@@ -270,6 +625,14 @@ async def decision_explanation(body: ExplainRequest, request: Request):
 async def empathy_analysis(body: EmpathyRequest, request: Request):
     return await run_in_threadpool(analyze_empathy, body.text, body.context)
 
+@router.post("/analyze/empathy/batch")
+@limiter.limit("10/minute")
+async def empathy_batch_analysis(body: EmpathyBatchRequest, request: Request):
+    result = await run_in_threadpool(analyze_empathy_batch, body.texts, body.context)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
 @router.post("/validate/correction-process")
 @limiter.limit("20/minute")
 async def correction_process_validation(body: CorrectionValidationRequest, request: Request):
@@ -285,6 +648,14 @@ async def correction_submission(body: CorrectionRequest, request: Request):
 async def ai_disclosure_analysis(body: DisclosureRequest, request: Request):
     return await run_in_threadpool(analyze_ai_disclosure, body.interface_text, body.interaction_type)
 
+@router.post("/analyze/disclosure/batch")
+@limiter.limit("10/minute")
+async def ai_disclosure_batch_analysis(body: DisclosureBatchRequest, request: Request):
+    result = await run_in_threadpool(analyze_ai_disclosure_batch, body.texts, body.interaction_type)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
 @router.post("/audit/comprehensive")
 @limiter.limit("5/minute")
 async def comprehensive_auditing(body: ComprehensiveAuditRequest, request: Request):
@@ -311,23 +682,29 @@ async def frameworks_listing(request: Request):
 
 # --- Fairness metrics endpoints ---
 
-@router.post("/analyze/statistical-parity")
+@router.post("/analyze/statistical-parity", openapi_extra=tabular_openapi(SPDRequest))
 @limiter.limit("30/minute")
-async def spd_analysis(body: SPDRequest, request: Request):
+async def spd_analysis(request: Request):
     """Statistical Parity Difference analysis across groups."""
-    result = await run_in_threadpool(statistical_parity_difference, body.data, body.protected_attribute, body.outcome_variable)
+    body, data = await read_tabular_body(request, SPDRequest)
+    result = await run_in_threadpool(
+        statistical_parity_difference, data, body.protected_attribute, body.outcome_variable,
+        compact=body.compact, top_n=body.top_n, include_matrix=body.include_matrix,
+    )
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     return result
 
-@router.post("/analyze/epsilon-fairness")
+@router.post("/analyze/epsilon-fairness", openapi_extra=tabular_openapi(EpsilonFairnessRequest))
 @limiter.limit("20/minute")
-async def epsilon_fairness_analysis(body: EpsilonFairnessRequest, request: Request):
+async def epsilon_fairness_analysis(request: Request):
     """epsilon-Differential Fairness for intersectional subgroups."""
+    body, data = await read_tabular_body(request, EpsilonFairnessRequest)
     result = await run_in_threadpool(
         epsilon_differential_fairness,
-        body.data, body.protected_attributes, body.outcome_variable,
-        body.epsilon, body.min_group_size
+        data, body.protected_attributes, body.outcome_variable,
+        body.epsilon, body.min_group_size,
+        compact=body.compact, top_n=body.top_n, include_matrix=body.include_matrix,
     )
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
@@ -345,6 +722,166 @@ async def drift_analysis(body: DriftRequest, request: Request):
         raise HTTPException(status_code=400, detail=result["error"])
     return result
 
+@router.post("/analyze/drift/profiles", openapi_extra=tabular_openapi(DriftProfileRequest))
+@limiter.limit("20/minute")
+async def register_drift_profile(request: Request):
+    """Register a baseline dataset once; later windows are compared against its stored profile."""
+    body, data = await read_tabular_body(request, DriftProfileRequest)
+    result = await run_in_threadpool(register_baseline, data, body.features, body.n_bins, body.name,
+                                    body.categorical_features)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.get("/analyze/drift/profiles/{profile_id}")
+@limiter.limit("60/minute")
+async def drift_profile_status(profile_id: str, request: Request):
+    profile = get_baseline_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=400, detail=f"Baseline profile '{profile_id}' not found or expired")
+    return profile.summary()
+
+@router.delete("/analyze/drift/profiles/{profile_id}")
+@limiter.limit("60/minute")
+async def delete_drift_profile(profile_id: str, request: Request):
+    result = delete_baseline(profile_id)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.post("/analyze/drift/profiles/{profile_id}/compare", openapi_extra=tabular_openapi(DriftCompareRequest))
+@limiter.limit("60/minute")
+async def compare_drift_profile(profile_id: str, request: Request):
+    """PSI, Jensen-Shannon and KS drift of every profiled feature in a window of current data."""
+    body, data = await read_tabular_body(request, DriftCompareRequest)
+    result = await run_in_threadpool(compare_to_baseline, profile_id, data, body.features)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.post("/analyze/drift/multivariate")
+@limiter.limit("10/minute")
+async def multivariate_drift(body: MultivariateDriftRequest, request: Request):
+    """
+    Joint-distribution drift between two windows: MMD (random Fourier
+    features) and a domain classifier's held-out AUC, within a sample and
+    time budget.
+    """
+    result = await run_in_threadpool(
+        analyze_multivariate_drift, body.baseline_data, body.current_data, body.features, body.methods,
+        body.max_samples, body.time_budget_seconds, body.n_permutations, body.random_state
+    )
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+
+# --- Streaming (sketch-based) drift monitoring ---
+
+@router.post("/analyze/drift/streams")
+@limiter.limit("30/minute")
+async def open_drift_stream(body: DriftStreamRequest, request: Request):
+    """
+    Open a constant-memory drift stream. Seed the baseline from a registered
+    profile (profile_id) or push baseline chunks before the first current chunk.
+    """
+    result = await run_in_threadpool(create_drift_stream, body.features, body.n_bins, body.sketch_k, body.profile_id)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.post("/analyze/drift/streams/{stream_id}/baseline", openapi_extra=tabular_openapi(DriftChunkRequest))
+@limiter.limit("600/minute")
+async def push_drift_baseline(stream_id: str, request: Request):
+    body, data = await read_tabular_body(request, DriftChunkRequest)
+    result = await run_in_threadpool(add_drift_baseline, stream_id, data)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.post("/analyze/drift/streams/{stream_id}/current", openapi_extra=tabular_openapi(DriftChunkRequest))
+@limiter.limit("600/minute")
+async def push_drift_current(stream_id: str, request: Request):
+    """Add production rows to the current window (fixes the baseline on the first call)."""
+    body, data = await read_tabular_body(request, DriftChunkRequest)
+    result = await run_in_threadpool(add_drift_current, stream_id, data)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.post("/analyze/drift/streams/{stream_id}/report")
+@limiter.limit("60/minute")
+async def report_drift_stream(stream_id: str, request: Request, reset_window: bool = False):
+    """Approximate PSI, JS and KS (with error bounds) of the current window; reset_window starts a new one."""
+    result = await run_in_threadpool(drift_stream_report, stream_id, reset_window)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.delete("/analyze/drift/streams/{stream_id}")
+@limiter.limit("60/minute")
+async def delete_drift_stream(stream_id: str, request: Request):
+    result = close_drift_stream(stream_id)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+# --- Scheduled drift monitors (evaluated by Celery beat) ---
+
+@router.post("/analyze/drift/monitors")
+@limiter.limit("30/minute")
+async def create_drift_monitor(body: DriftMonitorRequest, request: Request):
+    """Monitor one feature of a system; each scheduled run evaluates the rows pushed since the last one."""
+    result = await run_in_threadpool(
+        register_drift_monitor, body.system_id, body.feature, body.baseline_data, body.profile_id,
+        body.n_bins, body.min_window_rows
+    )
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.get("/analyze/drift/monitors")
+@limiter.limit("60/minute")
+async def get_drift_monitors(request: Request, system_id: Optional[str] = None):
+    return await run_in_threadpool(list_drift_monitors, system_id)
+
+@router.post("/analyze/drift/monitors/run")
+@limiter.limit("10/minute")
+async def run_drift_monitors_now(request: Request, system_id: Optional[str] = None):
+    """Evaluate pending windows now instead of waiting for the next scheduled run."""
+    return await run_in_threadpool(run_drift_monitors, system_id)
+
+@router.get("/analyze/drift/monitors/{monitor_id}")
+@limiter.limit("60/minute")
+async def get_drift_monitor(monitor_id: str, request: Request, history: int = 50):
+    """Monitor status with its rolling PSI/KS history."""
+    result = await run_in_threadpool(drift_monitor_status, monitor_id, max(1, min(history, 500)))
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.delete("/analyze/drift/monitors/{monitor_id}")
+@limiter.limit("30/minute")
+async def remove_drift_monitor(monitor_id: str, request: Request):
+    result = await run_in_threadpool(delete_drift_monitor, monitor_id)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.post("/analyze/drift/systems/{system_id}/observations", openapi_extra=tabular_openapi(DriftObservationsRequest))
+@limiter.limit("600/minute")
+async def push_drift_observations(system_id: str, request: Request):
+    """Queue production rows for every monitored feature of a system until the next run."""
+    body, data = await read_tabular_body(request, DriftObservationsRequest)
+    result = await run_in_threadpool(ingest_drift_observations, system_id, data)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.get("/analyze/drift/alerts")
+@limiter.limit("60/minute")
+async def get_drift_alerts(request: Request, system_id: Optional[str] = None, limit: int = 100):
+    return await run_in_threadpool(list_drift_alerts, system_id, max(1, min(limit, 1000)))
 
 # --- Hash chain / audit trail endpoints ---
 
@@ -357,42 +894,98 @@ async def create_audit_record(body: HashChainCreateRequest, request: Request):
         body.entry_data, body.previous_hash, body.sequence_number
     )
 
+@router.post("/audit-trail/create/batch")
+@limiter.limit("30/minute")
+async def create_audit_records(body: HashChainBatchCreateRequest, request: Request):
+    """
+    Create a chain of audit records. With AUDIT_SIGNING_MODE=merkle they are
+    signed as one Merkle batch (one signature for the whole batch); otherwise
+    each record is signed.
+    """
+    return await run_in_threadpool(
+        HashChain.create_audit_records,
+        body.entries, body.previous_hash, body.sequence_number, body.include_proofs
+    )
+
+@router.get("/audit-trail/merkle/head")
+@limiter.limit("60/minute")
+async def get_merkle_tree_head(request: Request):
+    """Size of the Merkle log, records awaiting the next signature, and the latest signed tree head."""
+    return await run_in_threadpool(merkle_log_status)
+
+@router.post("/audit-trail/merkle/seal")
+@limiter.limit("30/minute")
+async def seal_merkle_tree(request: Request):
+    """Sign a tree head over every record appended so far, without waiting for the batch window."""
+    result = await run_in_threadpool(seal_merkle_batch)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.get("/audit-trail/merkle/proof")
+@limiter.limit("120/minute")
+async def get_merkle_inclusion_proof(request: Request, leaf_index: Optional[int] = None,
+                                     chain_hash: Optional[str] = None, tree_size: Optional[int] = None):
+    """Inclusion proof of a record against a signed tree head (default: the latest)."""
+    result = await run_in_threadpool(merkle_inclusion_proof, leaf_index, chain_hash, tree_size)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.get("/audit-trail/merkle/consistency")
+@limiter.limit("60/minute")
+async def get_merkle_consistency_proof(request: Request, first: int, second: Optional[int] = None):
+    """Proof that the signed tree head of size first is a prefix of the one of size second (default: latest)."""
+    result = await run_in_threadpool(merkle_consistency_proof, first, second)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.post("/audit-trail/merkle/verify")
+@limiter.limit("60/minute")
+async def verify_merkle_proof(body: MerkleVerifyRequest, request: Request):
+    """Verify a record's inclusion proof and its tree head's signature."""
+    return await run_in_threadpool(verify_merkle_inclusion, body.chain_hash, body.leaf_index, body.proof, body.tree_head)
+
 
 # --- Explainability endpoints (SHAP / LIME) ---
 
-@router.post("/explain/shap")
+@router.post("/explain/shap", openapi_extra=tabular_openapi(ExplainabilityRequest))
 @limiter.limit("10/minute")
-async def shap_explanation(body: ExplainabilityRequest, request: Request):
+async def shap_explanation(request: Request):
     """SHAP-based model explanation. Trains a surrogate model on provided data."""
+    body, data = await read_tabular_body(request, ExplainabilityRequest)
     result = await run_in_threadpool(
         explain_from_data,
-        body.data, body.target_column, body.instance,
+        data, body.target_column, body.instance,
         method="shap", num_features=body.num_features,
     )
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     return result
 
-@router.post("/explain/lime")
+@router.post("/explain/lime", openapi_extra=tabular_openapi(ExplainabilityRequest))
 @limiter.limit("10/minute")
-async def lime_explanation(body: ExplainabilityRequest, request: Request):
+async def lime_explanation(request: Request):
     """LIME-based local model explanation."""
+    body, data = await read_tabular_body(request, ExplainabilityRequest)
     result = await run_in_threadpool(
         explain_from_data,
-        body.data, body.target_column, body.instance,
+        data, body.target_column, body.instance,
         method="lime", num_features=body.num_features,
     )
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     return result
 
-@router.post("/explain/stream")
+@router.post("/explain/stream", openapi_extra=tabular_openapi(ExplainStreamingRequest))
 @limiter.limit("5/minute")
-async def explain_streaming(body: ExplainStreamingRequest, request: Request):
+async def explain_streaming(request: Request):
     """Streaming explanation request for multiple instances."""
+    body, data = await read_tabular_body(request, ExplainStreamingRequest)
     return StreamingResponse(
         explain_from_data_stream(
-            body.data, body.target_column, body.instances,
+            data, body.target_column, body.instances,
             body.method, body.num_features
         ),
         media_type="application/x-ndjson"
@@ -423,6 +1016,48 @@ async def signing_status(request: Request):
     return {"signing_available": await run_in_threadpool(is_signing_available)}
 
 
+# --- Chunked (streaming) audit sessions ---
+
+@router.post("/analyze/stream/sessions")
+@limiter.limit("30/minute")
+async def open_audit_session(body: AuditSessionRequest, request: Request):
+    """
+    Open a chunked audit for datasets larger than one request.
+    Set outcome_variable for the Four-Fifths Rule and/or actual_outcome +
+    predicted_outcome for Equalized Odds.
+    """
+    result = await run_in_threadpool(
+        create_audit_session, body.protected_attribute, body.outcome_variable,
+        body.actual_outcome, body.predicted_outcome, body.threshold, body.previous_hash,
+        body.metrics, body.epsilon
+    )
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.post("/analyze/stream/sessions/{session_id}/chunks", openapi_extra=tabular_openapi(AuditChunkRequest))
+@limiter.limit("600/minute")
+async def push_audit_chunk(session_id: str, request: Request):
+    """Add a batch of rows (JSON, Arrow IPC stream or Parquet) to an open audit session."""
+    body, data = await read_tabular_body(request, AuditChunkRequest)
+    result = await run_in_threadpool(add_audit_chunk, session_id, data)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.post("/analyze/stream/sessions/{session_id}/finalize")
+@limiter.limit("30/minute")
+async def finalize_audit(session_id: str, request: Request):
+    """Close an audit session and return the signed reports over every chunk received."""
+    result = await run_in_threadpool(finalize_audit_session, session_id)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    for report in result.values():
+        if isinstance(report, dict) and "audit_hash" in report:
+            report.update(sign_audit_hash(report["audit_hash"]))
+    return result
+
+
 # --- Batch processing endpoint ---
 
 @router.post("/analyze/batch")
@@ -432,30 +1067,80 @@ async def batch_analysis(body: BatchAnalysisRequest, request: Request):
     Run multiple analyses in a single request.
     Each item specifies a type and params dict.
     Max 20 analyses per batch.
+
+    Analyses that omit params.data run against the batch-level data. Group
+    fairness metrics over that shared dataset read from one group statistics
+    cube per grouping, so the rows are scanned once rather than per metric.
     """
+    shared_frame = as_frame(body.data) if body.data is not None else None
+    cache = GroupStatsCache()
+
+    def _data(p):
+        if "data" not in p and shared_frame is not None:
+            return shared_frame
+        return p["data"]
+
     ANALYSIS_MAP = {
         "disparate_impact": lambda p: analyze_disparate_impact(
-            p["data"], p["protected_attribute"], p["outcome_variable"], p.get("previous_hash")
+            _data(p), p["protected_attribute"], p["outcome_variable"], p.get("previous_hash"),
+            cache=cache, confidence_interval=p.get("confidence_interval"),
+            confidence_level=p.get("confidence_level", 0.95),
+            n_bootstrap=max(100, min(int(p.get("n_bootstrap", 10_000)), 100_000)),
+            random_state=p.get("random_state", 0),
         ),
         "equalized_odds": lambda p: analyze_equalized_odds(
-            p["data"], p["protected_attribute"],
+            _data(p), p["protected_attribute"],
             p["actual_outcome"], p["predicted_outcome"],
-            p.get("threshold", 0.1), p.get("previous_hash")
+            p.get("threshold", 0.1), p.get("previous_hash"), p.get("include_matrix", False)
+        ),
+        "intersectional": lambda p: analyze_intersectional(
+            _data(p), p["protected_attributes"], p["outcome_variable"],
+            p.get("min_group_size", 30), p.get("previous_hash"), cache=cache,
         ),
         "statistical": lambda p: analyze_statistical_significance(
-            p["data"], p["protected_attribute"], p["outcome_variable"]
+            _data(p), p["protected_attribute"], p["outcome_variable"], cache=cache,
+            method=p.get("method", "chi_square"),
+            n_permutations=min(int(p.get("n_permutations", 10_000)), 1_000_000),
+            time_budget_seconds=min(float(p.get("time_budget_seconds", 10.0)), 60.0),
+            random_state=p.get("random_state", 0),
         ),
         "statistical_parity": lambda p: statistical_parity_difference(
-            p["data"], p["protected_attribute"], p["outcome_variable"]
+            _data(p), p["protected_attribute"], p["outcome_variable"], cache=cache,
+            compact=p.get("compact", False), top_n=p.get("top_n", 10),
+            include_matrix=p.get("include_matrix", False),
+        ),
+        "theil_index": lambda p: analyze_theil_index(
+            _data(p), p["protected_attribute"], p["outcome_variable"], cache=cache
+        ),
+        "atkinson_index": lambda p: analyze_atkinson_index(
+            _data(p), p["protected_attribute"], p["outcome_variable"],
+            p.get("epsilon", 0.5), cache=cache,
+        ),
+        "differential_fairness": lambda p: analyze_differential_fairness(
+            _data(p), p["protected_attributes"], p["outcome_variable"],
+            p.get("epsilon", 0.1), cache=cache,
+        ),
+        "privacy_values": lambda p: audit_privacy_values(
+            _data(p), min(int(p.get("sample_size", 200)), 10_000), p.get("min_match_rate", 0.05),
+        ),
+        "slice_discovery": lambda p: analyze_slice_discovery(
+            _data(p), p["outcome_variable"], p.get("features"), p.get("predicted_outcome"),
+            min_support=p.get("min_support", 30), max_order=min(int(p.get("max_order", 3)), 5),
+            top_k=p.get("top_k", 10), n_bins=p.get("n_bins", 4), previous_hash=p.get("previous_hash"),
         ),
         "empathy": lambda p: analyze_empathy(p["text"], p["context"]),
+        "empathy_batch": lambda p: analyze_empathy_batch(p["texts"], p.get("context", "rejection")),
         "disclosure": lambda p: analyze_ai_disclosure(
             p["interface_text"], p["interaction_type"]
         ),
+        "disclosure_batch": lambda p: analyze_ai_disclosure_batch(
+            p["texts"], p.get("interaction_type", "chatbot")
+        ),
         "drift": lambda p: analyze_drift(
             p["baseline_data"], p["current_data"],
             p["feature_name"], p.get("n_bins", 10),
         ),
+        "drift_profile": lambda p: compare_to_baseline(p["profile_id"], _data(p), p.get("features")),
     }
 
     results = []
@@ -32,6 +32,19 @@ class BiasAuditRequest(BaseModel):
     protected_attribute: str
     outcome_variable: str
     previous_hash: Optional[str] = None
+    confidence_interval: Optional[str] = Field(default=None, pattern="^(wilson|bootstrap)$")
+    confidence_level: float = Field(default=0.95, gt=0.0, lt=1.0)
+    n_bootstrap: int = Field(default=10_000, ge=100, le=100_000)
+    random_state: Optional[int] = 0
+
+class SignificanceRequest(BaseModel):
+    data: List[Dict] = Field(..., max_length=50000)
+    protected_attribute: str
+    outcome_variable: str
+    method: str = Field(default="chi_square", pattern="^(chi_square|permutation|exact)$")
+    n_permutations: int = Field(default=10_000, ge=100, le=1_000_000)
+    time_budget_seconds: float = Field(default=10.0, gt=0.0, le=60.0)
+    random_state: Optional[int] = 0
 
 class EqualizedOddsRequest(BaseModel):
     data: List[Dict] = Field(..., max_length=50000)
@@ -40,6 +53,7 @@ class EqualizedOddsRequest(BaseModel):
     predicted_outcome: str
     threshold: float = Field(default=0.1)
     previous_hash: Optional[str] = None
+    include_matrix: bool = False
 
 class IntersectionalRequest(BaseModel):
     data: List[Dict] = Field(..., max_length=50000)
@@ -48,6 +62,17 @@ class IntersectionalRequest(BaseModel):
     min_group_size: int = Field(default=30)
     previous_hash: Optional[str] = None
 
+class SliceDiscoveryRequest(BaseModel):
+    data: List[Dict] = Field(..., max_length=50000)
+    outcome_variable: str
+    features: Optional[List[str]] = None
+    predicted_outcome: Optional[str] = None
+    min_support: int = Field(default=30, ge=1)
+    max_order: int = Field(default=3, ge=1, le=5)
+    top_k: int = Field(default=10, ge=1, le=100)
+    n_bins: int = Field(default=4, ge=2, le=20)
+    previous_hash: Optional[str] = None
+
 class ExplainRequest(BaseModel):
     model_type: str
     input_features: Dict[str, Any]
@@ -59,6 +84,10 @@ class EmpathyRequest(BaseModel):
     text: str
     context: Optional[str] = Field(default="rejection", description="rejection, notification, support")
 
+class EmpathyBatchRequest(BaseModel):
+    texts: List[str] = Field(..., max_length=10_000)
+    context: Optional[str] = Field(default="rejection", description="rejection, notification, support")
+
 class CorrectionRequest(BaseModel):
     decision_id: str
     original_decision: str
@@ -77,6 +106,10 @@ class DisclosureRequest(BaseModel):
     interface_text: str
     interaction_type: str = Field(default="chatbot", description="chatbot, email, web, phone")
 
+class DisclosureBatchRequest(BaseModel):
+    texts: List[str] = Field(..., max_length=50_000)
+    interaction_type: str = Field(default="chatbot", description="chatbot, email, web, phone")
+
 class ComprehensiveAuditRequest(BaseModel):
     organization_name: str
     ai_systems: List[Dict[str, Any]]
@@ -0,0 +1,125 @@
+"""
+Canonical encoding and hashing for audit records.
+
+Every audit hash in the engine is SHA-256 over the canonical JSON encoding
+of a record: ``json.dumps(record, sort_keys=True, default=str)``. This module
+is the single implementation of that encoding. It produces the same bytes
+as json.dumps (so existing hashes verify unchanged) but streams them into
+the digest in bounded pieces instead of building one string for the whole
+record, which matters for large results such as full SHAP matrices.
+
+Small subtrees are encoded by the C JSON encoder in one call; only large
+dicts and lists are walked in Python, and long flat lists are encoded in
+slices.
+
+NumPy values are handled without a round trip through a fallback:
+float64 is a Python float and encodes as a number; other NumPy scalars keep
+their historical ``str()`` encoding so existing hashes are unchanged; arrays
+encode like the equivalent nested list (``ndarray.tolist()``).
+"""
+
+import hashlib
+import json
+from typing import Any, Iterator
+
+import numpy as np
+
+# Subtrees with at most this many items are encoded in one json.dumps call
+_SMALL_ITEMS = 4096
+# Digest update size
+_BUFFER_CHARS = 1 << 16
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+
+_ENCODER = json.JSONEncoder(sort_keys=True, default=_default)
+
+
+def _dumps(obj: Any) -> str:
+    return _ENCODER.encode(obj)
+
+
+def _estimated_items(obj: Any) -> int:
+    """
+    Cheap size estimate: dicts sum their values, lists and arrays are
+    assumed homogeneous (length x first item). Only decides where the
+    encoding is split, never what it contains.
+    """
+    if isinstance(obj, dict):
+        total = len(obj)
+        for value in obj.values():
+            total += _estimated_items(value)
+            if total > _SMALL_ITEMS:
+                break
+        return total
+    if isinstance(obj, (list, tuple)):
+        return len(obj) * (1 + _estimated_items(obj[0])) if obj else 0
+    if isinstance(obj, np.ndarray):
+        return obj.size
+    return 0
+
+
+def _encode_key(key: Any) -> str:
+    """Dict keys as json.dumps converts them (non-str scalars become strings)."""
+    if isinstance(key, str):
+        return _dumps(key)
+    if key is True or key is False or key is None or isinstance(key, (int, float)):
+        return _dumps(_dumps(key))
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+
+def iter_canonical(obj: Any) -> Iterator[str]:
+    """Yield the canonical JSON encoding of obj in pieces."""
+    if isinstance(obj, (str, int, float)) or obj is None or _estimated_items(obj) <= _SMALL_ITEMS:
+        yield _dumps(obj)
+    elif isinstance(obj, dict):
+        yield "{"
+        for i, (key, value) in enumerate(sorted(obj.items())):
+            yield (", " if i else "") + _encode_key(key) + ": "
+            yield from iter_canonical(value)
+        yield "}"
+    elif isinstance(obj, (list, tuple, np.ndarray)):
+        if isinstance(obj, np.ndarray) and obj.ndim == 1:
+            obj = obj.tolist()
+        yield "["
+        if all(not isinstance(item, (dict, list, tuple, np.ndarray)) for item in obj):
+            # Flat list: encode in slices
+            for start in range(0, len(obj), _SMALL_ITEMS):
+                yield (", " if start else "") + _dumps(obj[start:start + _SMALL_ITEMS])[1:-1]
+        else:
+            for i, item in enumerate(obj):
+                if i:
+                    yield ", "
+                yield from iter_canonical(item)
+        yield "]"
+    else:
+        yield _dumps(obj)
+
+
+def canonical_json(obj: Any) -> str:
+    """Canonical JSON string for obj (identical to json.dumps(obj, sort_keys=True, default=str))."""
+    return "".join(iter_canonical(obj))
+
+
+def canonical_update(digest: Any, obj: Any) -> None:
+    """Feed the canonical encoding of obj into a hashlib digest."""
+    buffer, size = [], 0
+    for piece in iter_canonical(obj):
+        buffer.append(piece)
+        size += len(piece)
+        if size >= _BUFFER_CHARS:
+            digest.update("".join(buffer).encode())
+            buffer, size = [], 0
+    if buffer:
+        digest.update("".join(buffer).encode())
+
+
+def canonical_hash(obj: Any, prefix: str = "") -> str:
+    """SHA-256 hex digest of prefix followed by the canonical encoding of obj."""
+    digest = hashlib.sha256(prefix.encode())
+    canonical_update(digest, obj)
+    return digest.hexdigest()
@@ -1,13 +1,21 @@
 from celery import Celery
+from celery.signals import worker_init
+import logging
 import os
 
+from app.core.config import (
+    AUDIT_SIGNING_MODE, DRIFT_MONITOR_DB_PATH, DRIFT_MONITOR_INTERVAL_SECONDS, MERKLE_BATCH_WINDOW_SECONDS, MERKLE_LOG_DB_PATH
+)
+
+logger = logging.getLogger(__name__)
+
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
 celery_app = Celery(
     "aic_engine",
     broker=REDIS_URL,
     backend=REDIS_URL,
-    include=["app.tasks.explainability"]
+    include=["app.tasks.explainability", "app.tasks.analysis"]
 )
 
 celery_app.conf.update(
@@ -20,4 +28,34 @@ celery_app.conf.update(
     task_time_limit=300,  # 5 minutes max for SHAP/LIME
     worker_max_memory_per_child=1024000,  # 1GB limit per worker child process
     worker_max_tasks_per_child=100,      # Restart worker after 100 tasks to prevent leaks
+    beat_schedule={
+        # Evaluates the window that arrived since the last run for every drift monitor
+        "drift-monitors": {
+            "task": "analysis.drift_monitors",
+            "schedule": DRIFT_MONITOR_INTERVAL_SECONDS,
+        },
+        # Signs the open Merkle batch of audit hashes once its window has passed
+        "merkle-seal": {
+            "task": "analysis.merkle_seal",
+            "schedule": MERKLE_BATCH_WINDOW_SECONDS,
+        },
+    },
 )
+
+
+# Beat-scheduled tasks run on the workers and read state the API wrote, so these stores must be shared files
+SHARED_STORES = {
+    "DRIFT_MONITOR_DB_PATH": DRIFT_MONITOR_DB_PATH,
+}
+if AUDIT_SIGNING_MODE == "merkle":
+    SHARED_STORES["MERKLE_LOG_DB_PATH"] = MERKLE_LOG_DB_PATH
+
+
+@worker_init.connect
+def warn_unshared_stores(**kwargs):
+    for name, path in SHARED_STORES.items():
+        if path == ":memory:":
+            logger.warning(
+                "%s is ':memory:'; scheduled tasks in this process will not see what the API stores. "
+                "Set it to a SQLite file shared by the API and the workers.", name
+            )
@@ -0,0 +1,154 @@
+"""
+Columnar ingestion for tabular analysis payloads.
+
+Tabular endpoints accept either the classic JSON body (``data`` as a list of
+row dicts) or a columnar body encoded as an Arrow IPC stream or a Parquet
+file. Columnar bodies are decoded straight into a DataFrame, skipping JSON
+parsing and the per-row dict construction, and are handed to the same
+service functions as the JSON path.
+
+Local CSV / Parquet files can also be read in fixed-size chunks for
+out-of-core audits (see iter_file_chunks).
+"""
+
+import io
+import logging
+import os
+from typing import Any, Iterator, List, Dict, Optional, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+    logging.warning("pyarrow library not available — columnar ingestion disabled")
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPES = ("application/vnd.apache.parquet", "application/x-parquet")
+COLUMNAR_MEDIA_TYPES = (ARROW_STREAM_MEDIA_TYPE,) + PARQUET_MEDIA_TYPES
+
+TabularData = Union[List[Dict[str, Any]], pd.DataFrame]
+
+
+class ColumnarDecodeError(ValueError):
+    """Raised when a columnar request body cannot be decoded."""
+
+
+def is_columnar_available() -> bool:
+    """Check if columnar ingestion is available (pyarrow installed)."""
+    return pa is not None
+
+
+def is_columnar_media_type(content_type: str) -> bool:
+    """True if a Content-Type header names a supported columnar encoding."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return media_type in COLUMNAR_MEDIA_TYPES
+
+
+def decode_columnar(body: bytes, content_type: str, max_rows: Optional[int] = None) -> pd.DataFrame:
+    """
+    Decode an Arrow IPC stream or Parquet body into a DataFrame.
+
+    With max_rows, the row count is checked before the data is materialized:
+    from the footer metadata for Parquet, and batch by batch for Arrow
+    streams, so a small compressed body cannot expand into an unbounded
+    table. The Arrow table is released column by column while converting, so
+    peak memory stays close to a single copy of the data.
+    """
+    if pa is None:
+        raise ColumnarDecodeError("pyarrow library not installed. Add pyarrow to requirements.")
+
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    try:
+        if media_type == ARROW_STREAM_MEDIA_TYPE:
+            reader = pa.ipc.open_stream(pa.py_buffer(body))
+            batches, rows = [], 0
+            for batch in reader:
+                rows += batch.num_rows
+                _check_rows(rows, max_rows)
+                batches.append(batch)
+            table = pa.Table.from_batches(batches, schema=reader.schema)
+        elif media_type in PARQUET_MEDIA_TYPES:
+            parquet_file = pq.ParquetFile(io.BytesIO(body))
+            _check_rows(parquet_file.metadata.num_rows, max_rows)
+            table = parquet_file.read()
+        else:
+            raise ColumnarDecodeError(f"Unsupported columnar media type '{media_type}'")
+    except ColumnarDecodeError:
+        raise
+    except Exception as e:
+        raise ColumnarDecodeError(f"Invalid columnar body: {str(e)}") from e
+
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _check_rows(rows: int, max_rows: Optional[int]) -> None:
+    if max_rows is not None and rows > max_rows:
+        raise ColumnarDecodeError(f"Data too large (more than {max_rows} rows).")
+
+
+def as_frame(data: TabularData) -> pd.DataFrame:
+    """Return tabular input as a DataFrame, without copying if it already is one."""
+    if isinstance(data, pd.DataFrame):
+        return data
+    return pd.DataFrame(data)
+
+
+CSV_SUFFIXES = (".csv", ".csv.gz", ".csv.bz2", ".csv.zip", ".csv.xz")
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+
+def file_format(path: str) -> Optional[str]:
+    """'csv' or 'parquet' from the file name, None if unsupported."""
+    name = path.lower()
+    if name.endswith(CSV_SUFFIXES):
+        return "csv"
+    if name.endswith(PARQUET_SUFFIXES):
+        return "parquet"
+    return None
+
+
+def file_columns(path: str) -> List[str]:
+    """Column names of a CSV / Parquet file, read from the header or footer only."""
+    if file_format(path) == "parquet":
+        if pq is None:
+            raise ColumnarDecodeError("pyarrow library not installed. Add pyarrow to requirements.")
+        return list(pq.read_schema(path).names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def iter_file_chunks(
+    path: str,
+    columns: List[str],
+    chunk_rows: int,
+    categorical: Optional[List[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield a CSV or Parquet file as DataFrames of at most chunk_rows rows.
+
+    Only the requested columns are read. Parquet is read one record batch at
+    a time; CSV with the pandas chunked reader. CSV columns listed in
+    categorical are kept as strings so group labels cannot change type from
+    one chunk to the next (e.g. "1" vs 1.0 once a chunk contains a blank).
+    """
+    fmt = file_format(path)
+    if fmt == "parquet":
+        if pq is None:
+            raise ColumnarDecodeError("pyarrow library not installed. Add pyarrow to requirements.")
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas(split_blocks=True, self_destruct=True)
+    elif fmt == "csv":
+        dtype = {col: str for col in (categorical or [])}
+        with pd.read_csv(path, usecols=columns, dtype=dtype, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                yield chunk
+    else:
+        raise ColumnarDecodeError(
+            f"Unsupported file type '{os.path.basename(path)}'. Use one of: "
+            f"{', '.join(CSV_SUFFIXES + PARQUET_SUFFIXES)}"
+        )
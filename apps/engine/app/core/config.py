@@ -1,8 +1,10 @@
 # AIC Engine - Global Configuration
+import os
 
 # Task 8: DataFrame and Data Input Limits
 # Prevents memory exhaustion/OOM from unbounded payloads
 MAX_DATA_ROWS = 10_000
+MAX_TABULAR_ROWS = 50_000 # rows per tabular request body, JSON or columnar; services apply MAX_DATA_ROWS where they need it
 MAX_FEATURES = 500
 MAX_BATCH_SIZE = 100
 MAX_TEXT_LENGTH = 1_000_000 # 1MB of text
@@ -13,3 +15,85 @@ CACHE_TTL_SECONDS = 3600 # 1 hour
 
 # Task 5: Middleware limits
 MAX_BODY_SIZE = 10 * 1024 * 1024 # 10MB
+
+# Chunked (streaming) audit sessions
+MAX_AUDIT_SESSIONS = 100
+AUDIT_SESSION_TTL_SECONDS = 3600 # idle sessions expire after 1 hour
+MAX_SESSION_GROUPS = 10_000 # bounds accumulator memory per session
+
+# Out-of-core file audits (CSV / Parquet on local disk)
+FILE_AUDIT_CHUNK_ROWS = 100_000
+AUDIT_FILE_ROOT = os.getenv("AUDIT_FILE_ROOT", "") # audited files must live under this directory; file audits are refused while unset
+
+# Permutation significance tests
+MAX_PERMUTATIONS = 1_000_000
+PERMUTATION_TIME_BUDGET_SECONDS = 10
+PERMUTATION_WORKERS = int(os.getenv("PERMUTATION_WORKERS", "1")) # >1 runs permutation batches on a process pool
+
+# Bootstrap confidence intervals
+MAX_BOOTSTRAP_CELLS = 50_000_000 # replicates x groups per report; more groups get fewer replicates (at least 100)
+
+# Group statistics cube
+MAX_OUTCOME_LEVELS = 100 # numeric outcomes with more distinct values keep per-group count/sum/sum of squares, not per-value counts
+
+# Multiclass equalized odds
+MAX_CONFUSION_LABELS = 20 # distinct actual/predicted labels; the confusion tensor is groups x labels^2, so threshold score columns first
+
+# Sorted-rate (compact) pairwise fairness reports
+MAX_RATE_MATRIX_GROUPS = 500 # the optional rate matrix is O(k^2)
+
+# Comprehensive audits over many systems
+AUDIT_WORKERS = int(os.getenv("AUDIT_WORKERS", "1")) # >1 audits systems on a process pool
+AUDIT_PARALLEL_MIN_SYSTEMS = 8 # below this, pool start-up costs more than it saves
+
+# Batch empathy and disclosure scoring
+MAX_EMPATHY_BATCH = 10_000
+MAX_DISCLOSURE_BATCH = 50_000
+
+# Streaming evidence scans (document uploads of any size)
+EVIDENCE_SCAN_CHUNK_CHARS = 1 << 20 # text scanned per pass
+EVIDENCE_SCAN_OVERLAP_CHARS = 1024 # carried between chunks so markers spanning a boundary still match
+
+# Streaming hash-chain verification (NDJSON bodies of any length)
+CHAIN_VERIFY_WORKERS = int(os.getenv("CHAIN_VERIFY_WORKERS", "1")) # >1 recomputes record hashes on a process pool
+CHAIN_VERIFY_BATCH_RECORDS = 2_000 # records per worker task
+CHAIN_VERIFY_MAX_RECORD_BYTES = MAX_BODY_SIZE # longest accepted NDJSON line
+
+# Merkle-batched signing of audit hashes
+AUDIT_SIGNING_MODE = os.getenv("AUDIT_SIGNING_MODE", "immediate") # "immediate": one RSA signature per record; "merkle": one per batch (signed Merkle tree head)
+MERKLE_LOG_DB_PATH = os.getenv("MERKLE_LOG_DB_PATH", ":memory:") # per-process unless set; in merkle mode set it to a SQLite file shared by the API and the beat-driven workers
+MERKLE_BATCH_WINDOW_SECONDS = float(os.getenv("MERKLE_BATCH_WINDOW_SECONDS", "5"))
+MERKLE_BATCH_MAX_RECORDS = 10_000 # a batch is signed early once this many records are waiting
+MERKLE_NODE_CACHE_SIZE = 1_000_000 # complete-subtree hashes kept in memory for proofs
+
+# Evidence corpus index
+EVIDENCE_INDEX_PATH = os.getenv("EVIDENCE_INDEX_PATH", ":memory:") # SQLite file for the evidence corpus index; set it to persist the index
+
+# Value-level PII/SPI scans
+PRIVACY_SAMPLE_SIZE = 200 # sampled values per column
+PRIVACY_SCAN_WORKERS = int(os.getenv("PRIVACY_SCAN_WORKERS", "1")) # >1 scans column blocks on a process pool
+PRIVACY_PARALLEL_MIN_COLUMNS = 50
+
+# Drift baseline profiles (registered once, compared against many windows)
+MAX_DRIFT_PROFILES = 100
+DRIFT_PROFILE_TTL_SECONDS = 7 * 24 * 3600 # unused profiles expire after a week
+MAX_DRIFT_CATEGORIES = 1_000 # categorical features with more categories (IDs, free text) are not profiled
+
+# Streaming (sketch-based) drift monitoring
+DRIFT_SKETCH_K = 1024 # quantile sketch items per level; rank error <= log2(n / k) / k
+MAX_DRIFT_STREAMS = 100
+DRIFT_STREAM_TTL_SECONDS = 7 * 24 * 3600 # idle streams expire after a week
+
+# Scheduled drift monitors (per system and feature, evaluated by Celery beat)
+DRIFT_MONITOR_DB_PATH = os.getenv("DRIFT_MONITOR_DB_PATH", ":memory:") # per-process unless set; set it to a SQLite file shared by the API and the beat-driven workers
+DRIFT_MONITOR_INTERVAL_SECONDS = int(os.getenv("DRIFT_MONITOR_INTERVAL_SECONDS", "300"))
+DRIFT_MONITOR_MIN_WINDOW_ROWS = 100 # pending rows needed before a window is evaluated
+DRIFT_MONITOR_MAX_PENDING_ROWS = 1_000_000 # per monitor, between runs
+DRIFT_MONITOR_HISTORY = 500 # evaluated windows kept per monitor
+
+# Multivariate (joint-distribution) drift: MMD and domain classifier
+MULTIVARIATE_DRIFT_MAX_SAMPLES = 5_000 # rows sampled per window
+MULTIVARIATE_DRIFT_TIME_BUDGET_SECONDS = 10
+MMD_RANDOM_FEATURES = 512 # random Fourier features approximating the Gaussian kernel
+MMD_PERMUTATIONS = 500
+DOMAIN_CLASSIFIER_MAX_ITER = 50 # boosting iterations
@@ -0,0 +1,143 @@
+"""
+Merkle tree hashing, inclusion proofs and consistency proofs (RFC 9162,
+the Certificate Transparency v2 construction).
+
+Leaves and interior nodes are hashed with distinct prefixes, so a leaf can
+never be passed off as a node:
+
+    leaf  = SHA-256(0x00 || value)
+    node  = SHA-256(0x01 || left || right)
+
+A tree over n leaves splits at the largest power of two below n, so every
+left subtree is complete and aligned. Proof generation therefore only ever
+needs the hashes of complete subtrees, which an append-only log can store
+once as they complete; node(level, index) supplies the hash of the complete
+subtree covering leaves [index * 2^level, (index + 1) * 2^level).
+
+Verification (verify_inclusion, verify_consistency) needs nothing but the
+proof and the roots, so third parties can check records against signed
+tree heads without access to the log.
+"""
+
+import hashlib
+from typing import Callable, List
+
+NodeLookup = Callable[[int, int], bytes]
+
+
+def leaf_hash(value: bytes) -> bytes:
+    return hashlib.sha256(b"\x00" + value).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def _split(n: int) -> int:
+    """Largest power of two strictly below n (n > 1)."""
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+def subtree_hash(node: NodeLookup, start: int, end: int) -> bytes:
+    """Merkle tree hash of leaves [start, end); start is aligned to the subtree's left split."""
+    n = end - start
+    if n & (n - 1) == 0:
+        level = n.bit_length() - 1
+        return node(level, start >> level)
+    k = _split(n)
+    return node_hash(node(k.bit_length() - 1, start // k), subtree_hash(node, start + k, end))
+
+
+def root_hash(node: NodeLookup, size: int) -> bytes:
+    if size == 0:
+        return hashlib.sha256(b"").digest()
+    return subtree_hash(node, 0, size)
+
+
+def inclusion_proof(node: NodeLookup, index: int, size: int) -> List[bytes]:
+    """Audit path of leaf index in the tree of the first size leaves (RFC 9162 PATH)."""
+    proof = []
+    start, end = 0, size
+    while end - start > 1:
+        k = _split(end - start)
+        if index < start + k:
+            proof.append(subtree_hash(node, start + k, end))
+            end = start + k
+        else:
+            proof.append(subtree_hash(node, start, start + k))
+            start += k
+    return proof[::-1]
+
+
+def consistency_proof(node: NodeLookup, first: int, second: int) -> List[bytes]:
+    """Proof that the tree of size first is a prefix of the tree of size second (RFC 9162 PROOF)."""
+    if not 0 < first <= second:
+        raise ValueError("Consistency proofs need 0 < first <= second")
+    proof = []
+    m, start, end, complete = first, 0, second, True
+    while m != end - start:
+        k = _split(end - start)
+        if m <= k:
+            proof.append(subtree_hash(node, start + k, end))
+            end = start + k
+        else:
+            proof.append(subtree_hash(node, start, start + k))
+            m -= k
+            start += k
+            complete = False
+    if not complete:
+        proof.append(subtree_hash(node, start, end))
+    return proof[::-1]
+
+
+def verify_inclusion(leaf: bytes, index: int, size: int, proof: List[bytes], root: bytes) -> bool:
+    """Check an inclusion proof for a leaf hash (RFC 9162, 2.1.3.2)."""
+    if not 0 <= index < size:
+        return False
+    fn, sn, r = index, size - 1, leaf
+    for p in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            if not fn & 1:
+                while fn & 1 == 0 and fn != 0:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+
+def verify_consistency(first: int, second: int, first_root: bytes, second_root: bytes, proof: List[bytes]) -> bool:
+    """Check that the tree with first_root is a prefix of the tree with second_root (RFC 9162, 2.1.4.2)."""
+    if not 0 < first <= second:
+        return False
+    if first == second:
+        return not proof and first_root == second_root
+    if first & (first - 1) == 0:
+        proof = [first_root] + list(proof)
+    if not proof:
+        return False
+    fn, sn = first - 1, second - 1
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+    fr = sr = proof[0]
+    for c in proof[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            fr = node_hash(c, fr)
+            sr = node_hash(c, sr)
+            if not fn & 1:
+                while fn & 1 == 0 and fn != 0:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            sr = node_hash(sr, c)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and fr == first_root and sr == second_root
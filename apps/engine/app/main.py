@@ -45,11 +45,13 @@ _boot_time = time.time()
 # Rate limiter
 limiter = Limiter(key_func=get_remote_address)
 PUBLIC_PATHS = {"/", "/health", "/docs", "/redoc", "/openapi.json"}
+# Endpoints that consume their body as a stream and bound memory themselves
+STREAMING_BODY_PATHS = {"/api/v1/audit/verify-document/stream", "/api/v1/audit-trail/verify/stream"}
 
 class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         content_length = request.headers.get("content-length")
-        if content_length and int(content_length) > MAX_BODY_SIZE:
+        if content_length and request.url.path not in STREAMING_BODY_PATHS and int(content_length) > MAX_BODY_SIZE:
             return JSONResponse(
                 status_code=413,
                 content={"error": "Request body too large", "max_bytes": MAX_BODY_SIZE},
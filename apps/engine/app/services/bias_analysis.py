@@ -1,17 +1,29 @@
 import pandas as pd
 import numpy as np
-from scipy import stats
+from scipy import sparse, stats
 import hashlib
-import json
-from typing import List, Dict, Any
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from textblob import TextBlob
+from textblob.en import sentiment as pattern_sentiment
 import re
 import uuid
 from datetime import datetime
 from app.api.v1.schemas.analysis import BiasStatus, EmpathyLevel, TierLevel, FrameworkType
-from app.core.config import MAX_DATA_ROWS
-
-def validate_data_size(data: List[Any]):
+from app.core.config import (
+    AUDIT_PARALLEL_MIN_SYSTEMS, AUDIT_WORKERS, MAX_DATA_ROWS, MAX_DISCLOSURE_BATCH, MAX_EMPATHY_BATCH,
+    MAX_CONFUSION_LABELS, MAX_OUTCOME_LEVELS, PERMUTATION_TIME_BUDGET_SECONDS, PERMUTATION_WORKERS,
+)
+from app.core.canonical import canonical_hash
+from app.core.columnar import TabularData, as_frame
+from app.services.group_stats import GroupStatsCache, compute_group_stats, sparse_contingency
+from app.services.confidence_intervals import disparate_impact_intervals
+from app.services.significance_tests import SIGNIFICANCE_METHODS, exact_test, permutation_test
+
+logger = logging.getLogger("aic.engine.bias_analysis")
+
+def validate_data_size(data: TabularData):
     """Task 8: Prevent OOM by limiting input data size"""
     if len(data) > MAX_DATA_ROWS:
         return {"error": f"Data too large ({len(data)} rows). Maximum is {MAX_DATA_ROWS}."}
@@ -22,42 +34,132 @@ def generate_audit_hash(data: Dict, previous_hash: str = None) -> str:
     payload = {"data": data}
     if previous_hash:
         payload["previous_hash"] = previous_hash
-    
-    json_str = json.dumps(payload, sort_keys=True, default=str)
-    return hashlib.sha256(json_str.encode()).hexdigest()
+    return canonical_hash(payload)
+
+def confusion_tensor(df: pd.DataFrame, actual: str, predicted: str, group_col: str):
+    """
+    Confusion counts for every group in one pass.
+
+    Encodes each row as a (group, actual, predicted) triple and counts them with
+    a single bincount, giving tensor[g, a, p]. Binary outcomes use labels [0, 1];
+    anything else is treated as multiclass over the sorted union of observed labels,
+    up to MAX_CONFUSION_LABELS; more raises ValueError before the tensor is allocated
+    (a float score column would otherwise make every distinct score a class).
+    Rows with a missing group value belong to no group and are left out; rows
+    with a missing actual or predicted label count towards sample_size only.
+
+    Returns (groups, labels, tensor, sample_sizes).
+    """
+    group_codes, groups = pd.factorize(df[group_col], sort=False)
+    actual_values = df[actual].to_numpy()
+    predicted_values = df[predicted].to_numpy()
+
+    observed = pd.unique(np.concatenate([actual_values, predicted_values]))
+    observed = [v for v in observed if not pd.isna(v)]
+    if all(v == 0 or v == 1 for v in observed):
+        labels = [0, 1]
+        actual_codes = np.select([actual_values == 1, actual_values == 0], [1, 0], -1)
+        predicted_codes = np.select([predicted_values == 1, predicted_values == 0], [1, 0], -1)
+    else:
+        try:
+            labels = sorted(observed)
+        except TypeError:
+            labels = observed
+        if len(labels) > MAX_CONFUSION_LABELS:
+            raise ValueError(confusion_label_error(len(labels)))
+        index = pd.Index(labels)
+        actual_codes = index.get_indexer(actual_values)
+        predicted_codes = index.get_indexer(predicted_values)
+
+    n_groups, n_labels = len(groups), len(labels)
+    sample_sizes = np.bincount(group_codes[group_codes >= 0], minlength=n_groups)
+
+    valid = (group_codes >= 0) & (actual_codes >= 0) & (predicted_codes >= 0)
+    cells = (group_codes[valid] * n_labels + actual_codes[valid]) * n_labels + predicted_codes[valid]
+    tensor = np.bincount(cells, minlength=n_groups * n_labels * n_labels).reshape(n_groups, n_labels, n_labels)
+    return groups, labels, tensor, sample_sizes
+
+def confusion_label_error(n_labels: int) -> str:
+    return (f"Too many distinct outcome labels ({n_labels}). Maximum is {MAX_CONFUSION_LABELS}; "
+            "threshold score columns into class labels first.")
+
+def _safe_rate(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """Elementwise num / den, 0 where the denominator is 0."""
+    return np.where(den > 0, num / np.maximum(den, 1), 0.0)
+
+def _ratio(num, den):
+    """Rounded rate for reports; an int 0 when undefined keeps audit hashes stable."""
+    num, den = int(num), int(den)
+    return round(num / den, 4) if den > 0 else 0
+
+def calculate_confusion_metrics(df: pd.DataFrame, actual: str, predicted: str, group_col: str, include_matrix: bool = False) -> Dict:
+    """Calculate TPR, FPR, PPV for each group (one-vs-rest per class for multiclass labels)"""
+    return confusion_metrics_from_tensor(*confusion_tensor(df, actual, predicted, group_col), include_matrix=include_matrix)
+
+def confusion_metrics_from_tensor(groups, labels: List, tensor: np.ndarray, sample_sizes: np.ndarray, include_matrix: bool = False) -> Dict:
+    """Per-group TPR, FPR, PPV from a (group, actual, predicted) count tensor; include_matrix adds each multiclass group's full matrix"""
+    # One-vs-rest counts per (group, class), all groups at once
+    tp = np.diagonal(tensor, axis1=1, axis2=2)
+    fn = tensor.sum(axis=2) - tp
+    fp = tensor.sum(axis=1) - tp
+    tn = tensor.sum(axis=(1, 2))[:, None] - tp - fn - fp
 
-def calculate_confusion_metrics(df: pd.DataFrame, actual: str, predicted: str, group_col: str) -> Dict:
-    """Calculate TPR, FPR, PPV for each group"""
     results = {}
-    for group in df[group_col].unique():
-        group_df = df[df[group_col] == group]
-        tp = len(group_df[(group_df[actual] == 1) & (group_df[predicted] == 1)])
-        tn = len(group_df[(group_df[actual] == 0) & (group_df[predicted] == 0)])
-        fp = len(group_df[(group_df[actual] == 0) & (group_df[predicted] == 1)])
-        fn = len(group_df[(group_df[actual] == 1) & (group_df[predicted] == 0)])
-
-        tpr = tp / (tp + fn) if (tp + fn) > 0 else 0
-        fpr = fp / (fp + tn) if (fp + tn) > 0 else 0
-        ppv = tp / (tp + fp) if (tp + fp) > 0 else 0
-
-        results[str(group)] = {
-            "true_positive_rate": round(tpr, 4),
-            "false_positive_rate": round(fpr, 4),
-            "positive_predictive_value": round(ppv, 4),
-            "sample_size": len(group_df),
-            "confusion_matrix": {"tp": tp, "tn": tn, "fp": fp, "fn": fn}
+    if labels == [0, 1]:
+        for g, group in enumerate(groups):
+            results[str(group)] = {
+                "true_positive_rate": _ratio(tp[g, 1], tp[g, 1] + fn[g, 1]),
+                "false_positive_rate": _ratio(fp[g, 1], fp[g, 1] + tn[g, 1]),
+                "positive_predictive_value": _ratio(tp[g, 1], tp[g, 1] + fp[g, 1]),
+                "sample_size": int(sample_sizes[g]),
+                "confusion_matrix": {
+                    "tp": int(tp[g, 1]), "tn": int(tn[g, 1]),
+                    "fp": int(fp[g, 1]), "fn": int(fn[g, 1])
+                }
+            }
+        return results
+
+    tpr = _safe_rate(tp, tp + fn)
+    fpr = _safe_rate(fp, fp + tn)
+    ppv = _safe_rate(tp, tp + fp)
+    for g, group in enumerate(groups):
+        group_metrics = {
+            "true_positive_rate": round(float(tpr[g].mean()), 4),
+            "false_positive_rate": round(float(fpr[g].mean()), 4),
+            "positive_predictive_value": round(float(ppv[g].mean()), 4),
+            "sample_size": int(sample_sizes[g]),
+            "per_class": {
+                str(label): {
+                    "true_positive_rate": _ratio(tp[g, k], tp[g, k] + fn[g, k]),
+                    "false_positive_rate": _ratio(fp[g, k], fp[g, k] + tn[g, k]),
+                    "positive_predictive_value": _ratio(tp[g, k], tp[g, k] + fp[g, k]),
+                    "support": int(tp[g, k] + fn[g, k])
+                }
+                for k, label in enumerate(labels)
+            },
         }
+        if include_matrix:
+            group_metrics["confusion_matrix"] = {
+                "labels": [str(label) for label in labels],
+                "matrix": tensor[g].tolist()
+            }
+        results[str(group)] = group_metrics
     return results
 
-def analyze_disparate_impact(data: List[Dict], protected_attribute: str, outcome_variable: str, previous_hash: str = None):
-    if not data:
+def analyze_disparate_impact(data: TabularData, protected_attribute: str, outcome_variable: str, previous_hash: str = None, cache: Optional[GroupStatsCache] = None,
+                             confidence_interval: Optional[str] = None, confidence_level: float = 0.95, n_bootstrap: int = 10_000, random_state: Optional[int] = 0):
+    """
+    Four-Fifths Rule. confidence_interval ("wilson" or "bootstrap") adds
+    per-group intervals for selection rate and impact ratio.
+    """
+    if data is None or len(data) == 0:
         return {"error": "No data provided for analysis"}
 
     size_error = validate_data_size(data)
     if size_error:
         return size_error
 
-    df = pd.DataFrame(data)
+    df = as_frame(data)
 
     if protected_attribute not in df.columns:
         return {"error": f"Column '{protected_attribute}' not found"}
@@ -65,9 +167,16 @@ def analyze_disparate_impact(data: List[Dict], protected_attribute: str, outcome
         return {"error": f"Column '{outcome_variable}' not found"}
 
     # Calculate selection rates
-    group_stats = df.groupby(protected_attribute)[outcome_variable].agg(['mean', 'count', 'sum'])
-    group_stats.columns = ['selection_rate', 'total', 'selected']
-
+    cube = compute_group_stats(df, protected_attribute, outcome_variable, cache)
+    intervals = None
+    if confidence_interval:
+        intervals = disparate_impact_intervals(cube, confidence_interval, confidence_level, n_bootstrap, random_state)
+        if "error" in intervals:
+            return intervals
+    return disparate_impact_report(cube.summary(), previous_hash, intervals)
+
+def disparate_impact_report(group_stats: pd.DataFrame, previous_hash: str = None, intervals: Optional[Dict] = None):
+    """Four-Fifths Rule report from per-group selection_rate / total / selected"""
     best_group = group_stats['selection_rate'].idxmax()
     best_rate = group_stats['selection_rate'].max()
 
@@ -98,6 +207,14 @@ def analyze_disparate_impact(data: List[Dict], protected_attribute: str, outcome
             "is_reference_group": group == best_group
         }
 
+        if intervals:
+            ci = intervals["groups"][str(group)]
+            lower, upper = ci["disparate_impact_ratio"]
+            conclusive = lower is not None and upper is not None and (lower >= 0.8 or upper < 0.8)
+            report[str(group)]["confidence_interval"] = {**ci, "conclusive": conclusive}
+            if not conclusive and status != BiasStatus.PASS.value:
+                flags.append(f"Small-sample uncertainty for {group}: impact ratio interval [{lower}, {upper}] spans the 80% threshold")
+
     overall = "BIASED" if any(r["status"] == "FAIL" for r in report.values()) else \
               "WARNING" if any(r["status"] == "WARNING" for r in report.values()) else "FAIR"
 
@@ -123,32 +240,55 @@ def analyze_disparate_impact(data: List[Dict], protected_attribute: str, outcome
         "previous_hash": previous_hash,
         "audit_hash": generate_audit_hash({"report": report, "flags": flags}, previous_hash)
     }
+    if intervals:
+        result["confidence_intervals"] = {k: v for k, v in intervals.items() if k != "groups"}
 
     return result
 
-def analyze_equalized_odds(data: List[Dict], protected_attribute: str, actual_outcome: str, predicted_outcome: str, threshold: float, previous_hash: str = None):
-    if not data:
+def analyze_equalized_odds(data: TabularData, protected_attribute: str, actual_outcome: str, predicted_outcome: str, threshold: float, previous_hash: str = None,
+                           include_matrix: bool = False):
+    if data is None or len(data) == 0:
         return {"error": "No data provided for analysis"}
 
     size_error = validate_data_size(data)
     if size_error:
         return size_error
 
-    df = pd.DataFrame(data)
+    df = as_frame(data)
 
     for col in [protected_attribute, actual_outcome, predicted_outcome]:
         if col not in df.columns:
             return {"error": f"Column '{col}' not found"}
 
-    metrics = calculate_confusion_metrics(
-        df, actual_outcome, predicted_outcome, protected_attribute
-    )
-
-    tprs = [m["true_positive_rate"] for m in metrics.values()]
-    fprs = [m["false_positive_rate"] for m in metrics.values()]
+    try:
+        metrics = calculate_confusion_metrics(
+            df, actual_outcome, predicted_outcome, protected_attribute, include_matrix
+        )
+    except ValueError as e:
+        return {"error": str(e)}
+    return equalized_odds_report(metrics, threshold, previous_hash)
+
+def equalized_odds_report(metrics: Dict, threshold: float, previous_hash: str = None):
+    """TPR / FPR parity report from per-group confusion metrics"""
+    multiclass = any("per_class" in m for m in metrics.values())
+    if multiclass:
+        # Equalized odds must hold for every class: report the worst class gap
+        per_class_differences = {}
+        for label in next(iter(metrics.values()))["per_class"]:
+            class_tprs = [m["per_class"][label]["true_positive_rate"] for m in metrics.values()]
+            class_fprs = [m["per_class"][label]["false_positive_rate"] for m in metrics.values()]
+            per_class_differences[label] = {
+                "tpr_difference": round(float(max(class_tprs) - min(class_tprs)), 4),
+                "fpr_difference": round(float(max(class_fprs) - min(class_fprs)), 4),
+            }
+        tpr_diff = max(d["tpr_difference"] for d in per_class_differences.values())
+        fpr_diff = max(d["fpr_difference"] for d in per_class_differences.values())
+    else:
+        tprs = [m["true_positive_rate"] for m in metrics.values()]
+        fprs = [m["false_positive_rate"] for m in metrics.values()]
 
-    tpr_diff = max(tprs) - min(tprs)
-    fpr_diff = max(fprs) - min(fprs)
+        tpr_diff = max(tprs) - min(tprs)
+        fpr_diff = max(fprs) - min(fprs)
 
     tpr_parity = tpr_diff <= threshold
     fpr_parity = fpr_diff <= threshold
@@ -159,7 +299,7 @@ def analyze_equalized_odds(data: List[Dict], protected_attribute: str, actual_ou
     if not fpr_parity:
         flags.append(f"FPR disparity: {fpr_diff:.3f} exceeds threshold {threshold}")
 
-    return {
+    result = {
         "right_enforced": "Right to Human Agency",
         "overall_status": "PASS" if (tpr_parity and fpr_parity) else "FAIL",
         "methodology": "Equalized Odds (TPR & FPR Parity)",
@@ -173,29 +313,28 @@ def analyze_equalized_odds(data: List[Dict], protected_attribute: str, actual_ou
         "previous_hash": previous_hash,
         "audit_hash": generate_audit_hash(metrics, previous_hash)
     }
+    if multiclass:
+        result["methodology"] = "Equalized Odds (One-vs-Rest TPR & FPR Parity, Multiclass)"
+        result["per_class_differences"] = per_class_differences
+    return result
 
-def analyze_intersectional(data: List[Dict], protected_attributes: List[str], outcome_variable: str, min_group_size: int, previous_hash: str = None):
-    if not data:
+def analyze_intersectional(data: TabularData, protected_attributes: List[str], outcome_variable: str, min_group_size: int, previous_hash: str = None, cache: Optional[GroupStatsCache] = None):
+    if data is None or len(data) == 0:
         return {"error": "No data provided for analysis"}
 
     size_error = validate_data_size(data)
     if size_error:
         return size_error
 
-    df = pd.DataFrame(data)
+    df = as_frame(data)
 
     for attr in protected_attributes:
         if attr not in df.columns:
             return {"error": f"Column '{attr}' not found"}
 
-    # Create intersectional groups
-    df['intersectional_group'] = df[protected_attributes].astype(str).agg(' + '.join, axis=1)
-
-    group_stats = df.groupby('intersectional_group').agg({
-        outcome_variable: ['mean', 'count']
-    })
-    group_stats.columns = ['selection_rate', 'total']
-    group_stats = group_stats[group_stats['total'] >= min_group_size]
+    # Intersectional groups are counted on categorical codes; only groups that
+    # meet min_group_size get human-readable labels
+    group_stats = compute_group_stats(df, protected_attributes, outcome_variable, cache).min_size(min_group_size).summary()
 
     if len(group_stats) == 0:
         return {"error": f"No groups with minimum size {min_group_size}"}
@@ -234,20 +373,84 @@ def analyze_intersectional(data: List[Dict], protected_attributes: List[str], ou
         "audit_hash": generate_audit_hash(results, previous_hash)
     }
 
-def analyze_statistical_significance(data: List[Dict], protected_attribute: str, outcome_variable: str):
+def analyze_statistical_significance(data: TabularData, protected_attribute: str, outcome_variable: str, cache: Optional[GroupStatsCache] = None,
+                                     method: str = "chi_square", n_permutations: int = 10_000,
+                                     time_budget_seconds: float = PERMUTATION_TIME_BUDGET_SECONDS,
+                                     random_state: Optional[int] = 0, n_jobs: int = PERMUTATION_WORKERS):
+    """
+    Group x outcome independence test. method="permutation" (Monte Carlo, for
+    sparse tables / small groups) or "exact" (Fisher, 2x2 only) replace the
+    asymptotic chi-square p-value.
+    """
     size_error = validate_data_size(data)
     if size_error:
         return size_error
 
-    df = pd.DataFrame(data)
+    df = as_frame(data)
+
+    contingency = compute_group_stats(df, protected_attribute, outcome_variable, cache).contingency()
+    if contingency is None:
+        # Too many outcome values for the cube's counts (e.g. a score column)
+        contingency = sparse_contingency(df, protected_attribute, outcome_variable)
+    # Cramér's V is normalised by every row, as it always has been
+    return statistical_significance_report(contingency, method, n_permutations, time_budget_seconds, random_state, n_jobs,
+                                           n_rows=len(df))
 
-    contingency = pd.crosstab(df[protected_attribute], df[outcome_variable])
-    chi2_raw, p_raw, dof, expected = stats.chi2_contingency(contingency)
-    chi2 = float(chi2_raw)
-    p_value = float(p_raw)
+
+def _chi_square(contingency) -> Tuple[float, float]:
+    """
+    Pearson chi-square statistic and p-value of a contingency table. Sparse
+    tables use chi2 = n * sum(O^2 / (row total * column total)) - n over
+    their non-zero cells only.
+    """
+    if not sparse.issparse(contingency):
+        chi2, p_value, _, _ = stats.chi2_contingency(contingency)
+        return float(chi2), float(p_value)
+    table = contingency.tocoo()
+    row_totals = np.asarray(contingency.sum(axis=1)).ravel()
+    col_totals = np.asarray(contingency.sum(axis=0)).ravel()
+    n = float(table.data.sum())
+    dof = (len(row_totals) - 1) * (len(col_totals) - 1)
+    if dof == 0:
+        return 0.0, 1.0
+    chi2 = n * float(np.sum(table.data ** 2 / (row_totals[table.row] * col_totals[table.col]))) - n
+    return chi2, float(stats.chi2.sf(chi2, dof))
+
+def statistical_significance_report(contingency, method: str = "chi_square", n_permutations: int = 10_000,
+                                    time_budget_seconds: float = PERMUTATION_TIME_BUDGET_SECONDS,
+                                    random_state: Optional[int] = 0, n_jobs: int = PERMUTATION_WORKERS,
+                                    n_rows: Optional[int] = None):
+    """
+    Test of independence from a group x outcome contingency table (dense, or
+    sparse for many outcome values: chi-square only). Cramér's V is
+    normalised by n_rows (default: the table total).
+    """
+    if method not in SIGNIFICANCE_METHODS:
+        return {"error": f"Unknown significance method '{method}'. Available: {', '.join(SIGNIFICANCE_METHODS)}"}
+    if contingency is None:
+        # Chunked audits keep only group moments for such outcomes, not the table
+        return {"error": f"Significance tests over chunks need a categorical outcome (at most {MAX_OUTCOME_LEVELS} distinct values)"}
+    if sparse.issparse(contingency) and method != "chi_square":
+        return {"error": f"Permutation and exact tests need a categorical outcome (at most {MAX_OUTCOME_LEVELS} distinct values)"}
+
+    chi2, p_value = _chi_square(contingency)
+
+    methodology = "Chi-Square Test for Independence"
+    details = None
+    if method == "permutation":
+        details = permutation_test(contingency, n_permutations, time_budget_seconds, random_state, n_jobs)
+        p_value = details.pop("p_value")
+        details.pop("statistic")
+        methodology = "Monte Carlo Permutation Test (Pearson Chi-Square Statistic)"
+    elif method == "exact":
+        details = exact_test(contingency)
+        if "error" in details:
+            return details
+        p_value = details.pop("p_value")
+        methodology = "Fisher's Exact Test"
 
     is_significant = bool(p_value < 0.05)
-    n = len(df)
+    n = int(contingency.sum()) if n_rows is None else n_rows
     min_dim = min(contingency.shape) - 1
     cramers_v = float(np.sqrt(chi2 / (n * min_dim))) if min_dim > 0 else 0.0
 
@@ -255,17 +458,26 @@ def analyze_statistical_significance(data: List[Dict], protected_attribute: str,
              "small" if cramers_v < 0.3 else \
              "medium" if cramers_v < 0.5 else "large"
 
-    return {
+    hashed = {"chi2": float(chi2), "p": float(p_value)}
+    if details is not None:
+        hashed.update({"method": method, **details})
+
+    result = {
         "right_enforced": "Right to Human Agency",
         "overall_status": "SIGNIFICANT_BIAS" if is_significant else "NOT_SIGNIFICANT",
-        "methodology": "Chi-Square Test for Independence",
+        "methodology": methodology,
         "chi_square": round(float(chi2), 4),
         "p_value": round(float(p_value), 6),
         "is_significant": is_significant,
         "effect_size": {"cramers_v": round(float(cramers_v), 4), "interpretation": effect},
         "recommendation": "Differences are statistically significant - investigate root causes" if is_significant else "Differences may be random variation",
-        "audit_hash": generate_audit_hash({"chi2": float(chi2), "p": float(p_value)})
+        "audit_hash": generate_audit_hash(hashed)
     }
+    if method == "permutation":
+        result["permutation"] = {**details, "monte_carlo_se": round(details["monte_carlo_se"], 6)}
+    elif method == "exact":
+        result["odds_ratio"] = round(details["odds_ratio"], 4)
+    return result
 
 def explain_decision(model_type: str, input_features: Dict[str, Any], decision: str, feature_weights: Dict[str, float] = None, confidence: float = None):
     model_descriptions = {
@@ -327,30 +539,31 @@ def explain_decision(model_type: str, input_features: Dict[str, Any], decision:
         "audit_hash": generate_audit_hash({"decision": decision, "features": input_features})
     }
 
-def analyze_empathy(text: str, context: str):
-    blob = TextBlob(text)
-
-    # Sentiment analysis (-1 to 1)
-    polarity = blob.sentiment.polarity
-    subjectivity = blob.sentiment.subjectivity
-
+# Empathy tone patterns, compiled once. Each alternative is a whole word or
+# phrase, so the distinct matches of a combined pattern count exactly the
+# individual patterns that occur.
+_HOSTILE_PATTERN = re.compile(
+    r'\b(denied|rejected|failed|unfortunately|cannot|will not|unable|ineligible)\b'
+)
+_EMPATHETIC_PATTERN = re.compile(
+    r'\b(understand|appreciate|thank you|sorry|help|support|options|alternative)\b'
+)
+_REJECTION_FEEDBACK = [
+    (re.compile(r'\balternative|option|next step\b'), "Missing: Provide alternative options or next steps"),
+    (re.compile(r'\bappeal|review|reconsider\b'), "Missing: Mention appeal or review process"),
+    (re.compile(r'\bthank|appreciate\b'), "Missing: Acknowledge the person's effort or situation"),
+]
+
+
+def _empathy_report(text: str, context: str, polarity: float, subjectivity: float) -> Dict[str, Any]:
+    """Empathy report for one text from its sentiment scores."""
     # Convert to 0-100 scale
     empathy_score = (polarity + 1) * 50
 
     # Check for hostile language patterns
-    hostile_patterns = [
-        r'\bdenied\b', r'\brejected\b', r'\bfailed\b', r'\bunfortunately\b',
-        r'\bcannot\b', r'\bwill not\b', r'\bunable\b', r'\bineligible\b'
-    ]
-
-    empathetic_patterns = [
-        r'\bunderstand\b', r'\bappreciate\b', r'\bthank you\b', r'\bsorry\b',
-        r'\bhelp\b', r'\bsupport\b', r'\boptions\b', r'\balternative\b'
-    ]
-
     text_lower = text.lower()
-    hostile_count = sum(1 for p in hostile_patterns if re.search(p, text_lower))
-    empathetic_count = sum(1 for p in empathetic_patterns if re.search(p, text_lower))
+    hostile_count = len(set(_HOSTILE_PATTERN.findall(text_lower)))
+    empathetic_count = len(set(_EMPATHETIC_PATTERN.findall(text_lower)))
 
     # Adjust score based on patterns
     pattern_adjustment = (empathetic_count - hostile_count) * 5
@@ -381,12 +594,7 @@ def analyze_empathy(text: str, context: str):
     # Specific feedback for rejections
     feedback = []
     if context == "rejection":
-        if not re.search(r'\balternative|option|next step\b', text_lower):
-            feedback.append("Missing: Provide alternative options or next steps")
-        if not re.search(r'\bappeal|review|reconsider\b', text_lower):
-            feedback.append("Missing: Mention appeal or review process")
-        if not re.search(r'\bthank|appreciate\b', text_lower):
-            feedback.append("Missing: Acknowledge the person's effort or situation")
+        feedback = [message for pattern, message in _REJECTION_FEEDBACK if not pattern.search(text_lower)]
 
     return {
         "right_enforced": "Right to Empathy",
@@ -407,6 +615,47 @@ def analyze_empathy(text: str, context: str):
         "audit_hash": generate_audit_hash({"score": float(empathy_score), "text_hash": hashlib.sha256(text.encode()).hexdigest()})
     }
 
+
+def analyze_empathy(text: str, context: str):
+    # Sentiment analysis (-1 to 1)
+    sentiment = TextBlob(text).sentiment
+    return _empathy_report(text, context, sentiment.polarity, sentiment.subjectivity)
+
+
+def analyze_empathy_batch(texts: List[str], context: str) -> Dict[str, Any]:
+    """
+    Empathy reports for many texts in one call; each result is identical to
+    analyze_empathy(text, context).
+
+    Sentiment comes straight from the pattern lexicon scorer behind
+    TextBlob's default analyzer (no blob or result type built per text), and
+    templated letters are scored once per distinct text.
+    """
+    if len(texts) > MAX_EMPATHY_BATCH:
+        return {"error": f"Too many texts ({len(texts)}). Maximum is {MAX_EMPATHY_BATCH}."}
+
+    reports: Dict[str, Dict[str, Any]] = {}
+    results = []
+    for text in texts:
+        if text not in reports:
+            polarity, subjectivity = pattern_sentiment(text)
+            reports[text] = _empathy_report(text, context, polarity, subjectivity)
+        results.append(reports[text])
+
+    statuses = [r["status"] for r in results]
+    return {
+        "right_enforced": "Right to Empathy",
+        "context": context,
+        "texts_analyzed": len(results),
+        "distinct_texts": len(reports),
+        "summary": {
+            "mean_empathy_score": round(float(np.mean([r["empathy_score"] for r in results])), 2) if results else None,
+            "status_counts": {status: statuses.count(status) for status in ("PASS", "WARNING", "FAIL")},
+            "level_counts": {level.value: sum(r["empathy_level"] == level.value for r in results) for level in EmpathyLevel},
+        },
+        "results": results,
+    }
+
 def validate_correction_process(has_appeal_mechanism: bool, response_time_hours: int, human_reviewer_assigned: bool, clear_instructions: bool, accessible_format: bool):
     score = 0
     max_score = 100
@@ -502,68 +751,94 @@ def submit_correction_request(decision_id: str, original_decision: str, requeste
         ]
     }
 
-def analyze_ai_disclosure(interface_text: str, interaction_type: str):
-    text_lower = interface_text.lower()
-
-    # Disclosure patterns
-    explicit_disclosures = [
-        r'\bai\b', r'\bartificial intelligence\b', r'\bautomated\b',
-        r'\bbot\b', r'\bchatbot\b', r'\bvirtual assistant\b',
-        r'\bmachine learning\b', r'\balgorithm\b', r'\bautomated system\b'
-    ]
-
-    clear_disclosures = [
-        r'\bthis is an ai\b', r'\bi am an ai\b', r'\bpowered by ai\b',
-        r'\bautomated response\b', r'\bai-generated\b', r'\bai assistant\b',
-        r'\byou are chatting with\b.*\bbot\b'
-    ]
-
-    deceptive_patterns = [
-        r'\bi am a human\b', r'\breal person\b', r'\bmy name is\b',
-        r'\bi personally\b', r'\bspeaking from experience\b'
-    ]
-
-    has_explicit = any(re.search(p, text_lower) for p in explicit_disclosures)
-    has_clear = any(re.search(p, text_lower) for p in clear_disclosures)
-    has_deceptive = any(re.search(p, text_lower) for p in deceptive_patterns)
+# Disclosure patterns
+_EXPLICIT_DISCLOSURES = [
+    r'\bai\b', r'\bartificial intelligence\b', r'\bautomated\b',
+    r'\bbot\b', r'\bchatbot\b', r'\bvirtual assistant\b',
+    r'\bmachine learning\b', r'\balgorithm\b', r'\bautomated system\b'
+]
+
+_CLEAR_DISCLOSURES = [
+    r'\bthis is an ai\b', r'\bi am an ai\b', r'\bpowered by ai\b',
+    r'\bautomated response\b', r'\bai-generated\b', r'\bai assistant\b',
+    # Lookahead rather than .* so the match does not swallow later phrases
+    r'\byou are chatting with\b(?=.*\bbot\b)'
+]
+
+_DECEPTIVE_PATTERNS = [
+    r'\bi am a human\b', r'\breal person\b', r'\bmy name is\b',
+    r'\bi personally\b', r'\bspeaking from experience\b'
+]
+
+# One automaton for all three lists; the named group of each match says which
+# list it came from. Alternatives are whole words or phrases and no phrase
+# contains the start of one from another list, so one left-to-right scan sees
+# every list that matches anywhere. Every clear disclosure contains an explicit
+# AI term, so a clear match also counts as an explicit mention.
+_DISCLOSURE_PATTERN = re.compile("|".join(
+    f"(?P<{name}>{'|'.join(patterns)})"
+    for name, patterns in (
+        ("deceptive", _DECEPTIVE_PATTERNS), ("clear", _CLEAR_DISCLOSURES), ("explicit", _EXPLICIT_DISCLOSURES),
+    )
+))
+
+_DISCLOSURE_LEVELS = {
+    "DECEPTIVE": (0, "CRITICAL VIOLATION"),
+    "FULLY_DISCLOSED": (100, "COMPLIANT"),
+    "PARTIALLY_DISCLOSED": (70, "ACCEPTABLE"),
+    "NOT_DISCLOSED": (30, "NON_COMPLIANT"),
+}
+
+# Recommendations by interaction type
+_DISCLOSURE_RECOMMENDATIONS = {
+    "chatbot": "Add prominent disclosure: 'You are chatting with an AI assistant'",
+    "email": "Include header: 'This email was generated by an automated system'",
+    "web": "Display AI badge/icon near AI-generated content",
+    "phone": "Begin with: 'This is an automated AI assistant'"
+}
+
+
+def classify_disclosure(interface_text: str) -> Dict[str, Any]:
+    """Disclosure status and findings for one text, from a single scan."""
+    found = set()
+    for match in _DISCLOSURE_PATTERN.finditer(interface_text.lower()):
+        found.add(match.lastgroup)
+        if len(found) == 3:
+            break
+    has_deceptive = "deceptive" in found
+    has_clear = "clear" in found
+    has_explicit = has_clear or "explicit" in found
 
-    # Calculate score
     if has_deceptive:
-        score = 0
         status = "DECEPTIVE"
-        level = "CRITICAL VIOLATION"
     elif has_clear:
-        score = 100
         status = "FULLY_DISCLOSED"
-        level = "COMPLIANT"
     elif has_explicit:
-        score = 70
         status = "PARTIALLY_DISCLOSED"
-        level = "ACCEPTABLE"
     else:
-        score = 30
         status = "NOT_DISCLOSED"
-        level = "NON_COMPLIANT"
-
-    # Recommendations by interaction type
-    recommendations = {
-        "chatbot": "Add prominent disclosure: 'You are chatting with an AI assistant'",
-        "email": "Include header: 'This email was generated by an automated system'",
-        "web": "Display AI badge/icon near AI-generated content",
-        "phone": "Begin with: 'This is an automated AI assistant'"
-    }
 
+    score, level = _DISCLOSURE_LEVELS[status]
     return {
-        "right_enforced": "Right to Truth",
-        "disclosure_score": int(score),
+        "disclosure_score": score,
         "status": status,
         "compliance_level": level,
         "findings": {
-            "explicit_ai_mention": bool(has_explicit),
-            "clear_disclosure": bool(has_clear),
-            "potentially_deceptive": bool(has_deceptive)
+            "explicit_ai_mention": has_explicit,
+            "clear_disclosure": has_clear,
+            "potentially_deceptive": has_deceptive
         },
-        "recommendation": recommendations.get(interaction_type, "Add clear AI disclosure"),
+    }
+
+
+def analyze_ai_disclosure(interface_text: str, interaction_type: str):
+    classified = classify_disclosure(interface_text)
+    score, status = classified["disclosure_score"], classified["status"]
+
+    return {
+        "right_enforced": "Right to Truth",
+        **classified,
+        "recommendation": _DISCLOSURE_RECOMMENDATIONS.get(interaction_type, "Add clear AI disclosure"),
         "popia_compliant": score >= 70,
         "eu_ai_act_compliant": score >= 70,
         "best_practices": [
@@ -575,7 +850,133 @@ def analyze_ai_disclosure(interface_text: str, interaction_type: str):
         "audit_hash": generate_audit_hash({"score": int(score), "status": status})
     }
 
-def comprehensive_audit(organization_name: str, ai_systems: List[Dict[str, Any]], framework: FrameworkType):
+
+def analyze_ai_disclosure_batch(texts: List[str], interaction_type: str) -> Dict[str, Any]:
+    """
+    Classify many interface strings (e.g. crawled UI copy) in one call.
+    Each text gets the same score, status and findings as
+    analyze_ai_disclosure; repeated strings are classified once.
+    """
+    if len(texts) > MAX_DISCLOSURE_BATCH:
+        return {"error": f"Too many texts ({len(texts)}). Maximum is {MAX_DISCLOSURE_BATCH}."}
+
+    classified: Dict[str, Dict[str, Any]] = {}
+    results = []
+    for i, text in enumerate(texts):
+        if text not in classified:
+            classified[text] = classify_disclosure(text)
+        results.append({"index": i, **classified[text]})
+
+    status_counts = {status: 0 for status in _DISCLOSURE_LEVELS}
+    for result in results:
+        status_counts[result["status"]] += 1
+    flagged = [r["index"] for r in results if r["status"] in ("DECEPTIVE", "NOT_DISCLOSED")]
+
+    return {
+        "right_enforced": "Right to Truth",
+        "interaction_type": interaction_type,
+        "texts_analyzed": len(results),
+        "distinct_texts": len(classified),
+        "status_counts": status_counts,
+        "flagged_indices": flagged,
+        "recommendation": _DISCLOSURE_RECOMMENDATIONS.get(interaction_type, "Add clear AI disclosure"),
+        "results": results,
+        "audit_hash": generate_audit_hash({"status_counts": status_counts, "flagged_indices": flagged}),
+    }
+
+def audit_system(system: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Assess one AI system against the 5 Algorithmic Rights.
+
+    Returns the system's findings, its score per right (None when the right
+    could not be tested) and its recommendations in order. Self-contained so
+    comprehensive_audit can run systems in worker processes.
+    """
+    system_name = system.get("name", "Unknown System")
+    system_result = {"name": system_name, "findings": []}
+    scores = {right: None for right in ("human_agency", "explanation", "empathy", "correction", "truth")}
+    recommendations = []
+
+    # --- Right to Human Agency ---
+    if "data" in system and "protected_attribute" in system and "outcome_variable" in system:
+        bias = analyze_disparate_impact(system["data"], system["protected_attribute"], system["outcome_variable"])
+        if "error" not in bias:
+            scores["human_agency"] = 100 if bias["overall_status"] == "FAIR" else 50 if bias["overall_status"] == "WARNING" else 20
+            system_result["bias_status"] = bias["overall_status"]
+            system_result["findings"].extend(bias.get("flags", []))
+            if bias.get("recommendations"):
+                recommendations.extend(bias["recommendations"])
+        else:
+            system_result["bias_status"] = "SKIPPED"
+    else:
+        system_result["bias_status"] = "NO_DATA"
+
+    # --- Right to Explanation ---
+    has_weights = "feature_weights" in system and system["feature_weights"]
+    has_model_type = "model_type" in system
+    if has_weights and has_model_type:
+        scores["explanation"] = 100
+    elif has_model_type:
+        scores["explanation"] = 60
+        recommendations.append(f"{system_name}: Provide feature weights for full explainability")
+    else:
+        scores["explanation"] = 30
+        recommendations.append(f"{system_name}: Document model type and feature importance")
+
+    # --- Right to Empathy ---
+    if "sample_communication" in system:
+        emp = analyze_empathy(system["sample_communication"], system.get("communication_context", "notification"))
+        scores["empathy"] = emp["empathy_score"]
+        if emp["status"] == "FAIL":
+            system_result["findings"].append(f"Empathy: {emp['recommendation']}")
+        if emp.get("specific_feedback"):
+            recommendations.extend(emp["specific_feedback"])
+
+    # --- Right to Correction ---
+    if "has_appeal" in system:
+        corr = validate_correction_process(
+            has_appeal_mechanism=system.get("has_appeal", False),
+            response_time_hours=system.get("appeal_response_hours", 168),
+            human_reviewer_assigned=system.get("human_reviewer", False),
+            clear_instructions=system.get("clear_appeal_instructions", False),
+            accessible_format=system.get("accessible_appeal", False),
+        )
+        scores["correction"] = corr["compliance_score"]
+        if corr["status"] != "COMPLIANT":
+            system_result["findings"].extend(corr["issues"])
+        if corr.get("recommendations"):
+            recommendations.extend(corr["recommendations"])
+
+    # --- Right to Truth ---
+    if "interface_text" in system:
+        disc = analyze_ai_disclosure(system["interface_text"], system.get("interaction_type", "web"))
+        scores["truth"] = disc["disclosure_score"]
+        if disc["status"] != "FULLY_DISCLOSED":
+            system_result["findings"].append(f"Disclosure: {disc['recommendation']}")
+        if disc.get("status") in ["NOT_DISCLOSED", "DECEPTIVE"]:
+            recommendations.append(disc.get("recommendation", "Add clear AI disclosure"))
+
+    return {"system_result": system_result, "scores": scores, "recommendations": recommendations}
+
+
+def _audit_systems(ai_systems: List[Dict[str, Any]], n_jobs: int) -> List[Dict[str, Any]]:
+    """audit_system over every system, in input order; on a process pool when n_jobs > 1."""
+    if n_jobs > 1 and len(ai_systems) >= AUDIT_PARALLEL_MIN_SYSTEMS:
+        try:
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(ai_systems))) as pool:
+                return list(pool.map(audit_system, ai_systems))
+        except (OSError, RuntimeError, AssertionError) as e:
+            # e.g. daemonic Celery worker processes cannot fork children
+            logger.warning(f"Process pool unavailable ({e}); auditing systems serially")
+    return [audit_system(system) for system in ai_systems]
+
+
+def comprehensive_audit(
+    organization_name: str,
+    ai_systems: List[Dict[str, Any]],
+    framework: FrameworkType,
+    n_jobs: int = AUDIT_WORKERS,
+):
     """
     Run a comprehensive audit across all 5 Algorithmic Rights.
     Aggregates real analysis results from each AI system provided.
@@ -586,6 +987,9 @@ def comprehensive_audit(organization_name: str, ai_systems: List[Dict[str, Any]]
         - sample_communication, communication_context (for empathy)
         - has_appeal, appeal_response_hours, human_reviewer, etc. (for correction)
         - interface_text, interaction_type (for truth/disclosure)
+
+    Systems are audited independently (on n_jobs worker processes) and
+    aggregated in input order, so the report matches a sequential run.
     """
     results = {
         "organization": organization_name,
@@ -598,77 +1002,13 @@ def comprehensive_audit(organization_name: str, ai_systems: List[Dict[str, Any]]
         "recommendations": []
     }
 
-    agency_scores = []
-    explanation_scores = []
-    empathy_scores = []
-    correction_scores = []
-    truth_scores = []
-
-    for system in ai_systems:
-        system_name = system.get("name", "Unknown System")
-        system_result = {"name": system_name, "findings": []}
-
-        # --- Right to Human Agency ---
-        if "data" in system and "protected_attribute" in system and "outcome_variable" in system:
-            bias = analyze_disparate_impact(system["data"], system["protected_attribute"], system["outcome_variable"])
-            if "error" not in bias:
-                score = 100 if bias["overall_status"] == "FAIR" else 50 if bias["overall_status"] == "WARNING" else 20
-                agency_scores.append(score)
-                system_result["bias_status"] = bias["overall_status"]
-                system_result["findings"].extend(bias.get("flags", []))
-                if bias.get("recommendations"):
-                    results["recommendations"].extend(bias["recommendations"])
-            else:
-                system_result["bias_status"] = "SKIPPED"
-        else:
-            system_result["bias_status"] = "NO_DATA"
-
-        # --- Right to Explanation ---
-        has_weights = "feature_weights" in system and system["feature_weights"]
-        has_model_type = "model_type" in system
-        if has_weights and has_model_type:
-            explanation_scores.append(100)
-        elif has_model_type:
-            explanation_scores.append(60)
-            results["recommendations"].append(f"{system_name}: Provide feature weights for full explainability")
-        else:
-            explanation_scores.append(30)
-            results["recommendations"].append(f"{system_name}: Document model type and feature importance")
-
-        # --- Right to Empathy ---
-        if "sample_communication" in system:
-            emp = analyze_empathy(system["sample_communication"], system.get("communication_context", "notification"))
-            empathy_scores.append(emp["empathy_score"])
-            if emp["status"] == "FAIL":
-                system_result["findings"].append(f"Empathy: {emp['recommendation']}")
-            if emp.get("specific_feedback"):
-                results["recommendations"].extend(emp["specific_feedback"])
-
-        # --- Right to Correction ---
-        if "has_appeal" in system:
-            corr = validate_correction_process(
-                has_appeal_mechanism=system.get("has_appeal", False),
-                response_time_hours=system.get("appeal_response_hours", 168),
-                human_reviewer_assigned=system.get("human_reviewer", False),
-                clear_instructions=system.get("clear_appeal_instructions", False),
-                accessible_format=system.get("accessible_appeal", False),
-            )
-            correction_scores.append(corr["compliance_score"])
-            if corr["status"] != "COMPLIANT":
-                system_result["findings"].extend(corr["issues"])
-            if corr.get("recommendations"):
-                results["recommendations"].extend(corr["recommendations"])
-
-        # --- Right to Truth ---
-        if "interface_text" in system:
-            disc = analyze_ai_disclosure(system["interface_text"], system.get("interaction_type", "web"))
-            truth_scores.append(disc["disclosure_score"])
-            if disc["status"] != "FULLY_DISCLOSED":
-                system_result["findings"].append(f"Disclosure: {disc['recommendation']}")
-            if disc.get("status") in ["NOT_DISCLOSED", "DECEPTIVE"]:
-                results["recommendations"].append(disc.get("recommendation", "Add clear AI disclosure"))
-
-        results["system_results"].append(system_result)
+    right_scores = {right: [] for right in ("human_agency", "explanation", "empathy", "correction", "truth")}
+    for audited in _audit_systems(ai_systems, n_jobs):
+        for right, score in audited["scores"].items():
+            if score is not None:
+                right_scores[right].append(score)
+        results["recommendations"].extend(audited["recommendations"])
+        results["system_results"].append(audited["system_result"])
 
     # Aggregate per-right averages
     def _avg(scores, default=50):
@@ -681,11 +1021,8 @@ def comprehensive_audit(organization_name: str, ai_systems: List[Dict[str, Any]]
         return "NEEDS_IMPROVEMENT"
 
     rights = {
-        "human_agency": {"score": _avg(agency_scores), "status": _status(_avg(agency_scores)), "systems_tested": len(agency_scores)},
-        "explanation": {"score": _avg(explanation_scores), "status": _status(_avg(explanation_scores)), "systems_tested": len(explanation_scores)},
-        "empathy": {"score": _avg(empathy_scores), "status": _status(_avg(empathy_scores)), "systems_tested": len(empathy_scores)},
-        "correction": {"score": _avg(correction_scores), "status": _status(_avg(correction_scores)), "systems_tested": len(correction_scores)},
-        "truth": {"score": _avg(truth_scores), "status": _status(_avg(truth_scores)), "systems_tested": len(truth_scores)},
+        right: {"score": _avg(scores), "status": _status(_avg(scores)), "systems_tested": len(scores)}
+        for right, scores in right_scores.items()
     }
 
     results["rights_assessment"] = rights
@@ -918,7 +1255,7 @@ def list_frameworks():
         ]
     }
 
-def analyze_differential_fairness(data: List[Dict], protected_attributes: List[str], outcome_variable: str, epsilon: float = 0.1):
+def analyze_differential_fairness(data: TabularData, protected_attributes: List[str], outcome_variable: str, epsilon: float = 0.1, cache: Optional[GroupStatsCache] = None):
     """
     Calculates epsilon-differential fairness.
     The system is fair if for any two intersectional groups s_i, s_j:
@@ -928,19 +1265,21 @@ def analyze_differential_fairness(data: List[Dict], protected_attributes: List[s
     if size_error:
         return size_error
 
-    df = pd.DataFrame(data)
+    df = as_frame(data)
     
-    # Create intersectional groups
-    df['group'] = df[protected_attributes].astype(str).agg(' + '.join, axis=1)
-    
-    group_stats = df.groupby('group')[outcome_variable].mean()
-    rates = group_stats.values
+    # Intersectional group rates from the shared group statistics cube
+    cube = compute_group_stats(df, protected_attributes, outcome_variable, cache)
+    rates = cube.rates
     
     if len(rates) < 2:
         return {"error": "Insufficient groups for differential analysis"}
         
     max_rate = np.max(rates)
     min_rate = np.min(rates)
+
+    # Only the extreme groups get labels; ties resolve to the first label in sorted order
+    max_group = min(cube.labels_for(np.flatnonzero(rates == max_rate)), default="nan")
+    min_group = min(cube.labels_for(np.flatnonzero(rates == min_rate)), default="nan")
     
     # Add small epsilon to avoid division by zero
     if min_rate == 0: min_rate = 0.0001
@@ -955,16 +1294,16 @@ def analyze_differential_fairness(data: List[Dict], protected_attributes: List[s
         "epsilon_target": float(epsilon),
         "observed_log_ratio": round(float(log_ratio), 4),
         "is_fair": is_fair,
-        "max_group": str(group_stats.idxmax()),
-        "min_group": str(group_stats.idxmin()),
+        "max_group": max_group,
+        "min_group": min_group,
         "right_enforced": "Right to Human Agency (Advanced)",
-        "recommendation": "Probability bounds are within fair range." if is_fair else f"Intersectional disparity exceeds epsilon bound ({epsilon}). Investigate {group_stats.idxmin()} outcomes."
+        "recommendation": "Probability bounds are within fair range." if is_fair else f"Intersectional disparity exceeds epsilon bound ({epsilon}). Investigate {min_group} outcomes."
     }
 
-def get_differential_fairness(data: List[Dict], protected_attributes: List[str], outcome_variable: str):
+def get_differential_fairness(data: TabularData, protected_attributes: List[str], outcome_variable: str):
     return analyze_differential_fairness(data, protected_attributes, outcome_variable)
 
-def analyze_atkinson_index(data: List[Dict], protected_attribute: str, outcome_variable: str, epsilon: float = 0.5):
+def analyze_atkinson_index(data: TabularData, protected_attribute: str, outcome_variable: str, epsilon: float = 0.5, cache: Optional[GroupStatsCache] = None):
     """
     Calculates the Atkinson Index for outcome inequality.
     A = 1 - [1/n * sum( (y_i / mean_y)^(1-epsilon) )]^(1/(1-epsilon))
@@ -973,10 +1312,12 @@ def analyze_atkinson_index(data: List[Dict], protected_attribute: str, outcome_v
     if size_error:
         return size_error
 
-    df = pd.DataFrame(data)
-    group_rates = df.groupby(protected_attribute)[outcome_variable].mean()
-    y = group_rates.values
-    
+    df = as_frame(data)
+    y = compute_group_stats(df, protected_attribute, outcome_variable, cache).rates
+    return atkinson_report(y, epsilon)
+
+def atkinson_report(y: np.ndarray, epsilon: float = 0.5):
+    """Atkinson Index from per-group selection rates"""
     # Avoid zero mean
     mean_y = np.mean(y)
     if mean_y == 0: return {"error": "Mean outcome is zero"}
@@ -1005,10 +1346,10 @@ def analyze_atkinson_index(data: List[Dict], protected_attribute: str, outcome_v
         "recommendation": "Outcome distribution is equitable." if atkinson < 0.1 else "Significant inequality detected in group outcomes. Review allocation logic."
     }
 
-def get_atkinson_index(data: List[Dict], protected_attribute: str, outcome_variable: str):
+def get_atkinson_index(data: TabularData, protected_attribute: str, outcome_variable: str):
     return analyze_atkinson_index(data, protected_attribute, outcome_variable)
 
-def analyze_theil_index(data: List[Dict], protected_attribute: str, outcome_variable: str):
+def analyze_theil_index(data: TabularData, protected_attribute: str, outcome_variable: str, cache: Optional[GroupStatsCache] = None):
     """
     Calculates the Theil Index (Generalized Entropy GE(1)).
     T = 1/n * sum( (y_i / mean_y) * ln(y_i / mean_y) )
@@ -1017,10 +1358,12 @@ def analyze_theil_index(data: List[Dict], protected_attribute: str, outcome_vari
     if size_error:
         return size_error
 
-    df = pd.DataFrame(data)
-    group_rates = df.groupby(protected_attribute)[outcome_variable].mean()
-    y = group_rates.values
-    
+    df = as_frame(data)
+    y = compute_group_stats(df, protected_attribute, outcome_variable, cache).rates
+    return theil_report(y)
+
+def theil_report(y: np.ndarray):
+    """Theil Index from per-group selection rates"""
     mean_y = np.mean(y)
     if mean_y == 0: return {"error": "Mean outcome is zero"}
     
@@ -1041,5 +1384,5 @@ def analyze_theil_index(data: List[Dict], protected_attribute: str, outcome_vari
         "recommendation": "Theil index indicates low entropy in outcome distribution." if theil < 0.05 else "Systemic inequality detected. High entropy in group outcomes."
     }
 
-def get_theil_index(data: List[Dict], protected_attribute: str, outcome_variable: str):
+def get_theil_index(data: TabularData, protected_attribute: str, outcome_variable: str):
     return analyze_theil_index(data, protected_attribute, outcome_variable)
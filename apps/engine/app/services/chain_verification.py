@@ -1,6 +1,15 @@
-from typing import List, Dict, Any
-import hashlib
 import json
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+from app.core.canonical import canonical_hash
+from app.core.config import CHAIN_VERIFY_WORKERS, CHAIN_VERIFY_BATCH_RECORDS, CHAIN_VERIFY_MAX_RECORD_BYTES
+from app.services.hash_chain import HashChain
+
+logger = logging.getLogger("aic.engine.chain_verification")
 
 def verify_hash_chain(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
@@ -20,7 +29,7 @@ def verify_hash_chain(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
         if previous_hash:
             payload["previous_hash"] = previous_hash
             
-        expected_hash = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+        expected_hash = canonical_hash(payload)
         
         entry_valid = (expected_hash == current_hash)
         
@@ -44,3 +53,176 @@ def verify_hash_chain(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
         "is_valid": is_valid,
         "results": verification_results
     }
+
+
+# (sequence_number, previous_hash, chain_hash, recomputed chain_hash, parse error)
+_Checked = Tuple[Any, str, str, Optional[str], Optional[str]]
+
+
+def _recompute_batch(lines: List[bytes]) -> List[_Checked]:
+    """
+    Parse NDJSON audit records and recompute each chain_hash from the
+    record's own previous_hash (runs in worker processes). Records are
+    independent here; links between neighbours are checked by the caller.
+    """
+    checked = []
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            checked.append((None, "", "", None, f"invalid JSON ({e})"))
+            continue
+        if not isinstance(record, dict):
+            checked.append((None, "", "", None, "record is not a JSON object"))
+            continue
+        # A JSON null reads as a missing hash, not the string "None"
+        previous_hash = str(record.get("previous_hash") or "")
+        recomputed = HashChain.compute_chain_hash(previous_hash, record.get("data", {}))
+        checked.append((record.get("sequence_number"), previous_hash, str(record.get("chain_hash") or ""),
+                        recomputed, None))
+    return checked
+
+
+class StreamingChainVerifier:
+    """
+    Verifies a HashChain audit trail delivered as NDJSON (one record per
+    line) in pieces of any size, with the same checks as
+    HashChain.verify_chain.
+
+    Complete lines are collected into batches of CHAIN_VERIFY_BATCH_RECORDS;
+    parsing and hash recomputation of a batch only need the batch itself, so
+    batches run on a process pool when n_jobs > 1. The previous_hash link
+    check needs the neighbouring record's chain_hash and runs here, in
+    order, as batches complete. At most 2 x n_jobs batches are in flight, so
+    memory stays bounded however long the chain is, and broken links are
+    reported as soon as their batch is done.
+    """
+
+    def __init__(self, n_jobs: int = CHAIN_VERIFY_WORKERS, batch_records: int = CHAIN_VERIFY_BATCH_RECORDS,
+                 expected_previous_hash: Optional[str] = None):
+        self.n_jobs = n_jobs
+        self.batch_records = batch_records
+        self.last_hash = expected_previous_hash or HashChain.GENESIS_HASH
+        self.records_checked = 0
+        self.issues = 0
+        self.bytes_received = 0
+        self._tail = b""
+        self._batch: List[bytes] = []
+        self._in_flight = deque()
+        self._pool = None
+        if n_jobs > 1:
+            try:
+                self._pool = ProcessPoolExecutor(max_workers=n_jobs)
+            except (OSError, RuntimeError, AssertionError) as e:
+                logger.warning(f"Process pool unavailable ({e}); verifying serially")
+
+    def _link(self, checked: List[_Checked]) -> List[Dict[str, Any]]:
+        reports = []
+        for sequence_number, previous_hash, chain_hash, recomputed, error in checked:
+            index = self.records_checked
+            self.records_checked += 1
+            if error is not None:
+                reports.append({"record_index": index, "sequence_number": None, "issue": error})
+                # The next record's link cannot be checked against an unreadable one
+                self.last_hash = None
+                continue
+            if self.last_hash is not None and previous_hash != self.last_hash:
+                reports.append({
+                    "record_index": index,
+                    "sequence_number": sequence_number,
+                    "issue": "previous_hash mismatch",
+                    "expected": self.last_hash[:16] + "...",
+                    "actual": previous_hash[:16] + "...",
+                })
+            if recomputed != chain_hash:
+                reports.append({
+                    "record_index": index,
+                    "sequence_number": sequence_number,
+                    "issue": "chain_hash recomputation failed — data may have been tampered with",
+                    "expected": recomputed[:16] + "...",
+                    "actual": chain_hash[:16] + "...",
+                })
+            self.last_hash = chain_hash
+        self.issues += len(reports)
+        return reports
+
+    def _submit(self) -> List[Dict[str, Any]]:
+        lines, self._batch = self._batch, []
+        if self._pool is not None:
+            try:
+                self._in_flight.append(self._pool.submit(_recompute_batch, lines))
+                return self._collect(wait=len(self._in_flight) > 2 * self.n_jobs)
+            except (OSError, RuntimeError, AssertionError) as e:
+                # e.g. daemonic Celery worker processes cannot fork children
+                logger.warning(f"Process pool unavailable ({e}); verifying serially")
+                self._shutdown(cancel=False)
+        return self._collect(drain=True) + self._link(_recompute_batch(lines))
+
+    def _collect(self, wait: bool = False, drain: bool = False) -> List[Dict[str, Any]]:
+        """Link-check finished batches in order; wait for the oldest (or, with drain, all) of them."""
+        reports = []
+        while self._in_flight and (drain or wait or self._in_flight[0].done()):
+            reports += self._link(self._in_flight.popleft().result())
+            wait = False
+        return reports
+
+    def _shutdown(self, cancel: bool = False) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=cancel)
+            self._pool = None
+
+    def feed_bytes(self, data: bytes, final: bool = False) -> List[Dict[str, Any]]:
+        """Add the next piece of the NDJSON body; returns the broken links found so far."""
+        self.bytes_received += len(data)
+        lines = (self._tail + data).split(b"\n")
+        self._tail = b"" if final else lines.pop()
+        if len(self._tail) > CHAIN_VERIFY_MAX_RECORD_BYTES:
+            raise ValueError(f"NDJSON record exceeds {CHAIN_VERIFY_MAX_RECORD_BYTES} bytes")
+
+        reports = []
+        for line in lines:
+            if line.strip():
+                self._batch.append(line)
+                if len(self._batch) >= self.batch_records:
+                    reports += self._submit()
+        if final:
+            if self._batch:
+                reports += self._submit()
+            reports += self._collect(drain=True)
+            self._shutdown()
+        return reports + self._collect()
+
+    def close(self) -> None:
+        """Stop early (e.g. the client went away): pending batches are cancelled."""
+        self._shutdown(cancel=True)
+        self._in_flight.clear()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "valid": self.issues == 0,
+            "records_checked": self.records_checked,
+            "issues": self.issues,
+            "last_chain_hash": self.last_hash,
+            "message": (
+                "Chain integrity verified — all records are intact."
+                if self.issues == 0
+                else f"Chain integrity BROKEN — {self.issues} issue(s) detected."
+            ),
+            "verified_at": datetime.utcnow().isoformat(),
+        }
+
+
+def verify_chain_stream(chunks: Iterable[bytes], n_jobs: int = CHAIN_VERIFY_WORKERS,
+                        expected_previous_hash: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Verify an NDJSON audit trail delivered as byte chunks (e.g. a file or
+    upload body). Yields each broken link as it is found, then a summary.
+    """
+    verifier = StreamingChainVerifier(n_jobs=n_jobs, expected_previous_hash=expected_previous_hash)
+    try:
+        for chunk in chunks:
+            yield from verifier.feed_bytes(chunk)
+        yield from verifier.feed_bytes(b"", final=True)
+        yield verifier.summary()
+    finally:
+        verifier.close()
@@ -0,0 +1,205 @@
+"""
+Confidence Intervals for Group Selection Rates
+Uncertainty for Four-Fifths Rule reports, which matters most for small groups.
+
+Two methods, both computed from the group statistics cube (never by
+re-running pandas over rows):
+
+- wilson: closed-form Wilson score interval per selection rate; the impact
+  ratio interval combines the group's and the reference group's Wilson
+  intervals with the MOVER-R method (Donner & Zou, 2012). Binary outcomes only.
+- bootstrap: percentile intervals from resampling each group's outcome
+  counts (one multinomial draw per group per replicate, all in NumPy). The
+  reference group is re-chosen in every replicate, exactly like the point
+  estimate. For high-cardinality outcomes the cube only keeps per-group
+  count, sum and sum of squares, and each resampled mean is drawn from its
+  normal limit (mean, variance / n) instead. Replicates use a fixed seed by
+  default so the report, and therefore its audit hash, is reproducible.
+
+Bootstrap replicates are drawn in blocks of groups, each from its own seeded
+stream, so memory is bounded by _BOOTSTRAP_BLOCK_CELLS replicate x group
+cells however many replicates and groups there are. A first pass finds each
+replicate's best rate, a second redraws the same blocks for the percentiles.
+Replicates x groups is capped at MAX_BOOTSTRAP_CELLS, so reports over many
+groups use fewer replicates than requested (never fewer than 100).
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from scipy import stats
+
+from app.core.config import MAX_BOOTSTRAP_CELLS
+from app.services.group_stats import GroupStats
+
+CI_METHODS = ("wilson", "bootstrap")
+
+# Replicate x group cells drawn at once (~32MB per float64 array)
+_BOOTSTRAP_BLOCK_CELLS = 1 << 22
+
+
+def wilson_interval(successes: np.ndarray, totals: np.ndarray, confidence: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized Wilson score interval; NaN where a group has no observations."""
+    successes = np.asarray(successes, dtype=float)
+    totals = np.asarray(totals, dtype=float)
+    z = stats.norm.ppf(0.5 + confidence / 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = successes / totals
+        denom = 1 + z ** 2 / totals
+        center = (p + z ** 2 / (2 * totals)) / denom
+        half = z * np.sqrt(p * (1 - p) / totals + z ** 2 / (4 * totals ** 2)) / denom
+    return np.clip(center - half, 0.0, 1.0), np.clip(center + half, 0.0, 1.0)
+
+
+def mover_ratio_interval(p1, l1, u1, p2, l2, u2) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    MOVER-R interval for p1 / p2 from separate intervals (l1, u1), (l2, u2).
+    The upper bound is NaN (unbounded) when the reference interval reaches 0.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lower = (p1 * p2 - np.sqrt(np.maximum((p1 * p2) ** 2 - l1 * u2 * (2 * p1 - l1) * (2 * p2 - u2), 0))) \
+            / (u2 * (2 * p2 - u2))
+        upper = (p1 * p2 + np.sqrt(np.maximum((p1 * p2) ** 2 - u1 * l2 * (2 * p1 - u1) * (2 * p2 - l2), 0))) \
+            / (l2 * (2 * p2 - l2))
+    upper = np.where(l2 > 0, upper, np.nan)
+    return np.maximum(lower, 0.0), upper
+
+
+def _resampled_rates(rng: np.random.Generator, n: np.ndarray, counts: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    """
+    (size, G) mean outcomes under multinomial resampling of each group's counts.
+
+    The multinomial is drawn as a chain of conditional binomials, each one
+    vectorized over replicates and groups, and folded straight into the
+    outcome sum — a binary outcome costs a single binomial call.
+    """
+    totals = np.zeros((size, len(n)))
+    remaining_n = np.broadcast_to(n, (size, len(n))).copy()
+    remaining_mass = n.astype(float)
+    for k in range(counts.shape[1] - 1):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            p = np.where(remaining_mass > 0, counts[:, k] / remaining_mass, 0.0)
+        draw = rng.binomial(remaining_n, np.clip(p, 0.0, 1.0))
+        if values[k] != 0:
+            totals += values[k] * draw
+        remaining_n -= draw
+        remaining_mass = remaining_mass - counts[:, k]
+    if values[-1] != 0:
+        totals += values[-1] * remaining_n
+    return totals / n
+
+
+def _resampled_means(rng: np.random.Generator, n: np.ndarray, sums: np.ndarray, sum_squares: np.ndarray,
+                     size: int) -> np.ndarray:
+    """(size, G) resampled mean outcomes from per-group moments, using the bootstrap mean's normal limit."""
+    mean = sums / n
+    variance = np.maximum(sum_squares / n - mean ** 2, 0.0)
+    return mean + np.sqrt(variance / n) * rng.standard_normal((size, len(n)))
+
+
+def _bootstrap(cube: GroupStats, confidence: float, n_bootstrap: int, random_state: Optional[int]):
+    """Percentile intervals for selection rates and impact ratios from resampled group means."""
+    totals = cube.totals
+    observed = np.flatnonzero(totals > 0)
+    width = max(1, _BOOTSTRAP_BLOCK_CELLS // n_bootstrap)
+    blocks = [observed[i:i + width] for i in range(0, len(observed), width)]
+    seeds = np.random.SeedSequence(random_state).spawn(len(blocks))
+    if cube.counts is not None:
+        values = np.asarray(cube.outcomes, dtype=float)
+
+    def resample(j: int) -> np.ndarray:
+        """(B, block) resampled rates of block j; the same draws on every call."""
+        rng, rows = np.random.default_rng(seeds[j]), blocks[j]
+        if cube.counts is None:
+            return _resampled_means(rng, totals[rows], cube.sums[rows], cube.sum_squares[rows], n_bootstrap)
+        return _resampled_rates(rng, totals[rows], cube.counts[rows], values, n_bootstrap)
+
+    first = resample(0)
+    best = first.max(axis=1)
+    for j in range(1, len(blocks)):
+        best = np.maximum(best, resample(j).max(axis=1))
+
+    alpha = (1 - confidence) / 2
+    q = [100 * alpha, 100 * (1 - alpha)]
+    rate_lo = np.full(len(totals), np.nan)
+    rate_hi = np.full(len(totals), np.nan)
+    ratio_lo = np.full(len(totals), np.nan)
+    ratio_hi = np.full(len(totals), np.nan)
+    for j, rows in enumerate(blocks):
+        rates = first if j == 0 else resample(j)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratios = np.where(best[:, None] > 0, rates / best[:, None], 0.0)
+        rate_lo[rows], rate_hi[rows] = np.percentile(rates, q, axis=0)
+        ratio_lo[rows], ratio_hi[rows] = np.percentile(ratios, q, axis=0)
+    return rate_lo, rate_hi, ratio_lo, ratio_hi
+
+
+def _wilson(cube: GroupStats, confidence: float):
+    """Wilson rate intervals and MOVER-R ratio intervals against the best observed group."""
+    selected, totals = cube.sums, cube.totals
+    rate_lo, rate_hi = wilson_interval(selected, totals, confidence)
+    rates = cube.rates
+    best = int(np.nanargmax(rates))
+    p2, l2, u2 = rates[best], rate_lo[best], rate_hi[best]
+    if p2 > 0:
+        ratio_lo, ratio_hi = mover_ratio_interval(rates, rate_lo, rate_hi, p2, l2, u2)
+        ratio_lo[best] = ratio_hi[best] = 1.0
+    else:
+        # Nobody is selected: the report uses ratio 0 for every group
+        ratio_lo = ratio_hi = np.zeros(len(rates))
+    return rate_lo, rate_hi, ratio_lo, ratio_hi
+
+
+def _bound(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def disparate_impact_intervals(
+    cube: GroupStats,
+    method: str = "wilson",
+    confidence_level: float = 0.95,
+    n_bootstrap: int = 10_000,
+    random_state: Optional[int] = 0,
+) -> Dict[str, Any]:
+    """
+    Per-group intervals for selection rate and disparate impact ratio.
+    Bounds are None where undefined (empty group, unbounded ratio).
+    """
+    if method not in CI_METHODS:
+        return {"error": f"Unknown confidence interval method '{method}'. Available: {', '.join(CI_METHODS)}"}
+    if not 0 < confidence_level < 1:
+        return {"error": "confidence_level must be between 0 and 1"}
+    if method == "bootstrap" and n_bootstrap < 1:
+        return {"error": "n_bootstrap must be at least 1"}
+    if not (cube.totals > 0).any():
+        return {"error": "No outcomes available for confidence intervals"}
+    # Cubes without per-value counts only exist for numeric outcomes
+    values = None
+    if cube.counts is not None:
+        try:
+            values = np.asarray(cube.outcomes, dtype=float)
+        except (TypeError, ValueError):
+            return {"error": "Confidence intervals require a numeric outcome"}
+
+    if method == "wilson":
+        if values is None or not np.isin(values, [0.0, 1.0]).all():
+            return {"error": "Wilson intervals require a binary (0/1) outcome; use the bootstrap method"}
+        rate_lo, rate_hi, ratio_lo, ratio_hi = _wilson(cube, confidence_level)
+    else:
+        requested = n_bootstrap
+        n_bootstrap = min(n_bootstrap, max(100, MAX_BOOTSTRAP_CELLS // len(cube.totals)))
+        rate_lo, rate_hi, ratio_lo, ratio_hi = _bootstrap(cube, confidence_level, n_bootstrap, random_state)
+
+    groups = {
+        str(group): {
+            "selection_rate": [_bound(rate_lo[i]), _bound(rate_hi[i])],
+            "disparate_impact_ratio": [_bound(ratio_lo[i]), _bound(ratio_hi[i])],
+        }
+        for i, group in enumerate(cube.groups)
+    }
+    method_info = {"method": method, "confidence_level": confidence_level}
+    if method == "bootstrap":
+        method_info.update({"replicates": n_bootstrap, "random_state": random_state})
+        if n_bootstrap < requested:
+            method_info["replicates_requested"] = requested
+    return {**method_info, "groups": groups}
@@ -1,9 +1,17 @@
+import threading
+import uuid
+from datetime import datetime
+
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from cachetools import TTLCache
 from scipy.spatial import distance
 from scipy import stats
-from app.core.config import MAX_DATA_ROWS
+from app.core.columnar import TabularData, as_frame
+from app.core.config import (
+    MAX_DATA_ROWS, MAX_FEATURES, MAX_DRIFT_PROFILES, DRIFT_PROFILE_TTL_SECONDS, MAX_DRIFT_CATEGORIES
+)
 
 class DriftMonitor:
     """Calculates distributional drift metrics like PSI, Jensen-Shannon, and KS Test."""
@@ -58,4 +66,412 @@ def analyze_drift(baseline: List[float], current: List[float], feature_name: str
         "js_divergence": js,
         "ks_test": {"statistic": round(float(ks_stat), 4), "p_value": round(float(p_val), 4), "significant": bool(p_val < 0.05)},
         "status": "STABLE" if (psi["status"] == "STABLE" and p_val > 0.05) else "DRIFT_DETECTED"
-    }
\ No newline at end of file
+    }
+
+
+def feature_matrix(df: pd.DataFrame, features: List[str]) -> np.ndarray:
+    """rows x features float matrix; missing values are NaN."""
+    return df[features].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+
+
+def numeric_features(df: pd.DataFrame) -> List[str]:
+    return [str(c) for c in df.columns
+            if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+
+
+# Above this effective sample size, KS p-values use the limiting Kolmogorov
+# distribution (within 0.01 of kstwo there, and far cheaper to evaluate)
+KS_LIMITING_MIN_N = 1000
+
+
+def ks_p_values(statistics: np.ndarray, n1: np.ndarray, n2: np.ndarray) -> np.ndarray:
+    """Two-sided asymptotic KS p-values, as ks_2samp(method="asymp"), for every feature at once."""
+    n1, n2 = n1.astype(float), n2.astype(float)
+    en = np.maximum(np.round(n1 * n2 / np.maximum(n1 + n2, 1)), 1)
+    p_values = stats.kstwobign.sf(statistics * np.sqrt(en))
+    small = en <= KS_LIMITING_MIN_N
+    if small.any():
+        p_values[small] = stats.kstwo.sf(statistics[small], en[small])
+    return np.clip(p_values, 0.0, 1.0)
+
+
+def fixed_bin_counts(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """
+    Counts (features x bins) of values (rows x features) over per-feature
+    equal-width edges (features x bins + 1), with np.histogram's bin
+    assignment. Values outside the edges fall into the outer bins; NaN is
+    not counted.
+    """
+    n_bins = edges.shape[1] - 1
+    first, last = edges[:, 0], edges[:, -1]
+    present = ~np.isnan(values)
+    x = np.clip(np.where(present, values, first), first, last)
+    indices = ((x - first) / (last - first) * n_bins).astype(np.intp)
+    indices[indices == n_bins] -= 1
+    # Same ~1 ULP corrections at bin edges as np.histogram
+    rows = np.arange(len(edges))
+    indices -= x < edges[rows, indices]
+    indices += (x >= edges[rows, indices + 1]) & (indices != n_bins - 1)
+    flat = (indices + rows * n_bins)[present]
+    return np.bincount(flat, minlength=len(edges) * n_bins).reshape(-1, n_bins).astype(float)
+
+
+def equal_width_edges(first: np.ndarray, last: np.ndarray, n_bins: int) -> np.ndarray:
+    """Per-feature bin edges over [first, last]; a constant feature gets a unit-wide range, as in np.histogram."""
+    constant = first == last
+    first, last = np.where(constant, first - 0.5, first), np.where(constant, last + 0.5, last)
+    return np.linspace(first, last, n_bins + 1, axis=1)
+
+
+def _psi_status(psi: np.ndarray) -> np.ndarray:
+    return np.where(psi >= 0.25, "CRITICAL_DRIFT", np.where(psi >= 0.1, "WARNING_DRIFT", "STABLE"))
+
+
+def _categorical_features(df: pd.DataFrame, max_categories: int) -> Tuple[List[str], List[str]]:
+    """(categorical columns, those with too many categories to profile)."""
+    columns = [str(c) for c in df.columns
+               if pd.api.types.is_bool_dtype(df[c]) or not pd.api.types.is_numeric_dtype(df[c])]
+    columns = [c for c in columns if not pd.api.types.is_datetime64_any_dtype(df[c])]
+    too_many = [c for c in columns if df[c].nunique() > max_categories]
+    return [c for c in columns if c not in too_many], too_many
+
+
+class CategoricalBaseline:
+    """
+    Category vocabularies and baseline frequencies of categorical features.
+
+    Each feature's vocabulary is a pandas Index built once per baseline, so
+    a window only needs one hash lookup per value (Index.get_indexer) to
+    map values to category codes; values outside the vocabulary share one
+    "unseen" slot per feature. Every feature owns a block of slots in one
+    flat count vector, so a window's category counts for all features come
+    from a single bincount, and PSI and chi-square are computed for all
+    features at once over a features x (categories + 1) matrix.
+
+    PSI floors empty categories (including the baseline's always-empty
+    unseen slot) at 0.0001, as the numeric PSI does. Chi-square is the test
+    of homogeneity between the baseline and window counts (no continuity
+    correction), over the categories seen in either.
+    """
+
+    def __init__(self, df: pd.DataFrame, features: List[str]):
+        self.features = list(features)
+        self.vocabularies: List[pd.Index] = []
+        baseline_counts = []
+        for feature in self.features:
+            codes, uniques = pd.factorize(df[feature])
+            self.vocabularies.append(pd.Index(uniques))
+            baseline_counts.append(np.bincount(codes[codes >= 0], minlength=len(uniques)))
+        sizes = np.array([len(v) + 1 for v in self.vocabularies], dtype=np.intp)  # + unseen slot
+        self.offsets = (np.cumsum(sizes) - sizes).astype(np.intp)
+        # Slot -> (feature, position) in the padded features x (max categories + 1) matrix
+        self.width = int(sizes.max()) if len(sizes) else 1
+        self.rows_of = np.repeat(np.arange(len(self.features)), sizes)
+        self.cols_of = np.arange(int(sizes.sum())) - np.repeat(self.offsets, sizes)
+        self.unseen = self.offsets + sizes - 1
+        self.baseline = self._padded(np.concatenate(
+            [np.append(counts, 0) for counts in baseline_counts]
+        ).astype(float) if self.features else np.zeros(0))
+        self.baseline_totals = self.baseline.sum(axis=1)
+
+    def _padded(self, flat: np.ndarray) -> np.ndarray:
+        matrix = np.zeros((len(self.features), self.width))
+        matrix[self.rows_of, self.cols_of] = flat
+        return matrix
+
+    def levels(self) -> Dict[str, int]:
+        return {f: len(v) for f, v in zip(self.features, self.vocabularies)}
+
+    def compare(self, df: pd.DataFrame, features: List[str]):
+        selected = np.array([self.features.index(f) for f in features], dtype=np.intp)
+        slots, unseen_values = [], {}
+        for i in selected:
+            column = df[self.features[i]]
+            # Missing values are not in the vocabulary either; only the
+            # (usually few) misses need a null check
+            codes = self.vocabularies[i].get_indexer(column)
+            misses = np.flatnonzero(codes < 0)
+            if len(misses):
+                missed = column.iloc[misses]
+                unseen = missed.notna().to_numpy()
+                codes[misses[unseen]] = len(self.vocabularies[i])
+                codes = codes[codes >= 0]
+                if unseen.any():
+                    unseen_values[i] = pd.unique(missed[unseen])[:10]
+            slots.append(self.offsets[i] + codes)
+        flat = np.bincount(np.concatenate(slots) if slots else np.zeros(0, dtype=np.intp),
+                           minlength=len(self.rows_of)).astype(float)
+
+        current = self._padded(flat)[selected]
+        baseline = self.baseline[selected]
+        n_current = current.sum(axis=1)
+        n_baseline = self.baseline_totals[selected]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            expected = baseline / n_baseline[:, None]
+            actual = current / n_current[:, None]
+            in_vocab = np.arange(self.width) < np.array([len(self.vocabularies[i]) + 1 for i in selected])[:, None]
+            floor_e = np.where(expected == 0, 0.0001, expected)
+            floor_a = np.where(actual == 0, 0.0001, actual)
+            psi = np.where(in_vocab, (floor_a - floor_e) * np.log(floor_a / floor_e), 0.0).sum(axis=1)
+
+            totals = baseline + current
+            n = (n_baseline + n_current)[:, None]
+            observed = totals > 0
+            chi2 = np.zeros(len(selected))
+            for counts, n_side in ((baseline, n_baseline), (current, n_current)):
+                expected_counts = totals * n_side[:, None] / n
+                chi2 += np.where(observed, (counts - expected_counts) ** 2 / np.where(observed, expected_counts, 1), 0.0).sum(axis=1)
+        dof = observed.sum(axis=1) - 1
+        chi2_p = np.where(dof > 0, stats.chi2.sf(chi2, np.maximum(dof, 1)), 1.0)
+        psi_status = _psi_status(psi)
+
+        results, skipped = [], []
+        for j, i in enumerate(selected):
+            name = self.features[i]
+            if n_current[j] == 0:
+                skipped.append(name)
+                continue
+            unseen = int(current[j, len(self.vocabularies[i])])
+            stable = psi_status[j] == "STABLE" and chi2_p[j] > 0.05
+            results.append({
+                "feature": name,
+                "type": "categorical",
+                "psi": {"metric": "PSI", "value": round(float(psi[j]), 4), "status": str(psi_status[j])},
+                "chi_square": {"statistic": round(float(chi2[j]), 4), "dof": int(max(dof[j], 0)),
+                               "p_value": round(float(chi2_p[j]), 4), "significant": bool(chi2_p[j] < 0.05)},
+                "unseen_categories": {
+                    "count": unseen,
+                    "rate": round(unseen / float(n_current[j]), 4),
+                    "examples": [v.item() if hasattr(v, "item") else v for v in unseen_values.get(i, [])],
+                },
+                "status": "STABLE" if stable else "DRIFT_DETECTED",
+            })
+        return results, skipped
+
+
+class BaselineProfile:
+    """
+    Precomputed baseline distributions for a set of numeric features.
+
+    Registering a baseline fixes, per feature, n_bins equal-width bin edges
+    over the baseline's range, the baseline histogram over them and the
+    sorted (non-null) baseline sample. Each window of current data is then
+    compared against every feature at once: one vectorized binning and
+    histogram of the window, PSI and JS divergence for all features as array
+    operations, and the KS statistic from the stored sorted samples.
+
+    Unlike analyze_drift, whose bins span baseline and current together, the
+    bins stay fixed: current values outside the baseline range fall into the
+    outer bins. While the window lies inside the baseline range, PSI, JS and
+    the KS statistic equal analyze_drift's; KS p-values are asymptotic (see
+    ks_p_values) rather than exact, so all features are computed together.
+    """
+
+    def __init__(self, df: pd.DataFrame, features: List[str], n_bins: int = 10, name: Optional[str] = None,
+                 categorical_features: Optional[List[str]] = None):
+        self.profile_id = str(uuid.uuid4())
+        self.name = name
+        self.features = list(features)
+        self.n_bins = n_bins
+        self.created_at = datetime.utcnow().isoformat()
+        self.rows = len(df)
+        self.categorical = CategoricalBaseline(df, categorical_features or [])
+
+        values = feature_matrix(df, self.features)
+        self.counts = (~np.isnan(values)).sum(axis=0)
+        if self.features:
+            self.edges = equal_width_edges(np.nanmin(values, axis=0), np.nanmax(values, axis=0), n_bins)
+        else:
+            self.edges = np.zeros((0, n_bins + 1))
+        self.percents = self._histograms(values, np.arange(len(self.features))) / self.counts[:, None]
+        # NaN sorts last, so feature i's sample is sorted[:counts[i], i]
+        self.sorted = np.sort(values, axis=0)
+
+    @classmethod
+    def from_arrays(cls, features: List[str], n_bins: int, edges: np.ndarray, percents: np.ndarray,
+                    sorted_values: np.ndarray) -> "BaselineProfile":
+        """
+        Numeric profile from the arrays a previous profile computed (edges,
+        percents and sorted, laid out as in __init__), e.g. read back from
+        storage, without re-binning or re-sorting the baseline.
+        """
+        profile = cls.__new__(cls)
+        profile.profile_id = str(uuid.uuid4())
+        profile.name = None
+        profile.features = list(features)
+        profile.n_bins = n_bins
+        profile.created_at = datetime.utcnow().isoformat()
+        profile.rows = len(sorted_values)
+        profile.categorical = CategoricalBaseline(pd.DataFrame(), [])
+        profile.counts = (~np.isnan(sorted_values)).sum(axis=0)
+        profile.edges, profile.percents, profile.sorted = edges, percents, sorted_values
+        return profile
+
+    def _histograms(self, values: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """Bin counts of values (rows x features, the profile features at columns)."""
+        return fixed_bin_counts(values, self.edges[columns])
+
+    def _ks(self, values: np.ndarray, columns: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """Two-sample KS statistic per feature against the stored sorted baseline."""
+        current = np.sort(values, axis=0)
+        statistics = np.zeros(len(columns))
+        for j, i in enumerate(columns):
+            b = self.sorted[:self.counts[i], i]
+            c = current[:counts[j], j]
+            if not len(c):
+                continue
+            # Both empirical CDFs evaluated at every point of either sample
+            points = np.concatenate((b, c))
+            cdf_b = np.searchsorted(b, points, side="right") / len(b)
+            cdf_c = np.searchsorted(c, points, side="right") / len(c)
+            statistics[j] = np.abs(cdf_b - cdf_c).max()
+        return statistics
+
+    def _compare_numeric(self, df: pd.DataFrame, features: List[str]):
+        columns = np.array([self.features.index(f) for f in features], dtype=np.intp)
+        values = feature_matrix(df, features)
+        counts = (~np.isnan(values)).sum(axis=0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            expected = self.percents[columns]
+            actual = self._histograms(values, columns) / counts[:, None]
+            floor_e = np.where(expected == 0, 0.0001, expected)
+            floor_a = np.where(actual == 0, 0.0001, actual)
+            psi = np.sum((floor_a - floor_e) * np.log(floor_a / floor_e), axis=1)
+            js = distance.jensenshannon(expected, actual, base=2, axis=1) ** 2
+        ks = self._ks(values, columns, counts)
+        p_values = ks_p_values(ks, self.counts[columns], counts)
+        psi_status = _psi_status(psi)
+
+        results, skipped = [], []
+        for i, name in enumerate(features):
+            if counts[i] == 0:
+                skipped.append(name)
+                continue
+            stable = psi_status[i] == "STABLE" and p_values[i] > 0.05
+            results.append({
+                "feature": name,
+                "psi": {"metric": "PSI", "value": round(float(psi[i]), 4), "status": str(psi_status[i])},
+                "js_divergence": {"metric": "JS Divergence", "value": round(float(js[i]), 4),
+                                  "status": "STABLE" if js[i] < 0.1 else "SHIFTED"},
+                "ks_test": {"statistic": round(float(ks[i]), 4), "p_value": round(float(p_values[i]), 4),
+                            "significant": bool(p_values[i] < 0.05)},
+                "status": "STABLE" if stable else "DRIFT_DETECTED",
+            })
+        return results, skipped
+
+    def compare(self, df: pd.DataFrame, features: Optional[List[str]] = None) -> Dict[str, Any]:
+        profiled = self.features + self.categorical.features
+        features = profiled if features is None else list(dict.fromkeys(features))
+        unknown = [f for f in features if f not in profiled]
+        if unknown:
+            return {"error": f"Feature(s) not in baseline profile: {', '.join(unknown)}"}
+        missing = [f for f in features if f not in df.columns]
+        if missing:
+            return {"error": f"Feature(s) not found in data: {', '.join(missing)}"}
+
+        numeric = [f for f in features if f in self.features]
+        categorical = [f for f in features if f not in self.features]
+        results, skipped = self._compare_numeric(df, numeric) if numeric else ([], [])
+        if categorical:
+            categorical_results, categorical_skipped = self.categorical.compare(df, categorical)
+            results += categorical_results
+            skipped += categorical_skipped
+        drifted = [r["feature"] for r in results if r["status"] != "STABLE"]
+
+        return {
+            "profile_id": self.profile_id,
+            "rows": len(df),
+            "features": results,
+            "drifted_features": drifted,
+            "features_skipped": skipped,
+            "status": "DRIFT_DETECTED" if drifted else "STABLE",
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "profile_id": self.profile_id,
+            "name": self.name,
+            "features": self.features,
+            "categorical_features": self.categorical.features,
+            "categories": self.categorical.levels(),
+            "rows": self.rows,
+            "n_bins": self.n_bins,
+            "created_at": self.created_at,
+        }
+
+
+# Registered profiles live in-process, like chunked audit sessions; unused ones expire
+_PROFILES = TTLCache(maxsize=MAX_DRIFT_PROFILES, ttl=DRIFT_PROFILE_TTL_SECONDS)
+_PROFILES_LOCK = threading.Lock()
+
+
+def get_baseline_profile(profile_id: str) -> Optional[BaselineProfile]:
+    with _PROFILES_LOCK:
+        return _PROFILES.get(profile_id)
+
+
+def register_baseline(data: TabularData, features: Optional[List[str]] = None, n_bins: int = 10,
+                      name: Optional[str] = None, categorical_features: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Profile a baseline dataset once for later multi-feature drift
+    comparisons. Without features or categorical_features, every numeric
+    column is profiled numerically and every other column with at most
+    MAX_DRIFT_CATEGORIES categories categorically.
+    """
+    if data is None or len(data) == 0:
+        return {"error": "No data provided for analysis"}
+    if len(data) > MAX_DATA_ROWS:
+        return {"error": f"Data too large. Maximum is {MAX_DATA_ROWS} rows."}
+    df = as_frame(data)
+    skipped = []
+    if features is None and categorical_features is None:
+        features = numeric_features(df)
+        categorical_features, skipped = _categorical_features(df, MAX_DRIFT_CATEGORIES)
+    features = list(dict.fromkeys(features or []))
+    categorical_features = [f for f in dict.fromkeys(categorical_features or []) if f not in features]
+    if not features and not categorical_features:
+        return {"error": "No features to profile"}
+    if len(features) + len(categorical_features) > MAX_FEATURES:
+        return {"error": f"Too many features ({len(features) + len(categorical_features)}). Maximum is {MAX_FEATURES}."}
+    for feature in features + categorical_features:
+        if feature not in df.columns:
+            return {"error": f"Feature '{feature}' not found in data"}
+    values = feature_matrix(df, features)
+    empty = [f for f, present in zip(features, (~np.isnan(values)).any(axis=0)) if not present]
+    if empty:
+        return {"error": f"Feature(s) without numeric baseline values: {', '.join(empty)}"}
+    empty = [f for f in categorical_features if df[f].notna().sum() == 0]
+    if empty:
+        return {"error": f"Feature(s) without baseline values: {', '.join(empty)}"}
+    too_many = [f for f in categorical_features if df[f].nunique() > MAX_DRIFT_CATEGORIES]
+    if too_many:
+        return {"error": f"Too many categories in {', '.join(too_many)}. Maximum is {MAX_DRIFT_CATEGORIES}."}
+
+    profile = BaselineProfile(df, features, n_bins, name, categorical_features)
+    with _PROFILES_LOCK:
+        _PROFILES[profile.profile_id] = profile
+    result = profile.summary()
+    if skipped:
+        result["features_skipped"] = skipped
+    return result
+
+
+def compare_to_baseline(profile_id: str, data: TabularData, features: Optional[List[str]] = None) -> Dict[str, Any]:
+    """PSI, JS divergence and KS of every profiled feature of a current window against its baseline."""
+    profile = get_baseline_profile(profile_id)
+    if profile is None:
+        return {"error": f"Baseline profile '{profile_id}' not found or expired"}
+    if data is None or len(data) == 0:
+        return {"error": "No data provided for analysis"}
+    if len(data) > MAX_DATA_ROWS:
+        return {"error": f"Data too large. Maximum is {MAX_DATA_ROWS} rows."}
+    return profile.compare(as_frame(data), features)
+
+
+def delete_baseline(profile_id: str) -> Dict[str, Any]:
+    with _PROFILES_LOCK:
+        profile = _PROFILES.pop(profile_id, None)
+    if profile is None:
+        return {"error": f"Baseline profile '{profile_id}' not found or expired"}
+    return {"profile_id": profile_id, "deleted": True}
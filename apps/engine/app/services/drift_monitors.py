@@ -0,0 +1,419 @@
+"""
+Scheduled Drift Monitors
+Continuous drift monitoring per (system, feature), evaluated by Celery beat.
+
+A monitor profiles its feature's baseline once, at registration, and stores
+the bin edges, baseline histogram and sorted sample. Production rows pushed for a
+system are appended to every monitor of that system as pending batches;
+each scheduled run (run_drift_monitors, every DRIFT_MONITOR_INTERVAL_SECONDS)
+evaluates only the batches that arrived since the previous run, as one
+window against the stored baseline (BaselineProfile.compare), and consumes
+them. Runs are therefore incremental: past windows are never recomputed,
+and the rolling PSI/KS history is read back from the stored per-window
+results. A change of a monitor's status raises an alert.
+
+Monitors, pending batches, history and alerts live in SQLite at
+DRIFT_MONITOR_DB_PATH, so the API process and the workers share them when
+it points at a shared file (in memory unless configured).
+"""
+
+import logging
+import sqlite3
+import threading
+import uuid
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.columnar import TabularData, as_frame
+from app.core.config import (
+    DRIFT_MONITOR_DB_PATH, DRIFT_MONITOR_MIN_WINDOW_ROWS, DRIFT_MONITOR_MAX_PENDING_ROWS,
+    DRIFT_MONITOR_HISTORY, MAX_DATA_ROWS
+)
+from app.services.drift_monitoring import BaselineProfile, get_baseline_profile
+
+logger = logging.getLogger("aic.engine.drift_monitors")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS monitors (
+    monitor_id TEXT PRIMARY KEY,
+    system_id TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    n_bins INTEGER NOT NULL,
+    min_window_rows INTEGER NOT NULL,
+    baseline BLOB NOT NULL,
+    edges BLOB NOT NULL,
+    percents BLOB NOT NULL,
+    baseline_rows INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    windows_evaluated INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    last_run_at TEXT,
+    UNIQUE (system_id, feature)
+);
+CREATE TABLE IF NOT EXISTS pending (
+    batch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    monitor_id TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    vals BLOB NOT NULL,
+    received_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pending_by_monitor ON pending (monitor_id, batch_id);
+CREATE TABLE IF NOT EXISTS history (
+    monitor_id TEXT NOT NULL,
+    window_seq INTEGER NOT NULL,
+    run_at TEXT NOT NULL,
+    window_rows INTEGER NOT NULL,
+    psi REAL NOT NULL,
+    js_divergence REAL NOT NULL,
+    ks_statistic REAL NOT NULL,
+    ks_p_value REAL NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (monitor_id, window_seq)
+);
+CREATE TABLE IF NOT EXISTS alerts (
+    alert_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    monitor_id TEXT NOT NULL,
+    system_id TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    window_seq INTEGER NOT NULL,
+    previous_status TEXT NOT NULL,
+    status TEXT NOT NULL,
+    psi REAL NOT NULL,
+    ks_statistic REAL NOT NULL,
+    raised_at TEXT NOT NULL
+);
+"""
+
+# Status of a monitor that has not evaluated a window yet
+NO_DATA = "NO_DATA"
+
+_EVALUATION_COLUMNS = (
+    "monitor_id, system_id, feature, n_bins, min_window_rows, baseline, edges, percents, status, windows_evaluated"
+)
+
+_MONITOR_COLUMNS = (
+    "monitor_id, system_id, feature, n_bins, min_window_rows, baseline_rows, status, "
+    "windows_evaluated, created_at, last_run_at"
+)
+
+
+def _pack(values: np.ndarray) -> bytes:
+    return zlib.compress(np.ascontiguousarray(values, dtype="<f8").tobytes())
+
+
+def _unpack(blob: bytes) -> np.ndarray:
+    return np.frombuffer(zlib.decompress(blob), dtype="<f8")
+
+
+class DriftMonitorStore:
+    """Drift monitors and their pending windows, history and alerts."""
+
+    def __init__(self, path: str = ":memory:"):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.executescript(_SCHEMA)
+
+    def _monitor(self, row) -> Dict[str, Any]:
+        return dict(zip([c.strip() for c in _MONITOR_COLUMNS.split(",")], row))
+
+    def register(self, system_id: str, feature: str, baseline: np.ndarray, n_bins: int = 10,
+                 min_window_rows: int = DRIFT_MONITOR_MIN_WINDOW_ROWS) -> Dict[str, Any]:
+        baseline = baseline[~np.isnan(baseline)]
+        if not len(baseline):
+            return {"error": f"No numeric baseline values for feature '{feature}'"}
+        # Binned and sorted here once; every scheduled run reuses the stored arrays
+        profile = BaselineProfile(pd.DataFrame({feature: baseline}), [feature], n_bins)
+        monitor_id = str(uuid.uuid4())
+        with self.lock:
+            try:
+                self.conn.execute(
+                    "INSERT INTO monitors VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, NULL)",
+                    (monitor_id, system_id, feature, n_bins, min_window_rows, _pack(profile.sorted),
+                     _pack(profile.edges), _pack(profile.percents), len(baseline),
+                     NO_DATA, datetime.utcnow().isoformat()),
+                )
+            except sqlite3.IntegrityError:
+                return {"error": f"A monitor for feature '{feature}' of system '{system_id}' already exists"}
+        return self.get(monitor_id)
+
+    def get(self, monitor_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT {_MONITOR_COLUMNS} FROM monitors WHERE monitor_id = ?", (monitor_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            pending = self.conn.execute(
+                "SELECT COALESCE(SUM(rows), 0) FROM pending WHERE monitor_id = ?", (monitor_id,)
+            ).fetchone()[0]
+        return {**self._monitor(row), "pending_rows": pending}
+
+    def list(self, system_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = f"SELECT {_MONITOR_COLUMNS} FROM monitors"
+        params = ()
+        if system_id is not None:
+            query += " WHERE system_id = ?"
+            params = (system_id,)
+        with self.lock:
+            rows = self.conn.execute(query + " ORDER BY system_id, feature", params).fetchall()
+        return [self._monitor(row) for row in rows]
+
+    def delete(self, monitor_id: str) -> bool:
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = self.conn.execute("DELETE FROM monitors WHERE monitor_id = ?", (monitor_id,)).rowcount
+                for table in ("pending", "history", "alerts"):
+                    self.conn.execute(f"DELETE FROM {table} WHERE monitor_id = ?", (monitor_id,))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return bool(deleted)
+
+    def ingest(self, system_id: str, df: pd.DataFrame) -> Dict[str, Any]:
+        """Append each monitored feature's values to that monitor's pending window."""
+        with self.lock:
+            monitors = self.conn.execute(
+                "SELECT monitor_id, feature FROM monitors WHERE system_id = ?", (system_id,)
+            ).fetchall()
+        if not monitors:
+            return {"error": f"No drift monitors registered for system '{system_id}'"}
+
+        batches, ignored = [], []
+        for monitor_id, feature in monitors:
+            if feature not in df.columns:
+                ignored.append(feature)
+                continue
+            values = pd.to_numeric(df[feature], errors="coerce").to_numpy(dtype=float)
+            values = values[~np.isnan(values)]
+            if len(values):
+                batches.append((monitor_id, feature, values))
+
+        received_at = datetime.utcnow().isoformat()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for monitor_id, feature, values in batches:
+                    pending = self.conn.execute(
+                        "SELECT COALESCE(SUM(rows), 0) FROM pending WHERE monitor_id = ?", (monitor_id,)
+                    ).fetchone()[0]
+                    if pending + len(values) > DRIFT_MONITOR_MAX_PENDING_ROWS:
+                        self.conn.execute("ROLLBACK")
+                        return {"error": f"Too many pending rows for feature '{feature}'. "
+                                         f"Maximum is {DRIFT_MONITOR_MAX_PENDING_ROWS} between runs."}
+                    self.conn.execute(
+                        "INSERT INTO pending (monitor_id, rows, vals, received_at) VALUES (?, ?, ?, ?)",
+                        (monitor_id, len(values), _pack(values), received_at),
+                    )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return {
+            "system_id": system_id,
+            "rows": len(df),
+            "features_received": [feature for _, feature, _ in batches],
+            "features_missing": ignored,
+        }
+
+    def _evaluate(self, monitor: tuple) -> Optional[Dict[str, Any]]:
+        """
+        Evaluate one monitor's pending window, if large enough. Runs inside a
+        write transaction, so concurrent runs never evaluate a batch twice.
+        """
+        monitor_id, system_id, feature, n_bins, min_window_rows, baseline, edges, percents, previous, windows = monitor
+        batches = self.conn.execute(
+            "SELECT batch_id, vals FROM pending WHERE monitor_id = ? ORDER BY batch_id", (monitor_id,)
+        ).fetchall()
+        if not batches:
+            return None
+        values = np.concatenate([_unpack(blob) for _, blob in batches])
+        if len(values) < min_window_rows:
+            return None
+
+        profile = BaselineProfile.from_arrays(
+            [feature], n_bins, _unpack(edges).reshape(1, -1), _unpack(percents).reshape(1, -1),
+            _unpack(baseline).reshape(-1, 1),
+        )
+        result = profile.compare(pd.DataFrame({feature: values}))["features"][0]
+        status, window, run_at = result["status"], windows + 1, datetime.utcnow().isoformat()
+
+        self.conn.execute("DELETE FROM pending WHERE monitor_id = ? AND batch_id <= ?", (monitor_id, batches[-1][0]))
+        self.conn.execute(
+            "INSERT INTO history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (monitor_id, window, run_at, len(values), result["psi"]["value"], result["js_divergence"]["value"],
+             result["ks_test"]["statistic"], result["ks_test"]["p_value"], status),
+        )
+        self.conn.execute(
+            "DELETE FROM history WHERE monitor_id = ? AND window_seq <= ?", (monitor_id, window - DRIFT_MONITOR_HISTORY)
+        )
+        self.conn.execute(
+            "UPDATE monitors SET status = ?, windows_evaluated = ?, last_run_at = ? WHERE monitor_id = ?",
+            (status, window, run_at, monitor_id),
+        )
+
+        alert = None
+        # A first window only alerts when it already shows drift
+        if status != previous and not (previous == NO_DATA and status == "STABLE"):
+            alert = {
+                "monitor_id": monitor_id, "system_id": system_id, "feature": feature, "window": window,
+                "previous_status": previous, "status": status, "psi": result["psi"]["value"],
+                "ks_statistic": result["ks_test"]["statistic"], "raised_at": run_at,
+            }
+            self.conn.execute(
+                "INSERT INTO alerts (monitor_id, system_id, feature, window_seq, previous_status, status, psi, "
+                "ks_statistic, raised_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                tuple(alert.values()),
+            )
+            logger.warning(
+                f"Drift alert: {system_id}/{feature} changed from {previous} to {status} "
+                f"(PSI {alert['psi']}, KS {alert['ks_statistic']})"
+            )
+        return {"monitor_id": monitor_id, "system_id": system_id, "feature": feature, "window": window,
+                "window_rows": len(values), **{k: result[k] for k in ("psi", "js_divergence", "ks_test")},
+                "status": status, "alert": alert}
+
+    def run(self, system_id: Optional[str] = None) -> Dict[str, Any]:
+        """Evaluate the newly arrived window of every monitor (of one system, if given)."""
+        query = "SELECT monitor_id FROM monitors"
+        params = ()
+        if system_id is not None:
+            query += " WHERE system_id = ?"
+            params = (system_id,)
+        with self.lock:
+            monitor_ids = [row[0] for row in self.conn.execute(query, params).fetchall()]
+
+        evaluated, waiting = [], []
+        for monitor_id in monitor_ids:
+            with self.lock:
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    # Re-read under the write lock: another run may have moved the monitor on
+                    monitor = self.conn.execute(
+                        f"SELECT {_EVALUATION_COLUMNS} FROM monitors WHERE monitor_id = ?", (monitor_id,)
+                    ).fetchone()
+                    result = self._evaluate(monitor) if monitor is not None else None
+                    self.conn.execute("COMMIT")
+                except Exception:
+                    self.conn.execute("ROLLBACK")
+                    raise
+            if result is None:
+                waiting.append(monitor_id)
+            else:
+                evaluated.append(result)
+        return {
+            "run_at": datetime.utcnow().isoformat(),
+            "evaluated": evaluated,
+            "waiting": waiting,
+            "alerts": [r["alert"] for r in evaluated if r["alert"]],
+        }
+
+    def history(self, monitor_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT window_seq, run_at, window_rows, psi, js_divergence, ks_statistic, ks_p_value, status "
+                "FROM history WHERE monitor_id = ? ORDER BY window_seq DESC LIMIT ?", (monitor_id, limit)
+            ).fetchall()
+        keys = ("window", "run_at", "window_rows", "psi", "js_divergence", "ks_statistic", "ks_p_value", "status")
+        return [dict(zip(keys, row)) for row in reversed(rows)]
+
+    def alerts(self, system_id: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        query = ("SELECT alert_id, monitor_id, system_id, feature, window_seq, previous_status, status, psi, "
+                 "ks_statistic, raised_at FROM alerts")
+        params: tuple = ()
+        if system_id is not None:
+            query += " WHERE system_id = ?"
+            params = (system_id,)
+        with self.lock:
+            rows = self.conn.execute(query + " ORDER BY alert_id DESC LIMIT ?", params + (limit,)).fetchall()
+        keys = ("alert_id", "monitor_id", "system_id", "feature", "window", "previous_status", "status", "psi",
+                "ks_statistic", "raised_at")
+        return [dict(zip(keys, row)) for row in rows]
+
+
+def _rolling(history: List[Dict[str, Any]]) -> Dict[str, Any]:
+    if not history:
+        return {}
+    psi = np.array([h["psi"] for h in history])
+    ks = np.array([h["ks_statistic"] for h in history])
+    return {
+        "windows": len(history),
+        "psi_mean": round(float(psi.mean()), 4),
+        "psi_max": round(float(psi.max()), 4),
+        "ks_mean": round(float(ks.mean()), 4),
+        "ks_max": round(float(ks.max()), 4),
+        "drift_rate": round(sum(h["status"] != "STABLE" for h in history) / len(history), 4),
+    }
+
+
+_STORE: Optional[DriftMonitorStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_monitor_store() -> DriftMonitorStore:
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = DriftMonitorStore(DRIFT_MONITOR_DB_PATH)
+        return _STORE
+
+
+def register_drift_monitor(system_id: str, feature: str, baseline_data: Optional[List[float]] = None,
+                           profile_id: Optional[str] = None, n_bins: int = 10,
+                           min_window_rows: int = DRIFT_MONITOR_MIN_WINDOW_ROWS) -> Dict[str, Any]:
+    """Monitor one feature of a system against a baseline (raw values or a registered profile's feature)."""
+    if (baseline_data is None) == (profile_id is None):
+        return {"error": "Provide exactly one of baseline_data or profile_id"}
+    if profile_id is not None:
+        profile = get_baseline_profile(profile_id)
+        if profile is None:
+            return {"error": f"Baseline profile '{profile_id}' not found or expired"}
+        if feature not in profile.features:
+            return {"error": f"Feature '{feature}' not in baseline profile"}
+        i = profile.features.index(feature)
+        baseline = profile.sorted[:profile.counts[i], i]
+    else:
+        if len(baseline_data) > MAX_DATA_ROWS:
+            return {"error": f"Data too large. Maximum is {MAX_DATA_ROWS} rows."}
+        baseline = np.array(baseline_data, dtype=float)
+    return get_monitor_store().register(system_id, feature, baseline, n_bins, min_window_rows)
+
+
+def ingest_drift_observations(system_id: str, data: TabularData) -> Dict[str, Any]:
+    if data is None or len(data) == 0:
+        return {"error": "No data provided for analysis"}
+    if len(data) > MAX_DATA_ROWS:
+        return {"error": f"Data too large ({len(data)} rows). Maximum is {MAX_DATA_ROWS}."}
+    return get_monitor_store().ingest(system_id, as_frame(data))
+
+
+def run_drift_monitors(system_id: Optional[str] = None) -> Dict[str, Any]:
+    return get_monitor_store().run(system_id)
+
+
+def drift_monitor_status(monitor_id: str, history: int = 50) -> Dict[str, Any]:
+    store = get_monitor_store()
+    monitor = store.get(monitor_id)
+    if monitor is None:
+        return {"error": f"Drift monitor '{monitor_id}' not found"}
+    windows = store.history(monitor_id, history)
+    return {**monitor, "history": windows, "rolling": _rolling(windows)}
+
+
+def list_drift_monitors(system_id: Optional[str] = None) -> Dict[str, Any]:
+    return {"monitors": get_monitor_store().list(system_id)}
+
+
+def list_drift_alerts(system_id: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+    return {"alerts": get_monitor_store().alerts(system_id, limit)}
+
+
+def delete_drift_monitor(monitor_id: str) -> Dict[str, Any]:
+    if not get_monitor_store().delete(monitor_id):
+        return {"error": f"Drift monitor '{monitor_id}' not found"}
+    return {"monitor_id": monitor_id, "deleted": True}
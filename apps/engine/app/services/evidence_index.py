@@ -0,0 +1,229 @@
+"""
+Evidence Corpus Index
+A persistent inverted index of POPIA Section 71 markers over an
+organization's evidence documents (policies, specs, procedures).
+
+Each document is scanned once with EvidenceScanner.locate when it is added
+or changes; the index stores marker -> (document, offsets) postings in
+SQLite. Coverage questions across the whole corpus ("which policies have no
+recourse mechanism?") are then answered from the postings without
+rescanning any text, and per-document reports are identical to
+scan_evidence on the document.
+
+Re-indexing is incremental: a document whose content hash is unchanged is
+skipped. Documents are stored compressed alongside their postings and
+carry the version of the marker set they were indexed with, so a change to
+POPIA_SECTION_71_MARKERS re-indexes stale documents on their next query.
+
+The index lives in EVIDENCE_INDEX_PATH (in memory unless configured).
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.config import EVIDENCE_INDEX_PATH
+from app.services.evidence_scanner import EvidenceScanner
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    organization_id TEXT NOT NULL,
+    document_id TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    marker_version TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    content BLOB NOT NULL,
+    indexed_at TEXT NOT NULL,
+    PRIMARY KEY (organization_id, document_id)
+);
+CREATE TABLE IF NOT EXISTS postings (
+    organization_id TEXT NOT NULL,
+    document_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    pattern TEXT NOT NULL,
+    offsets TEXT NOT NULL,
+    PRIMARY KEY (organization_id, document_id, category, pattern)
+);
+CREATE INDEX IF NOT EXISTS postings_by_marker ON postings (organization_id, category, pattern);
+"""
+
+
+def _marker_version(scanner: EvidenceScanner) -> str:
+    return hashlib.sha256(json.dumps(scanner.markers()).encode()).hexdigest()[:16]
+
+
+class EvidenceIndex:
+    """Marker postings for every indexed document, per organization."""
+
+    def __init__(self, path: str = ":memory:", scanner: Optional[EvidenceScanner] = None):
+        self.scanner = scanner or EvidenceScanner()
+        self.marker_version = _marker_version(self.scanner)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(_SCHEMA)
+
+    def _write_document(self, organization_id: str, document_id: str, text: str, content_hash: str) -> None:
+        located = self.scanner.locate(text)
+        self.conn.execute(
+            "DELETE FROM postings WHERE organization_id = ? AND document_id = ?", (organization_id, document_id)
+        )
+        self.conn.executemany(
+            "INSERT INTO postings VALUES (?, ?, ?, ?, ?)",
+            [(organization_id, document_id, category, pattern, json.dumps(offsets))
+             for (category, pattern), offsets in located.items()],
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (organization_id, document_id, content_hash, self.marker_version, len(text),
+             zlib.compress(text.encode()), datetime.utcnow().isoformat()),
+        )
+
+    def index_documents(self, organization_id: str, documents: Dict[str, str]) -> Dict[str, Any]:
+        """Add or update documents (document_id -> text); unchanged documents are skipped."""
+        hashes = {doc_id: hashlib.sha256(text.encode()).hexdigest() for doc_id, text in documents.items()}
+        indexed, unchanged = [], []
+        with self.lock, self.conn:
+            stored = dict(self.conn.execute(
+                "SELECT document_id, content_hash || ':' || marker_version FROM documents WHERE organization_id = ?",
+                (organization_id,),
+            ).fetchall())
+            for doc_id, text in documents.items():
+                if stored.get(doc_id) == f"{hashes[doc_id]}:{self.marker_version}":
+                    unchanged.append(doc_id)
+                    continue
+                self._write_document(organization_id, doc_id, text, hashes[doc_id])
+                indexed.append(doc_id)
+        return {
+            "organization_id": organization_id,
+            "indexed": indexed,
+            "unchanged": unchanged,
+            "documents_in_index": self.count(organization_id),
+        }
+
+    def remove_documents(self, organization_id: str, document_ids: List[str]) -> Dict[str, Any]:
+        with self.lock, self.conn:
+            for table in ("postings", "documents"):
+                self.conn.executemany(
+                    f"DELETE FROM {table} WHERE organization_id = ? AND document_id = ?",
+                    [(organization_id, doc_id) for doc_id in document_ids],
+                )
+        return {"organization_id": organization_id, "removed": document_ids,
+                "documents_in_index": self.count(organization_id)}
+
+    def count(self, organization_id: str) -> int:
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM documents WHERE organization_id = ?", (organization_id,)
+            ).fetchone()[0]
+
+    def _refresh_stale(self, organization_id: str) -> None:
+        """Re-index documents indexed with a different marker set."""
+        with self.lock, self.conn:
+            stale = self.conn.execute(
+                "SELECT document_id, content_hash, content FROM documents WHERE organization_id = ? AND marker_version != ?",
+                (organization_id, self.marker_version),
+            ).fetchall()
+            for doc_id, content_hash, content in stale:
+                self._write_document(organization_id, doc_id, zlib.decompress(content).decode(), content_hash)
+
+    def coverage(self, organization_id: str, document_ids: Optional[List[str]] = None,
+                 include_documents: bool = True) -> Dict[str, Any]:
+        """
+        Marker coverage across the corpus (or the listed documents), from the
+        postings alone. Each document report matches scan_evidence.
+        """
+        self._refresh_stale(organization_id)
+        with self.lock:
+            docs = [row[0] for row in self.conn.execute(
+                "SELECT document_id FROM documents WHERE organization_id = ? ORDER BY document_id", (organization_id,)
+            )]
+            found = {doc_id: set() for doc_id in docs}
+            for doc_id, category, pattern in self.conn.execute(
+                "SELECT document_id, category, pattern FROM postings WHERE organization_id = ?", (organization_id,)
+            ):
+                found[doc_id].add((category, pattern))
+
+        if document_ids is not None:
+            unknown = [d for d in document_ids if d not in found]
+            if unknown:
+                return {"error": f"Document(s) not indexed: {', '.join(unknown)}"}
+            docs = list(dict.fromkeys(document_ids))
+        if not docs:
+            return {"error": "No documents indexed for this organization"}
+
+        reports = {doc_id: self.scanner.report(found[doc_id]) for doc_id in docs}
+        categories = {}
+        for category, patterns in self.scanner.POPIA_SECTION_71_MARKERS.items():
+            missing = [d for d in docs if reports[d]["categories"][category]["status"] == "MISSING"]
+            categories[category] = {
+                "documents_covered": len(docs) - len(missing),
+                "missing_in": missing,
+                "marker_document_counts": {
+                    p: sum((category, p) in found[d] for d in docs) for p in patterns
+                },
+            }
+        statuses = Counter(r["status"] for r in reports.values())
+        result = {
+            "organization_id": organization_id,
+            "documents": len(docs),
+            "status_counts": dict(statuses),
+            "categories": categories,
+        }
+        if include_documents:
+            result["document_reports"] = reports
+        return result
+
+    def occurrences(self, organization_id: str, pattern: str) -> Dict[str, Any]:
+        """Documents containing a marker, with the start offsets of each occurrence."""
+        self._refresh_stale(organization_id)
+        markers = [m for m in self.scanner.markers() if m[1] == pattern]
+        if not markers:
+            return {"error": f"Unknown marker '{pattern}'"}
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT document_id, offsets FROM postings WHERE organization_id = ? AND category = ? AND pattern = ? "
+                "ORDER BY document_id",
+                (organization_id, markers[0][0], pattern),
+            ).fetchall()
+        return {
+            "organization_id": organization_id,
+            "category": markers[0][0],
+            "marker": pattern,
+            "documents": {doc_id: json.loads(offsets) for doc_id, offsets in rows},
+        }
+
+
+_INDEX: Optional[EvidenceIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_evidence_index() -> EvidenceIndex:
+    global _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            _INDEX = EvidenceIndex(EVIDENCE_INDEX_PATH)
+        return _INDEX
+
+
+def index_evidence(organization_id: str, documents: Dict[str, str]) -> Dict[str, Any]:
+    if not documents:
+        return {"error": "No documents provided"}
+    return get_evidence_index().index_documents(organization_id, documents)
+
+
+def remove_evidence(organization_id: str, document_ids: List[str]) -> Dict[str, Any]:
+    return get_evidence_index().remove_documents(organization_id, document_ids)
+
+
+def evidence_coverage(organization_id: str, document_ids: Optional[List[str]] = None,
+                      include_documents: bool = True) -> Dict[str, Any]:
+    return get_evidence_index().coverage(organization_id, document_ids, include_documents)
+
+
+def evidence_occurrences(organization_id: str, marker: str) -> Dict[str, Any]:
+    return get_evidence_index().occurrences(organization_id, marker)
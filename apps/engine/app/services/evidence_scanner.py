@@ -1,21 +1,24 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable
+import codecs
 import re
 
+from app.core.config import EVIDENCE_SCAN_CHUNK_CHARS, EVIDENCE_SCAN_OVERLAP_CHARS
+
 class EvidenceScanner:
     """Scans organization evidence (policies, specs) for POPIA Section 71 compliance markers."""
 
     # Markers required for meaningful human intervention
     POPIA_SECTION_71_MARKERS = {
         "human_intervention": [
-            r"human intervention", r"manual override", r"human review", 
+            r"human intervention", r"manual override", r"human review",
             r"human-in-the-loop", r"person shall review"
         ],
         "recourse_mechanism": [
-            r"appeal", r"contest", r"representation", r"reconsider", 
+            r"appeal", r"contest", r"representation", r"reconsider",
             r"right to be heard"
         ],
         "explanation_logic": [
-            r"logic involved", r"explanation", r"how the decision", 
+            r"logic involved", r"explanation", r"how the decision",
             r"interpretable", r"transparency"
         ],
         "data_minimization": [
@@ -25,19 +28,45 @@ class EvidenceScanner:
     }
 
     def scan_text(self, text: str) -> Dict[str, Any]:
+        scan = StreamingEvidenceScan(self)
+        scan.feed(text)
+        return scan.report()
+
+    def scan_chunks(self, chunks: Iterable[str]) -> Dict[str, Any]:
+        """Same report as scan_text over the concatenated chunks."""
+        scan = StreamingEvidenceScan(self)
+        for chunk in chunks:
+            scan.feed(chunk)
+        return scan.report()
+
+    def markers(self) -> List[tuple]:
+        """(category, pattern) for every marker, in declaration order."""
+        return [
+            (category, pattern)
+            for category, patterns in self.POPIA_SECTION_71_MARKERS.items()
+            for pattern in patterns
+        ]
+
+    def locate(self, text: str) -> Dict[tuple, List[int]]:
+        """Start offsets of every occurrence of each marker found in text."""
+        text_lower = text.lower()
+        located = {}
+        for marker in self.markers():
+            offsets = [m.start() for m in re.finditer(marker[1], text_lower)]
+            if offsets:
+                located[marker] = offsets
+        return located
+
+    def report(self, found: set) -> Dict[str, Any]:
+        """Category report from the set of (category, pattern) markers found."""
         results = {}
         findings = []
         missing = []
         total_score = 0
-        
-        text_lower = text.lower()
 
         for category, patterns in self.POPIA_SECTION_71_MARKERS.items():
-            found_in_cat = []
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    found_in_cat.append(pattern)
-            
+            found_in_cat = [pattern for pattern in patterns if (category, pattern) in found]
+
             if found_in_cat:
                 results[category] = {"status": "FOUND", "matches": found_in_cat}
                 total_score += 25
@@ -57,6 +86,86 @@ class EvidenceScanner:
             "recommendation": "Document meets technical compliance standards." if total_score >= 75 else "Document lacks specific legal language required for POPIA Section 71."
         }
 
+
+class StreamingEvidenceScan:
+    """
+    Incremental marker scan over a document received in pieces.
+
+    All markers still outstanding are combined into one alternation, so each
+    chunk is scanned in a single pass. Found markers are dropped from the
+    alternation and the search resumes at the match's start, which finds
+    every marker an individual re.search would (including ones overlapping
+    or starting at the same position). The last EVIDENCE_SCAN_OVERLAP_CHARS
+    characters are carried into the next chunk so a marker split across a
+    chunk boundary still matches. Memory is bounded by the chunk size, and
+    once every marker has been found the rest of the document is skipped.
+    """
+
+    def __init__(self, scanner: EvidenceScanner = None, chunk_chars: int = EVIDENCE_SCAN_CHUNK_CHARS):
+        self.scanner = scanner or EvidenceScanner()
+        self.chunk_chars = chunk_chars
+        self.markers = self.scanner.markers()
+        self.overlap = max([EVIDENCE_SCAN_OVERLAP_CHARS] + [len(p) for _, p in self.markers])
+        self.found = set()
+        self.tail = ""
+        self.bytes_received = 0
+        self._decoder = None
+        self._compile()
+
+    def _compile(self) -> None:
+        # No capture groups: they defeat the regex engine's literal-prefix
+        # scan and make the combined pattern an order of magnitude slower
+        self.remaining = [marker for marker in self.markers if marker not in self.found]
+        self.pattern = re.compile("|".join(f"(?:{p})" for _, p in self.remaining)) if self.remaining else None
+
+    @property
+    def complete(self) -> bool:
+        return self.pattern is None
+
+    def _search(self, text: str) -> None:
+        pos = 0
+        while self.pattern is not None:
+            match = self.pattern.search(text, pos)
+            if match is None:
+                return
+            matched = match.group()
+            self.found.update(marker for marker in self.remaining if re.fullmatch(marker[1], matched))
+            self._compile()
+            pos = match.start()
+
+    def feed(self, text: str) -> None:
+        """Scan the next piece of the document."""
+        for start in range(0, len(text), self.chunk_chars):
+            if self.complete:
+                return
+            window = self.tail + text[start:start + self.chunk_chars].lower()
+            self._search(window)
+            self.tail = window[-self.overlap:]
+
+    def feed_bytes(self, data: bytes, final: bool = False, encoding: str = "utf-8") -> None:
+        """Decode and scan the next piece of an encoded document; characters split across pieces are kept."""
+        self.bytes_received += len(data)
+        if self.complete:
+            return
+        if self._decoder is None:
+            self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self.feed(self._decoder.decode(data, final=final))
+
+    def report(self) -> Dict[str, Any]:
+        return self.scanner.report(self.found)
+
+
 def scan_evidence(text: str):
     scanner = EvidenceScanner()
     return scanner.scan_text(text)
+
+
+def scan_evidence_stream(chunks: Iterable[bytes], encoding: str = "utf-8") -> Dict[str, Any]:
+    """Scan a document delivered as byte chunks (e.g. a file or upload body) of any size."""
+    scan = StreamingEvidenceScan()
+    for chunk in chunks:
+        scan.feed_bytes(chunk, encoding=encoding)
+    scan.feed_bytes(b"", final=True, encoding=encoding)
+    result = scan.report()
+    result["bytes_received"] = scan.bytes_received
+    return result
@@ -33,6 +33,9 @@ except ImportError:
 
 from app.core.config import MAX_FEATURES, MAX_DATA_ROWS, MAX_BATCH_SIZE, MAX_CACHE_ENTRIES, CACHE_TTL_SECONDS
 
+from app.core.canonical import canonical_hash, canonical_update
+from app.core.columnar import TabularData, as_frame
+
 from cachetools import TTLCache
 
 logger = logging.getLogger("aic.engine.explainability")
@@ -47,8 +50,19 @@ _MODEL_CACHE = TTLCache(maxsize=MAX_CACHE_ENTRIES, ttl=CACHE_TTL_SECONDS)
 
 def _generate_hash(data: Any) -> str:
     """Generate SHA-256 hash for audit trail and caching."""
-    json_str = json.dumps(data, sort_keys=True, default=str)
-    return hashlib.sha256(json_str.encode()).hexdigest()
+    return canonical_hash(data)
+
+
+def _data_fingerprint(df: pd.DataFrame, target_column: str) -> str:
+    """Content hash of a training frame, used as the surrogate model cache key."""
+    digest = hashlib.sha256()
+    canonical_update(digest, {"columns": [str(c) for c in df.columns], "target": target_column})
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    except TypeError:
+        # Unhashable cell values (nested dicts/lists) — fall back to the JSON encoding
+        canonical_update(digest, df.to_dict("records"))
+    return digest.hexdigest()
 
 
 def explain_with_shap(
@@ -260,7 +274,7 @@ def explain_with_lime(
 
 
 def explain_from_data(
-    data: List[Dict[str, Any]],
+    data: TabularData,
     target_column: str,
     instance_data: Dict[str, Any],
     method: str = "shap",
@@ -272,7 +286,7 @@ def explain_from_data(
     doesn't require the caller to provide a pre-trained model.
 
     Args:
-        data: Training data as list of dicts.
+        data: Training data as list of dicts or a DataFrame.
         target_column: Name of the target/outcome column.
         instance_data: Single instance to explain (dict of feature values).
         method: "shap" or "lime".
@@ -281,18 +295,16 @@ def explain_from_data(
     Returns:
         Explanation dict with feature contributions and compliance info.
     """
-    if not data:
+    if data is None or len(data) == 0:
         return {"error": "No training data provided"}
-    if target_column not in data[0]:
-        return {"error": f"Target column '{target_column}' not found in data"}
 
-    # Task 6: Implement Model Caching
-    data_hash = _generate_hash({"data": data, "target": target_column})
-    
     # Always compute X_array and feature names from current data to avoid fatal memory growth
-    df = pd.DataFrame(data)
+    df = as_frame(data)
     if target_column not in df.columns:
-        return {"error": f"Target column '{target_column}' not found"}
+        return {"error": f"Target column '{target_column}' not found in data"}
+
+    # Task 6: Implement Model Caching
+    data_hash = _data_fingerprint(df, target_column)
 
     feature_cols = [c for c in df.columns if c != target_column]
     if not feature_cols:
@@ -374,7 +386,7 @@ def explain_from_data(
 
 
 def explain_from_data_stream(
-    data: List[Dict[str, Any]],
+    data: TabularData,
     target_column: str,
     instances: List[Dict[str, Any]],
     method: str = "shap",
@@ -384,14 +396,13 @@ def explain_from_data_stream(
     Generator that yields explanations one by one for a batch of instances.
     Enables streaming responses for long-running batch explanations.
     """
-    if not data or not instances:
+    if data is None or len(data) == 0 or not instances:
         yield json.dumps({"error": "Data and instances required"})
         return
 
     # 1. Prepare / Train model (cached)
-    data_hash = _generate_hash({"data": data, "target": target_column})
-    
-    df = pd.DataFrame(data)
+    df = as_frame(data)
+    data_hash = _data_fingerprint(df, target_column)
     feature_cols = [c for c in df.columns if c != target_column]
     encoders = {}
     X = df[feature_cols].copy()
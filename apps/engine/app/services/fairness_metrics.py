@@ -2,25 +2,91 @@
 Advanced Fairness Metrics Service
 Implements Statistical Parity Difference and epsilon-Differential Fairness.
 Supplements the core Four-Fifths Rule in bias_analysis.py.
+
+Both metrics compare every pair of groups. The default report lists every
+pair, which is O(k^2) for k groups. With compact=True the decision is made
+from the sorted group rates instead: the worst pair is (min, max), pair
+counts per status come from a binary search per group, and only the top_n
+worst pairs are reported, so O(k log k) overall. The full k x k rate matrix
+is only built when include_matrix is requested.
 """
 
+import heapq
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any
-import hashlib
-import json
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from itertools import combinations
 
+from app.core.canonical import canonical_hash
+from app.core.columnar import TabularData, as_frame
+from app.core.config import MAX_RATE_MATRIX_GROUPS
+from app.services.group_stats import GroupStatsCache, compute_group_stats
+
 
 def _generate_hash(data: Dict) -> str:
-    json_str = json.dumps(data, sort_keys=True, default=str)
-    return hashlib.sha256(json_str.encode()).hexdigest()
+    return canonical_hash(data)
+
+
+def _count_pairs(rates: np.ndarray, exceeds: Callable[[np.ndarray, np.ndarray], np.ndarray]) -> int:
+    """
+    Number of pairs i < j of ascending rates with exceeds(rates[i], rates[j]).
+    exceeds must be monotone in its second argument; one vectorized
+    bisection per group gives the first partner that exceeds.
+    """
+    k = len(rates)
+    lo = np.arange(1, k + 1)  # first candidate partner for each i
+    hi = np.full(k, k)
+    while (lo < hi).any():
+        active = lo < hi
+        mid = (lo + hi) // 2
+        hit = np.zeros(k, dtype=bool)
+        idx = np.flatnonzero(active)
+        hit[idx] = exceeds(rates[idx], rates[mid[idx]])
+        hi = np.where(active & hit, mid, hi)
+        lo = np.where(active & ~hit, mid + 1, lo)
+    return int((k - lo).sum())
+
+
+def _worst_pairs(rates: np.ndarray, n: int, gap: Callable[[float, float], float]) -> List[Tuple[int, int]]:
+    """
+    The n pairs i < j of ascending rates with the largest gap(rates[i], rates[j]).
+    gap grows with j and shrinks with i, so the pairs are enumerated
+    best-first from (0, k-1) with a heap, O(n log n).
+    """
+    k = len(rates)
+    if k < 2 or n <= 0:
+        return []
+    heap = [(-gap(rates[0], rates[-1]), 0, k - 1)]
+    seen = {(0, k - 1)}
+    pairs = []
+    while heap and len(pairs) < n:
+        _, i, j = heapq.heappop(heap)
+        pairs.append((i, j))
+        for a, b in ((i + 1, j), (i, j - 1)):
+            if a < b and (a, b) not in seen:
+                seen.add((a, b))
+                heapq.heappush(heap, (-gap(rates[a], rates[b]), a, b))
+    return pairs
+
+
+def _sorted_rates(rates: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Ascending rates and the original position of each (stable, so ties keep group order)."""
+    order = np.argsort(rates.to_numpy(dtype=float), kind="stable")
+    return rates.to_numpy(dtype=float)[order], order
+
+
+def _rate_matrix(groups: List[Any], values: List[List[Optional[float]]], name: str) -> Dict[str, Any]:
+    return {"groups": [str(g) for g in groups], name: values}
 
 
 def statistical_parity_difference(
-    data: List[Dict],
+    data: TabularData,
     protected_attribute: str,
     outcome_variable: str,
+    cache: Optional[GroupStatsCache] = None,
+    compact: bool = False,
+    top_n: int = 10,
+    include_matrix: bool = False,
 ) -> Dict[str, Any]:
     """
     Statistical Parity Difference (SPD).
@@ -31,18 +97,38 @@ def statistical_parity_difference(
         |SPD| < 0.05 => FAIR
         |SPD| 0.05-0.10 => WARNING
         |SPD| > 0.10 => BIASED
+
+    compact=True reports pair counts and the top_n worst pairs instead of
+    every pair; include_matrix adds the k x k SPD matrix.
     """
-    df = pd.DataFrame(data)
+    df = as_frame(data)
 
     if protected_attribute not in df.columns:
         return {"error": f"Column '{protected_attribute}' not found"}
     if outcome_variable not in df.columns:
         return {"error": f"Column '{outcome_variable}' not found"}
 
-    group_rates = df.groupby(protected_attribute)[outcome_variable].mean()
+    group_rates = compute_group_stats(df, protected_attribute, outcome_variable, cache).rate_series()
+    return statistical_parity_report(group_rates, compact, top_n, include_matrix)
 
+
+def _spd_status(abs_spd: float) -> str:
+    return "BIASED" if abs_spd > 0.10 else "WARNING" if abs_spd > 0.05 else "FAIR"
+
+
+def statistical_parity_report(
+    group_rates: pd.Series,
+    compact: bool = False,
+    top_n: int = 10,
+    include_matrix: bool = False,
+) -> Dict[str, Any]:
+    """Pairwise SPD report from per-group positive rates."""
     if len(group_rates) < 2:
         return {"error": "Need at least 2 groups for comparison"}
+    if include_matrix and len(group_rates) > MAX_RATE_MATRIX_GROUPS:
+        return {"error": f"Rate matrix limited to {MAX_RATE_MATRIX_GROUPS} groups (got {len(group_rates)})"}
+    if compact:
+        return _compact_parity_report(group_rates, top_n, include_matrix)
 
     # Compare all pairs
     pairwise_results = {}
@@ -90,16 +176,83 @@ def statistical_parity_difference(
             flags if flags else ["No significant parity differences detected. Continue monitoring."]
         ),
     }
+    if include_matrix:
+        result["rate_matrix"] = _spd_matrix(group_rates)
+    result["audit_hash"] = _generate_hash(result)
+    return result
+
+
+def _spd_matrix(group_rates: pd.Series) -> Dict[str, Any]:
+    """k x k matrix of rate[row] - rate[column]."""
+    rates = group_rates.to_numpy(dtype=float)
+    return _rate_matrix(list(group_rates.index), np.round(rates[:, None] - rates[None, :], 4).tolist(), "spd")
+
+
+def _compact_parity_report(group_rates: pd.Series, top_n: int, include_matrix: bool) -> Dict[str, Any]:
+    """SPD decided from the sorted rates: pair counts per status and the top_n worst pairs."""
+    groups = list(group_rates.index)
+    rates, order = _sorted_rates(group_rates)
+    k = len(rates)
+
+    total_pairs = k * (k - 1) // 2
+    biased = _count_pairs(rates, lambda lo, hi: hi - lo > 0.10)
+    marginal = _count_pairs(rates, lambda lo, hi: hi - lo > 0.05) - biased
+    max_spd = float(rates[-1] - rates[0])
+
+    worst_pairs = []
+    flags = []
+    for i, j in _worst_pairs(rates, top_n, lambda lo, hi: hi - lo):
+        # Keep the original group order within the pair so the sign matches the full report
+        a, b = sorted((order[i], order[j]))
+        g1, g2 = groups[a], groups[b]
+        spd = float(group_rates[g1] - group_rates[g2])
+        status = _spd_status(abs(spd))
+        if status == "BIASED":
+            flags.append(f"Significant parity gap between {g1} and {g2}: {spd:+.4f}")
+        elif status == "WARNING":
+            flags.append(f"Marginal parity gap between {g1} and {g2}: {spd:+.4f}")
+        worst_pairs.append({
+            "pair": f"{g1} vs {g2}",
+            "spd": round(spd, 4),
+            "abs_spd": round(abs(spd), 4),
+            "status": status,
+            "group_rates": {str(g1): round(float(group_rates[g1]), 4), str(g2): round(float(group_rates[g2]), 4)},
+        })
+    unlisted = biased + marginal - len(flags)
+    if unlisted > 0:
+        flags.append(f"{unlisted} further group pairs have parity gaps above 0.05")
+
+    result = {
+        "right_enforced": "Right to Human Agency",
+        "overall_status": _spd_status(max_spd),
+        "methodology": "Statistical Parity Difference (sorted rates)",
+        "max_absolute_spd": round(max_spd, 4),
+        "thresholds": {"fair": "<0.05", "warning": "0.05-0.10", "biased": ">0.10"},
+        "flags": flags,
+        "pair_counts": {"total": total_pairs, "biased": biased, "warning": marginal,
+                        "fair": total_pairs - biased - marginal},
+        "worst_pairs": worst_pairs,
+        "group_positive_rates": {str(k): round(float(v), 4) for k, v in group_rates.items()},
+        "recommendations": (
+            flags if flags else ["No significant parity differences detected. Continue monitoring."]
+        ),
+    }
+    if include_matrix:
+        result["rate_matrix"] = _spd_matrix(group_rates)
     result["audit_hash"] = _generate_hash(result)
     return result
 
 
 def epsilon_differential_fairness(
-    data: List[Dict],
+    data: TabularData,
     protected_attributes: List[str],
     outcome_variable: str,
     epsilon: float = 0.8,
     min_group_size: int = 10,
+    cache: Optional[GroupStatsCache] = None,
+    compact: bool = False,
+    top_n: int = 10,
+    include_matrix: bool = False,
 ) -> Dict[str, Any]:
     """
     ε-Differential Fairness for intersectional subgroups.
@@ -108,48 +261,59 @@ def epsilon_differential_fairness(
 
     A smaller epsilon means stricter fairness.
     Default ε=0.8 corresponds roughly to the Four-Fifths Rule.
+
+    compact=True counts violations from the sorted rates and lists only the
+    top_n largest rate ratios; include_matrix adds the k x k ratio matrix.
     """
-    df = pd.DataFrame(data)
+    df = as_frame(data)
 
     for attr in protected_attributes:
         if attr not in df.columns:
             return {"error": f"Column '{attr}' not found"}
 
-    df["_subgroup"] = df[protected_attributes].astype(str).agg(" + ".join, axis=1)
-
-    group_stats = df.groupby("_subgroup")[outcome_variable].agg(["mean", "count"])
-    group_stats.columns = ["rate", "count"]
-    group_stats = group_stats[group_stats["count"] >= min_group_size]
+    # Subgroups are counted on categorical codes; labels only for those meeting min_group_size
+    cube = compute_group_stats(df, protected_attributes, outcome_variable, cache).min_size(min_group_size)
+    group_stats = cube.summary()[["selection_rate", "total"]].set_axis(["rate", "count"], axis=1)
 
     if len(group_stats) < 2:
         return {"error": f"Fewer than 2 subgroups with minimum size {min_group_size}"}
+    if include_matrix and len(group_stats) > MAX_RATE_MATRIX_GROUPS:
+        return {"error": f"Rate matrix limited to {MAX_RATE_MATRIX_GROUPS} groups (got {len(group_stats)})"}
 
     lower_bound = np.exp(-epsilon)
     upper_bound = np.exp(epsilon)
 
-    violations = []
-    groups = list(group_stats.index)
-
-    for g1, g2 in combinations(groups, 2):
+    def violation(g1, g2) -> Dict[str, Any]:
         r1 = float(group_stats.loc[g1, "rate"])
         r2 = float(group_stats.loc[g2, "rate"])
+        return {
+            "group_1": g1,
+            "group_2": g2,
+            "rate_1": round(r1, 4),
+            "rate_2": round(r2, 4),
+            "ratio": round(_rate_ratio(r1, r2), 4),
+            "bounds": {"lower": round(lower_bound, 4), "upper": round(upper_bound, 4)},
+        }
 
-        if r2 > 0:
-            ratio = r1 / r2
-        else:
-            ratio = float("inf") if r1 > 0 else 1.0
-
-        if ratio < lower_bound or ratio > upper_bound:
-            violations.append({
-                "group_1": g1,
-                "group_2": g2,
-                "rate_1": round(r1, 4),
-                "rate_2": round(r2, 4),
-                "ratio": round(ratio, 4),
-                "bounds": {"lower": round(lower_bound, 4), "upper": round(upper_bound, 4)},
-            })
+    groups = list(group_stats.index)
+    if compact:
+        # A pair violates iff its larger rate exceeds e^ε times its smaller one
+        rates, order = _sorted_rates(group_stats["rate"])
+        exceeds = lambda lo, hi: (hi > 0) & ((lo == 0) | (hi > lo * upper_bound))
+        violation_count = _count_pairs(rates, exceeds)
+        violations = []
+        for i, j in _worst_pairs(rates, min(top_n, violation_count), _ordered_ratio):
+            a, b = sorted((order[i], order[j]))
+            violations.append(violation(groups[a], groups[b]))
+    else:
+        violations = []
+        for g1, g2 in combinations(groups, 2):
+            ratio = _rate_ratio(float(group_stats.loc[g1, "rate"]), float(group_stats.loc[g2, "rate"]))
+            if ratio < lower_bound or ratio > upper_bound:
+                violations.append(violation(g1, g2))
+        violation_count = len(violations)
 
-    is_fair = len(violations) == 0
+    is_fair = violation_count == 0
 
     result = {
         "right_enforced": "Right to Human Agency",
@@ -159,7 +323,7 @@ def epsilon_differential_fairness(
         "bounds": {"lower": round(lower_bound, 4), "upper": round(upper_bound, 4)},
         "subgroups_analyzed": len(group_stats),
         "violations": violations,
-        "violation_count": len(violations),
+        "violation_count": violation_count,
         "group_rates": {
             str(k): {"rate": round(float(v["rate"]), 4), "count": int(v["count"])}
             for k, v in group_stats.iterrows()
@@ -169,5 +333,26 @@ def epsilon_differential_fairness(
             for v in violations
         ],
     }
+    if compact:
+        result["methodology"] += " (sorted rates)"
+        result["violations_truncated"] = violation_count > len(violations)
+    if include_matrix:
+        rates = group_stats["rate"].to_numpy(dtype=float)
+        result["rate_matrix"] = _rate_matrix(groups, [
+            [None if np.isinf(r) else round(r, 4) for r in (_rate_ratio(r1, r2) for r2 in rates)]
+            for r1 in rates
+        ], "ratio")
     result["audit_hash"] = _generate_hash(result)
     return result
+
+
+def _rate_ratio(r1: float, r2: float) -> float:
+    """r1 / r2, with x / 0 = inf and 0 / 0 = 1."""
+    if r2 > 0:
+        return r1 / r2
+    return float("inf") if r1 > 0 else 1.0
+
+
+def _ordered_ratio(lo: float, hi: float) -> float:
+    """Larger over smaller rate of a pair, the quantity bounded by e^ε."""
+    return _rate_ratio(float(hi), float(lo))
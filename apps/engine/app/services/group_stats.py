@@ -0,0 +1,307 @@
+"""
+Group Statistics Cube
+Single-pass, vectorized per-(group, outcome) counts shared by every group
+fairness metric (Four-Fifths Rule, SPD, Chi-Square, Theil, Atkinson,
+differential fairness).
+
+Rows are encoded once into integer codes and counted with one bincount.
+Selection rates, group sizes, positive counts and the contingency table are
+all derived from the resulting counts matrix, so several metrics over the
+same dataset never rescan the rows.
+
+A numeric outcome with more than MAX_OUTCOME_LEVELS distinct values (e.g.
+income for Theil/Atkinson) would need one column per value, so such cubes
+keep per-group count, sum and sum of squares instead, which is all the
+mean-based metrics use. They have no contingency table; sparse_contingency
+builds one straight from the rows.
+
+Intersectional groups are keyed by combined categorical codes, never by
+row-wise string joins. Human-readable labels ("F + Black") are built only for
+the groups a metric actually reports, after any min_group_size filter.
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from app.core.config import MAX_OUTCOME_LEVELS
+
+GroupBy = Union[str, List[str]]
+
+
+def intersectional_codes(df: pd.DataFrame, attributes: List[str]) -> Tuple[np.ndarray, np.ndarray, List[List[str]]]:
+    """
+    Encode multi-attribute groups as dense integer ids.
+
+    Each attribute is factorized on its own (missing values kept as a level,
+    labelled the way astype(str) would), then the codes are combined
+    mixed-radix style and re-densified after every attribute, so the key space
+    never exceeds the row count no matter how many attributes are crossed.
+
+    Returns (row group ids, per-group attribute codes, per-attribute level labels).
+    """
+    columns = []
+    levels = []
+    for attr in attributes:
+        values = df[attr]
+        codes, uniques = pd.factorize(values)
+        names = [str(v) for v in uniques]
+        missing = codes < 0
+        if missing.any():
+            codes = np.where(missing, len(uniques), codes)
+            names.append(str(values.iloc[int(np.argmax(missing))]))
+        columns.append(codes)
+        levels.append(names)
+
+    # Densify even a single attribute: missing values were coded after every
+    # known level, which need not be their order of first appearance
+    group_ids, combos = pd.factorize(columns[0])
+    n_ids = len(combos)
+    for codes, names in zip(columns[1:], levels[1:]):
+        group_ids, combos = pd.factorize(group_ids * len(names) + codes)
+        n_ids = len(combos)
+
+    # First row of each dense id (ids are assigned in order of first appearance)
+    first_rows = np.flatnonzero(~pd.Series(group_ids).duplicated().to_numpy())
+    key_codes = np.column_stack(columns)[first_rows] if n_ids else np.empty((0, len(attributes)), dtype=np.intp)
+    return group_ids, key_codes, levels
+
+
+class GroupStats:
+    """
+    Counts per (group, outcome) cell for one dataset.
+
+    groups and outcomes are sorted, matching pandas groupby/crosstab ordering.
+    Rows with a missing group label are ignored; rows with a missing outcome
+    keep their group but contribute no counts, as with groupby().count().
+    Intersectional groups keep missing attribute values as their own level.
+
+    High-cardinality numeric outcomes are summarized by moments, a
+    (group x [count, sum, sum of squares]) matrix; outcomes and counts are
+    then None.
+    """
+
+    def __init__(
+        self,
+        outcomes: Optional[pd.Index],
+        counts: Optional[np.ndarray],
+        groups: Optional[pd.Index] = None,
+        key_codes: Optional[np.ndarray] = None,
+        key_levels: Optional[List[List[str]]] = None,
+        moments: Optional[np.ndarray] = None,
+    ):
+        self.outcomes = outcomes
+        self.counts = counts
+        self.moments = moments
+        self._groups = groups
+        self._key_codes = key_codes
+        self._key_levels = key_levels
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, group_by: GroupBy, outcome_variable: str) -> "GroupStats":
+        outcome = df[outcome_variable]
+        outcome_codes, outcomes = pd.factorize(outcome, sort=True)
+
+        if isinstance(group_by, str):
+            group_codes, groups = pd.factorize(df[group_by], sort=True)
+            groups, key_codes, key_levels = pd.Index(groups), None, None
+            n_groups = len(groups)
+        else:
+            group_codes, key_codes, key_levels = intersectional_codes(df, list(group_by))
+            groups = None
+            n_groups = len(key_codes)
+
+        n_outcomes = len(outcomes)
+        valid = (group_codes >= 0) & (outcome_codes >= 0)
+        if n_outcomes > MAX_OUTCOME_LEVELS:
+            try:
+                y = outcome.to_numpy(dtype=float)[valid]
+            except (TypeError, ValueError):
+                pass  # non-numeric: per-value counts are all there is
+            else:
+                codes = group_codes[valid]
+                moments = np.column_stack([
+                    np.bincount(codes, minlength=n_groups),
+                    np.bincount(codes, weights=y, minlength=n_groups),
+                    np.bincount(codes, weights=y * y, minlength=n_groups),
+                ]).astype(float)
+                return cls(None, None, groups=groups, key_codes=key_codes, key_levels=key_levels, moments=moments)
+        cells = group_codes[valid] * n_outcomes + outcome_codes[valid]
+        counts = np.bincount(cells, minlength=n_groups * n_outcomes).reshape(n_groups, n_outcomes)
+        return cls(pd.Index(outcomes), counts, groups=groups, key_codes=key_codes, key_levels=key_levels)
+
+    def _labels(self, rows: np.ndarray) -> np.ndarray:
+        """Joined labels for the given intersectional group rows only."""
+        labels = None
+        for j, names in enumerate(self._key_levels):
+            part = np.array(names, dtype=object)[self._key_codes[rows, j]]
+            labels = part if labels is None else labels + " + " + part
+        return labels if labels is not None else np.array([], dtype=object)
+
+    def labels_for(self, rows: np.ndarray) -> List[str]:
+        """Labels for a handful of group rows, without materializing the rest."""
+        if self._key_codes is None:
+            return [str(g) for g in self._groups[rows]]
+        return list(self._labels(rows))
+
+    def _rows(self, rows: np.ndarray, groups: pd.Index) -> "GroupStats":
+        if self.moments is not None:
+            return GroupStats(None, None, groups=groups, moments=self.moments[rows])
+        return GroupStats(self.outcomes, self.counts[rows], groups=groups)
+
+    def _select(self, rows: np.ndarray) -> "GroupStats":
+        """Sub-cube for the given group rows, with labels materialized and sorted."""
+        if self._key_codes is None:
+            return self._rows(rows, self._groups[rows])
+        labels = self._labels(rows)
+        order = np.argsort(labels, kind="stable")
+        return self._rows(rows[order], pd.Index(labels[order]))
+
+    @property
+    def groups(self) -> pd.Index:
+        if self._groups is None:
+            # Materialize every intersectional label once, in sorted order
+            selected = self._select(np.arange(len(self.totals)))
+            self.counts, self.moments, self._groups = selected.counts, selected.moments, selected._groups
+            self._key_codes = self._key_levels = None
+        return self._groups
+
+    def _moment_matrix(self) -> np.ndarray:
+        """(group x [count, sum, sum of squares]); raises ValueError for a non-numeric outcome."""
+        if self.moments is not None:
+            return self.moments
+        values = np.asarray(self.outcomes, dtype=float)
+        return np.column_stack([self.counts.sum(axis=1), self.counts @ values, self.counts @ (values * values)])
+
+    def merge(self, other: "GroupStats") -> "GroupStats":
+        """
+        Cube over the rows of both cubes, e.g. consecutive chunks of one file.
+
+        Groups and outcomes are the sorted union of both sides, so merging
+        chunk cubes gives the same cube as from_frame over all rows. Once the
+        union has more than MAX_OUTCOME_LEVELS numeric outcomes, the merged
+        cube keeps moments instead of per-value counts.
+        """
+        if self.moments is None and other.moments is None:
+            left = pd.DataFrame(self.counts, index=self.groups, columns=self.outcomes)
+            right = pd.DataFrame(other.counts, index=other.groups, columns=other.outcomes)
+            # Cells absent on both sides (group only left, outcome only right) come back NaN
+            merged = left.add(right, fill_value=0).fillna(0)
+            try:
+                merged = merged.sort_index().sort_index(axis=1)
+            except TypeError:
+                pass  # unorderable mix of labels: keep union order
+            cube = GroupStats(pd.Index(merged.columns), merged.to_numpy(dtype=np.int64), groups=pd.Index(merged.index))
+            if len(cube.outcomes) <= MAX_OUTCOME_LEVELS:
+                return cube
+            try:
+                return GroupStats(None, None, groups=cube.groups, moments=cube._moment_matrix())
+            except (TypeError, ValueError):
+                return cube
+
+        left = pd.DataFrame(self._moment_matrix(), index=self.groups)
+        right = pd.DataFrame(other._moment_matrix(), index=other.groups)
+        merged = left.add(right, fill_value=0)
+        try:
+            merged = merged.sort_index()
+        except TypeError:
+            pass
+        return GroupStats(None, None, groups=pd.Index(merged.index), moments=merged.to_numpy(dtype=float))
+
+    def min_size(self, min_group_size: int) -> "GroupStats":
+        """Groups with at least min_group_size known outcomes; only these get labels."""
+        return self._select(np.flatnonzero(self.totals >= min_group_size))
+
+    @property
+    def totals(self) -> np.ndarray:
+        """Rows with a known outcome, per group."""
+        if self.moments is not None:
+            return self.moments[:, 0].astype(np.int64)
+        return self.counts.sum(axis=1)
+
+    @property
+    def sums(self) -> np.ndarray:
+        """Sum of the (numeric) outcome per group, e.g. number selected."""
+        if self.moments is not None:
+            return self.moments[:, 1]
+        return self.counts @ np.asarray(self.outcomes, dtype=float)
+
+    @property
+    def sum_squares(self) -> np.ndarray:
+        """Sum of the squared (numeric) outcome per group."""
+        return self._moment_matrix()[:, 2]
+
+    @property
+    def rates(self) -> np.ndarray:
+        """Mean outcome per group (selection rate); NaN for groups with no outcomes."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.sums / self.totals
+
+    def rate_series(self) -> pd.Series:
+        groups = self.groups
+        return pd.Series(self.rates, index=groups)
+
+    def summary(self) -> pd.DataFrame:
+        """selection_rate / total / selected per group, like groupby().agg(['mean', 'count', 'sum'])."""
+        groups = self.groups
+        return pd.DataFrame(
+            {"selection_rate": self.rates, "total": self.totals, "selected": self.sums},
+            index=groups,
+        )
+
+    def contingency(self) -> Optional[np.ndarray]:
+        """
+        Group x outcome contingency table without empty rows or columns, like
+        pd.crosstab; None when the cube keeps moments instead of counts.
+        """
+        if self.counts is None:
+            return None
+        table = self.counts[self.totals > 0]
+        return table[:, table.sum(axis=0) > 0]
+
+
+def sparse_contingency(df: pd.DataFrame, group_by: str, outcome_variable: str) -> sparse.csr_matrix:
+    """
+    Group x outcome contingency table as a sparse matrix, for outcomes with
+    too many values for a cube's counts. Like pd.crosstab it skips rows with
+    a missing group or outcome and has no empty rows or columns.
+    """
+    valid = df[group_by].notna().to_numpy() & df[outcome_variable].notna().to_numpy()
+    group_codes, groups = pd.factorize(df[group_by][valid])
+    outcome_codes, outcomes = pd.factorize(df[outcome_variable][valid])
+    return sparse.csr_matrix((np.ones(len(group_codes)), (group_codes, outcome_codes)),
+                             shape=(len(groups), len(outcomes)))
+
+
+class GroupStatsCache:
+    """
+    Memoizes cubes per (frame, grouping, outcome) for the lifetime of one request.
+
+    The batch endpoint shares one cache across all analyses over the same
+    dataset so the rows are scanned once per grouping rather than once per metric.
+    """
+
+    def __init__(self):
+        self._cubes: Dict[Tuple, Tuple[pd.DataFrame, GroupStats]] = {}
+
+    def get(self, df: pd.DataFrame, group_by: GroupBy, outcome_variable: str) -> GroupStats:
+        key_by = group_by if isinstance(group_by, str) else tuple(group_by)
+        key = (id(df), key_by, outcome_variable)
+        if key not in self._cubes:
+            # Keep the frame referenced so its id cannot be reused while cached
+            self._cubes[key] = (df, GroupStats.from_frame(df, group_by, outcome_variable))
+        return self._cubes[key][1]
+
+
+def compute_group_stats(
+    df: pd.DataFrame,
+    group_by: GroupBy,
+    outcome_variable: str,
+    cache: Optional[GroupStatsCache] = None,
+) -> GroupStats:
+    """Build (or fetch from cache) the group statistics cube for a dataset."""
+    if cache is not None:
+        return cache.get(df, group_by, outcome_variable)
+    return GroupStats.from_frame(df, group_by, outcome_variable)
@@ -4,12 +4,12 @@ Implements linked audit hashing: h_i = SHA256(h_{i-1} || Entry_i)
 Provides tamper-evident audit trail for POPIA Section 71 compliance.
 """
 
-import hashlib
-import json
 import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+from app.core.canonical import canonical_hash
+
 logger = logging.getLogger("aic.engine.hash_chain")
 
 
@@ -25,8 +25,7 @@ class HashChain:
     @staticmethod
     def compute_entry_hash(entry_data: Dict[str, Any]) -> str:
         """Hash a single audit entry (without chain linking)."""
-        json_str = json.dumps(entry_data, sort_keys=True, default=str)
-        return hashlib.sha256(json_str.encode()).hexdigest()
+        return canonical_hash(entry_data)
 
     @staticmethod
     def compute_chain_hash(previous_hash: str, entry_data: Dict[str, Any]) -> str:
@@ -35,9 +34,7 @@ class HashChain:
         This links each audit record to its predecessor, making
         any tampering detectable.
         """
-        entry_json = json.dumps(entry_data, sort_keys=True, default=str)
-        combined = f"{previous_hash}||{entry_json}"
-        return hashlib.sha256(combined.encode()).hexdigest()
+        return canonical_hash(entry_data, prefix=f"{previous_hash}||")
 
     @staticmethod
     def create_audit_record(
@@ -62,18 +59,59 @@ class HashChain:
             "data": entry_data,
         }
 
-        # Cryptographic signature (if signing is available)
+        # Cryptographic signature (if signing is available), or in merkle
+        # mode a place in the Merkle log whose tree head is signed per batch
         try:
-            from app.core.signing import sign_data, is_signing_available
+            from app.core.signing import is_signing_available
+            from app.services.merkle_log import sign_audit_hash
             if is_signing_available():
-                signature = sign_data(chain_hash)
-                if signature:
-                    record["signature"] = signature
+                record.update({k: v for k, v in sign_audit_hash(chain_hash).items() if v is not None})
         except ImportError:
             pass
 
         return record
 
+    @staticmethod
+    def create_audit_records(
+        entries: List[Dict[str, Any]],
+        previous_hash: Optional[str] = None,
+        sequence_number: int = 0,
+        include_proofs: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Create a chain of audit records in bulk. In merkle mode
+        (AUDIT_SIGNING_MODE=merkle) they are signed as one Merkle batch:
+        every chain hash becomes a leaf of the Merkle log and a single tree
+        head covering them all is signed, instead of one signature per
+        record. Each record gets its leaf index (and, with include_proofs,
+        its inclusion proof against the returned tree head). Otherwise each
+        record is signed on its own and tree_head is None.
+        """
+        from app.core.signing import is_signing_available
+        from app.services.merkle_log import sign_audit_hashes
+
+        prev = previous_hash or HashChain.GENESIS_HASH
+        timestamp = datetime.utcnow().isoformat()
+        records = []
+        for i, entry_data in enumerate(entries):
+            chain_hash = HashChain.compute_chain_hash(prev, entry_data)
+            records.append({
+                "sequence_number": sequence_number + i,
+                "timestamp": timestamp,
+                "previous_hash": prev,
+                "entry_hash": HashChain.compute_entry_hash(entry_data),
+                "chain_hash": chain_hash,
+                "data": entry_data,
+            })
+            prev = chain_hash
+
+        tree_head = None
+        if is_signing_available():
+            fields, tree_head = sign_audit_hashes([r["chain_hash"] for r in records], include_proofs)
+            for record, extra in zip(records, fields):
+                record.update(extra)
+        return {"records": records, "tree_head": tree_head}
+
     @staticmethod
     def verify_chain(records: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -0,0 +1,312 @@
+"""
+Merkle-Batched Signing of Audit Hashes
+An RSA-3072 signature per audit record costs milliseconds of CPU. In
+merkle mode (AUDIT_SIGNING_MODE=merkle) audit hashes are instead appended
+to an append-only Merkle log (RFC 9162 tree, see app.core.merkle), and
+only the tree head (size, root, timestamp) is signed, once per batch
+window: when MERKLE_BATCH_WINDOW_SECONDS have passed since the first
+unsigned record, after MERKLE_BATCH_MAX_RECORDS records, or on the
+periodic seal task.
+
+Each record then carries its leaf index. Its inclusion proof against any
+later signed head, and consistency proofs between signed heads (every head
+extends the previous one), are produced on demand from the stored
+complete-subtree hashes in O(log n) lookups.
+
+Leaves, complete-subtree hashes and signed heads live in SQLite at
+MERKLE_LOG_DB_PATH, so the API process and the workers append to one log
+when it points at a shared file (in memory unless configured).
+"""
+
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from cachetools import LRUCache
+
+from app.core.canonical import canonical_json
+from app.core.config import (
+    AUDIT_SIGNING_MODE, MERKLE_LOG_DB_PATH, MERKLE_BATCH_WINDOW_SECONDS, MERKLE_BATCH_MAX_RECORDS,
+    MERKLE_NODE_CACHE_SIZE,
+)
+from app.core.merkle import (
+    consistency_proof, inclusion_proof, leaf_hash, node_hash, root_hash, verify_inclusion
+)
+from app.core.signing import is_signing_available, sign_data, verify_signature
+
+logger = logging.getLogger("aic.engine.merkle_log")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leaves (
+    leaf_index INTEGER PRIMARY KEY,
+    value TEXT NOT NULL,
+    appended_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS leaves_by_value ON leaves (value);
+CREATE TABLE IF NOT EXISTS nodes (
+    level INTEGER NOT NULL,
+    node_index INTEGER NOT NULL,
+    hash BLOB NOT NULL,
+    PRIMARY KEY (level, node_index)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tree_heads (
+    tree_size INTEGER PRIMARY KEY,
+    root_hash TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    signature TEXT
+);
+"""
+
+
+def tree_head_message(head: Dict[str, Any]) -> str:
+    """The string a tree head's signature covers."""
+    return canonical_json({"tree_size": head["tree_size"], "root_hash": head["root_hash"],
+                           "timestamp": head["timestamp"]})
+
+
+class MerkleLog:
+    """Append-only Merkle log of audit hashes with signed tree heads."""
+
+    def __init__(self, path: str = ":memory:"):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.executescript(_SCHEMA)
+        # Complete subtrees never change, so cached hashes stay valid whoever appends
+        self._nodes = LRUCache(maxsize=MERKLE_NODE_CACHE_SIZE)
+
+    def _node(self, level: int, index: int) -> bytes:
+        value = self._nodes.get((level, index))
+        if value is None:
+            row = self.conn.execute(
+                "SELECT hash FROM nodes WHERE level = ? AND node_index = ?", (level, index)
+            ).fetchone()
+            value = self._nodes[(level, index)] = row[0]
+        return value
+
+    def _size(self) -> int:
+        return self.conn.execute("SELECT COALESCE(MAX(leaf_index) + 1, 0) FROM leaves").fetchone()[0]
+
+    def _head(self, tree_size: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        if tree_size is None:
+            row = self.conn.execute(
+                "SELECT tree_size, root_hash, timestamp, signature FROM tree_heads ORDER BY tree_size DESC LIMIT 1"
+            ).fetchone()
+        else:
+            row = self.conn.execute(
+                "SELECT tree_size, root_hash, timestamp, signature FROM tree_heads WHERE tree_size = ?", (tree_size,)
+            ).fetchone()
+        return dict(zip(("tree_size", "root_hash", "timestamp", "signature"), row)) if row else None
+
+    def append(self, values: List[str]) -> int:
+        """Append audit hashes as leaves; returns the first one's leaf index."""
+        appended_at = datetime.utcnow().isoformat()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                first = self._size()
+                fresh = {}
+
+                def lookup(level: int, index: int) -> bytes:
+                    return fresh.get((level, index)) or self._node(level, index)
+
+                for i, value in enumerate(values, start=first):
+                    current = fresh[(0, i)] = leaf_hash(value.encode())
+                    level, index = 0, i
+                    # Each odd index completes its parent subtree
+                    while index & 1:
+                        current = node_hash(lookup(level, index - 1), current)
+                        level, index = level + 1, index >> 1
+                        fresh[(level, index)] = current
+                self.conn.executemany(
+                    "INSERT INTO leaves VALUES (?, ?, ?)",
+                    [(i, value, appended_at) for i, value in enumerate(values, start=first)],
+                )
+                self.conn.executemany("INSERT INTO nodes VALUES (?, ?, ?)",
+                                      [(level, index, h) for (level, index), h in fresh.items()])
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self._nodes.update(fresh)
+        return first
+
+    def due(self) -> bool:
+        """True once the current batch window should be signed."""
+        with self.lock:
+            signed = self.conn.execute("SELECT COALESCE(MAX(tree_size), 0) FROM tree_heads").fetchone()[0]
+            row = self.conn.execute(
+                "SELECT leaf_index, appended_at FROM leaves WHERE leaf_index = ?", (signed,)
+            ).fetchone()
+            if row is None:
+                return False
+            pending = self._size() - signed
+        age = (datetime.utcnow() - datetime.fromisoformat(row[1])).total_seconds()
+        return pending >= MERKLE_BATCH_MAX_RECORDS or age >= MERKLE_BATCH_WINDOW_SECONDS
+
+    def seal(self) -> Optional[Dict[str, Any]]:
+        """
+        Sign a tree head over every leaf appended so far (a no-op if none are
+        new). Without a signing key nothing is stored and the batch stays
+        open, so it is signed once a key is loaded.
+        """
+        if not is_signing_available():
+            logger.warning("No signing key loaded; the Merkle batch stays open")
+            return None
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                size, head = self._size(), self._head()
+                if size == 0 or (head is not None and head["tree_size"] == size):
+                    self.conn.execute("COMMIT")
+                    return head
+                head = {
+                    "tree_size": size,
+                    "root_hash": root_hash(self._node, size).hex(),
+                    "timestamp": datetime.utcnow().isoformat(),
+                }
+                head["signature"] = sign_data(tree_head_message(head))
+                if head["signature"] is None:
+                    self.conn.execute("COMMIT")
+                    return None
+                self.conn.execute("INSERT INTO tree_heads VALUES (?, ?, ?, ?)",
+                                  (head["tree_size"], head["root_hash"], head["timestamp"], head["signature"]))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        logger.info(f"Signed Merkle tree head over {size} audit records")
+        return head
+
+    def status(self) -> Dict[str, Any]:
+        with self.lock:
+            size, head = self._size(), self._head()
+        return {"tree_size": size, "unsigned_records": size - (head["tree_size"] if head else 0), "tree_head": head}
+
+    def head(self, tree_size: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self._head(tree_size)
+
+    def inclusion(self, leaf_index: Optional[int] = None, value: Optional[str] = None,
+                  tree_size: Optional[int] = None) -> Dict[str, Any]:
+        with self.lock:
+            if leaf_index is None:
+                row = self.conn.execute(
+                    "SELECT leaf_index, value FROM leaves WHERE value = ? ORDER BY leaf_index LIMIT 1", (value,)
+                ).fetchone()
+            else:
+                row = self.conn.execute("SELECT leaf_index, value FROM leaves WHERE leaf_index = ?",
+                                        (leaf_index,)).fetchone()
+            if row is None:
+                return {"error": "Record not found in the Merkle log"}
+            head = self._head(tree_size)
+            if head is None:
+                return {"error": f"No signed tree head of size {tree_size}" if tree_size else "No signed tree head yet"}
+            if row[0] >= head["tree_size"]:
+                return {"error": "Record is not covered by this tree head yet; it is signed when its batch window closes"}
+            proof = inclusion_proof(self._node, row[0], head["tree_size"])
+        return {"leaf_index": row[0], "chain_hash": row[1], "proof": [p.hex() for p in proof], "tree_head": head}
+
+    def consistency(self, first: int, second: Optional[int] = None) -> Dict[str, Any]:
+        with self.lock:
+            first_head, second_head = self._head(first), self._head(second)
+            if first_head is None or second_head is None:
+                return {"error": "Consistency proofs are between signed tree heads"}
+            if first > second_head["tree_size"]:
+                return {"error": "first must not be larger than second"}
+            proof = consistency_proof(self._node, first, second_head["tree_size"])
+        return {"first": first_head, "second": second_head, "proof": [p.hex() for p in proof]}
+
+
+_LOG: Optional[MerkleLog] = None
+_LOG_LOCK = threading.Lock()
+
+
+def get_merkle_log() -> MerkleLog:
+    global _LOG
+    with _LOG_LOCK:
+        if _LOG is None:
+            _LOG = MerkleLog(MERKLE_LOG_DB_PATH)
+        return _LOG
+
+
+def append_audit_hashes(values: List[str]) -> int:
+    """Add audit hashes to the current batch; signs it if its window is due. Returns the first leaf index."""
+    log = get_merkle_log()
+    first = log.append(values)
+    if log.due():
+        log.seal()
+    return first
+
+
+def sign_audit_hash(value: str) -> Dict[str, Any]:
+    """
+    Fields to attach to a signed audit result: an RSA signature of the hash,
+    or in merkle mode its leaf index in the Merkle log (the covering tree
+    head is signed when the batch window closes).
+    """
+    if AUDIT_SIGNING_MODE == "merkle":
+        return {"merkle_leaf_index": append_audit_hashes([value])}
+    return {"signature": sign_data(value)}
+
+
+def sign_audit_hashes(values: List[str], include_proofs: bool = False
+                      ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    sign_audit_hash for many hashes at once. In merkle mode they are appended
+    together and one tree head covering them is signed right away (returned
+    alongside; with include_proofs each hash also gets its inclusion proof).
+    """
+    if AUDIT_SIGNING_MODE != "merkle":
+        return [{"signature": sign_data(value)} for value in values], None
+    log = get_merkle_log()
+    first = log.append(values)
+    head = log.seal()
+    fields = [{"merkle_leaf_index": first + i} for i in range(len(values))]
+    if include_proofs and head is not None:
+        for i, extra in enumerate(fields):
+            extra["inclusion_proof"] = log.inclusion(first + i, tree_size=head["tree_size"])["proof"]
+    return fields, head
+
+
+def seal_merkle_batch() -> Dict[str, Any]:
+    if not is_signing_available():
+        return {"error": "No signing key is loaded, so tree heads cannot be signed"}
+    head = get_merkle_log().seal()
+    return {"tree_head": head} if head else {"error": "The Merkle log is empty"}
+
+
+def merkle_log_status() -> Dict[str, Any]:
+    return get_merkle_log().status()
+
+
+def merkle_inclusion_proof(leaf_index: Optional[int] = None, chain_hash: Optional[str] = None,
+                           tree_size: Optional[int] = None) -> Dict[str, Any]:
+    """Inclusion proof of a record (by leaf index or hash) against a signed tree head (default: latest)."""
+    if (leaf_index is None) == (chain_hash is None):
+        return {"error": "Provide exactly one of leaf_index or chain_hash"}
+    return get_merkle_log().inclusion(leaf_index, chain_hash, tree_size)
+
+
+def merkle_consistency_proof(first: int, second: Optional[int] = None) -> Dict[str, Any]:
+    """Proof that signed tree head `first` is a prefix of `second` (default: latest)."""
+    return get_merkle_log().consistency(first, second)
+
+
+def verify_merkle_inclusion(chain_hash: str, leaf_index: int, proof: List[str],
+                            tree_head: Dict[str, Any]) -> Dict[str, Any]:
+    """Check a record's inclusion proof and the signature of the tree head it refers to."""
+    try:
+        proof_bytes = [bytes.fromhex(p) for p in proof]
+        root = bytes.fromhex(tree_head["root_hash"])
+        included = verify_inclusion(leaf_hash(chain_hash.encode()), leaf_index, int(tree_head["tree_size"]),
+                                    proof_bytes, root)
+    except (KeyError, TypeError, ValueError) as e:
+        return {"valid": False, "error": f"Malformed proof or tree head: {e}"}
+    signature = verify_signature(tree_head_message(tree_head), tree_head.get("signature") or "")
+    return {
+        "valid": included and signature["valid"],
+        "inclusion_valid": included,
+        "signature_valid": signature["valid"],
+    }
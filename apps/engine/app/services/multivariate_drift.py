@@ -0,0 +1,215 @@
+"""
+Multivariate Drift Detection
+Per-feature PSI/KS cannot see a shift in the joint distribution (e.g. a
+correlation that flips while every marginal stays put). Two tests compare
+the windows as a whole:
+
+- mmd: Maximum Mean Discrepancy with a Gaussian kernel (median-heuristic
+  bandwidth), approximated with random Fourier features so that MMD^2 is
+  the squared distance between the windows' mean feature vectors: linear in
+  rows instead of quadratic. The p-value comes from a permutation test in
+  which each batch of permuted splits is one (permutations x rows) @
+  (rows x features) product.
+- domain_classifier: a gradient-boosted classifier trained to tell the
+  windows apart; its held-out AUC is ~0.5 without drift. Trees are added in
+  steps (warm start) until DOMAIN_CLASSIFIER_MAX_ITER or the time budget.
+
+Both run on at most max_samples rows per window and stop at the time budget
+(at a permutation batch / boosting step boundary); the result states how
+many permutations and iterations were actually used.
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from scipy import stats
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+
+from app.core.columnar import TabularData, as_frame
+from app.core.config import (
+    MAX_DATA_ROWS, MAX_FEATURES, MULTIVARIATE_DRIFT_MAX_SAMPLES, MULTIVARIATE_DRIFT_TIME_BUDGET_SECONDS,
+    MMD_RANDOM_FEATURES, MMD_PERMUTATIONS, DOMAIN_CLASSIFIER_MAX_ITER,
+)
+from app.services.drift_monitoring import feature_matrix, numeric_features
+
+MULTIVARIATE_DRIFT_METHODS = ("mmd", "domain_classifier")
+
+# Rows used to pick the kernel bandwidth, permuted splits per matrix product,
+# and trees added between time-budget checks
+_BANDWIDTH_SAMPLE = 1_000
+_PERMUTATION_BATCH = 50
+_BOOSTING_STEP = 10
+
+
+def _standardize(baseline: np.ndarray, current: np.ndarray):
+    """Scale both windows by the baseline's mean and std; missing values become the mean (0)."""
+    with np.errstate(invalid="ignore"):
+        mean = np.nanmean(baseline, axis=0)
+        std = np.nanstd(baseline, axis=0)
+    mean = np.where(np.isnan(mean), 0.0, mean)
+    std = np.where(np.isnan(std) | (std == 0), 1.0, std)
+    return [np.nan_to_num((X - mean) / std) for X in (baseline, current)]
+
+
+def _median_bandwidth(X: np.ndarray, rng: np.random.Generator) -> float:
+    sample = X[rng.choice(len(X), min(len(X), _BANDWIDTH_SAMPLE), replace=False)]
+    squared = np.sum(sample ** 2, axis=1)
+    d2 = squared[:, None] + squared[None, :] - 2 * sample @ sample.T
+    d2 = d2[np.triu_indices(len(sample), k=1)]
+    median = float(np.sqrt(np.median(np.clip(d2, 0, None)))) if len(d2) else 0.0
+    return median if median > 0 else 1.0
+
+
+def mmd_test(baseline: np.ndarray, current: np.ndarray, n_features: int = MMD_RANDOM_FEATURES,
+             n_permutations: int = MMD_PERMUTATIONS, deadline: Optional[float] = None,
+             rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
+    """
+    Permutation test on the random-Fourier-feature estimate of MMD^2 between
+    two standardized samples.
+
+    With z(x) = sqrt(2/D) cos(xW + b), W ~ N(0, 1/bandwidth^2), z(x).z(y)
+    approximates the Gaussian kernel, so MMD^2 ~ |mean z(baseline) - mean
+    z(current)|^2. After centering z on the pooled mean, a split's mean
+    difference is (sum over the first group) * (1/n1 + 1/n2).
+    """
+    rng = rng or np.random.default_rng(0)
+    pooled = np.vstack([baseline, current])
+    n1, n = len(baseline), len(pooled)
+    bandwidth = _median_bandwidth(pooled, rng)
+    W = rng.normal(scale=1 / bandwidth, size=(pooled.shape[1], n_features))
+    b = rng.uniform(0, 2 * np.pi, n_features)
+    Z = np.sqrt(2 / n_features) * np.cos(pooled @ W + b)
+    Z -= Z.mean(axis=0)
+    scale = 1 / n1 + 1 / (n - n1)
+
+    observed = float(np.sum((Z[:n1].sum(axis=0) * scale) ** 2))
+    extreme = done = 0
+    while done < n_permutations and (done == 0 or deadline is None or time.monotonic() < deadline):
+        size = min(_PERMUTATION_BATCH, n_permutations - done)
+        first = np.argsort(rng.random((size, n)), axis=1)[:, :n1]
+        S = np.zeros((size, n))
+        S[np.arange(size)[:, None], first] = 1.0
+        permuted = np.sum((S @ Z * scale) ** 2, axis=1)
+        extreme += int((permuted >= observed * (1 - 1e-12)).sum())
+        done += size
+
+    p_value = (1 + extreme) / (1 + done)
+    return {
+        "statistic": round(observed, 6),
+        "p_value": round(p_value, 4),
+        "significant": bool(p_value < 0.05),
+        "bandwidth": round(bandwidth, 4),
+        "random_features": n_features,
+        "permutations": done,
+        "permutations_requested": n_permutations,
+        "time_budget_exhausted": done < n_permutations,
+    }
+
+
+def domain_classifier_test(baseline: np.ndarray, current: np.ndarray, max_iter: int = DOMAIN_CLASSIFIER_MAX_ITER,
+                           deadline: Optional[float] = None, random_state: Optional[int] = 0) -> Dict[str, Any]:
+    """
+    Held-out AUC of a classifier separating the two samples (baseline = 0).
+
+    The p-value is the one-sided normal approximation of the Mann-Whitney U
+    statistic (AUC = U / (n0 * n1)) under the null of no separation.
+    """
+    X = np.vstack([baseline, current])
+    y = np.concatenate([np.zeros(len(baseline)), np.ones(len(current))])
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, stratify=y, random_state=random_state)
+
+    model = HistGradientBoostingClassifier(max_iter=0, max_leaf_nodes=15, max_bins=32, learning_rate=0.2,
+                                           early_stopping=False, warm_start=True, random_state=random_state)
+    iterations = 0
+    while iterations < max_iter and (iterations == 0 or deadline is None or time.monotonic() < deadline):
+        iterations = min(iterations + _BOOSTING_STEP, max_iter)
+        model.set_params(max_iter=iterations)
+        model.fit(X_train, y_train)
+
+    auc = float(roc_auc_score(y_test, model.predict_proba(X_test)[:, 1]))
+    n0, n1 = int((y_test == 0).sum()), int((y_test == 1).sum())
+    z = (auc - 0.5) / np.sqrt((n0 + n1 + 1) / (12 * n0 * n1))
+    p_value = float(stats.norm.sf(z))
+    return {
+        "auc": round(auc, 4),
+        "p_value": round(p_value, 4),
+        "significant": bool(p_value < 0.05),
+        "test_rows": n0 + n1,
+        "iterations": iterations,
+        "iterations_requested": max_iter,
+        "time_budget_exhausted": iterations < max_iter,
+    }
+
+
+def analyze_multivariate_drift(baseline_data: TabularData, current_data: TabularData,
+                               features: Optional[List[str]] = None,
+                               methods: Optional[List[str]] = None,
+                               max_samples: int = MULTIVARIATE_DRIFT_MAX_SAMPLES,
+                               time_budget_seconds: float = MULTIVARIATE_DRIFT_TIME_BUDGET_SECONDS,
+                               n_permutations: int = MMD_PERMUTATIONS,
+                               random_state: Optional[int] = 0) -> Dict[str, Any]:
+    """
+    Joint-distribution drift between a baseline and a current window over
+    numeric features (default: every numeric column of the baseline).
+
+    Each window is sampled down to max_samples rows. The time budget is
+    shared: MMD permutations may use half of it when both methods run, and
+    the domain classifier the rest.
+    """
+    started = time.monotonic()
+    if baseline_data is None or current_data is None or len(baseline_data) == 0 or len(current_data) == 0:
+        return {"error": "No data provided for analysis"}
+    if len(baseline_data) > MAX_DATA_ROWS or len(current_data) > MAX_DATA_ROWS:
+        return {"error": f"Data too large. Maximum is {MAX_DATA_ROWS} rows."}
+    methods = list(dict.fromkeys(methods or MULTIVARIATE_DRIFT_METHODS))
+    unknown = [m for m in methods if m not in MULTIVARIATE_DRIFT_METHODS]
+    if unknown:
+        return {"error": f"Unknown method(s): {', '.join(unknown)}. Use {', '.join(MULTIVARIATE_DRIFT_METHODS)}."}
+
+    baseline_df, current_df = as_frame(baseline_data), as_frame(current_data)
+    features = numeric_features(baseline_df) if features is None else list(dict.fromkeys(features))
+    if not features:
+        return {"error": "No numeric features to compare"}
+    if len(features) > MAX_FEATURES:
+        return {"error": f"Too many features ({len(features)}). Maximum is {MAX_FEATURES}."}
+    missing = [f for f in features if f not in baseline_df.columns or f not in current_df.columns]
+    if missing:
+        return {"error": f"Feature(s) not found in both windows: {', '.join(missing)}"}
+
+    rng = np.random.default_rng(random_state)
+    samples = []
+    for df in (baseline_df, current_df):
+        if len(df) > max_samples:
+            df = df.iloc[np.sort(rng.choice(len(df), max_samples, replace=False))]
+        samples.append(feature_matrix(df, features))
+    baseline, current = samples
+    if min(len(baseline), len(current)) < 10:
+        return {"error": "Each window needs at least 10 rows"}
+
+    deadline = started + time_budget_seconds
+    result = {
+        "features": features,
+        "baseline_rows": len(baseline_df),
+        "current_rows": len(current_df),
+        "sampled_rows": [len(baseline), len(current)],
+    }
+    detected = []
+    if "mmd" in methods:
+        mmd_deadline = started + time_budget_seconds / 2 if "domain_classifier" in methods else deadline
+        result["mmd"] = mmd_test(*_standardize(baseline, current), n_permutations=n_permutations,
+                                 deadline=mmd_deadline, rng=rng)
+        if result["mmd"]["significant"]:
+            detected.append("mmd")
+    if "domain_classifier" in methods:
+        result["domain_classifier"] = domain_classifier_test(baseline, current, deadline=deadline,
+                                                             random_state=random_state)
+        if result["domain_classifier"]["significant"]:
+            detected.append("domain_classifier")
+
+    result["drift_detected_by"] = detected
+    result["status"] = "DRIFT_DETECTED" if detected else "STABLE"
+    result["elapsed_seconds"] = round(time.monotonic() - started, 3)
+    return result
@@ -1,63 +1,218 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import pandas as pd
 import numpy as np
+from scipy import sparse
+
+from app.core.columnar import TabularData, as_frame
+
+# Categorical columns with more levels than this (IDs, free text) are not
+# scored: Cramér's V of a near-unique column is ~1 against anything
+MAX_CATEGORY_LEVELS = 100
+
+ASSOCIATION_MEASURES = {
+    (False, False): "pearson",
+    (True, True): "cramers_v",
+    (False, True): "correlation_ratio",
+    (True, False): "correlation_ratio",
+}
+
+
+def _is_categorical(column: pd.Series) -> bool:
+    return column.dtype == 'object' or isinstance(column.dtype, pd.CategoricalDtype) \
+        or pd.api.types.is_string_dtype(column)
+
+
+class _Encoded:
+    """Numeric block (centered, NaN -> 0) and one-hot categorical block of a column set."""
+
+    def __init__(self, df: pd.DataFrame, columns: List[str], max_levels: Optional[int] = None,
+                 keep: Tuple[str, ...] = ()):
+        is_categorical = {c: _is_categorical(df[c]) for c in columns}
+        self.numeric = [c for c in columns if not is_categorical[c]]
+        self.categorical, self.dropped = [], []
+        n = len(df)
+        X = df[self.numeric].to_numpy(dtype=float) if self.numeric else np.zeros((n, 0))
+        present = ~np.isnan(X)
+        self.masked = not present.all()
+        self.present = present.astype(float)
+        with np.errstate(invalid="ignore"):
+            self.X = np.where(present, X - np.nanmean(X, axis=0), 0.0) if self.numeric else X
+        self.sum_squares = (self.X ** 2).sum(axis=0)
+
+        codes, sizes = [], []
+        for col in (c for c in columns if is_categorical[c]):
+            c, uniques = pd.factorize(df[col], use_na_sentinel=False)
+            if max_levels is not None and len(uniques) > max_levels and col not in keep:
+                self.dropped.append(col)
+                continue
+            self.categorical.append(col)
+            codes.append(c)
+            sizes.append(len(uniques))
+        self.sizes = np.array(sizes, dtype=np.int64)
+        levels = int(self.sizes.sum())
+        k = len(self.categorical)
+        offsets = np.concatenate(([0], np.cumsum(self.sizes)[:-1])).astype(np.int64)
+        cols = (np.column_stack(codes) + offsets).ravel() if k else np.zeros(0, dtype=np.int64)
+        self.Z = sparse.csr_matrix((np.ones(n * k), (np.repeat(np.arange(n), k), cols)), shape=(n, levels))
+        # level -> feature membership, to sum per-level terms into per-feature blocks
+        self.A = sparse.csr_matrix((np.ones(levels), (np.arange(levels), np.repeat(np.arange(k), self.sizes))),
+                                   shape=(levels, k))
+        self.level_counts = np.asarray(self.Z.sum(axis=0)).ravel()
+
+
+def _pearson(left: _Encoded, right: _Encoded) -> np.ndarray:
+    """|Pearson r| between numeric columns, over the rows where both are present."""
+    sxy = left.X.T @ right.X
+    if not (left.masked or right.masked):
+        return np.abs(sxy / np.sqrt(np.outer(left.sum_squares, right.sum_squares)))
+    n = left.present.T @ right.present
+    sx = left.X.T @ right.present  # sum of the left column over rows where the right one is present
+    sy = left.present.T @ right.X
+    sxx = (left.X ** 2).T @ right.present
+    syy = left.present.T @ right.X ** 2
+    return np.abs((sxy - sx * sy / n) / np.sqrt((sxx - sx ** 2 / n) * (syy - sy ** 2 / n)))
+
+
+def _correlation_ratio(numeric: _Encoded, categorical: _Encoded) -> np.ndarray:
+    """eta (numeric x categorical): sqrt(between-level / total sum of squares)."""
+    G = np.asarray(categorical.Z.T @ numeric.X)  # per-level sums, levels x numeric
+    counts = np.asarray(categorical.Z.T @ numeric.present) if numeric.masked else categorical.level_counts[:, None]
+    between = categorical.A.T @ np.where(counts > 0, G ** 2 / np.where(counts > 0, counts, 1), 0.0)
+    return np.sqrt(between / numeric.sum_squares).T
+
+
+def _cramers_v(left: _Encoded, right: _Encoded) -> np.ndarray:
+    """Cramér's V: sum O^2 / (row total * col total) over a pair's contingency table is 1 + chi2 / n."""
+    O = (left.Z.T @ right.Z).tocsr()  # every pair's contingency table at once
+    scaled = sparse.diags(1 / left.level_counts) @ O.multiply(O) @ sparse.diags(1 / right.level_counts)
+    S = (left.A.T @ scaled @ right.A).toarray()
+    dof = np.minimum.outer(left.sizes, right.sizes) - 1
+    return np.sqrt(np.clip(S - 1, 0, None) / dof)
+
+
+def association_matrix(df: pd.DataFrame, columns: List[str], against: Optional[List[str]] = None,
+                       max_levels: Optional[int] = None,
+                       keep: Tuple[str, ...] = ()) -> Tuple[np.ndarray, List[str], List[str]]:
+    """
+    Association strength in [0, 1] between every column of against (default:
+    columns) and every column of columns, in one vectorized pass.
+
+    - numeric x numeric: |Pearson r| over pairwise-complete rows, from
+      cross-products of the centered matrices;
+    - categorical x categorical: Cramér's V. Categorical columns are one-hot
+      encoded into a sparse indicator matrix Z, so Z'Z holds the contingency
+      table of every pair at once;
+    - numeric x categorical: correlation ratio (eta), from per-level sums of
+      the centered numeric columns (Z'X).
+
+    Missing categorical values form their own level; categorical columns with
+    more than max_levels levels are left out, except those in keep (columns
+    of against are always kept). Undefined associations
+    (constant columns) are NaN. Returns the matrix with rows in the order of
+    the returned row labels and columns in the order of the column labels
+    (numeric columns first on both axes).
+    """
+    right = _Encoded(df, columns, max_levels, keep)
+    left = right if against is None else _Encoded(df, against)
+    p_l, p_r = len(left.numeric), len(right.numeric)
+    result = np.full((p_l + len(left.categorical), p_r + len(right.categorical)), np.nan)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if p_l and p_r:
+            result[:p_l, :p_r] = _pearson(left, right)
+        if left.categorical and right.categorical:
+            result[p_l:, p_r:] = _cramers_v(left, right)
+        if p_l and right.categorical:
+            result[:p_l, p_r:] = _correlation_ratio(left, right)
+        if left.categorical and p_r:
+            result[p_l:, :p_r] = _correlation_ratio(right, left).T
+
+    row_labels = left.numeric + left.categorical
+    col_labels = right.numeric + right.categorical
+    if against is None:
+        np.fill_diagonal(result, 1.0)
+    return np.clip(result, 0.0, 1.0), row_labels, col_labels
+
 
 class RedTeamAuditor:
     """Actively discovers hidden proxies and unintended biases in AI datasets."""
 
-    def discover_proxies(self, data: List[Dict], protected_attribute: str, other_columns: List[str]) -> Dict[str, Any]:
-        """Identifies columns that are highly correlated with a protected attribute (Hidden Proxies)."""
-        df = pd.DataFrame(data)
-        
+    def discover_proxies(self, data: TabularData, protected_attribute: str, other_columns: List[str],
+                         include_matrix: bool = False) -> Dict[str, Any]:
+        """
+        Identifies columns that are strongly associated with a protected attribute (Hidden Proxies).
+
+        Association is measured to suit each pair of column types (see
+        association_matrix); the full matrix over the protected attribute and
+        other_columns is computed in one pass and can be returned.
+        """
+        df = as_frame(data)
+
         if protected_attribute not in df.columns:
             return {"error": f"Protected attribute '{protected_attribute}' not found in data."}
 
         proxies = []
         findings = []
-        
-        # Convert protected attribute to numeric for correlation if it's categorical
-        if df[protected_attribute].dtype == 'object':
-            df[f"{protected_attribute}_encoded"] = df[protected_attribute].astype('category').cat.codes
-            target_col = f"{protected_attribute}_encoded"
-        else:
-            target_col = protected_attribute
+        skipped = []
 
-        for col in other_columns:
-            if col == protected_attribute or col == target_col:
+        candidates = []
+        for col in dict.fromkeys(other_columns):
+            if col == protected_attribute:
+                continue
+            if col not in df.columns:
+                skipped.append(col)
+                continue
+            if not _is_categorical(df[col]) and not pd.api.types.is_numeric_dtype(df[col]):
+                skipped.append(col)  # e.g. datetimes
                 continue
-            
-            # Simple correlation for numeric, or use Mutual Information/Chi-Square for categorical
-            # For the Alpha engine, we use a correlation threshold of 0.7
-            try:
-                if df[col].dtype == 'object':
-                    # Categorical proxy check
-                    df[f"{col}_encoded"] = df[col].astype('category').cat.codes
-                    correlation = df[f"{col}_encoded"].corr(df[target_col])
-                else:
-                    correlation = df[col].corr(df[target_col])
-                
-                abs_corr = abs(correlation)
-                
-                if abs_corr >= 0.7:
-                    proxies.append({
-                        "column": col,
-                        "correlation_strength": round(abs_corr, 4),
-                        "risk": "CRITICAL" if abs_corr >= 0.85 else "HIGH"
-                    })
-                    findings.append(f"PROXY DETECTED: Column '{col}' is a {proxies[-1]['risk']} proxy for '{protected_attribute}' (Strength: {abs_corr:.2f}).")
-            except Exception:  # nosec
+            candidates.append(col)
+
+        # The protected attribute's row is all the scan needs; the full
+        # matrix (O(columns^2)) is only computed when asked for. Either way
+        # the protected attribute is scored whatever its number of levels.
+        if include_matrix:
+            matrix, order, _ = association_matrix(df, [protected_attribute] + candidates,
+                                                  max_levels=MAX_CATEGORY_LEVELS, keep=(protected_attribute,))
+            row = matrix[order.index(protected_attribute)]
+        else:
+            row_matrix, _, order = association_matrix(
+                df, candidates, against=[protected_attribute], max_levels=MAX_CATEGORY_LEVELS
+            )
+            row = row_matrix[0]
+        strengths = dict(zip(order, row))
+        skipped += [col for col in candidates if col not in strengths]
+        protected_is_categorical = _is_categorical(df[protected_attribute])
+
+        # For the Alpha engine, we use an association threshold of 0.7
+        for col in candidates:
+            strength = strengths.get(col, np.nan)
+            if np.isnan(strength) or strength < 0.7:
                 continue
+            proxies.append({
+                "column": col,
+                "correlation_strength": round(float(strength), 4),
+                "measure": ASSOCIATION_MEASURES[(protected_is_categorical, _is_categorical(df[col]))],
+                "risk": "CRITICAL" if strength >= 0.85 else "HIGH"
+            })
+            findings.append(f"PROXY DETECTED: Column '{col}' is a {proxies[-1]['risk']} proxy for '{protected_attribute}' (Strength: {strength:.2f}).")
 
         score = max(0, 100 - (len(proxies) * 20))
 
-        return {
+        result = {
             "right_enforced": "Right to Truth (Proxy Audit)",
             "red_team_score": score,
             "proxies_identified": proxies,
             "findings": findings,
+            "columns_skipped": skipped,
             "recommendation": "Remove identified proxies to ensure POPIA Section 71 compliance." if proxies else "No significant proxies detected in the provided schema."
         }
+        if include_matrix:
+            result["association_matrix"] = {
+                "columns": order,
+                "values": [[None if np.isnan(v) else round(float(v), 4) for v in row] for row in matrix],
+            }
+        return result
 
-def red_team_audit(data: List[Dict], protected_attribute: str, other_columns: List[str]):
+def red_team_audit(data: TabularData, protected_attribute: str, other_columns: List[str], include_matrix: bool = False):
     auditor = RedTeamAuditor()
-    return auditor.discover_proxies(data, protected_attribute, other_columns)
+    return auditor.discover_proxies(data, protected_attribute, other_columns, include_matrix)
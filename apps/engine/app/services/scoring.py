@@ -1,7 +1,6 @@
 from app.schemas.integrity import IntegrityScoreRequest, IntegrityScoreResponse, TierLevel
 from app.use_cases.configs import get_use_case_thresholds
-import hashlib
-import json
+from app.core.canonical import canonical_hash
 
 def calculate_integrity_score(request: IntegrityScoreRequest) -> IntegrityScoreResponse:
     thresholds = get_use_case_thresholds(request.system_type)
@@ -46,7 +45,7 @@ def calculate_integrity_score(request: IntegrityScoreRequest) -> IntegrityScoreR
         "score": final_score,
         "breakdown": breakdown
     }
-    audit_hash = hashlib.sha256(json.dumps(audit_data, sort_keys=True).encode()).hexdigest()
+    audit_hash = canonical_hash(audit_data)
     
     return IntegrityScoreResponse(
         score=final_score,
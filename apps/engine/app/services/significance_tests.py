@@ -0,0 +1,148 @@
+"""
+Significance Tests for Group x Outcome Independence
+Small-sample alternatives to the asymptotic chi-square test, which is
+unreliable for sparse tables and small groups.
+
+- permutation: Monte Carlo permutation test on the Pearson chi-square
+  statistic. Shuffling outcome labels across rows while group sizes stay
+  fixed is the same as drawing contingency tables with fixed margins, so
+  each replicate is sampled directly as a table (a chain of hypergeometric
+  draws, vectorized over the whole batch of replicates) instead of
+  materializing a rows x permutations label matrix. Batches can run on a
+  process pool and stop at a time budget; the result states how many
+  permutations were actually used.
+- exact: Fisher's exact test for 2x2 tables.
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from scipy import stats
+
+from app.core.config import MAX_PERMUTATIONS, PERMUTATION_TIME_BUDGET_SECONDS, PERMUTATION_WORKERS
+
+logger = logging.getLogger("aic.engine.significance")
+
+SIGNIFICANCE_METHODS = ("chi_square", "permutation", "exact")
+
+# Per-batch bounds: replicates x cells held in memory, and replicates between
+# time-budget checks
+_BATCH_CELLS = 4_000_000
+_BATCH_REPLICATES = 20_000
+
+
+def pearson_chi2(tables: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    """Pearson chi-square statistic for a (..., G, K) stack of tables with fixed margins."""
+    return ((tables - expected) ** 2 / expected).sum(axis=(-2, -1))
+
+
+def random_tables(rng: np.random.Generator, row_totals: np.ndarray, col_totals: np.ndarray, size: int) -> np.ndarray:
+    """
+    (size, G, K) tables with the given margins, distributed as under random
+    label permutation. Each group's row is a multivariate hypergeometric draw
+    from the outcomes not yet assigned, decomposed into binary hypergeometrics.
+    """
+    n_rows, n_cols = len(row_totals), len(col_totals)
+    tables = np.zeros((size, n_rows, n_cols), dtype=np.int64)
+    remaining = np.broadcast_to(col_totals, (size, n_cols)).copy()
+    for g in range(n_rows - 1):
+        need = np.full(size, row_totals[g], dtype=np.int64)
+        others = remaining.sum(axis=1)
+        for k in range(n_cols - 1):
+            others -= remaining[:, k]
+            draw = rng.hypergeometric(remaining[:, k], others, need)
+            tables[:, g, k] = draw
+            remaining[:, k] -= draw
+            need -= draw
+        tables[:, g, -1] = need
+        remaining[:, -1] -= need
+    tables[:, -1, :] = remaining
+    return tables
+
+
+def _permutation_batch(row_totals: np.ndarray, col_totals: np.ndarray, observed: float,
+                       size: int, seed: np.random.SeedSequence) -> Tuple[int, int]:
+    """Count of permuted statistics >= observed in one batch (runs in worker processes)."""
+    rng = np.random.default_rng(seed)
+    expected = np.outer(row_totals, col_totals) / row_totals.sum()
+    statistics = pearson_chi2(random_tables(rng, row_totals, col_totals, size), expected)
+    # Relative tolerance so ties with the observed table are counted as extreme
+    return int((statistics >= observed * (1 - 1e-12)).sum()), size
+
+
+def permutation_test(
+    contingency: np.ndarray,
+    n_permutations: int = 10_000,
+    time_budget_seconds: float = PERMUTATION_TIME_BUDGET_SECONDS,
+    random_state: Optional[int] = 0,
+    n_jobs: int = PERMUTATION_WORKERS,
+) -> Dict[str, Any]:
+    """
+    Monte Carlo permutation p-value for independence in a contingency table.
+
+    p = (1 + #{chi2* >= chi2_obs}) / (1 + permutations), which is never 0.
+    Stops early (at a batch boundary) once time_budget_seconds is spent.
+    """
+    table = np.asarray(contingency, dtype=np.int64)
+    row_totals, col_totals = table.sum(axis=1), table.sum(axis=0)
+    expected = np.outer(row_totals, col_totals) / table.sum()
+    observed = float(pearson_chi2(table, expected))
+
+    n_permutations = int(min(n_permutations, MAX_PERMUTATIONS))
+    batch = int(max(1, min(n_permutations, _BATCH_REPLICATES, _BATCH_CELLS // table.size)))
+    sizes = [batch] * (n_permutations // batch)
+    if n_permutations % batch:
+        sizes.append(n_permutations % batch)
+    seeds = np.random.SeedSequence(random_state).spawn(len(sizes))
+    jobs = list(zip(sizes, seeds))
+
+    deadline = time.monotonic() + time_budget_seconds
+    extreme = done = 0
+    parallel = n_jobs > 1 and len(jobs) > 1
+    if parallel:
+        try:
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                pending = set()
+                while (jobs or pending) and time.monotonic() < deadline:
+                    while jobs and len(pending) < n_jobs:
+                        size, seed = jobs.pop(0)
+                        pending.add(pool.submit(_permutation_batch, row_totals, col_totals, observed, size, seed))
+                    finished, pending = wait(pending, timeout=max(deadline - time.monotonic(), 0),
+                                             return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        count, size = future.result()
+                        extreme, done = extreme + count, done + size
+                for future in pending:
+                    future.cancel()
+        except (OSError, RuntimeError, AssertionError) as e:
+            # e.g. daemonic Celery worker processes cannot fork children
+            logger.warning(f"Process pool unavailable ({e}); running permutations serially")
+            parallel = False
+    if not parallel:
+        for size, seed in jobs:
+            if done and time.monotonic() >= deadline:
+                break
+            count, size = _permutation_batch(row_totals, col_totals, observed, size, seed)
+            extreme, done = extreme + count, done + size
+
+    p_value = (1 + extreme) / (1 + done)
+    return {
+        "statistic": observed,
+        "p_value": p_value,
+        "permutations": done,
+        "permutations_requested": n_permutations,
+        "time_budget_exhausted": done < n_permutations,
+        "monte_carlo_se": float(np.sqrt(p_value * (1 - p_value) / (done + 1))),
+    }
+
+
+def exact_test(contingency: np.ndarray) -> Dict[str, Any]:
+    """Fisher's exact test (two-sided) for a 2x2 table."""
+    table = np.asarray(contingency)
+    if table.shape != (2, 2):
+        return {"error": f"Exact test requires a 2x2 table (got {table.shape[0]}x{table.shape[1]}); use method='permutation'"}
+    odds_ratio, p_value = stats.fisher_exact(table)
+    return {"p_value": float(p_value), "odds_ratio": float(odds_ratio)}
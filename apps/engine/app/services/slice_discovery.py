@@ -0,0 +1,294 @@
+"""
+Fairness Slice Discovery
+Finds the feature-value conjunctions (slices) treated worst, instead of only
+comparing pre-declared protected groups.
+
+The search walks the Apriori lattice of slices ("gender=F", then
+"gender=F + age=(35, 50]", ...). Like intersectional analysis, every feature
+is factorized once into categorical codes; each surviving slice is extended
+one feature at a time with a single bincount over its rows. Three prunes keep
+wide datasets fast:
+
+- support: slices with fewer than min_support rows are dropped, and so are
+  all their refinements (support only shrinks);
+- Apriori: a slice is only evaluated if every one-item-smaller sub-slice
+  survived;
+- bound: the best score any refinement with at least min_support rows can
+  reach is bounded from the slice's counts; branches that cannot beat the
+  current top-k are not expanded.
+
+Slices are ranked by their gap to the overall rate (lower selection rate, or
+higher error rate when a predicted outcome is given) weighted by
+sqrt(size), i.e. by the gap's z-score.
+"""
+
+import heapq
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.columnar import TabularData, as_frame
+from app.services.bias_analysis import generate_audit_hash, validate_data_size
+
+SLICE_METRICS = ("selection_rate", "error_rate")
+
+# Numeric features with more distinct values than this are quantile-binned
+CONTINUOUS_MIN_LEVELS = 10
+
+
+def _encode_features(df: pd.DataFrame, features: List[str], n_bins: int, max_cardinality: int):
+    """Categorical codes and level labels per feature; continuous features are quantile-binned."""
+    encoded, skipped = [], []
+    for feature in features:
+        column = df[feature]
+        if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column) \
+                and column.nunique(dropna=True) > CONTINUOUS_MIN_LEVELS:
+            column = pd.qcut(column, q=n_bins, duplicates="drop")
+        codes, uniques = pd.factorize(column, use_na_sentinel=False)
+        if len(uniques) > max_cardinality or len(uniques) < 2:
+            skipped.append(feature)
+            continue
+        encoded.append((feature, codes.astype(np.int64), [str(v) for v in uniques]))
+    return encoded, skipped
+
+
+def _optimistic_scores(n: np.ndarray, s: np.ndarray, min_support: int, overall: float, worse_is_lower: bool,
+                       binary: bool, y_min: float, y_max: float) -> np.ndarray:
+    """
+    Upper bound on gap * sqrt(size) over every refinement with >= min_support rows.
+
+    For 0/1 outcomes the best refinement keeps the b "worst" rows (zeros for
+    selection, errors for error rate): the score rises while only worst rows
+    are kept and falls once other rows must be added, so the maximum is at
+    size max(b, min_support). Bounds shrink with support, so deep branches prune.
+    """
+    if not binary:
+        return (overall - y_min if worse_is_lower else y_max - overall) * np.sqrt(n)
+    worst = n - s if worse_is_lower else s
+    m = np.maximum(worst, min_support)
+    share = np.minimum(worst / m, 1.0)
+    gap = overall - (1 - share) if worse_is_lower else share - overall
+    return gap * np.sqrt(m)
+
+
+def discover_slices(
+    df: pd.DataFrame,
+    y: np.ndarray,
+    features: List[str],
+    worse_is_lower: bool = True,
+    min_support: int = 30,
+    max_order: int = 3,
+    top_k: int = 10,
+    n_bins: int = 4,
+    max_cardinality: int = 50,
+) -> Dict[str, Any]:
+    """
+    Top-k slices by gap to the overall mean of y, weighted by sqrt(size).
+
+    The score is proportional to the gap's z-score, so a large gap on a
+    handful of rows does not outrank a moderate gap on thousands. Returns the
+    ranked slices (items as (feature, level) pairs) and search statistics.
+    """
+    encoded, skipped = _encode_features(df, features, n_bins, max_cardinality)
+    n_rows = len(y)
+    overall = float(y.mean())
+    spread = float(y.std())
+    binary = bool(np.isin(y, [0.0, 1.0]).all())
+    y_min, y_max = float(y.min()), float(y.max())
+
+    # One code space for every (feature, level): a single bincount per parent
+    # counts the children along all remaining features at once
+    offsets = np.cumsum([0] + [len(levels) for _, _, levels in encoded])
+    codes = np.column_stack([c + offsets[f] for f, (_, c, _) in enumerate(encoded)]) \
+        if encoded else np.zeros((n_rows, 0), dtype=np.int64)
+    level_feature = np.repeat(np.arange(len(encoded)), np.diff(offsets))
+
+    top: List[Tuple[float, str, Tuple]] = []  # min-heap of (score, label, items)
+    found = {}
+    stats = {"evaluated": 0, "pruned_support": 0, "pruned_apriori": 0, "pruned_bound": 0}
+
+    def threshold() -> float:
+        return top[0][0] if len(top) >= top_k else 0.0
+
+    # Frontier entries: (items, rows); items are ((feature_idx, level_code), ...)
+    frontier = [((), np.arange(n_rows))]
+    expandable = {()}
+
+    for order in range(1, max_order + 1):
+        next_frontier, next_expandable = [], set()
+        for items, rows in frontier:
+            start = items[-1][0] + 1 if items else 0
+            if start >= len(encoded):
+                continue
+            n = len(rows)
+            block = codes[rows, start:]
+            base = offsets[start]
+            counts = np.bincount(block.ravel(), minlength=offsets[-1])[base:]
+            sums = np.bincount(block.ravel(), weights=np.repeat(y[rows], block.shape[1]),
+                               minlength=offsets[-1])[base:]
+
+            supported = counts >= min_support
+            stats["pruned_support"] += int(((counts > 0) & ~supported).sum())
+            if items:
+                supported &= counts < n  # same rows as the parent: the parent is the more general slice
+            idx = np.flatnonzero(supported)
+            stats["evaluated"] += len(idx)
+            if not len(idx):
+                continue
+
+            size, total = counts[idx].astype(float), sums[idx]
+            rate = total / size
+            scores = ((overall - rate) if worse_is_lower else (rate - overall)) * np.sqrt(size)
+            if order < max_order:
+                bounds = _optimistic_scores(size, total, min_support, overall, worse_is_lower, binary, y_min, y_max)
+            else:
+                bounds = np.full(len(idx), -np.inf)
+            relevant = (scores > threshold()) | (bounds > threshold())
+            stats["pruned_bound"] += int((~relevant & (bounds > -np.inf)).sum())
+
+            split = {}
+            for j in np.flatnonzero(relevant):
+                level = int(idx[j]) + base
+                f = int(level_feature[level])
+                child = items + ((f, level - offsets[f]),)
+                if order > 2 and any(child[:i] + child[i + 1:] not in expandable for i in range(len(child) - 1)):
+                    stats["pruned_apriori"] += 1
+                    continue
+                if scores[j] > threshold():
+                    label = " + ".join(f"{encoded[fi][0]}={encoded[fi][2][ci]}" for fi, ci in child)
+                    entry = (float(scores[j]), label, child)
+                    if len(top) >= top_k:
+                        heapq.heapreplace(top, entry)
+                    else:
+                        heapq.heappush(top, entry)
+                    found[child] = (int(size[j]), float(rate[j]))
+                if bounds[j] <= threshold():
+                    stats["pruned_bound"] += bounds[j] > -np.inf
+                    continue
+                if f not in split:
+                    column = block[:, f - start]
+                    order_idx = np.argsort(column, kind="stable")
+                    split[f] = (order_idx, np.searchsorted(column[order_idx], np.arange(offsets[f], offsets[f + 1] + 1)))
+                order_idx, bounds_at = split[f]
+                code = level - offsets[f]
+                next_frontier.append((child, rows[order_idx[bounds_at[code]:bounds_at[code + 1]]]))
+                next_expandable.add(child)
+        frontier, expandable = next_frontier, next_expandable
+        if not frontier:
+            break
+
+    slices = []
+    for score, label, items in sorted(top, key=lambda e: (-e[0], e[1])):
+        size, rate = found[items]
+        slices.append({
+            "items": [(encoded[fi][0], encoded[fi][2][ci]) for fi, ci in items],
+            "label": label,
+            "size": size,
+            "rate": rate,
+            "gap": overall - rate if worse_is_lower else rate - overall,
+            "z_score": score / spread if spread > 0 else 0.0,
+        })
+    return {
+        "overall_rate": overall,
+        "slices": slices,
+        "features_searched": [e[0] for e in encoded],
+        "features_skipped": skipped,
+        "search": {k: int(v) for k, v in stats.items()},
+    }
+
+
+def analyze_slice_discovery(
+    data: TabularData,
+    outcome_variable: str,
+    features: Optional[List[str]] = None,
+    predicted_outcome: Optional[str] = None,
+    min_support: int = 30,
+    max_order: int = 3,
+    top_k: int = 10,
+    n_bins: int = 4,
+    max_cardinality: int = 50,
+    previous_hash: str = None,
+) -> Dict[str, Any]:
+    """
+    Search feature slices for the worst selection rate (outcome_variable), or
+    the worst error rate when predicted_outcome is given (outcome_variable is
+    then the actual outcome). Slices are compared to the overall rate with
+    the Four-Fifths Rule.
+    """
+    if data is None or len(data) == 0:
+        return {"error": "No data provided for analysis"}
+
+    size_error = validate_data_size(data)
+    if size_error:
+        return size_error
+
+    df = as_frame(data)
+
+    targets = [outcome_variable] + ([predicted_outcome] if predicted_outcome else [])
+    for col in targets + list(features or []):
+        if col not in df.columns:
+            return {"error": f"Column '{col}' not found"}
+    if features is None:
+        features = [c for c in df.columns if c not in targets]
+    features = [f for f in features if f not in targets]
+    if not features:
+        return {"error": "No features to search"}
+
+    metric = "error_rate" if predicted_outcome else "selection_rate"
+    known = df[targets].notna().all(axis=1)
+    df = df[known]
+    try:
+        if predicted_outcome:
+            y = (df[outcome_variable] != df[predicted_outcome]).to_numpy(dtype=float)
+        else:
+            y = df[outcome_variable].to_numpy(dtype=float)
+    except (TypeError, ValueError):
+        return {"error": f"Column '{outcome_variable}' must be numeric"}
+    if len(y) == 0:
+        return {"error": "No rows with a known outcome"}
+
+    found = discover_slices(
+        df, y, features, worse_is_lower=(metric == "selection_rate"), min_support=min_support,
+        max_order=max_order, top_k=top_k, n_bins=n_bins, max_cardinality=max_cardinality,
+    )
+    overall = found["overall_rate"]
+
+    slices = []
+    flags = []
+    for s in found["slices"]:
+        rate = s["rate"]
+        if metric == "selection_rate":
+            ratio = rate / overall if overall > 0 else 0
+        else:
+            ratio = overall / rate if rate > 0 else 1.0
+        status = "PASS" if ratio >= 0.8 else "FAIL"
+        if status == "FAIL":
+            flags.append(f"Worst-treated slice '{s['label']}': {metric.replace('_', ' ')} {rate:.1%} vs {overall:.1%} overall")
+        slices.append({
+            "slice": {feature: level for feature, level in s["items"]},
+            "label": s["label"],
+            "order": len(s["items"]),
+            "size": int(s["size"]),
+            metric: round(float(rate), 4),
+            "gap": round(float(s["gap"]), 4),
+            "ratio_to_overall": round(float(ratio), 4),
+            "z_score": round(float(s["z_score"]), 4),
+            "status": status,
+        })
+
+    return {
+        "right_enforced": "Right to Human Agency",
+        "overall_status": "BIASED" if flags else "FAIR",
+        "methodology": "Apriori Slice Discovery (support and optimistic-bound pruning)",
+        "metric": metric,
+        "overall_rate": round(float(overall), 4),
+        "rows_analyzed": int(len(y)),
+        "features_searched": found["features_searched"],
+        "features_skipped": found["features_skipped"],
+        "search": {**found["search"], "min_support": min_support, "max_order": max_order, "top_k": top_k},
+        "flags": flags,
+        "slices": slices,
+        "previous_hash": previous_hash,
+        "audit_hash": generate_audit_hash({"slices": slices, "flags": flags}, previous_hash),
+    }
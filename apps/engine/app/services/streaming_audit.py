@@ -0,0 +1,419 @@
+"""
+Streaming Fairness Audits
+Chunked ingestion for datasets larger than a single request (MAX_DATA_ROWS).
+
+Clients open an audit session, push row batches to it and finalize it. Each
+batch is reduced to mergeable sufficient statistics — per-group outcome
+counts and sums for the Four-Fifths Rule, per-group (actual, predicted)
+counts for Equalized Odds — and merged into the session. Memory is bounded by
+the number of groups (MAX_SESSION_GROUPS) and, for Equalized Odds, the label
+set (MAX_CONFUSION_LABELS), never by the number of rows; a session that
+outgrows either bound is discarded. Finalizing produces the
+same report (and audit hash) that analyze_disparate_impact /
+analyze_equalized_odds would produce over the concatenated rows.
+
+audit_file runs the same accumulators over a local CSV or Parquet file read
+in chunks, for nightly audits of full decision logs.
+"""
+
+import os
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from cachetools import TTLCache
+
+from app.core.columnar import ColumnarDecodeError, TabularData, as_frame, file_columns, file_format, iter_file_chunks
+from app.core.config import (
+    MAX_AUDIT_SESSIONS, AUDIT_SESSION_TTL_SECONDS, MAX_SESSION_GROUPS, MAX_CONFUSION_LABELS, FILE_AUDIT_CHUNK_ROWS,
+    AUDIT_FILE_ROOT
+)
+from app.services.bias_analysis import (
+    atkinson_report, confusion_label_error, confusion_metrics_from_tensor, disparate_impact_report, equalized_odds_report,
+    statistical_significance_report, theil_report, validate_data_size
+)
+from app.services.fairness_metrics import statistical_parity_report
+from app.services.group_stats import GroupStats
+
+
+class GroupStatsAccumulator:
+    """Running group statistics cube over every chunk seen so far."""
+
+    def __init__(self, protected_attribute: str, outcome_variable: str):
+        self.protected_attribute = protected_attribute
+        self.outcome_variable = outcome_variable
+        self.cube: Optional[GroupStats] = None
+
+    def update(self, df: pd.DataFrame) -> None:
+        self._add(GroupStats.from_frame(df, self.protected_attribute, self.outcome_variable))
+
+    def merge(self, other: "GroupStatsAccumulator") -> None:
+        if other.cube is not None:
+            self._add(other.cube)
+
+    def _add(self, cube: GroupStats) -> None:
+        self.cube = cube if self.cube is None else self.cube.merge(cube)
+
+    @property
+    def n_groups(self) -> int:
+        return 0 if self.cube is None else len(self.cube.totals)
+
+
+class EqualizedOddsAccumulator:
+    """
+    Per-group (actual, predicted) pair counts plus the observed label set.
+
+    Labels are resolved only at finalize time, so a chunk that happens to
+    contain only binary labels merges correctly with a later multiclass chunk.
+    """
+
+    def __init__(self, protected_attribute: str, actual_outcome: str, predicted_outcome: str):
+        self.protected_attribute = protected_attribute
+        self.actual_outcome = actual_outcome
+        self.predicted_outcome = predicted_outcome
+        self.sample_sizes: Dict[Any, int] = {}  # insertion order == first appearance
+        self.pairs: Counter = Counter()
+        self.observed: set = set()
+
+    def update(self, df: pd.DataFrame) -> None:
+        groups = df[self.protected_attribute]
+        codes, uniques = pd.factorize(groups, sort=False)
+        for group, size in zip(uniques, np.bincount(codes[codes >= 0], minlength=len(uniques))):
+            self.sample_sizes[group] = self.sample_sizes.get(group, 0) + int(size)
+
+        for col in (self.actual_outcome, self.predicted_outcome):
+            self.observed.update(v for v in pd.unique(df[col]) if not pd.isna(v))
+
+        cols = [self.protected_attribute, self.actual_outcome, self.predicted_outcome]
+        counts = df[cols].dropna().groupby(cols, sort=False).size()
+        self.pairs.update(dict(counts.items()))
+
+    def merge(self, other: "EqualizedOddsAccumulator") -> None:
+        for group, size in other.sample_sizes.items():
+            self.sample_sizes[group] = self.sample_sizes.get(group, 0) + size
+        self.pairs.update(other.pairs)
+        self.observed |= other.observed
+
+    @property
+    def n_groups(self) -> int:
+        return len(self.sample_sizes)
+
+    @property
+    def n_labels(self) -> int:
+        return len(self.observed)
+
+    def tensor(self):
+        """(groups, labels, tensor, sample_sizes) in the layout of confusion_tensor()."""
+        groups = list(self.sample_sizes)
+        if all(v == 0 or v == 1 for v in self.observed):
+            labels = [0, 1]
+            code = lambda v: 1 if v == 1 else 0
+        else:
+            try:
+                labels = sorted(self.observed)
+            except TypeError:
+                labels = list(self.observed)
+            index = pd.Index(labels)
+            code = lambda v: int(index.get_indexer([v])[0])
+
+        group_index = {g: i for i, g in enumerate(groups)}
+        tensor = np.zeros((len(groups), len(labels), len(labels)), dtype=np.int64)
+        for (group, actual, predicted), count in self.pairs.items():
+            tensor[group_index[group], code(actual), code(predicted)] += count
+        sample_sizes = np.array([self.sample_sizes[g] for g in groups], dtype=np.int64)
+        return groups, labels, tensor, sample_sizes
+
+    def finalize(self, threshold: float, previous_hash: Optional[str] = None) -> Dict[str, Any]:
+        if not self.sample_sizes:
+            return {"error": "No data provided for analysis"}
+        metrics = confusion_metrics_from_tensor(*self.tensor())
+        return equalized_odds_report(metrics, threshold, previous_hash)
+
+
+# Metrics derived from the merged group statistics cube, by batch analysis type name
+CUBE_METRICS = {
+    "disparate_impact": lambda cube, session: disparate_impact_report(cube.summary(), session.previous_hash),
+    "statistical": lambda cube, session: statistical_significance_report(cube.contingency(), n_rows=session.rows),
+    "statistical_parity": lambda cube, session: statistical_parity_report(cube.rate_series()),
+    "theil_index": lambda cube, session: theil_report(cube.rates),
+    "atkinson_index": lambda cube, session: atkinson_report(cube.rates, session.epsilon),
+}
+CONFUSION_METRICS = ("equalized_odds",)
+AUDIT_METRICS = tuple(CUBE_METRICS) + CONFUSION_METRICS
+
+
+class AuditSession:
+    """Accumulators for one chunked audit, guarded by a lock for concurrent chunk uploads."""
+
+    def __init__(
+        self,
+        protected_attribute: str,
+        outcome_variable: Optional[str] = None,
+        actual_outcome: Optional[str] = None,
+        predicted_outcome: Optional[str] = None,
+        threshold: float = 0.1,
+        previous_hash: Optional[str] = None,
+        metrics: Optional[List[str]] = None,
+        epsilon: float = 0.5,
+    ):
+        self.session_id = str(uuid.uuid4())
+        self.created_at = datetime.utcnow().isoformat()
+        self.protected_attribute = protected_attribute
+        self.outcome_variable = outcome_variable
+        self.actual_outcome = actual_outcome
+        self.predicted_outcome = predicted_outcome
+        self.threshold = threshold
+        self.epsilon = epsilon
+        self.previous_hash = previous_hash
+        if metrics is None:
+            metrics = []
+            if outcome_variable:
+                metrics.append("disparate_impact")
+            if actual_outcome and predicted_outcome:
+                metrics.append("equalized_odds")
+        self.metrics = list(metrics)
+        self.accumulators = self.new_accumulators()
+        self.rows = 0
+        self.chunks = 0
+        self.lock = threading.Lock()
+
+    def validate(self) -> Optional[Dict[str, Any]]:
+        """Error dict if the metric list cannot be computed from the configured columns."""
+        if not self.metrics:
+            return {"error": "Provide outcome_variable and/or both actual_outcome and predicted_outcome"}
+        unknown = [m for m in self.metrics if m not in AUDIT_METRICS]
+        if unknown:
+            return {"error": f"Unknown metric(s) {', '.join(unknown)}. Available: {', '.join(AUDIT_METRICS)}"}
+        if any(m in CUBE_METRICS for m in self.metrics) and not self.outcome_variable:
+            return {"error": "outcome_variable is required for group rate metrics"}
+        if "equalized_odds" in self.metrics and not (self.actual_outcome and self.predicted_outcome):
+            return {"error": "actual_outcome and predicted_outcome are required for equalized_odds"}
+        return None
+
+    @property
+    def columns(self) -> List[str]:
+        cols = [self.protected_attribute]
+        if "group_stats" in self.accumulators:
+            cols.append(self.outcome_variable)
+        if "equalized_odds" in self.accumulators:
+            cols += [self.actual_outcome, self.predicted_outcome]
+        return list(dict.fromkeys(cols))
+
+    def new_accumulators(self) -> Dict[str, Any]:
+        accumulators = {}
+        if any(m in CUBE_METRICS for m in self.metrics) and self.outcome_variable:
+            accumulators["group_stats"] = GroupStatsAccumulator(self.protected_attribute, self.outcome_variable)
+        if "equalized_odds" in self.metrics and self.actual_outcome and self.predicted_outcome:
+            accumulators["equalized_odds"] = EqualizedOddsAccumulator(
+                self.protected_attribute, self.actual_outcome, self.predicted_outcome
+            )
+        return accumulators
+
+    def partial(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Statistics for one chunk, computed without holding the session lock."""
+        accumulators = self.new_accumulators()
+        for acc in accumulators.values():
+            acc.update(df)
+        return accumulators
+
+    def merge(self, partial: Dict[str, Any], rows: int) -> None:
+        for name, acc in partial.items():
+            self.accumulators[name].merge(acc)
+        self.rows += rows
+        self.chunks += 1
+
+    def add(self, df: pd.DataFrame) -> None:
+        """Fold one chunk into the session (single writer, e.g. a file scan)."""
+        self.merge(self.partial(df), len(df))
+
+    @property
+    def n_groups(self) -> int:
+        return max(a.n_groups for a in self.accumulators.values())
+
+    @property
+    def n_labels(self) -> int:
+        odds = self.accumulators.get("equalized_odds")
+        return 0 if odds is None else odds.n_labels
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "created_at": self.created_at,
+            "metrics": self.metrics,
+            "rows_received": self.rows,
+            "chunks_received": self.chunks,
+            "groups": self.n_groups,
+        }
+
+    def _report(self, metric: str) -> Dict[str, Any]:
+        if metric == "equalized_odds":
+            return self.accumulators["equalized_odds"].finalize(self.threshold, self.previous_hash)
+        cube = self.accumulators["group_stats"].cube
+        if cube is None:
+            return {"error": "No data provided for analysis"}
+        try:
+            return CUBE_METRICS[metric](cube, self)
+        except Exception as e:
+            return {"error": f"Analysis failed: {str(e)}"}
+
+    def finalize(self) -> Dict[str, Any]:
+        results = {"session_id": self.session_id, "rows": self.rows, "chunks": self.chunks}
+        for metric in self.metrics:
+            results[metric] = self._report(metric)
+        return results
+
+
+# Open sessions live in-process, like the surrogate model cache; idle ones expire
+_SESSIONS = TTLCache(maxsize=MAX_AUDIT_SESSIONS, ttl=AUDIT_SESSION_TTL_SECONDS)
+_SESSIONS_LOCK = threading.Lock()
+
+
+def _get_session(session_id: str) -> Optional[AuditSession]:
+    with _SESSIONS_LOCK:
+        return _SESSIONS.get(session_id)
+
+
+def create_audit_session(
+    protected_attribute: str,
+    outcome_variable: Optional[str] = None,
+    actual_outcome: Optional[str] = None,
+    predicted_outcome: Optional[str] = None,
+    threshold: float = 0.1,
+    previous_hash: Optional[str] = None,
+    metrics: Optional[List[str]] = None,
+    epsilon: float = 0.5,
+) -> Dict[str, Any]:
+    session = AuditSession(
+        protected_attribute, outcome_variable, actual_outcome, predicted_outcome,
+        threshold, previous_hash, metrics, epsilon,
+    )
+    config_error = session.validate()
+    if config_error:
+        return config_error
+    with _SESSIONS_LOCK:
+        _SESSIONS[session.session_id] = session
+    return session.status()
+
+
+def add_audit_chunk(session_id: str, data: TabularData) -> Dict[str, Any]:
+    session = _get_session(session_id)
+    if session is None:
+        return {"error": f"Audit session '{session_id}' not found or expired"}
+    if data is None or len(data) == 0:
+        return {"error": "No data provided for analysis"}
+
+    size_error = validate_data_size(data)
+    if size_error:
+        return size_error
+
+    df = as_frame(data)
+    for col in session.columns:
+        if col not in df.columns:
+            return {"error": f"Column '{col}' not found"}
+
+    partial = session.partial(df)
+    with session.lock:
+        session.merge(partial, len(df))
+        if session.n_groups > MAX_SESSION_GROUPS:
+            with _SESSIONS_LOCK:
+                _SESSIONS.pop(session_id, None)
+            return {"error": f"Too many groups ({session.n_groups}). Maximum is {MAX_SESSION_GROUPS}; session discarded."}
+        if session.n_labels > MAX_CONFUSION_LABELS:
+            with _SESSIONS_LOCK:
+                _SESSIONS.pop(session_id, None)
+            return {"error": f"{confusion_label_error(session.n_labels)} Session discarded."}
+        return session.status()
+
+
+def finalize_audit_session(session_id: str) -> Dict[str, Any]:
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.pop(session_id, None)
+    if session is None:
+        return {"error": f"Audit session '{session_id}' not found or expired"}
+    with session.lock:
+        if session.rows == 0:
+            return {"error": "No data provided for analysis"}
+        return session.finalize()
+
+
+def _resolve_audit_path(path: str) -> Optional[str]:
+    """Absolute path of an audit file, or None if it escapes AUDIT_FILE_ROOT."""
+    resolved = os.path.realpath(path)
+    root = os.path.realpath(AUDIT_FILE_ROOT)
+    if os.path.commonpath([root, resolved]) != root:
+        return None
+    return resolved
+
+
+def audit_file(
+    path: str,
+    protected_attribute: str,
+    outcome_variable: Optional[str] = None,
+    actual_outcome: Optional[str] = None,
+    predicted_outcome: Optional[str] = None,
+    metrics: Optional[List[str]] = None,
+    threshold: float = 0.1,
+    epsilon: float = 0.5,
+    previous_hash: Optional[str] = None,
+    chunk_rows: int = FILE_AUDIT_CHUNK_ROWS,
+) -> Dict[str, Any]:
+    """
+    Fairness audit over a local CSV or Parquet file, streamed in chunks.
+
+    Memory is bounded by chunk_rows plus the per-group statistics; there is no
+    MAX_DATA_ROWS limit. metrics defaults to disparate_impact (with
+    outcome_variable) and/or equalized_odds (with actual/predicted outcomes);
+    statistical, statistical_parity, theil_index and atkinson_index are also
+    available. Each report matches what the single-request analysis returns
+    for the same rows (CSV group columns are read as text).
+
+    Only files under AUDIT_FILE_ROOT are read; without it, file audits are
+    refused rather than opening anything the worker can read.
+    """
+    if not AUDIT_FILE_ROOT:
+        return {"error": "File audits are disabled: set AUDIT_FILE_ROOT to the directory audited files are read from"}
+    resolved = _resolve_audit_path(path)
+    if resolved is None:
+        return {"error": f"File '{path}' is outside the permitted audit directory"}
+    if not os.path.isfile(resolved):
+        return {"error": f"File '{path}' not found"}
+    if file_format(resolved) is None:
+        return {"error": f"Unsupported file type for '{path}'. Use CSV or Parquet."}
+
+    session = AuditSession(
+        protected_attribute, outcome_variable, actual_outcome, predicted_outcome,
+        threshold, previous_hash, metrics, epsilon,
+    )
+    config_error = session.validate()
+    if config_error:
+        return config_error
+
+    try:
+        available = set(file_columns(resolved))
+    except (ColumnarDecodeError, ValueError, OSError) as e:
+        return {"error": f"Could not read '{path}': {str(e)}"}
+    for col in session.columns:
+        if col not in available:
+            return {"error": f"Column '{col}' not found"}
+
+    try:
+        for chunk in iter_file_chunks(resolved, session.columns, chunk_rows, categorical=[protected_attribute]):
+            session.add(chunk)
+            if session.n_groups > MAX_SESSION_GROUPS:
+                return {"error": f"Too many groups ({session.n_groups}). Maximum is {MAX_SESSION_GROUPS}."}
+            if session.n_labels > MAX_CONFUSION_LABELS:
+                return {"error": confusion_label_error(session.n_labels)}
+    except (ColumnarDecodeError, ValueError, OSError) as e:
+        return {"error": f"Could not read '{path}': {str(e)}"}
+
+    if session.rows == 0:
+        return {"error": "No data provided for analysis"}
+
+    result = session.finalize()
+    del result["session_id"]
+    result["file"] = path
+    return result
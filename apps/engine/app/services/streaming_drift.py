@@ -0,0 +1,392 @@
+"""
+Streaming Drift Monitoring
+Constant-memory PSI, Jensen-Shannon and KS drift over feature streams of
+any length (DriftMonitor and BaselineProfile need every value in memory).
+
+Each feature keeps a mergeable quantile sketch of its baseline and of its
+current stream, plus fixed-bin counts of the current stream over bins fixed
+from the baseline. Chunks are reduced to sketches without holding the
+stream lock and merged in, like chunked audit sessions, so memory per
+feature is O(k log(n / k)) sketch items and n_bins counters whatever the
+number of rows.
+
+Error bounds (reported with every result):
+- QuantileSketch is a hierarchy of compactors in the style of KLL: a full
+  level is sorted and every other item (random offset) is promoted with
+  twice the weight. A compaction at level h moves any rank by at most 2^h,
+  and the sketch adds these up, so its rank error bound is bookkeeping, not
+  an estimate; it is at most log2(n / k) / k of n, and 0 until the first
+  compaction.
+- KS: the statistic between two sketches is within the sum of their rank
+  error bounds of the exact two-sample statistic.
+- PSI / JS: current bin counts are exact. A streamed baseline's bin
+  probabilities come from its sketch at the bin edges, each within twice
+  its rank error bound; the reported bounds are the PSI/JS range over every
+  baseline within those limits. Seeding a stream from a registered
+  BaselineProfile makes the baseline histogram exact.
+
+As with BaselineProfile, bins span the baseline range and current values
+outside it fall into the outer bins.
+"""
+
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from cachetools import TTLCache
+
+from app.core.columnar import TabularData, as_frame
+from app.core.config import (
+    MAX_DATA_ROWS, MAX_FEATURES, DRIFT_SKETCH_K, MAX_DRIFT_STREAMS, DRIFT_STREAM_TTL_SECONDS
+)
+from app.services.drift_monitoring import (
+    equal_width_edges, feature_matrix, fixed_bin_counts, get_baseline_profile, ks_p_values
+)
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with a tracked worst-case rank error."""
+
+    def __init__(self, k: int = DRIFT_SKETCH_K, seed: Optional[int] = None):
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]  # items at level h carry weight 2^h
+        self.n = 0
+        self.rank_error = 0  # absolute bound on the rank error of any query
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        self.levels += [np.empty(0)] * (len(other.levels) - len(self.levels))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate((self.levels[h], items))
+        self.n += other.n
+        self.rank_error += other.rank_error
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) >= self.k:
+                items = np.sort(items)
+                held = len(items) % 2  # an odd item out stays at this level
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                promoted = items[self._rng.integers(2):len(items) - held:2]
+                self.levels[h + 1] = np.concatenate((self.levels[h + 1], promoted))
+                self.levels[h] = items[len(items) - held:]
+                self.rank_error += 2 ** h
+            h += 1
+
+    def _weighted(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** h, dtype=np.int64) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def rank(self, x: np.ndarray, side: str = "right") -> np.ndarray:
+        """Estimated number of values <= x (side="right") or < x (side="left")."""
+        values, cumulative = self._weighted()
+        idx = np.searchsorted(values, x, side=side)
+        return np.where(idx > 0, cumulative[np.maximum(idx - 1, 0)], 0)
+
+    def cdf(self, x: np.ndarray, side: str = "right") -> np.ndarray:
+        return self.rank(x, side) / self.n
+
+    @property
+    def epsilon(self) -> float:
+        """Rank error bound as a fraction of n."""
+        return self.rank_error / self.n if self.n else 0.0
+
+    @property
+    def size(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+
+def _sketch_ks(baseline: QuantileSketch, current: QuantileSketch) -> float:
+    """KS statistic between two sketches; both CDFs only step at retained items."""
+    points = np.concatenate(baseline.levels + current.levels)
+    return float(np.abs(baseline.cdf(points) - current.cdf(points)).max())
+
+
+def _psi_terms(expected: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    e = np.where(expected == 0, 0.0001, expected)
+    a = np.where(actual == 0, 0.0001, actual)
+    return (a - e) * np.log(a / e)
+
+
+def _js_terms(expected: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    """Per-bin terms of the base-2 Jensen-Shannon divergence (the square of scipy's distance)."""
+    m = (expected + actual) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        left = np.where(expected > 0, expected * np.log2(expected / m), 0.0)
+        right = np.where(actual > 0, actual * np.log2(actual / m), 0.0)
+    return (left + right) / 2
+
+
+def _bounded(terms, expected: np.ndarray, error: np.ndarray, actual: np.ndarray):
+    """
+    Sum of per-bin terms and its range over baselines within error of
+    expected in every bin. Both PSI and JS terms are convex in the baseline
+    probability with their minimum (0) where it equals the current one, so
+    per bin the maximum is at an end of the interval and the minimum is 0
+    when the interval contains the current probability.
+    """
+    lo = np.clip(expected - error, 0.0, 1.0)
+    hi = np.clip(expected + error, 0.0, 1.0)
+    at_lo, at_hi = terms(lo, actual), terms(hi, actual)
+    floor = 0.0001
+    contains = (np.maximum(lo, floor) <= np.maximum(actual, floor)) & (np.maximum(actual, floor) <= np.maximum(hi, floor))
+    lower = np.where(contains, 0.0, np.minimum(at_lo, at_hi)).sum(axis=-1)
+    upper = np.maximum(at_lo, at_hi).sum(axis=-1)
+    return terms(expected, actual).sum(axis=-1), lower, upper
+
+
+class DriftStream:
+    """Baseline and current sketches for a set of features, guarded by a lock for concurrent chunk uploads."""
+
+    def __init__(self, features: List[str], n_bins: int = 10, sketch_k: int = DRIFT_SKETCH_K,
+                 profile=None):
+        self.stream_id = str(uuid.uuid4())
+        self.created_at = datetime.utcnow().isoformat()
+        self.features = list(features)
+        self.n_bins = n_bins
+        self.sketch_k = sketch_k
+        self.profile_id = profile.profile_id if profile is not None else None
+        self.baseline = [QuantileSketch(sketch_k) for _ in self.features]
+        self.edges = None
+        self.baseline_percents = None
+        self.bin_error = np.zeros(len(self.features))
+        self.baseline_rows = 0
+        self.lock = threading.Lock()
+        if profile is not None:
+            columns = [profile.features.index(f) for f in self.features]
+            for sketch, i in zip(self.baseline, columns):
+                sketch.update(profile.sorted[:profile.counts[i], i])
+            self.baseline_rows = profile.rows
+            self.n_bins = profile.n_bins
+            self.edges = profile.edges[columns]
+            self.baseline_percents = profile.percents[columns]
+        self.reset_window()
+
+    def reset_window(self) -> None:
+        self.current = [QuantileSketch(self.sketch_k) for _ in self.features]
+        self.current_counts = np.zeros((len(self.features), self.n_bins))
+        self.current_rows = 0
+        self.window_started_at = datetime.utcnow().isoformat()
+
+    @property
+    def frozen(self) -> bool:
+        """The baseline is fixed once current data arrives (or when seeded from a profile)."""
+        return self.edges is not None
+
+    def freeze(self) -> Optional[Dict[str, Any]]:
+        """Fix the bins over the baseline range and the baseline histogram from its sketches."""
+        if self.frozen:
+            return None
+        empty = [f for f, sketch in zip(self.features, self.baseline) if sketch.n == 0]
+        if empty:
+            return {"error": f"No baseline values for feature(s): {', '.join(empty)}"}
+        first = np.array([sketch.min for sketch in self.baseline])
+        last = np.array([sketch.max for sketch in self.baseline])
+        edges = equal_width_edges(first, last, self.n_bins)
+        percents = np.empty((len(self.features), self.n_bins))
+        for i, sketch in enumerate(self.baseline):
+            # Bins are [e_j, e_j+1) except the last, as in np.histogram
+            below = np.concatenate(([0], sketch.rank(edges[i, 1:-1], side="left"), [sketch.n]))
+            percents[i] = np.diff(below) / sketch.n
+        self.bin_error = np.array([2 * sketch.epsilon for sketch in self.baseline])
+        self.baseline_percents = percents
+        self.edges = edges
+        return None
+
+    def sketch_chunk(self, values: np.ndarray) -> List[QuantileSketch]:
+        """Per-feature sketches of one chunk, computed without holding the stream lock."""
+        sketches = [QuantileSketch(self.sketch_k) for _ in self.features]
+        for i, sketch in enumerate(sketches):
+            sketch.update(values[:, i])
+        return sketches
+
+    def add_baseline(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        values = feature_matrix(df, self.features)
+        sketches = self.sketch_chunk(values)
+        with self.lock:
+            if self.frozen:
+                return {"error": "Baseline is fixed once current data has been added"}
+            for sketch, partial in zip(self.baseline, sketches):
+                sketch.merge(partial)
+            self.baseline_rows += len(df)
+        return None
+
+    def add_current(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            error = self.freeze()
+        if error:
+            return error
+        values = feature_matrix(df, self.features)
+        sketches = self.sketch_chunk(values)
+        counts = fixed_bin_counts(values, self.edges)
+        with self.lock:
+            for sketch, partial in zip(self.current, sketches):
+                sketch.merge(partial)
+            self.current_counts += counts
+            self.current_rows += len(df)
+        return None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "stream_id": self.stream_id,
+            "created_at": self.created_at,
+            "features": self.features,
+            "n_bins": self.n_bins,
+            "sketch_k": self.sketch_k,
+            "profile_id": self.profile_id,
+            "baseline_fixed": self.frozen,
+            "baseline_rows": self.baseline_rows,
+            "current_rows": self.current_rows,
+            "window_started_at": self.window_started_at,
+            "sketch_items": sum(s.size for s in self.baseline + self.current),
+        }
+
+    def report(self) -> Dict[str, Any]:
+        n_current = np.array([sketch.n for sketch in self.current])
+        observed = n_current > 0
+        actual = self.current_counts / np.maximum(n_current, 1)[:, None]
+        error = self.bin_error[:, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            psi, psi_lo, psi_hi = _bounded(_psi_terms, self.baseline_percents, error, actual)
+            js, js_lo, js_hi = _bounded(_js_terms, self.baseline_percents, error, actual)
+        ks = np.array([_sketch_ks(b, c) if c.n else 0.0 for b, c in zip(self.baseline, self.current)])
+        ks_error = np.array([b.epsilon + c.epsilon for b, c in zip(self.baseline, self.current)])
+        p_values = ks_p_values(ks, np.array([s.n for s in self.baseline]), np.maximum(n_current, 1))
+
+        results, drifted = [], []
+        for i, name in enumerate(self.features):
+            if not observed[i]:
+                continue
+            psi_status = "CRITICAL_DRIFT" if psi[i] >= 0.25 else ("WARNING_DRIFT" if psi[i] >= 0.1 else "STABLE")
+            stable = psi_status == "STABLE" and p_values[i] > 0.05
+            results.append({
+                "feature": name,
+                "psi": {"metric": "PSI", "value": round(float(psi[i]), 4), "status": psi_status,
+                        "bounds": [round(float(psi_lo[i]), 4), round(float(psi_hi[i]), 4)]},
+                "js_divergence": {"metric": "JS Divergence", "value": round(float(js[i]), 4),
+                                  "status": "STABLE" if js[i] < 0.1 else "SHIFTED",
+                                  "bounds": [round(float(js_lo[i]), 4), round(float(js_hi[i]), 4)]},
+                "ks_test": {"statistic": round(float(ks[i]), 4), "error_bound": round(float(ks_error[i]), 4),
+                            "p_value": round(float(p_values[i]), 4), "significant": bool(p_values[i] < 0.05)},
+                "baseline_rank_error": round(float(self.baseline[i].epsilon), 6),
+                "current_rank_error": round(float(self.current[i].epsilon), 6),
+                "status": "STABLE" if stable else "DRIFT_DETECTED",
+            })
+            if not stable:
+                drifted.append(name)
+
+        return {
+            **self.status(),
+            "features": results,
+            "drifted_features": drifted,
+            "features_skipped": [f for f, seen in zip(self.features, observed) if not seen],
+            "status": "DRIFT_DETECTED" if drifted else "STABLE",
+        }
+
+
+# Open streams live in-process, like chunked audit sessions; idle ones expire
+_STREAMS = TTLCache(maxsize=MAX_DRIFT_STREAMS, ttl=DRIFT_STREAM_TTL_SECONDS)
+_STREAMS_LOCK = threading.Lock()
+
+
+def _get_stream(stream_id: str) -> Optional[DriftStream]:
+    with _STREAMS_LOCK:
+        return _STREAMS.get(stream_id)
+
+
+def create_drift_stream(features: Optional[List[str]] = None, n_bins: int = 10, sketch_k: int = DRIFT_SKETCH_K,
+                        profile_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Open a drift stream. With profile_id the baseline (and n_bins) come from
+    a registered BaselineProfile; otherwise push baseline chunks first.
+    """
+    profile = None
+    if profile_id is not None:
+        profile = get_baseline_profile(profile_id)
+        if profile is None:
+            return {"error": f"Baseline profile '{profile_id}' not found or expired"}
+        features = profile.features if features is None else features
+        unknown = [f for f in features if f not in profile.features]
+        if unknown:
+            return {"error": f"Feature(s) not in baseline profile: {', '.join(unknown)}"}
+    if not features:
+        return {"error": "Provide the features to monitor"}
+    features = list(dict.fromkeys(features))
+    if len(features) > MAX_FEATURES:
+        return {"error": f"Too many features ({len(features)}). Maximum is {MAX_FEATURES}."}
+
+    stream = DriftStream(features, n_bins, sketch_k, profile)
+    with _STREAMS_LOCK:
+        _STREAMS[stream.stream_id] = stream
+    return stream.status()
+
+
+def _add_chunk(stream_id: str, data: TabularData, target: str) -> Dict[str, Any]:
+    stream = _get_stream(stream_id)
+    if stream is None:
+        return {"error": f"Drift stream '{stream_id}' not found or expired"}
+    if data is None or len(data) == 0:
+        return {"error": "No data provided for analysis"}
+    if len(data) > MAX_DATA_ROWS:
+        return {"error": f"Data too large ({len(data)} rows). Maximum is {MAX_DATA_ROWS}."}
+
+    df = as_frame(data)
+    missing = [f for f in stream.features if f not in df.columns]
+    if missing:
+        return {"error": f"Feature(s) not found in data: {', '.join(missing)}"}
+    error = stream.add_baseline(df) if target == "baseline" else stream.add_current(df)
+    return error or stream.status()
+
+
+def add_drift_baseline(stream_id: str, data: TabularData) -> Dict[str, Any]:
+    return _add_chunk(stream_id, data, "baseline")
+
+
+def add_drift_current(stream_id: str, data: TabularData) -> Dict[str, Any]:
+    return _add_chunk(stream_id, data, "current")
+
+
+def drift_stream_report(stream_id: str, reset_window: bool = False) -> Dict[str, Any]:
+    """Approximate drift of the current window against the baseline; optionally start a new window."""
+    stream = _get_stream(stream_id)
+    if stream is None:
+        return {"error": f"Drift stream '{stream_id}' not found or expired"}
+    with stream.lock:
+        if stream.current_rows == 0:
+            return {"error": "No current data in this window"}
+        result = stream.report()
+        if reset_window:
+            stream.reset_window()
+    return result
+
+
+def close_drift_stream(stream_id: str) -> Dict[str, Any]:
+    with _STREAMS_LOCK:
+        stream = _STREAMS.pop(stream_id, None)
+    if stream is None:
+        return {"error": f"Drift stream '{stream_id}' not found or expired"}
+    return {"stream_id": stream_id, "closed": True}
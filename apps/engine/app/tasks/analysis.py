@@ -3,11 +3,15 @@ from app.services.bias_analysis import (
     analyze_disparate_impact, analyze_equalized_odds, analyze_intersectional
 )
 from app.services.explainability import explain_from_data
-from app.core.signing import sign_data
+from app.services.streaming_audit import audit_file
 from app.core.telemetry import track_resource_usage
+from app.core.config import MULTIVARIATE_DRIFT_MAX_SAMPLES, MULTIVARIATE_DRIFT_TIME_BUDGET_SECONDS, MMD_PERMUTATIONS
 import logging
 
 from app.services.drift_monitoring import analyze_drift
+from app.services.drift_monitors import run_drift_monitors
+from app.services.multivariate_drift import analyze_multivariate_drift
+from app.services.merkle_log import get_merkle_log, seal_merkle_batch, sign_audit_hash
 
 logger = logging.getLogger("aic.tasks")
 
@@ -25,32 +29,74 @@ def task_drift(self, baseline_data, current_data, feature_name, n_bins=10):
         logger.error(f"Drift task failed: {str(e)}")
         raise self.retry(exc=e, countdown=5)
 
+@celery_app.task(name="analysis.drift_monitors", bind=True, max_retries=3)
+def task_drift_monitors(self, system_id=None):
+    """Scheduled by Celery beat: evaluates each drift monitor's newly arrived window."""
+    try:
+        with track_resource_usage() as usage:
+            result = run_drift_monitors(system_id)
+            result["resource_usage"] = usage
+            return {"status": "success", "data": result}
+    except Exception as e:
+        logger.error(f"Drift monitor run failed: {str(e)}")
+        raise self.retry(exc=e, countdown=5)
+
+@celery_app.task(name="analysis.multivariate_drift", bind=True, max_retries=3)
+def task_multivariate_drift(self, baseline_data, current_data, features=None, methods=None,
+                            max_samples=MULTIVARIATE_DRIFT_MAX_SAMPLES,
+                            time_budget_seconds=MULTIVARIATE_DRIFT_TIME_BUDGET_SECONDS,
+                            n_permutations=MMD_PERMUTATIONS, random_state=0):
+    try:
+        with track_resource_usage() as usage:
+            result = analyze_multivariate_drift(baseline_data, current_data, features, methods, max_samples,
+                                                time_budget_seconds, n_permutations, random_state)
+            if "error" in result:
+                return {"status": "error", "message": result["error"]}
+
+            result["resource_usage"] = usage
+            return {"status": "success", "data": result}
+    except Exception as e:
+        logger.error(f"Multivariate drift task failed: {str(e)}")
+        raise self.retry(exc=e, countdown=5)
+
+@celery_app.task(name="analysis.merkle_seal")
+def task_merkle_seal():
+    """Scheduled by Celery beat: signs the open Merkle batch so no record waits longer than a window."""
+    if get_merkle_log().due():
+        return seal_merkle_batch()
+    return {"tree_head": None}
+
 @celery_app.task(name="analysis.disparate_impact", bind=True, max_retries=3)
-def task_disparate_impact(self, data, protected_attribute, outcome_variable, previous_hash=None):
+def task_disparate_impact(self, data, protected_attribute, outcome_variable, previous_hash=None,
+                          confidence_interval=None, confidence_level=0.95, n_bootstrap=10_000, random_state=0):
     try:
         logger.info(f"Starting Disparate Impact task for {protected_attribute}")
         with track_resource_usage() as usage:
-            result = analyze_disparate_impact(data, protected_attribute, outcome_variable, previous_hash)
+            result = analyze_disparate_impact(
+                data, protected_attribute, outcome_variable, previous_hash,
+                confidence_interval=confidence_interval, confidence_level=confidence_level,
+                n_bootstrap=n_bootstrap, random_state=random_state,
+            )
             if "error" in result:
                 return {"status": "error", "message": result["error"]}
             
             result["resource_usage"] = usage
-            result["signature"] = sign_data(result["audit_hash"])
+            result.update(sign_audit_hash(result["audit_hash"]))
             return {"status": "success", "data": result}
     except Exception as e:
         logger.error(f"Task failed: {str(e)}")
         raise self.retry(exc=e, countdown=5)
 
 @celery_app.task(name="analysis.equalized_odds", bind=True, max_retries=3)
-def task_equalized_odds(self, data, protected_attribute, actual_outcome, predicted_outcome, threshold=0.1, previous_hash=None):
+def task_equalized_odds(self, data, protected_attribute, actual_outcome, predicted_outcome, threshold=0.1, previous_hash=None, include_matrix=False):
     try:
         with track_resource_usage() as usage:
-            result = analyze_equalized_odds(data, protected_attribute, actual_outcome, predicted_outcome, threshold, previous_hash)
+            result = analyze_equalized_odds(data, protected_attribute, actual_outcome, predicted_outcome, threshold, previous_hash, include_matrix)
             if "error" in result:
                 return {"status": "error", "message": result["error"]}
             
             result["resource_usage"] = usage
-            result["signature"] = sign_data(result["audit_hash"])
+            result.update(sign_audit_hash(result["audit_hash"]))
             return {"status": "success", "data": result}
     except Exception as e:
         raise self.retry(exc=e, countdown=5)
@@ -64,9 +110,32 @@ def task_intersectional(self, data, protected_attributes, outcome_variable, min_
                 return {"status": "error", "message": result["error"]}
             
             result["resource_usage"] = usage
-            result["signature"] = sign_data(result["audit_hash"])
+            result.update(sign_audit_hash(result["audit_hash"]))
+            return {"status": "success", "data": result}
+    except Exception as e:
+        raise self.retry(exc=e, countdown=5)
+
+@celery_app.task(name="analysis.file_audit", bind=True, max_retries=3, time_limit=3600)
+def task_file_audit(self, path, protected_attribute, outcome_variable=None, actual_outcome=None,
+                    predicted_outcome=None, metrics=None, threshold=0.1, epsilon=0.5, previous_hash=None):
+    """Out-of-core audit of a CSV/Parquet decision log on the worker's local disk."""
+    try:
+        logger.info(f"Starting file audit of {path} for {protected_attribute}")
+        with track_resource_usage() as usage:
+            result = audit_file(
+                path, protected_attribute, outcome_variable, actual_outcome, predicted_outcome,
+                metrics, threshold, epsilon, previous_hash
+            )
+            if "error" in result:
+                return {"status": "error", "message": result["error"]}
+
+            for report in result.values():
+                if isinstance(report, dict) and "audit_hash" in report:
+                    report.update(sign_audit_hash(report["audit_hash"]))
+            result["resource_usage"] = usage
             return {"status": "success", "data": result}
     except Exception as e:
+        logger.error(f"File audit task failed: {str(e)}")
         raise self.retry(exc=e, countdown=5)
 
 @celery_app.task(name="analysis.explain", bind=True, max_retries=2)
@@ -82,7 +151,7 @@ def task_explain(self, data, target_column, instance, method="shap", num_feature
             result["resource_usage"] = usage
             # Sign the result for the audit trail
             if "audit_hash" in result:
-                result["signature"] = sign_data(result["audit_hash"])
+                result.update(sign_audit_hash(result["audit_hash"]))
                 
             return {"status": "success", "data": result}
     except Exception as e:
@@ -273,6 +273,83 @@ class TestDisclosureEndpoint:
         assert "status" in data
 
 
+class TestEvidenceStreamEndpoint:
+    """Tests for /api/v1/audit/verify-document/stream endpoint"""
+
+    def test_stream_matches_document_endpoint(self, client):
+        text = "Decisions are subject to human review and may be appealed. Data is anonymized."
+        whole = client.post("/api/v1/audit/verify-document", json={"text": text}).json()
+        response = client.post(
+            "/api/v1/audit/verify-document/stream",
+            content=(text[i:i + 8].encode() for i in range(0, len(text), 8)),
+            headers={"Content-Type": "text/plain"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data.pop("bytes_received") == len(text)
+        assert data == whole
+
+    def test_stream_is_not_limited_by_body_size(self, client, monkeypatch):
+        import app.main
+        monkeypatch.setattr(app.main, "MAX_BODY_SIZE", 64)
+        text = "filler " * 100 + "manual override"
+        assert client.post("/api/v1/audit/verify-document", json={"text": text}).status_code == 413
+        response = client.post("/api/v1/audit/verify-document/stream", content=text.encode())
+
+        assert response.status_code == 200
+        assert response.json()["categories"]["human_intervention"]["status"] == "FOUND"
+
+
+class TestChainVerifyStreamEndpoint:
+    """Tests for /api/v1/audit-trail/verify/stream endpoint"""
+
+    def test_streams_broken_links_then_summary(self, client, monkeypatch):
+        import json
+        import app.main
+        from app.services.hash_chain import HashChain
+        monkeypatch.setattr(app.main, "MAX_BODY_SIZE", 64)
+        records, previous = [], None
+        for i in range(20):
+            records.append(HashChain.create_audit_record({"i": i}, previous, sequence_number=i))
+            previous = records[-1]["chain_hash"]
+        records[5]["data"]["i"] = -1
+        body = "".join(json.dumps(r) + "\n" for r in records).encode()
+
+        response = client.post("/api/v1/audit-trail/verify/stream",
+                               content=(body[i:i + 500] for i in range(0, len(body), 500)),
+                               headers={"Content-Type": "application/x-ndjson"})
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [(line["type"], line.get("record_index")) for line in lines] == [("broken_link", 5), ("summary", None)]
+        assert lines[-1]["records_checked"] == 20
+        assert lines[-1]["valid"] is False
+
+
+class TestEvidenceIndexEndpoints:
+    """Tests for /api/v1/audit/evidence endpoints"""
+
+    def test_index_then_query_coverage(self, client):
+        response = client.post(
+            "/api/v1/audit/evidence/index",
+            json={"organization_id": "api-test-org", "documents": {"policy": "Applicants may appeal any decision."}}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["documents_in_index"] == 1
+        coverage = client.post("/api/v1/audit/evidence/coverage", json={"organization_id": "api-test-org"}).json()
+        assert coverage["categories"]["recourse_mechanism"]["documents_covered"] == 1
+        occurrences = client.get(
+            "/api/v1/audit/evidence/occurrences", params={"organization_id": "api-test-org", "marker": "appeal"}
+        ).json()
+        assert occurrences["documents"] == {"policy": [15]}
+
+    def test_coverage_without_documents_rejected(self, client):
+        response = client.post("/api/v1/audit/evidence/coverage", json={"organization_id": "unknown-org"})
+
+        assert response.status_code == 400
+
+
 class TestComprehensiveAuditEndpoint:
     """Tests for /api/v1/audit/comprehensive endpoint"""
 
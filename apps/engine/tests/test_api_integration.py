@@ -119,6 +119,25 @@ class TestDriftEndpoint:
         assert "ks_test" in data
         assert data["feature"] == "income"
 
+    def test_baseline_profile_roundtrip(self):
+        import numpy as np
+        rng = np.random.default_rng(0)
+        baseline = [{"income": float(x), "age": float(a)}
+                    for x, a in zip(rng.normal(0, 1, 200), rng.integers(18, 80, 200))]
+        response = client.post("/api/v1/analyze/drift/profiles", json={"data": baseline, "n_bins": 8})
+        assert response.status_code == 200
+        profile_id = response.json()["profile_id"]
+        assert client.get(f"/api/v1/analyze/drift/profiles/{profile_id}").json()["features"] == ["income", "age"]
+
+        current = [{"income": row["income"] + 3, "age": row["age"]} for row in baseline]
+        response = client.post(f"/api/v1/analyze/drift/profiles/{profile_id}/compare", json={"data": current})
+        assert response.status_code == 200
+        assert response.json()["drifted_features"] == ["income"]
+
+        assert client.delete(f"/api/v1/analyze/drift/profiles/{profile_id}").status_code == 200
+        response = client.post(f"/api/v1/analyze/drift/profiles/{profile_id}/compare", json={"data": current})
+        assert response.status_code == 400
+
 
 class TestExplainEndpoint:
 
@@ -241,6 +260,15 @@ class TestPrivacyAuditEndpoint:
         assert data["compliance_status"] == "PASS"
 
 
+    def test_value_level_detection(self):
+        payload = {"data": [{"notes": "diagnosed with hypertension", "id": i} for i in range(20)]}
+        response = client.post("/api/v1/audit/privacy/values", json=payload)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["compliance_status"] == "FAIL"
+        assert data["spi_detected"][0]["field"] == "notes"
+
+
 class TestLaborAuditEndpoint:
 
     def test_healthy_agency(self):
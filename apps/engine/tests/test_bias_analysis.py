@@ -11,12 +11,15 @@ from app.services.bias_analysis import (
     analyze_statistical_significance,
     explain_decision,
     analyze_empathy,
+    analyze_empathy_batch,
     validate_correction_process,
     analyze_ai_disclosure,
+    analyze_ai_disclosure_batch,
     comprehensive_audit,
     assess_organization,
     generate_audit_hash,
     calculate_confusion_metrics,
+    confusion_tensor,
 )
 from app.api.v1.schemas.analysis import FrameworkType
 
@@ -160,6 +163,62 @@ class TestEqualizedOdds:
         )
         assert result["tpr_parity"] is True
 
+    def test_confusion_tensor_counts(self):
+        import pandas as pd
+        groups, labels, tensor, sizes = confusion_tensor(
+            pd.DataFrame(make_equalized_odds_data()), "actual", "predicted", "group"
+        )
+        assert labels == [0, 1]
+        a = list(groups).index("A")
+        # Group A: tn=2, fp=0, fn=1, tp=2
+        assert tensor[a].tolist() == [[2, 0], [1, 2]]
+        assert sizes[a] == 5
+
+    def test_missing_group_rows_are_left_out(self):
+        data = make_equalized_odds_data()
+        with_missing = data + [{"group": None, "actual": 1, "predicted": 0}] * 3
+        result = analyze_equalized_odds(with_missing, "group", "actual", "predicted", 0.1)
+        assert set(result["detailed_analysis"]) == {"A", "B"}
+        assert result == analyze_equalized_odds(data, "group", "actual", "predicted", 0.1)
+
+    def test_binary_confusion_matrix_keys(self):
+        import pandas as pd
+        metrics = calculate_confusion_metrics(
+            pd.DataFrame(make_equalized_odds_data()), "actual", "predicted", "group"
+        )
+        assert metrics["B"]["confusion_matrix"] == {"tp": 1, "tn": 1, "fp": 1, "fn": 2}
+        assert metrics["B"]["true_positive_rate"] == 0.3333
+
+    def test_multiclass_labels(self):
+        data = [
+            {"group": "A", "actual": "low", "predicted": "low"},
+            {"group": "A", "actual": "mid", "predicted": "mid"},
+            {"group": "A", "actual": "high", "predicted": "high"},
+            {"group": "B", "actual": "low", "predicted": "mid"},
+            {"group": "B", "actual": "mid", "predicted": "mid"},
+            {"group": "B", "actual": "high", "predicted": "low"},
+        ]
+        result = analyze_equalized_odds(data, "group", "actual", "predicted", 0.1)
+        assert "per_class_differences" in result
+        assert set(result["per_class_differences"]) == {"high", "low", "mid"}
+        assert result["detailed_analysis"]["A"]["per_class"]["mid"]["true_positive_rate"] == 1.0
+        # Group B never predicts "high" correctly: worst-class TPR gap is 1.0
+        assert result["tpr_difference"] == 1.0
+        assert result["overall_status"] == "FAIL"
+        assert "confusion_matrix" not in result["detailed_analysis"]["A"]
+
+        with_matrix = analyze_equalized_odds(data, "group", "actual", "predicted", 0.1, include_matrix=True)
+        assert with_matrix["detailed_analysis"]["B"]["confusion_matrix"] == {
+            "labels": ["high", "low", "mid"], "matrix": [[0, 1, 0], [0, 0, 1], [0, 0, 1]]
+        }
+
+    def test_float_predicted_scores_rejected(self):
+        """A raw score column is not a label set: reject instead of one class per score."""
+        data = [{"group": "AB"[i % 2], "actual": i % 2, "predicted": i / 1000} for i in range(1000)]
+        result = analyze_equalized_odds(data, "group", "actual", "predicted", 0.1)
+        assert "error" in result
+        assert "Too many distinct outcome labels" in result["error"]
+
 
 # ============================================================
 # Intersectional Analysis Tests
@@ -206,6 +265,28 @@ class TestStatisticalSignificance:
         assert "effect_size" in result
         assert result["effect_size"]["cramers_v"] > 0
 
+    def test_default_method_is_chi_square(self):
+        result = analyze_statistical_significance(make_biased_data(), "gender", "hired")
+        assert result["methodology"] == "Chi-Square Test for Independence"
+        assert "permutation" not in result
+
+    def test_permutation_mode(self):
+        result = analyze_statistical_significance(
+            make_biased_data(), "gender", "hired", method="permutation", n_permutations=2000
+        )
+        assert result["methodology"].startswith("Monte Carlo Permutation Test")
+        assert result["permutation"]["permutations"] == 2000
+        assert result["is_significant"] == True
+
+    def test_exact_mode(self):
+        result = analyze_statistical_significance(make_biased_data(), "gender", "hired", method="exact")
+        assert result["methodology"] == "Fisher's Exact Test"
+        assert "odds_ratio" in result
+
+    def test_unknown_method_returns_error(self):
+        result = analyze_statistical_significance(make_biased_data(), "gender", "hired", method="bayes")
+        assert "error" in result
+
 
 # ============================================================
 # Empathy Analysis Tests
@@ -233,6 +314,33 @@ class TestEmpathyAnalysis:
         assert 0 <= result["empathy_score"] <= 100
 
 
+class TestEmpathyBatch:
+
+    TEXTS = [
+        "Your application has been denied. You are ineligible and cannot reapply.",
+        "We appreciate your effort and understand this is hard. Thank you; we can help with alternative options.",
+        "Your request will not be processed. Please review the next steps or appeal.",
+        "Your application has been denied. You are ineligible and cannot reapply.",
+        "",
+    ]
+
+    def test_matches_single_text_path(self):
+        for context in ("rejection", "notification"):
+            batch = analyze_empathy_batch(self.TEXTS, context)
+            assert batch["results"] == [analyze_empathy(text, context) for text in self.TEXTS]
+
+    def test_summary_and_duplicates(self):
+        batch = analyze_empathy_batch(self.TEXTS, "rejection")
+        assert batch["texts_analyzed"] == 5
+        assert batch["distinct_texts"] == 4
+        assert sum(batch["summary"]["status_counts"].values()) == 5
+
+    def test_api_batch(self, client):
+        response = client.post("/api/v1/analyze/empathy/batch", json={"texts": self.TEXTS[:2]})
+        assert response.status_code == 200
+        assert [r["status"] for r in response.json()["results"]] == ["FAIL", "PASS"]
+
+
 # ============================================================
 # Correction Process Tests
 # ============================================================
@@ -294,6 +402,51 @@ class TestAIDisclosure:
         assert result["status"] == "DECEPTIVE"
         assert result["disclosure_score"] == 0
 
+    def test_chatting_with_bot_does_not_hide_later_phrases(self):
+        result = analyze_ai_disclosure("You are chatting with Sam, my name is Sam and I am no bot.", "chatbot")
+        assert result["status"] == "DECEPTIVE"
+        assert result["findings"]["clear_disclosure"] is True
+
+
+class TestAIDisclosureBatch:
+
+    TEXTS = [
+        "This is an AI assistant here to help you.",
+        "Hello, how can I help you today?",
+        "I am a human agent speaking from experience.",
+        "Recommendations by our algorithm",
+        "Hello, how can I help you today?",
+    ]
+
+    def test_matches_single_text_path(self):
+        batch = analyze_ai_disclosure_batch(self.TEXTS, "web")
+        for text, result in zip(self.TEXTS, batch["results"]):
+            single = analyze_ai_disclosure(text, "web")
+            for key in ("disclosure_score", "status", "compliance_level", "findings"):
+                assert result[key] == single[key]
+
+    def test_summary(self):
+        batch = analyze_ai_disclosure_batch(self.TEXTS, "web")
+        assert batch["distinct_texts"] == 4
+        assert batch["status_counts"] == {
+            "DECEPTIVE": 1, "FULLY_DISCLOSED": 1, "PARTIALLY_DISCLOSED": 1, "NOT_DISCLOSED": 2,
+        }
+        assert batch["flagged_indices"] == [1, 2, 4]
+
+    def test_api_batch(self, client):
+        response = client.post("/api/v1/analyze/disclosure/batch", json={"texts": self.TEXTS})
+        assert response.status_code == 200
+        assert response.json()["texts_analyzed"] == 5
+
+    def test_batch_routes_share_single_endpoint_default(self, client):
+        single = client.post("/api/v1/analyze/disclosure", json={"interface_text": self.TEXTS[0]}).json()
+        batch = client.post("/api/v1/analyze/disclosure/batch", json={"texts": self.TEXTS[:1]}).json()
+        shared = client.post("/api/v1/analyze/batch", json={
+            "analyses": [{"type": "disclosure_batch", "params": {"texts": self.TEXTS[:1]}}],
+        }).json()["results"][0]["result"]
+        assert batch["interaction_type"] == shared["interaction_type"] == "chatbot"
+        assert batch["recommendation"] == shared["recommendation"] == single["recommendation"]
+
 
 # ============================================================
 # Decision Explanation Tests
@@ -383,6 +536,21 @@ class TestComprehensiveAudit:
         result = comprehensive_audit("X", [{"name": "A"}], FrameworkType.EU_AI_ACT)
         assert "EU" in result["framework_note"] or "conformity" in result["framework_note"]
 
+    def test_process_pool_matches_sequential(self):
+        systems = [
+            {"name": f"System {i}", "data": make_biased_data() if i % 2 else make_fair_data(),
+             "protected_attribute": "gender", "outcome_variable": "hired",
+             "model_type": "credit_scoring", "interface_text": "Welcome!" if i % 3 else "This is an AI assistant."}
+            for i in range(10)
+        ]
+        sequential = comprehensive_audit("TestCorp", systems, FrameworkType.POPIA, n_jobs=1)
+        parallel = comprehensive_audit("TestCorp", systems, FrameworkType.POPIA, n_jobs=2)
+        for report in (sequential, parallel):
+            report.pop("timestamp")
+            report.pop("audit_hash")
+        assert parallel == sequential
+        assert [s["name"] for s in parallel["system_results"]] == [f"System {i}" for i in range(10)]
+
 
 # ============================================================
 # Organization Assessment (Weighted Scoring) Tests
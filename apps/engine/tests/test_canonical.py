@@ -0,0 +1,55 @@
+"""
+Unit tests for the canonical audit-hash encoding.
+"""
+
+import datetime
+import hashlib
+import json
+
+import numpy as np
+
+from app.core import canonical
+from app.core.canonical import canonical_hash, canonical_json
+from app.services.hash_chain import HashChain
+
+
+def legacy_hash(obj, prefix=""):
+    return hashlib.sha256((prefix + json.dumps(obj, sort_keys=True, default=str)).encode()).hexdigest()
+
+
+def make_record():
+    return {
+        "z": [1, 2.5, float("nan"), None, True, "é\"", np.float64(0.1), np.int64(7), np.bool_(False)],
+        "a": {"nested": [{"b": 1, "a": [datetime.date(2024, 1, 1)]}] * 50},
+        "keys": {3: "int key", 1.5: "float key", True: "bool key"},
+        "shap_values": {"values": np.random.default_rng(0).normal(size=(40, 30)).tolist()},
+        "tuple": (1, "two"),
+    }
+
+
+class TestCanonicalEncoding:
+
+    def test_matches_json_dumps(self):
+        record = make_record()
+        assert canonical_json(record) == json.dumps(record, sort_keys=True, default=str)
+        assert canonical_hash(record) == legacy_hash(record)
+
+    def test_split_encoding_is_identical(self, monkeypatch):
+        monkeypatch.setattr(canonical, "_SMALL_ITEMS", 4)
+        monkeypatch.setattr(canonical, "_BUFFER_CHARS", 64)
+        record = make_record()
+        assert len(list(canonical.iter_canonical(record))) > 100
+        assert canonical_hash(record, prefix="p||") == legacy_hash(record, prefix="p||")
+
+    def test_arrays_encode_as_lists(self):
+        matrix = np.arange(12, dtype=float).reshape(3, 4)
+        assert canonical_json({"m": matrix}) == json.dumps({"m": matrix.tolist()})
+
+    def test_existing_chain_record_still_verifies(self):
+        entry = {"decision": "approved", "score": 0.87, "features": {"age": 41}}
+        record = {
+            "previous_hash": HashChain.GENESIS_HASH,
+            "chain_hash": legacy_hash(entry, prefix=f"{HashChain.GENESIS_HASH}||"),
+            "data": entry,
+        }
+        assert HashChain.verify_chain([record])["valid"] is True
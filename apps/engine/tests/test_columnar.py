@@ -0,0 +1,162 @@
+"""
+Tests for columnar (Arrow IPC / Parquet) ingestion on tabular endpoints.
+Columnar bodies must produce exactly the same results as the JSON path.
+"""
+
+import io
+import pytest
+import pandas as pd
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.ipc  # noqa: E402
+import pyarrow.parquet as pq  # noqa: E402
+
+from app.api.v1.endpoints import analysis as analysis_endpoints  # noqa: E402
+from app.core.columnar import (  # noqa: E402
+    ARROW_STREAM_MEDIA_TYPE, ColumnarDecodeError, as_frame, decode_columnar,
+)
+
+
+def make_rows():
+    rows = []
+    for i in range(200):
+        rows.append({
+            "gender": "M" if i % 2 else "F",
+            "race": ["A", "B", "C"][i % 3],
+            "hired": 1 if (i % 5) < (3 if i % 2 else 2) else 0,
+            "actual": i % 2,
+            "predicted": 1 if i % 3 else 0,
+        })
+    return rows
+
+
+def to_arrow_stream(rows):
+    table = pa.Table.from_pylist(rows)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def to_parquet(rows):
+    buf = io.BytesIO()
+    pq.write_table(pa.Table.from_pylist(rows), buf)
+    return buf.getvalue()
+
+
+class TestDecodeColumnar:
+
+    def test_arrow_stream_roundtrip(self):
+        rows = make_rows()
+        df = decode_columnar(to_arrow_stream(rows), ARROW_STREAM_MEDIA_TYPE)
+        pd.testing.assert_frame_equal(df, pd.DataFrame(rows))
+
+    def test_parquet_roundtrip(self):
+        rows = make_rows()
+        df = decode_columnar(to_parquet(rows), "application/vnd.apache.parquet")
+        pd.testing.assert_frame_equal(df, pd.DataFrame(rows))
+
+    def test_invalid_body_raises(self):
+        with pytest.raises(ColumnarDecodeError):
+            decode_columnar(b"not arrow", ARROW_STREAM_MEDIA_TYPE)
+
+    def test_parquet_row_cap_read_from_footer(self):
+        body = to_parquet(make_rows())
+        assert len(decode_columnar(body, "application/vnd.apache.parquet", max_rows=200)) == 200
+        with pytest.raises(ColumnarDecodeError, match="too large"):
+            decode_columnar(body, "application/vnd.apache.parquet", max_rows=199)
+
+    def test_arrow_row_cap_stops_between_batches(self):
+        table = pa.Table.from_pylist(make_rows())
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            for batch in table.to_batches(max_chunksize=50):
+                writer.write_batch(batch)
+        with pytest.raises(ColumnarDecodeError, match="too large"):
+            decode_columnar(sink.getvalue().to_pybytes(), ARROW_STREAM_MEDIA_TYPE, max_rows=120)
+
+    def test_as_frame_does_not_copy(self):
+        df = pd.DataFrame(make_rows())
+        assert as_frame(df) is df
+
+
+class TestColumnarEndpoints:
+
+    def test_disparate_impact_matches_json(self, client):
+        rows = make_rows()
+        params = {"protected_attribute": "gender", "outcome_variable": "hired"}
+        json_resp = client.post("/api/v1/analyze", json={"data": rows, **params})
+        arrow_resp = client.post(
+            "/api/v1/analyze", params=params, content=to_arrow_stream(rows),
+            headers={"Content-Type": ARROW_STREAM_MEDIA_TYPE},
+        )
+        assert arrow_resp.status_code == 200
+        expected, actual = json_resp.json(), arrow_resp.json()
+        assert actual["audit_hash"] == expected["audit_hash"]
+        assert actual["detailed_analysis"] == expected["detailed_analysis"]
+
+    def test_equalized_odds_parquet_matches_json(self, client):
+        rows = make_rows()
+        params = {"protected_attribute": "race", "actual_outcome": "actual", "predicted_outcome": "predicted"}
+        json_resp = client.post("/api/v1/analyze/equalized-odds", json={"data": rows, **params})
+        pq_resp = client.post(
+            "/api/v1/analyze/equalized-odds", params=params, content=to_parquet(rows),
+            headers={"Content-Type": "application/vnd.apache.parquet"},
+        )
+        assert pq_resp.status_code == 200
+        assert pq_resp.json()["audit_hash"] == json_resp.json()["audit_hash"]
+
+    def test_intersectional_list_params_from_query(self, client):
+        rows = make_rows()
+        json_resp = client.post("/api/v1/analyze/intersectional", json={
+            "data": rows, "protected_attributes": ["gender", "race"],
+            "outcome_variable": "hired", "min_group_size": 5,
+        })
+        arrow_resp = client.post(
+            "/api/v1/analyze/intersectional?protected_attributes=gender&protected_attributes=race"
+            "&outcome_variable=hired&min_group_size=5",
+            content=to_arrow_stream(rows), headers={"Content-Type": ARROW_STREAM_MEDIA_TYPE},
+        )
+        assert arrow_resp.status_code == 200
+        assert arrow_resp.json()["detailed_analysis"] == json_resp.json()["detailed_analysis"]
+
+    def test_statistical_parity_matches_json(self, client):
+        rows = make_rows()
+        params = {"protected_attribute": "race", "outcome_variable": "hired"}
+        json_resp = client.post("/api/v1/analyze/statistical-parity", json={"data": rows, **params})
+        arrow_resp = client.post(
+            "/api/v1/analyze/statistical-parity", params=params, content=to_arrow_stream(rows),
+            headers={"Content-Type": ARROW_STREAM_MEDIA_TYPE},
+        )
+        assert arrow_resp.json() == json_resp.json()
+
+    def test_missing_query_params_returns_422(self, client):
+        response = client.post(
+            "/api/v1/analyze", content=to_arrow_stream(make_rows()),
+            headers={"Content-Type": ARROW_STREAM_MEDIA_TYPE},
+        )
+        assert response.status_code == 422
+
+    def test_corrupt_body_returns_400(self, client):
+        response = client.post(
+            "/api/v1/analyze", params={"protected_attribute": "gender", "outcome_variable": "hired"},
+            content=b"garbage", headers={"Content-Type": ARROW_STREAM_MEDIA_TYPE},
+        )
+        assert response.status_code == 400
+
+    def test_row_cap_applies_to_every_endpoint(self, client, monkeypatch):
+        monkeypatch.setattr(analysis_endpoints, "MAX_TABULAR_ROWS", 100)
+        params = {"protected_attributes": ["gender"], "outcome_variable": "hired"}
+        response = client.post(
+            "/api/v1/analyze/epsilon-fairness", params=params, content=to_parquet(make_rows()),
+            headers={"Content-Type": "application/vnd.apache.parquet"},
+        )
+        assert response.status_code == 400 and "too large" in response.json()["detail"]
+        response = client.post("/api/v1/analyze/epsilon-fairness", json={"data": make_rows(), **params})
+        assert response.status_code == 400 and "too large" in response.json()["detail"]
+
+    def test_malformed_json_returns_422(self, client):
+        response = client.post(
+            "/api/v1/analyze", content=b"{not json", headers={"Content-Type": "application/json"},
+        )
+        assert response.status_code == 422
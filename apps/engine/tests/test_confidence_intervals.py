@@ -0,0 +1,141 @@
+"""
+Unit tests for Wilson / bootstrap confidence intervals on disparate impact.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from app.services import confidence_intervals
+from app.services.bias_analysis import analyze_disparate_impact
+from app.services.confidence_intervals import (
+    disparate_impact_intervals, mover_ratio_interval, wilson_interval,
+)
+from app.services.group_stats import GroupStats
+
+
+def make_small_group_data():
+    """Group A: 5/12 selected, group B: 30/40 selected."""
+    return (
+        [{"group": "A", "hired": 1}] * 5 + [{"group": "A", "hired": 0}] * 7 +
+        [{"group": "B", "hired": 1}] * 30 + [{"group": "B", "hired": 0}] * 10
+    )
+
+
+class TestWilson:
+
+    def test_matches_reference_formula(self):
+        lower, upper = wilson_interval(np.array([5]), np.array([12]), 0.95)
+        # statsmodels proportion_confint(5, 12, method="wilson")
+        assert round(float(lower[0]), 4) == 0.1933
+        assert round(float(upper[0]), 4) == 0.6805
+
+    def test_empty_group_is_nan(self):
+        lower, upper = wilson_interval(np.array([0]), np.array([0]))
+        assert np.isnan(lower[0]) and np.isnan(upper[0])
+
+    def test_mover_ratio_contains_point_estimate(self):
+        lo1, hi1 = wilson_interval(np.array([5]), np.array([12]))
+        lo2, hi2 = wilson_interval(np.array([30]), np.array([40]))
+        lower, upper = mover_ratio_interval(5 / 12, lo1, hi1, 0.75, lo2, hi2)
+        assert lower[0] < (5 / 12) / 0.75 < upper[0]
+
+
+class TestBootstrap:
+
+    def test_reproducible_with_seed(self):
+        cube = GroupStats.from_frame(pd.DataFrame(make_small_group_data()), "group", "hired")
+        first = disparate_impact_intervals(cube, "bootstrap", n_bootstrap=2000, random_state=7)
+        second = disparate_impact_intervals(cube, "bootstrap", n_bootstrap=2000, random_state=7)
+        assert first == second
+
+    def test_rate_interval_close_to_binomial_quantiles(self):
+        cube = GroupStats.from_frame(pd.DataFrame(make_small_group_data()), "group", "hired")
+        result = disparate_impact_intervals(cube, "bootstrap", n_bootstrap=20000)
+        lower, upper = result["groups"]["B"]["selection_rate"]
+        expected = stats.binom.ppf([0.025, 0.975], 40, 0.75) / 40
+        assert abs(lower - expected[0]) <= 0.026
+        assert abs(upper - expected[1]) <= 0.026
+
+    def test_blocked_draws_match_single_block(self, monkeypatch):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({"group": rng.integers(0, 40, 4000), "hired": rng.integers(0, 2, 4000)})
+        cube = GroupStats.from_frame(df, "group", "hired")
+        whole = disparate_impact_intervals(cube, "bootstrap", n_bootstrap=2000)["groups"]
+        # 2000 replicates x 3 groups per block: 14 blocks, each redrawn for the percentiles
+        monkeypatch.setattr(confidence_intervals, "_BOOTSTRAP_BLOCK_CELLS", 6000)
+        blocked = disparate_impact_intervals(cube, "bootstrap", n_bootstrap=2000)
+        assert blocked == disparate_impact_intervals(cube, "bootstrap", n_bootstrap=2000)
+        for group, bounds in blocked["groups"].items():
+            for key in ("selection_rate", "disparate_impact_ratio"):
+                assert np.allclose(bounds[key], whole[group][key], atol=0.03)
+
+    def test_replicates_capped_by_group_count(self, monkeypatch):
+        monkeypatch.setattr(confidence_intervals, "MAX_BOOTSTRAP_CELLS", 1000)
+        cube = GroupStats.from_frame(pd.DataFrame(make_small_group_data()), "group", "hired")
+        result = disparate_impact_intervals(cube, "bootstrap", n_bootstrap=5000)
+        assert result["replicates"] == 500 and result["replicates_requested"] == 5000
+        monkeypatch.setattr(confidence_intervals, "MAX_BOOTSTRAP_CELLS", 10)
+        assert disparate_impact_intervals(cube, "bootstrap", n_bootstrap=5000)["replicates"] == 100
+
+    def test_non_binary_outcome_supported(self):
+        df = pd.DataFrame({"group": ["A"] * 6 + ["B"] * 6, "score": [0, 1, 2, 2, 1, 0, 2, 2, 2, 1, 2, 2]})
+        cube = GroupStats.from_frame(df, "group", "score")
+        assert "error" in disparate_impact_intervals(cube, "wilson")
+        result = disparate_impact_intervals(cube, "bootstrap", n_bootstrap=500)
+        assert result["groups"]["A"]["selection_rate"][0] <= 1.0 <= result["groups"]["A"]["selection_rate"][1]
+
+    def test_continuous_outcome_uses_moments(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({"group": ["A"] * 400 + ["B"] * 400,
+                           "income": np.concatenate([rng.normal(50, 10, 400), rng.normal(60, 10, 400)])})
+        cube = GroupStats.from_frame(df, "group", "income")
+        assert cube.counts is None
+        assert "error" in disparate_impact_intervals(cube, "wilson")
+        lower, upper = disparate_impact_intervals(cube, "bootstrap", n_bootstrap=5000)["groups"]["A"]["selection_rate"]
+        mean, se = df["income"][:400].mean(), df["income"][:400].std(ddof=0) / 20
+        assert abs(lower - (mean - 1.96 * se)) < 0.1 and abs(upper - (mean + 1.96 * se)) < 0.1
+
+
+class TestDisparateImpactWithIntervals:
+
+    def test_default_report_unchanged(self):
+        plain = analyze_disparate_impact(make_small_group_data(), "group", "hired")
+        assert "confidence_intervals" not in plain
+        assert "confidence_interval" not in plain["detailed_analysis"]["A"]
+
+    def test_small_group_flagged_as_inconclusive(self):
+        result = analyze_disparate_impact(make_small_group_data(), "group", "hired", confidence_interval="wilson")
+        group = result["detailed_analysis"]["A"]
+        assert group["status"] == "FAIL"
+        assert group["confidence_interval"]["conclusive"] is False
+        assert any("Small-sample uncertainty for A" in f for f in result["flags"])
+        assert result["detailed_analysis"]["B"]["confidence_interval"]["disparate_impact_ratio"] == [1.0, 1.0]
+        assert result["confidence_intervals"] == {"method": "wilson", "confidence_level": 0.95}
+
+    def test_unknown_method_returns_error(self):
+        result = analyze_disparate_impact(make_small_group_data(), "group", "hired", confidence_interval="exact")
+        assert "error" in result
+
+    def test_api_bootstrap(self, client):
+        response = client.post("/api/v1/analyze", json={
+            "data": make_small_group_data(), "protected_attribute": "group", "outcome_variable": "hired",
+            "confidence_interval": "bootstrap", "n_bootstrap": 1000,
+        })
+        assert response.status_code == 200
+        body = response.json()
+        assert body["confidence_intervals"]["replicates"] == 1000
+        assert len(body["detailed_analysis"]["A"]["confidence_interval"]["selection_rate"]) == 2
+
+    def test_replicates_must_be_positive(self):
+        cube = GroupStats.from_frame(pd.DataFrame(make_small_group_data()), "group", "hired")
+        assert "error" in disparate_impact_intervals(cube, "bootstrap", n_bootstrap=0)
+
+    def test_batch_clamps_replicates(self, client):
+        params = {"protected_attribute": "group", "outcome_variable": "hired",
+                  "confidence_interval": "bootstrap", "n_bootstrap": 0}
+        response = client.post("/api/v1/analyze/batch", json={
+            "data": make_small_group_data(), "analyses": [{"type": "disparate_impact", "params": params}],
+        })
+        assert response.status_code == 200
+        assert response.json()["results"][0]["result"]["confidence_intervals"]["replicates"] == 100
@@ -1,11 +1,15 @@
 """
 Unit tests for drift monitoring service.
-Tests the DriftMonitor class and analyze_drift() function.
+Tests the DriftMonitor class, analyze_drift() and baseline profiles.
 """
 
 import pytest
 import numpy as np
-from app.services.drift_monitoring import DriftMonitor, analyze_drift
+import pandas as pd
+from scipy import stats
+from app.services.drift_monitoring import (
+    DriftMonitor, analyze_drift, register_baseline, compare_to_baseline, delete_baseline
+)
 
 
 class TestDriftMonitorPSI:
@@ -93,3 +97,192 @@ class TestAnalyzeDrift:
         data = list(np.random.normal(0, 1, 200))
         result = analyze_drift(data, data, "feat", n_bins=20)
         assert result["status"] == "STABLE"
+
+
+class TestBaselineProfiles:
+
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        self.baseline = pd.DataFrame({
+            "income": rng.normal(50, 10, 800),
+            "age": rng.integers(18, 80, 800).astype(float),
+            "score": rng.uniform(0, 1, 800).round(2),
+        })
+        self.rng = rng
+
+    def _window_in_range(self, n=300, shift=0.0):
+        lo, hi = self.baseline.min(), self.baseline.max()
+        window = pd.DataFrame({c: self.rng.normal(self.baseline[c].mean() + shift * self.baseline[c].std(),
+                                                  self.baseline[c].std(), n) for c in self.baseline.columns})
+        return window.clip(lo, hi, axis=1)
+
+    def test_register_defaults_to_numeric_features(self):
+        df = self.baseline.assign(region=["north", "south"] * 400)
+        result = register_baseline(df, n_bins=12, name="loans")
+        assert result["features"] == ["income", "age", "score"]
+        assert result["n_bins"] == 12
+        assert result["rows"] == 800
+        assert result["name"] == "loans"
+
+    def test_matches_analyze_drift_within_baseline_range(self):
+        profile = register_baseline(self.baseline, n_bins=15)
+        window = self._window_in_range()
+        result = compare_to_baseline(profile["profile_id"], window)
+        assert [r["feature"] for r in result["features"]] == ["income", "age", "score"]
+        for r in result["features"]:
+            ref = analyze_drift(self.baseline[r["feature"]].tolist(), window[r["feature"]].tolist(),
+                                r["feature"], 15)
+            assert r["psi"] == ref["psi"]
+            assert r["js_divergence"] == ref["js_divergence"]
+            # ks_2samp snaps the exact-mode statistic to a multiple of 1/lcm(n1, n2)
+            assert r["ks_test"]["statistic"] == pytest.approx(ref["ks_test"]["statistic"], abs=1e-4)
+
+    def test_ks_p_value_is_asymptotic(self):
+        profile = register_baseline(self.baseline)
+        window = self._window_in_range(n=200, shift=0.2)
+        result = compare_to_baseline(profile["profile_id"], window)
+        for r in result["features"]:
+            _, p = stats.ks_2samp(self.baseline[r["feature"]], window[r["feature"]], method="asymp")
+            assert r["ks_test"]["p_value"] == pytest.approx(round(p, 4), abs=1e-4)
+
+    def test_shifted_window_detected(self):
+        profile = register_baseline(self.baseline)
+        window = self.baseline.copy()
+        window["income"] = window["income"] + 30
+        result = compare_to_baseline(profile["profile_id"], window)
+        assert result["status"] == "DRIFT_DETECTED"
+        assert result["drifted_features"] == ["income"]
+        income = result["features"][0]
+        # Values beyond the baseline range fall into the last bin
+        assert income["psi"]["status"] == "CRITICAL_DRIFT"
+        assert income["ks_test"]["significant"]
+
+    def test_identical_window_stable(self):
+        profile = register_baseline(self.baseline)
+        result = compare_to_baseline(profile["profile_id"], self.baseline)
+        assert result["status"] == "STABLE"
+        assert all(r["psi"]["value"] == 0 and r["ks_test"]["statistic"] == 0 for r in result["features"])
+
+    def test_missing_values_ignored_per_feature(self):
+        baseline = self.baseline.copy()
+        baseline.loc[:99, "income"] = np.nan
+        profile = register_baseline(baseline)
+        window = self._window_in_range()
+        window.loc[:49, "age"] = np.nan
+        window["score"] = np.nan
+        result = compare_to_baseline(profile["profile_id"], window)
+        assert result["features_skipped"] == ["score"]
+        age = next(r for r in result["features"] if r["feature"] == "age")
+        ref = analyze_drift(baseline["age"].tolist(), window["age"].dropna().tolist(), "age")
+        assert age["psi"] == ref["psi"]
+
+    def test_feature_subset(self):
+        profile = register_baseline(self.baseline)
+        result = compare_to_baseline(profile["profile_id"], self.baseline[["age"]], features=["age"])
+        assert [r["feature"] for r in result["features"]] == ["age"]
+
+    def test_constant_feature(self):
+        profile = register_baseline(pd.DataFrame({"flag": [1.0] * 50}))
+        result = compare_to_baseline(profile["profile_id"], pd.DataFrame({"flag": [1.0] * 20}))
+        assert result["status"] == "STABLE"
+
+    def test_errors(self):
+        assert "error" in register_baseline([])
+        assert "error" in register_baseline(self.baseline, features=["missing"])
+        assert "error" in register_baseline(pd.DataFrame({"x": [None, None]}), features=["x"])
+        profile = register_baseline(self.baseline)
+        assert "error" in compare_to_baseline(profile["profile_id"], self.baseline[["age"]])
+        assert "error" in compare_to_baseline(profile["profile_id"], self.baseline, features=["other"])
+        assert "error" in compare_to_baseline("unknown", self.baseline)
+
+    def test_delete(self):
+        profile = register_baseline(self.baseline)
+        assert delete_baseline(profile["profile_id"])["deleted"]
+        assert "error" in compare_to_baseline(profile["profile_id"], self.baseline)
+        assert "error" in delete_baseline(profile["profile_id"])
+
+
+class TestCategoricalDrift:
+
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        self.rng = rng
+        self.baseline = pd.DataFrame({
+            "income": rng.normal(50, 10, 1000),
+            "region": rng.choice(["north", "south", "east", "west"], 1000, p=[0.4, 0.3, 0.2, 0.1]),
+            "channel": rng.choice(["web", "branch"], 1000),
+            "approved": rng.random(1000) < 0.6,
+            "customer_id": [f"c{i}" for i in range(1000)],
+        })
+
+    def _window(self, n=500, region_p=(0.4, 0.3, 0.2, 0.1)):
+        return pd.DataFrame({
+            "income": self.rng.normal(50, 10, n),
+            "region": self.rng.choice(["north", "south", "east", "west"], n, p=region_p),
+            "channel": self.rng.choice(["web", "branch"], n),
+            "approved": self.rng.random(n) < 0.6,
+        })
+
+    def test_register_profiles_categorical_columns(self, monkeypatch):
+        monkeypatch.setattr("app.services.drift_monitoring.MAX_DRIFT_CATEGORIES", 100)
+        result = register_baseline(self.baseline)
+        assert result["features"] == ["income"]
+        assert result["categorical_features"] == ["region", "channel", "approved"]
+        assert result["categories"] == {"region": 4, "channel": 2, "approved": 2}
+        # Near-unique columns (IDs) are skipped unless asked for explicitly
+        assert result["features_skipped"] == ["customer_id"]
+        assert "error" in register_baseline(self.baseline, categorical_features=["customer_id"])
+
+    def test_matches_chi2_contingency(self):
+        profile = register_baseline(self.baseline, features=[], categorical_features=["region", "channel"])
+        window = self._window(region_p=(0.25, 0.25, 0.25, 0.25))
+        result = compare_to_baseline(profile["profile_id"], window)
+        for r in result["features"]:
+            levels = sorted(self.baseline[r["feature"]].unique())
+            table = np.array([self.baseline[r["feature"]].value_counts()[levels],
+                              window[r["feature"]].value_counts().reindex(levels, fill_value=0)])
+            chi2, p, dof, _ = stats.chi2_contingency(table, correction=False)
+            assert r["type"] == "categorical"
+            assert r["chi_square"]["statistic"] == pytest.approx(chi2, abs=1e-4)
+            assert r["chi_square"]["p_value"] == pytest.approx(round(p, 4), abs=1e-4)
+            assert r["chi_square"]["dof"] == dof
+            expected = self.baseline[r["feature"]].value_counts(normalize=True)[levels].to_numpy()
+            actual = window[r["feature"]].value_counts(normalize=True).reindex(levels, fill_value=0).to_numpy()
+            psi = np.sum((actual - expected) * np.log(actual / expected))
+            assert r["psi"]["value"] == pytest.approx(psi, abs=1e-4)
+        assert result["drifted_features"] == ["region"]
+
+    def test_stable_window(self):
+        profile = register_baseline(self.baseline, categorical_features=["region", "channel", "approved"])
+        result = compare_to_baseline(profile["profile_id"], self._window(n=2000))
+        assert result["status"] == "STABLE"
+        assert all(r["unseen_categories"]["count"] == 0 for r in result["features"])
+
+    def test_unseen_categories(self):
+        profile = register_baseline(self.baseline, features=[], categorical_features=["region"])
+        window = self._window()
+        window.loc[:99, "region"] = "offshore"
+        window.loc[100:109, "region"] = "unknown"
+        window.loc[110:119, "region"] = None
+        region = compare_to_baseline(profile["profile_id"], window)["features"][0]
+        assert region["unseen_categories"]["count"] == 110
+        assert region["unseen_categories"]["rate"] == round(110 / 490, 4)
+        assert region["unseen_categories"]["examples"] == ["offshore", "unknown"]
+        assert region["chi_square"]["dof"] == 4
+        assert region["status"] == "DRIFT_DETECTED"
+
+    def test_repeat_windows_reuse_vocabulary(self):
+        profile = register_baseline(self.baseline, features=[], categorical_features=["region"])
+        first = compare_to_baseline(profile["profile_id"], self._window(region_p=(0.1, 0.2, 0.3, 0.4)))
+        second = compare_to_baseline(profile["profile_id"], self._window(region_p=(0.1, 0.2, 0.3, 0.4)))
+        assert first["status"] == second["status"] == "DRIFT_DETECTED"
+        # A window of a single category leaves the others unobserved, not missing
+        single = compare_to_baseline(profile["profile_id"], pd.DataFrame({"region": ["north"] * 50}))
+        assert single["features"][0]["chi_square"]["dof"] == 3
+
+    def test_mixed_feature_subset(self):
+        profile = register_baseline(self.baseline, features=["income"], categorical_features=["channel"])
+        result = compare_to_baseline(profile["profile_id"], self._window(), features=["channel"])
+        assert [r["feature"] for r in result["features"]] == ["channel"]
+        result = compare_to_baseline(profile["profile_id"], self._window())
+        assert [r["feature"] for r in result["features"]] == ["income", "channel"]
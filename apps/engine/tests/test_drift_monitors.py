@@ -0,0 +1,184 @@
+"""
+Tests for scheduled drift monitors: each run evaluates only the rows that
+arrived since the previous one, keeps per-window history and alerts on
+status transitions.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.drift_monitoring import BaselineProfile, compare_to_baseline, register_baseline
+from app.services.drift_monitors import (
+    DriftMonitorStore, drift_monitor_status, ingest_drift_observations, list_drift_alerts,
+    register_drift_monitor, run_drift_monitors,
+)
+from app.tasks.analysis import task_drift_monitors
+
+
+def rows(n, shift=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"income": rng.normal(50 + shift, 10, n), "age": rng.normal(40, 8, n)})
+
+
+@pytest.fixture
+def store():
+    return DriftMonitorStore()
+
+
+class TestDriftMonitorStore:
+
+    def test_window_matches_profile_comparison(self, store):
+        baseline, window = rows(1000), rows(400, shift=3, seed=1)
+        monitor = store.register("credit", "income", baseline["income"].to_numpy(), n_bins=12)
+        store.ingest("credit", window.iloc[:150])
+        store.ingest("credit", window.iloc[150:])
+        assert store.get(monitor["monitor_id"])["pending_rows"] == 400
+
+        result = store.run()["evaluated"][0]
+        profile = register_baseline(baseline[["income"]], n_bins=12)
+        expected = compare_to_baseline(profile["profile_id"], window[["income"]])["features"][0]
+        assert result["window_rows"] == 400
+        assert result["psi"] == expected["psi"]
+        assert result["ks_test"] == expected["ks_test"]
+        assert store.get(monitor["monitor_id"])["pending_rows"] == 0
+
+    def test_runs_are_incremental(self, store):
+        monitor = store.register("credit", "income", rows(1000)["income"].to_numpy(), min_window_rows=50)
+        store.ingest("credit", rows(200, seed=1))
+        assert len(store.run()["evaluated"]) == 1
+        # Nothing new arrived: the next run has nothing to evaluate
+        assert store.run()["evaluated"] == []
+        store.ingest("credit", rows(300, seed=2))
+        second = store.run()["evaluated"][0]
+        assert second["window"] == 2 and second["window_rows"] == 300
+        history = store.history(monitor["monitor_id"])
+        assert [h["window_rows"] for h in history] == [200, 300]
+
+    def test_runs_reuse_the_stored_profile(self, store, monkeypatch):
+        store.register("credit", "income", rows(1000)["income"].to_numpy())
+        store.ingest("credit", rows(200, seed=1))
+
+        def rebuilt(*args, **kwargs):
+            raise AssertionError("baseline re-profiled during a run")
+        monkeypatch.setattr(BaselineProfile, "__init__", rebuilt)
+        assert len(store.run()["evaluated"]) == 1
+
+    def test_small_windows_wait(self, store):
+        monitor = store.register("credit", "income", rows(500)["income"].to_numpy(), min_window_rows=100)
+        store.ingest("credit", rows(60, seed=1))
+        result = store.run()
+        assert result["waiting"] == [monitor["monitor_id"]]
+        store.ingest("credit", rows(60, seed=2))
+        assert store.run()["evaluated"][0]["window_rows"] == 120
+
+    def test_alerts_on_status_transitions(self, store):
+        store.register("credit", "income", rows(2000)["income"].to_numpy(), min_window_rows=50)
+        statuses = []
+        for shift, seed in [(0, 1), (25, 2), (25, 3), (0, 4)]:
+            store.ingest("credit", rows(500, shift=shift, seed=seed))
+            statuses.append(store.run()["evaluated"][0]["status"])
+        assert statuses == ["STABLE", "DRIFT_DETECTED", "DRIFT_DETECTED", "STABLE"]
+
+        alerts = store.alerts()
+        assert [(a["previous_status"], a["status"]) for a in reversed(alerts)] == [
+            ("STABLE", "DRIFT_DETECTED"), ("DRIFT_DETECTED", "STABLE"),
+        ]
+
+    def test_first_drifting_window_alerts(self, store):
+        store.register("credit", "income", rows(1000)["income"].to_numpy(), min_window_rows=50)
+        store.ingest("credit", rows(300, shift=30, seed=1))
+        alert = store.run()["alerts"][0]
+        assert (alert["previous_status"], alert["status"]) == ("NO_DATA", "DRIFT_DETECTED")
+
+    def test_ingest_fans_out_per_feature(self, store):
+        store.register("credit", "income", rows(500)["income"].to_numpy(), min_window_rows=10)
+        store.register("credit", "age", rows(500)["age"].to_numpy(), min_window_rows=10)
+        store.register("hiring", "age", rows(500)["age"].to_numpy(), min_window_rows=10)
+        result = store.ingest("credit", rows(50, seed=1)[["income"]])
+        assert result["features_received"] == ["income"]
+        assert result["features_missing"] == ["age"]
+        assert len(store.run("credit")["evaluated"]) == 1
+
+    def test_history_is_bounded(self, store, monkeypatch):
+        monkeypatch.setattr("app.services.drift_monitors.DRIFT_MONITOR_HISTORY", 3)
+        monitor = store.register("credit", "income", rows(500)["income"].to_numpy(), min_window_rows=10)
+        for seed in range(5):
+            store.ingest("credit", rows(20, seed=seed + 1))
+            store.run()
+        assert [h["window"] for h in store.history(monitor["monitor_id"])] == [3, 4, 5]
+
+    def test_errors(self, store):
+        store.register("credit", "income", rows(100)["income"].to_numpy())
+        assert "error" in store.register("credit", "income", rows(100)["income"].to_numpy())
+        assert "error" in store.register("credit", "other", np.array([np.nan]))
+        assert "error" in store.ingest("unknown", rows(10))
+
+    def test_delete(self, store):
+        monitor = store.register("credit", "income", rows(100)["income"].to_numpy())
+        store.ingest("credit", rows(10, seed=1))
+        assert store.delete(monitor["monitor_id"])
+        assert store.get(monitor["monitor_id"]) is None
+        assert not store.delete(monitor["monitor_id"])
+
+
+class TestDriftMonitorService:
+
+    def test_register_from_profile_and_scheduled_task(self):
+        baseline = rows(800)
+        profile = register_baseline(baseline)
+        monitor = register_drift_monitor("svc-profile", "income", profile_id=profile["profile_id"],
+                                         min_window_rows=50)
+        assert monitor["baseline_rows"] == 800
+        assert "error" not in ingest_drift_observations("svc-profile", rows(200, shift=30, seed=1))
+
+        result = task_drift_monitors.apply(kwargs={"system_id": "svc-profile"}).get()
+        assert result["status"] == "success"
+        assert result["data"]["evaluated"][0]["status"] == "DRIFT_DETECTED"
+
+        status = drift_monitor_status(monitor["monitor_id"])
+        assert status["status"] == "DRIFT_DETECTED"
+        assert status["rolling"]["windows"] == 1
+        assert list_drift_alerts("svc-profile")["alerts"][0]["status"] == "DRIFT_DETECTED"
+
+    def test_register_errors(self):
+        assert "error" in register_drift_monitor("svc", "income")
+        assert "error" in register_drift_monitor("svc", "income", baseline_data=[1.0], profile_id="p")
+        assert "error" in register_drift_monitor("svc", "income", profile_id="unknown")
+        assert "error" in ingest_drift_observations("svc", [])
+
+    def test_in_memory_store_warns_worker(self, monkeypatch, caplog):
+        from app.core import celery_app
+        monkeypatch.setitem(celery_app.SHARED_STORES, "DRIFT_MONITOR_DB_PATH", ":memory:")
+        celery_app.warn_unshared_stores()
+        assert "DRIFT_MONITOR_DB_PATH is ':memory:'" in caplog.text
+
+        caplog.clear()
+        monkeypatch.setitem(celery_app.SHARED_STORES, "DRIFT_MONITOR_DB_PATH", "/var/lib/aic/drift.db")
+        celery_app.warn_unshared_stores()
+        assert "DRIFT_MONITOR_DB_PATH" not in caplog.text
+
+
+class TestDriftMonitorEndpoints:
+
+    def test_monitor_over_api(self, client):
+        created = client.post("/api/v1/analyze/drift/monitors", json={
+            "system_id": "api-system", "feature": "income",
+            "baseline_data": rows(500)["income"].tolist(), "min_window_rows": 20,
+        })
+        assert created.status_code == 200
+        monitor_id = created.json()["monitor_id"]
+
+        pushed = client.post("/api/v1/analyze/drift/systems/api-system/observations",
+                             json={"data": rows(100, shift=30, seed=1).to_dict("records")})
+        assert pushed.status_code == 200
+        run = client.post("/api/v1/analyze/drift/monitors/run?system_id=api-system")
+        assert run.json()["alerts"][0]["feature"] == "income"
+
+        status = client.get(f"/api/v1/analyze/drift/monitors/{monitor_id}")
+        assert status.json()["history"][0]["status"] == "DRIFT_DETECTED"
+        listed = client.get("/api/v1/analyze/drift/monitors?system_id=api-system").json()["monitors"]
+        assert [m["monitor_id"] for m in listed] == [monitor_id]
+        assert client.get("/api/v1/analyze/drift/alerts?system_id=api-system").json()["alerts"]
+        assert client.delete(f"/api/v1/analyze/drift/monitors/{monitor_id}").status_code == 200
+        assert client.get(f"/api/v1/analyze/drift/monitors/{monitor_id}").status_code == 400
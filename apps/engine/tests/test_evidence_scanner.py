@@ -0,0 +1,113 @@
+"""
+Unit tests for the POPIA Section 71 evidence scanner and corpus index.
+"""
+
+from app.services.evidence_index import EvidenceIndex
+from app.services.evidence_scanner import EvidenceScanner, StreamingEvidenceScan, scan_evidence, scan_evidence_stream
+
+POLICY = (
+    "Every automated decision is subject to Human Review on request. "
+    "Applicants may appeal and will receive an explanation of the logic involved. "
+    "Training data is de-identified."
+)
+
+
+class TestEvidenceScanner:
+
+    def test_policy_is_verified(self):
+        result = scan_evidence(POLICY)
+        assert result["status"] == "VERIFIED"
+        assert result["verification_score"] == 100
+        assert result["categories"]["explanation_logic"]["matches"] == ["logic involved", "explanation"]
+
+    def test_missing_markers(self):
+        result = scan_evidence("Our model is accurate.")
+        assert result["verification_score"] == 0
+        assert result["missing_elements"] == ["human intervention", "recourse mechanism", "explanation logic", "data minimization"]
+
+    def test_overlapping_markers_are_all_found(self):
+        class OverlappingScanner(EvidenceScanner):
+            POPIA_SECTION_71_MARKERS = {"review": ["human review", "review", "man"]}
+
+        result = OverlappingScanner().scan_text("Human Review")
+        assert result["categories"]["review"]["matches"] == ["human review", "review", "man"]
+
+
+class TestStreamingEvidenceScan:
+
+    def test_chunked_scan_matches_whole_text(self):
+        scanner = EvidenceScanner()
+        for size in (1, 2, 7, 64):
+            pieces = [POLICY[i:i + size] for i in range(0, len(POLICY), size)]
+            assert scanner.scan_chunks(pieces) == scanner.scan_text(POLICY)
+
+    def test_marker_across_chunk_boundary(self):
+        scan = StreamingEvidenceScan(chunk_chars=16)
+        scan.feed("x" * 10 + "manual over")
+        scan.feed("ride and more")
+        assert scan.report()["categories"]["human_intervention"]["matches"] == ["manual override"]
+
+    def test_byte_stream_splits_multibyte_characters(self):
+        text = "Résumé screening allows an appeal. " * 3
+        data = text.encode()
+        result = scan_evidence_stream(data[i:i + 3] for i in range(0, len(data), 3))
+        assert result["bytes_received"] == len(data)
+        assert result["categories"]["recourse_mechanism"]["matches"] == ["appeal"]
+
+    def test_stops_scanning_once_every_marker_found(self):
+        everything = " ".join(p for ps in EvidenceScanner.POPIA_SECTION_71_MARKERS.values() for p in ps)
+        scan = StreamingEvidenceScan()
+        scan.feed(everything)
+        assert scan.complete
+        scan.feed("more text")
+        assert scan.report()["verification_score"] == 100
+
+
+class TestEvidenceIndex:
+
+    def make_index(self, tmp_path=None):
+        return EvidenceIndex(str(tmp_path / "evidence.sqlite3") if tmp_path else ":memory:")
+
+    def test_document_reports_match_scanner(self):
+        index = self.make_index()
+        docs = {"policy": POLICY, "empty": "Our model is accurate.", "partial": "You may Appeal. No Manual Override."}
+        index.index_documents("org", docs)
+        coverage = index.coverage("org")
+        for doc_id, text in docs.items():
+            assert coverage["document_reports"][doc_id] == scan_evidence(text)
+        assert coverage["categories"]["recourse_mechanism"]["missing_in"] == ["empty"]
+        assert coverage["categories"]["human_intervention"]["marker_document_counts"]["manual override"] == 1
+        assert coverage["status_counts"] == {"VERIFIED": 1, "REMEDIATION_REQUIRED": 2}
+
+    def test_incremental_reindex(self):
+        index = self.make_index()
+        index.index_documents("org", {"a": POLICY, "b": "appeal"})
+        result = index.index_documents("org", {"a": POLICY, "b": "no recourse"})
+        assert result["unchanged"] == ["a"]
+        assert result["indexed"] == ["b"]
+        assert index.coverage("org", ["b"])["categories"]["recourse_mechanism"]["documents_covered"] == 0
+
+    def test_occurrence_offsets(self):
+        index = self.make_index()
+        index.index_documents("org", {"a": "appeal, then appeal again"})
+        assert index.occurrences("org", "appeal")["documents"] == {"a": [0, 13]}
+        assert "error" in index.occurrences("org", "not a marker")
+
+    def test_organizations_are_separate_and_removal(self):
+        index = self.make_index()
+        index.index_documents("org1", {"a": POLICY})
+        index.index_documents("org2", {"a": "nothing"})
+        assert index.coverage("org1")["status_counts"] == {"VERIFIED": 1}
+        index.remove_documents("org1", ["a"])
+        assert "error" in index.coverage("org1")
+        assert index.count("org2") == 1
+
+    def test_persists_and_reindexes_on_marker_change(self, tmp_path):
+        self.make_index(tmp_path).index_documents("org", {"a": "Decisions are audited."})
+
+        class AuditScanner(EvidenceScanner):
+            POPIA_SECTION_71_MARKERS = {"audit": ["audited"]}
+
+        reopened = EvidenceIndex(str(tmp_path / "evidence.sqlite3"), AuditScanner())
+        coverage = reopened.coverage("org")
+        assert coverage["categories"]["audit"]["documents_covered"] == 1
@@ -88,3 +88,49 @@ class TestEpsilonDifferentialFairness:
             small_data, ["group"], "outcome", min_group_size=10
         )
         assert "error" in result
+
+
+def make_many_groups(k=40, n=40):
+    """k groups of n rows with rates spread from 0 to 1."""
+    data = []
+    for g in range(k):
+        positives = round(n * g / (k - 1))
+        data += [{"group": f"g{g:02d}", "outcome": int(i < positives)} for i in range(n)]
+    return data
+
+
+class TestCompactPairwise:
+
+    def test_spd_counts_match_full_report(self):
+        full = statistical_parity_difference(make_many_groups(), "group", "outcome")
+        compact = statistical_parity_difference(make_many_groups(), "group", "outcome", compact=True, top_n=3)
+        statuses = [v["status"] for v in full["pairwise_analysis"].values()]
+        assert compact["pair_counts"] == {
+            "total": len(statuses), "biased": statuses.count("BIASED"),
+            "warning": statuses.count("WARNING"), "fair": statuses.count("FAIR"),
+        }
+        assert compact["overall_status"] == full["overall_status"]
+        assert compact["max_absolute_spd"] == full["max_absolute_spd"]
+        assert [p["pair"] for p in compact["worst_pairs"]][0] == "g00 vs g39"
+        assert len(compact["worst_pairs"]) == 3
+        assert "pairwise_analysis" not in compact
+
+    def test_epsilon_violation_count_matches_full_report(self):
+        args = (make_many_groups(), ["group"], "outcome", 0.5, 10)
+        full = epsilon_differential_fairness(*args)
+        compact = epsilon_differential_fairness(*args, compact=True, top_n=5)
+        assert compact["violation_count"] == full["violation_count"]
+        assert len(compact["violations"]) == 5
+        assert compact["violations_truncated"] is True
+        assert compact["violations"][0]["ratio"] == 0.0  # g00 has rate 0
+
+    def test_rate_matrix_only_on_request(self):
+        plain = statistical_parity_difference(make_unequal_data(), "group", "outcome")
+        assert "rate_matrix" not in plain
+        result = statistical_parity_difference(make_unequal_data(), "group", "outcome", include_matrix=True)
+        assert result["rate_matrix"] == {"groups": ["A", "B"], "spd": [[0.0, 0.6], [-0.6, 0.0]]}
+
+    def test_epsilon_matrix_marks_unbounded_ratio(self):
+        data = [{"group": "A", "outcome": 1}] * 3 + [{"group": "B", "outcome": 0}] * 3
+        result = epsilon_differential_fairness(data, ["group"], "outcome", min_group_size=2, include_matrix=True)
+        assert result["rate_matrix"]["ratio"] == [[1.0, None], [0.0, 1.0]]
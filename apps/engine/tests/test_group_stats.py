@@ -0,0 +1,174 @@
+"""
+Unit tests for the group statistics cube shared by group fairness metrics.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from app.services.bias_analysis import analyze_intersectional, analyze_statistical_significance
+from app.services.group_stats import GroupStats, GroupStatsCache, compute_group_stats
+
+
+def make_frame():
+    return pd.DataFrame({
+        "gender": ["M", "M", "M", "F", "F", "F", None, "F"],
+        "race": ["A", "B", "A", "A", "B", "B", "A", "A"],
+        "hired": [1, 1, 0, 1, 0, 0, 1, np.nan],
+    })
+
+
+class TestGroupStats:
+
+    def test_matches_groupby(self):
+        df = make_frame()
+        cube = GroupStats.from_frame(df, "gender", "hired")
+        expected = df.groupby("gender")["hired"].agg(["mean", "count", "sum"])
+        summary = cube.summary()
+        assert list(summary.index) == list(expected.index)
+        assert np.allclose(summary["selection_rate"], expected["mean"])
+        assert list(summary["total"]) == list(expected["count"])
+        assert list(summary["selected"]) == list(expected["sum"])
+
+    def test_contingency_matches_crosstab(self):
+        df = make_frame()
+        cube = GroupStats.from_frame(df, "gender", "hired")
+        expected = pd.crosstab(df["gender"], df["hired"])
+        assert (cube.contingency() == expected.values).all()
+
+    def test_intersectional_labels(self):
+        cube = GroupStats.from_frame(make_frame(), ["gender", "race"], "hired")
+        assert "M + A" in list(cube.groups)
+        assert "F + B" in list(cube.groups)
+
+    def test_intersectional_matches_string_keys(self):
+        rng = np.random.default_rng(0)
+        attrs = [f"a{i}" for i in range(6)]
+        df = pd.DataFrame({a: rng.integers(0, 4, 500) for a in attrs})
+        df["a0"] = df["a0"].astype(object).where(df["a0"] > 0, None)
+        df["hired"] = rng.integers(0, 2, 500)
+        keys = df[attrs].astype(str).agg(" + ".join, axis=1)
+        expected = df.groupby(keys)["hired"].agg(["mean", "count"])
+        summary = GroupStats.from_frame(df, attrs, "hired").summary()
+        assert list(summary.index) == list(expected.index)
+        assert np.allclose(summary["selection_rate"], expected["mean"])
+        assert list(summary["total"]) == list(expected["count"])
+
+    def test_single_attribute_missing_first(self):
+        # A missing value in the first row must keep its own counts
+        df = pd.DataFrame({"g": [None, "a", "a", "b", "b", None], "y": [0, 1, 1, 1, 0, 0]})
+        rates = GroupStats.from_frame(df, ["g"], "y").rate_series()
+        assert rates.to_dict() == {"None": 0.0, "a": 1.0, "b": 0.5}
+
+        result = analyze_intersectional(df, ["g"], "y", min_group_size=1)
+        assert result["detailed_analysis"]["None"]["selection_rate"] == 0.0
+        assert result["detailed_analysis"]["a"]["selection_rate"] == 1.0
+
+    def test_min_size_labels_only_survivors(self):
+        cube = GroupStats.from_frame(make_frame(), ["gender", "race"], "hired")
+        kept = cube.min_size(2)
+        assert list(kept.groups) == ["F + B", "M + A"]
+        assert cube._groups is None
+
+    def test_merge_matches_full_frame(self):
+        df = make_frame()
+        # The second half has a group whose only outcome is missing
+        merged = GroupStats.from_frame(df.iloc[:4], "gender", "hired").merge(
+            GroupStats.from_frame(df.iloc[4:], "gender", "hired"))
+        full = GroupStats.from_frame(df, "gender", "hired")
+        assert list(merged.groups) == list(full.groups)
+        assert list(merged.outcomes) == list(full.outcomes)
+        assert (merged.counts == full.counts).all()
+
+    def test_continuous_outcome_keeps_moments(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({"g": rng.choice(["a", "b", "c"], 2000), "income": rng.lognormal(10, 1, 2000)})
+        df.loc[:9, "income"] = np.nan
+        cube = GroupStats.from_frame(df, "g", "income")
+        assert cube.counts is None and cube.moments.shape == (3, 3)
+        expected = df.groupby("g")["income"].agg(["mean", "count", "sum"])
+        summary = cube.summary()
+        assert np.allclose(summary["selection_rate"], expected["mean"])
+        assert list(summary["total"]) == list(expected["count"])
+        assert np.allclose(cube.sum_squares, df.groupby("g")["income"].apply(lambda v: (v ** 2).sum()))
+        assert cube.contingency() is None
+
+    def test_significance_matches_crosstab_for_many_outcome_values(self):
+        rng = np.random.default_rng(1)
+        df = pd.DataFrame({"g": rng.choice(["a", "b", "c"], 3000), "score": rng.integers(0, 400, 3000)})
+        df.loc[:49, "g"] = None
+        chi2, p_value, _, _ = stats.chi2_contingency(pd.crosstab(df["g"], df["score"]))
+        result = analyze_statistical_significance(df, "g", "score")
+        assert result["chi_square"] == round(chi2, 4)
+        assert result["p_value"] == round(p_value, 6)
+        assert "error" in analyze_statistical_significance(df, "g", "score", method="permutation")
+
+    def test_cramers_v_normalised_by_all_rows(self):
+        df = make_frame()
+        contingency = pd.crosstab(df["gender"], df["hired"])
+        chi2 = stats.chi2_contingency(contingency)[0]
+        # Rows with a missing group or outcome still count, as before the shared cube
+        expected = np.sqrt(chi2 / (len(df) * (min(contingency.shape) - 1)))
+        result = analyze_statistical_significance(df, "gender", "hired")
+        assert result["effect_size"]["cramers_v"] == round(expected, 4)
+
+    def test_merge_switches_to_moments(self):
+        df = pd.DataFrame({"g": ["a", "b"] * 100, "y": np.arange(200) / 10})
+        # Each half has 100 distinct outcomes (counts), the union 200 (moments)
+        merged = GroupStats.from_frame(df.iloc[:100], "g", "y").merge(GroupStats.from_frame(df.iloc[100:], "g", "y"))
+        full = GroupStats.from_frame(df, "g", "y")
+        assert merged.counts is None
+        assert list(merged.groups) == list(full.groups)
+        assert np.allclose(merged.moments, full.moments)
+
+    def test_missing_column_raises(self):
+        with pytest.raises(KeyError):
+            GroupStats.from_frame(make_frame(), "age", "hired")
+
+
+class TestGroupStatsCache:
+
+    def test_single_scan_per_grouping(self, monkeypatch):
+        calls = []
+        original = GroupStats.from_frame.__func__
+
+        def counting(cls, df, group_by, outcome_variable):
+            calls.append(group_by)
+            return original(cls, df, group_by, outcome_variable)
+
+        monkeypatch.setattr(GroupStats, "from_frame", classmethod(counting))
+        df = make_frame()
+        cache = GroupStatsCache()
+        first = compute_group_stats(df, "gender", "hired", cache)
+        second = compute_group_stats(df, "gender", "hired", cache)
+        compute_group_stats(df, "race", "hired", cache)
+        assert first is second
+        assert calls == ["gender", "race"]
+
+
+class TestBatchSharedData:
+
+    def test_shared_dataset_runs_all_metrics(self, client, monkeypatch):
+        calls = []
+        original = GroupStats.from_frame.__func__
+
+        def counting(cls, df, group_by, outcome_variable):
+            calls.append(group_by)
+            return original(cls, df, group_by, outcome_variable)
+
+        monkeypatch.setattr(GroupStats, "from_frame", classmethod(counting))
+        data = [{"gender": "M" if i % 2 else "F", "hired": int(i % 3 == 0)} for i in range(60)]
+        params = {"protected_attribute": "gender", "outcome_variable": "hired"}
+        response = client.post("/api/v1/analyze/batch", json={
+            "data": data,
+            "analyses": [
+                {"type": t, "params": params}
+                for t in ("disparate_impact", "statistical", "statistical_parity",
+                          "theil_index", "atkinson_index")
+            ],
+        })
+        assert response.status_code == 200
+        body = response.json()
+        assert body["completed"] == 5
+        assert calls == ["gender"]
@@ -2,10 +2,27 @@
 Unit tests for hash chain service.
 """
 
+import json
+
 import pytest
+from app.services.chain_verification import StreamingChainVerifier, verify_chain_stream
 from app.services.hash_chain import HashChain
 
 
+def build_chain(n):
+    records, previous = [], None
+    for i in range(n):
+        record = HashChain.create_audit_record({"action": "decision", "i": i}, previous, sequence_number=i)
+        records.append(record)
+        previous = record["chain_hash"]
+    return records
+
+
+def ndjson_chunks(records, size=97):
+    body = "".join(json.dumps(r) + "\n" for r in records).encode()
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
 class TestHashChainCreate:
 
     def test_first_record_uses_genesis(self):
@@ -88,3 +105,70 @@ class TestHashChainVerify:
 
         result = HashChain.verify_chain([r1, r2])
         assert result["valid"] is False
+
+
+class TestStreamingChainVerify:
+
+    def test_valid_chain(self):
+        *reports, summary = verify_chain_stream(ndjson_chunks(build_chain(50)), n_jobs=1)
+        assert reports == []
+        assert summary["valid"] is True
+        assert summary["records_checked"] == 50
+
+    def test_matches_verify_chain(self):
+        records = build_chain(30)
+        records[4]["data"]["i"] = "TAMPERED"
+        records[17]["previous_hash"] = HashChain.GENESIS_HASH
+        expected = HashChain.verify_chain(records)
+
+        verifier = StreamingChainVerifier(n_jobs=1, batch_records=7)
+        reports = []
+        for chunk in ndjson_chunks(records, size=41):
+            reports += verifier.feed_bytes(chunk)
+        reports += verifier.feed_bytes(b"", final=True)
+        assert reports == expected["broken_links"]
+        assert verifier.summary()["issues"] == len(expected["broken_links"])
+
+    def test_null_previous_hash_reads_as_empty(self):
+        records = build_chain(3)
+        records[1]["previous_hash"] = ""
+        expected = HashChain.verify_chain(records)["broken_links"]
+        records[1]["previous_hash"] = None
+        *reports, _ = verify_chain_stream(ndjson_chunks(records), n_jobs=1)
+        assert reports == expected
+        assert reports[0]["actual"] == "..."
+
+    def test_reports_arrive_before_the_end(self):
+        records = build_chain(40)
+        records[2]["data"]["i"] = "TAMPERED"
+        verifier = StreamingChainVerifier(n_jobs=1, batch_records=5)
+        chunks = ndjson_chunks(records)
+        first_half = [r for chunk in chunks[:len(chunks) // 2] for r in verifier.feed_bytes(chunk)]
+        assert [r["record_index"] for r in first_half] == [2]
+
+    def test_parallel_workers(self):
+        records = build_chain(300)
+        records[150]["data"]["i"] = "TAMPERED"
+        *reports, summary = verify_chain_stream(ndjson_chunks(records, size=4096), n_jobs=2)
+        assert [r["record_index"] for r in reports] == [150]
+        assert summary["records_checked"] == 300
+
+    def test_chain_segment(self):
+        records = build_chain(20)
+        *reports, summary = verify_chain_stream(ndjson_chunks(records[10:]), n_jobs=1,
+                                                expected_previous_hash=records[9]["chain_hash"])
+        assert reports == [] and summary["valid"]
+        assert summary["last_chain_hash"] == records[-1]["chain_hash"]
+
+    def test_invalid_lines(self):
+        records = build_chain(3)
+        body = (json.dumps(records[0]) + "\n{not json\n[1]\n" + json.dumps(records[1]) + "\n").encode()
+        *reports, summary = verify_chain_stream([body], n_jobs=1)
+        assert [r["record_index"] for r in reports] == [1, 2]
+        assert summary["records_checked"] == 4
+        assert summary["valid"] is False
+
+    def test_oversized_record_rejected(self, monkeypatch):
+        monkeypatch.setattr("app.services.chain_verification.CHAIN_VERIFY_MAX_RECORD_BYTES", 100)
+        with pytest.raises(ValueError):
+            StreamingChainVerifier(n_jobs=1).feed_bytes(b"x" * 200)
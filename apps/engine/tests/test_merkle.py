@@ -0,0 +1,214 @@
+"""
+Tests for Merkle-batched signing: RFC 9162 tree hashes and proofs against
+a direct recursive definition, the Merkle log's batches and signed tree
+heads, and the audit endpoints built on them.
+"""
+
+import pytest
+
+import app.services.merkle_log as merkle_log
+from app.core.merkle import (
+    consistency_proof, inclusion_proof, leaf_hash, node_hash, root_hash, verify_consistency, verify_inclusion
+)
+from app.services.hash_chain import HashChain
+from app.services.merkle_log import MerkleLog, sign_audit_hash, verify_merkle_inclusion
+from app.tasks.analysis import task_merkle_seal
+
+
+def mth(leaves):
+    """Merkle tree hash straight from the RFC 9162 definition."""
+    if len(leaves) == 1:
+        return leaf_hash(leaves[0])
+    k = 1 << ((len(leaves) - 1).bit_length() - 1)
+    return node_hash(mth(leaves[:k]), mth(leaves[k:]))
+
+
+def node_lookup(leaves):
+    """node(level, index) over complete subtrees, computed directly."""
+    def node(level, index):
+        return mth(leaves[index << level:(index + 1) << level])
+    return node
+
+
+LEAVES = [f"record-{i}".encode() for i in range(20)]
+
+
+@pytest.fixture
+def log(monkeypatch):
+    log = MerkleLog()
+    monkeypatch.setattr(merkle_log, "_LOG", log)
+    return log
+
+
+@pytest.fixture
+def merkle_mode(monkeypatch):
+    monkeypatch.setattr(merkle_log, "AUDIT_SIGNING_MODE", "merkle")
+
+
+class TestMerkleTree:
+
+    def test_root_matches_definition(self):
+        node = node_lookup(LEAVES)
+        for n in range(1, len(LEAVES) + 1):
+            assert root_hash(node, n) == mth(LEAVES[:n])
+
+    def test_inclusion_proofs(self):
+        node = node_lookup(LEAVES)
+        for n in range(1, len(LEAVES) + 1):
+            root = mth(LEAVES[:n])
+            for i in range(n):
+                proof = inclusion_proof(node, i, n)
+                assert verify_inclusion(leaf_hash(LEAVES[i]), i, n, proof, root)
+                assert not verify_inclusion(leaf_hash(b"forged"), i, n, proof, root)
+                if n > 1:
+                    assert not verify_inclusion(leaf_hash(LEAVES[i]), (i + 1) % n, n, proof, root)
+
+    def test_consistency_proofs(self):
+        node = node_lookup(LEAVES)
+        for n in range(1, len(LEAVES) + 1):
+            for m in range(1, n + 1):
+                proof = consistency_proof(node, m, n)
+                first, second = mth(LEAVES[:m]), mth(LEAVES[:n])
+                assert verify_consistency(m, n, first, second, proof)
+                if m < n:
+                    assert not verify_consistency(m, n, mth(LEAVES[1:m + 1]), second, proof)
+                    assert not verify_consistency(m, n, first, second, proof[:-1])
+
+    def test_consistency_needs_non_empty_first_tree(self):
+        with pytest.raises(ValueError):
+            consistency_proof(node_lookup(LEAVES), 0, 4)
+
+
+class TestMerkleLog:
+
+    def test_append_and_seal(self, log):
+        assert log.append(["a", "b", "c"]) == 0
+        assert log.append(["d", "e"]) == 3
+        head = log.seal()
+        assert head["tree_size"] == 5
+        assert head["root_hash"] == mth([v.encode() for v in "abcde"]).hex()
+        assert log.seal() == head
+        assert log.status() == {"tree_size": 5, "unsigned_records": 0, "tree_head": head}
+
+    def test_batch_due_by_size_or_window(self, log, monkeypatch):
+        assert not log.due()
+        log.append(["a", "b"])
+        assert not log.due()
+        monkeypatch.setattr(merkle_log, "MERKLE_BATCH_MAX_RECORDS", 2)
+        assert log.due()
+        monkeypatch.setattr(merkle_log, "MERKLE_BATCH_MAX_RECORDS", 10)
+        monkeypatch.setattr(merkle_log, "MERKLE_BATCH_WINDOW_SECONDS", 0)
+        assert log.due()
+        log.seal()
+        assert not log.due()
+
+    def test_inclusion_and_consistency_between_heads(self, log):
+        log.append([f"h{i}" for i in range(7)])
+        first = log.seal()
+        log.append([f"h{i}" for i in range(7, 13)])
+        second = log.seal()
+
+        proof = log.inclusion(value="h3", tree_size=7)
+        assert proof["leaf_index"] == 3 and proof["tree_head"] == first
+        assert verify_merkle_inclusion("h3", 3, proof["proof"], first)["valid"]
+        latest = log.inclusion(3)
+        assert latest["tree_head"] == second
+        assert verify_merkle_inclusion("h3", 3, latest["proof"], second)["valid"]
+
+        consistency = log.consistency(7)
+        assert consistency["second"] == second
+        assert verify_consistency(7, 13, bytes.fromhex(first["root_hash"]), bytes.fromhex(second["root_hash"]),
+                                  [bytes.fromhex(p) for p in consistency["proof"]])
+
+    def test_unsigned_records_have_no_proof_yet(self, log):
+        log.append(["a"])
+        assert "error" in log.inclusion(0)
+        log.seal()
+        log.append(["b"])
+        assert "error" in log.inclusion(1)
+        assert "error" in log.inclusion(value="missing")
+        assert "error" in log.consistency(1, 2)
+
+    def test_no_signing_key_leaves_batch_open(self, log, monkeypatch):
+        log.append(["a", "b"])
+        monkeypatch.setattr(merkle_log, "is_signing_available", lambda: False)
+        assert log.seal() is None
+        assert "error" in merkle_log.seal_merkle_batch()
+        assert log.status()["tree_head"] is None
+        monkeypatch.setattr(merkle_log, "is_signing_available", lambda: True)
+        assert log.seal()["signature"]
+
+    def test_tampered_tree_head_fails(self, log):
+        log.append(["a", "b", "c"])
+        head = log.seal()
+        proof = log.inclusion(1)["proof"]
+        result = verify_merkle_inclusion("b", 1, proof, {**head, "timestamp": "2020-01-01T00:00:00"})
+        assert result["inclusion_valid"] and not result["signature_valid"] and not result["valid"]
+        assert not verify_merkle_inclusion("x", 1, proof, head)["valid"]
+        assert "error" in verify_merkle_inclusion("b", 1, ["zz"], head)
+
+
+class TestMerkleSigning:
+
+    def test_immediate_mode_signs_each_hash(self, log):
+        assert "signature" in sign_audit_hash("abc")
+        assert log.status()["tree_size"] == 0
+
+    def test_merkle_mode_records_leaf_index(self, log, merkle_mode, monkeypatch):
+        assert sign_audit_hash("abc") == {"merkle_leaf_index": 0}
+        record = HashChain.create_audit_record({"action": "decision"})
+        assert record["merkle_leaf_index"] == 1 and "signature" not in record
+        assert log.status()["unsigned_records"] == 2
+
+        monkeypatch.setattr(merkle_log, "MERKLE_BATCH_WINDOW_SECONDS", 0)
+        assert task_merkle_seal.apply().get()["tree_head"]["tree_size"] == 2
+        assert task_merkle_seal.apply().get() == {"tree_head": None}
+
+    def test_bulk_records_signed_individually_by_default(self, log):
+        result = HashChain.create_audit_records([{"i": i} for i in range(3)], include_proofs=True)
+        assert result["tree_head"] is None
+        assert all("signature" in r and "merkle_leaf_index" not in r for r in result["records"])
+        assert log.status()["tree_size"] == 0
+
+    def test_bulk_records_share_one_tree_head(self, log, merkle_mode):
+        result = HashChain.create_audit_records([{"i": i} for i in range(25)], include_proofs=True)
+        records, head = result["records"], result["tree_head"]
+        assert HashChain.verify_chain(records)["valid"]
+        assert head["tree_size"] == 25
+        for record in records:
+            assert verify_merkle_inclusion(record["chain_hash"], record["merkle_leaf_index"],
+                                           record["inclusion_proof"], head)["valid"]
+
+
+class TestMerkleEndpoints:
+
+    def test_batch_create_and_proofs_over_api(self, client, log, merkle_mode):
+        response = client.post("/api/v1/audit-trail/create/batch",
+                               json={"entries": [{"i": i} for i in range(5)]})
+        assert response.status_code == 200
+        record = response.json()["records"][2]
+
+        proof = client.get("/api/v1/audit-trail/merkle/proof", params={"chain_hash": record["chain_hash"]}).json()
+        assert proof["leaf_index"] == record["merkle_leaf_index"]
+        verified = client.post("/api/v1/audit-trail/merkle/verify", json={
+            "chain_hash": record["chain_hash"], "leaf_index": proof["leaf_index"],
+            "proof": proof["proof"], "tree_head": proof["tree_head"],
+        })
+        assert verified.json()["valid"]
+
+        client.post("/api/v1/audit-trail/create/batch", json={"entries": [{"i": 5}]})
+        assert client.get("/api/v1/audit-trail/merkle/head").json()["tree_head"]["tree_size"] == 6
+        consistency = client.get("/api/v1/audit-trail/merkle/consistency", params={"first": 5})
+        assert consistency.status_code == 200
+        assert consistency.json()["second"]["tree_size"] == 6
+
+    def test_errors_return_400(self, client, log):
+        assert client.post("/api/v1/audit-trail/merkle/seal").status_code == 400
+        assert client.get("/api/v1/audit-trail/merkle/proof", params={"leaf_index": 0}).status_code == 400
+        assert client.get("/api/v1/audit-trail/merkle/consistency", params={"first": 1}).status_code == 400
+
+    def test_in_memory_log_warns_worker_in_merkle_mode(self, monkeypatch, caplog):
+        from app.core import celery_app
+        monkeypatch.setitem(celery_app.SHARED_STORES, "MERKLE_LOG_DB_PATH", ":memory:")
+        celery_app.warn_unshared_stores()
+        assert "MERKLE_LOG_DB_PATH is ':memory:'" in caplog.text
@@ -0,0 +1,121 @@
+"""
+Tests for multivariate drift: MMD with random Fourier features and the
+domain classifier catch joint shifts that per-feature tests miss, within
+their sample and time budgets.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.drift_monitoring import compare_to_baseline, register_baseline
+from app.services.multivariate_drift import analyze_multivariate_drift, mmd_test
+from app.tasks.analysis import task_multivariate_drift
+
+
+def correlated(n, rho, seed, noise=3):
+    """x and y with correlation rho (identical standard normal marginals) plus noise columns."""
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=n)
+    frame = {"x": x, "y": rho * x + np.sqrt(1 - rho ** 2) * rng.normal(size=n)}
+    frame.update({f"noise_{i}": rng.normal(size=n) for i in range(noise)})
+    return pd.DataFrame(frame)
+
+
+class TestMMD:
+
+    def test_matches_exact_kernel_mmd(self):
+        rng = np.random.default_rng(0)
+        X, Y = rng.normal(size=(300, 3)), rng.normal(0.5, 1, size=(300, 3))
+        result = mmd_test(X, Y, n_features=20_000, n_permutations=10, rng=np.random.default_rng(1))
+        bandwidth = result["bandwidth"]
+
+        def kernel(A, B):
+            d2 = ((A[:, None, :] - B[None, :, :]) ** 2).sum(axis=2)
+            return np.exp(-d2 / (2 * bandwidth ** 2))
+        exact = kernel(X, X).mean() + kernel(Y, Y).mean() - 2 * kernel(X, Y).mean()
+        assert result["statistic"] == pytest.approx(exact, rel=0.05)
+
+    def test_permutation_p_values(self):
+        rng = np.random.default_rng(0)
+        same = mmd_test(rng.normal(size=(500, 4)), rng.normal(size=(500, 4)), n_permutations=200)
+        shifted = mmd_test(rng.normal(size=(500, 4)), rng.normal(0.3, 1, size=(500, 4)), n_permutations=200)
+        assert same["p_value"] > 0.05
+        assert shifted["p_value"] == round(1 / 201, 4)
+        assert shifted["permutations"] == 200 and not shifted["time_budget_exhausted"]
+
+
+class TestMultivariateDrift:
+
+    def test_joint_shift_missed_per_feature(self):
+        baseline, current = correlated(3000, 0.8, seed=0), correlated(3000, -0.8, seed=1)
+        profile = register_baseline(baseline)
+        assert compare_to_baseline(profile["profile_id"], current)["status"] == "STABLE"
+
+        result = analyze_multivariate_drift(baseline, current, n_permutations=200)
+        assert result["status"] == "DRIFT_DETECTED"
+        assert result["drift_detected_by"] == ["mmd", "domain_classifier"]
+        assert result["domain_classifier"]["auc"] > 0.6
+
+    def test_no_drift(self):
+        result = analyze_multivariate_drift(correlated(2000, 0.8, seed=0), correlated(2000, 0.8, seed=1),
+                                            n_permutations=200)
+        assert result["status"] == "STABLE"
+        assert 0.4 < result["domain_classifier"]["auc"] < 0.6
+
+    def test_sample_budget(self):
+        result = analyze_multivariate_drift(correlated(3000, 0.8, seed=0), correlated(800, 0.8, seed=1),
+                                            methods=["mmd"], max_samples=1000, n_permutations=20)
+        assert result["sampled_rows"] == [1000, 800]
+        assert result["baseline_rows"] == 3000
+        assert "domain_classifier" not in result
+
+    def test_time_budget(self):
+        result = analyze_multivariate_drift(correlated(2000, 0.8, seed=0), correlated(2000, 0.8, seed=1),
+                                            time_budget_seconds=0.001, n_permutations=10_000)
+        # At least one permutation batch and boosting step always run
+        assert 0 < result["mmd"]["permutations"] < 10_000
+        assert result["mmd"]["time_budget_exhausted"]
+        assert result["domain_classifier"]["time_budget_exhausted"]
+        assert result["domain_classifier"]["iterations"] > 0
+
+    def test_missing_values_and_feature_subset(self):
+        baseline, current = correlated(1000, 0.8, seed=0), correlated(1000, 0.8, seed=1)
+        baseline.loc[:99, "x"] = np.nan
+        result = analyze_multivariate_drift(baseline, current, features=["x", "y"], n_permutations=50)
+        assert result["features"] == ["x", "y"]
+        assert "error" not in result
+
+    def test_errors(self):
+        frame = correlated(100, 0.5, seed=0)
+        assert "error" in analyze_multivariate_drift([], frame)
+        assert "error" in analyze_multivariate_drift(frame, frame, methods=["kde"])
+        assert "error" in analyze_multivariate_drift(frame, frame, features=["missing"])
+        assert "error" in analyze_multivariate_drift(frame, frame.head(5))
+        assert "error" in analyze_multivariate_drift(pd.DataFrame({"a": ["x"] * 20}), pd.DataFrame({"a": ["y"] * 20}))
+
+    def test_celery_task(self):
+        baseline = correlated(500, 0.8, seed=0).to_dict("records")
+        current = correlated(500, -0.8, seed=1).to_dict("records")
+        result = task_multivariate_drift.apply(args=(baseline, current), kwargs={"n_permutations": 100}).get()
+        assert result["status"] == "success"
+        assert result["data"]["status"] == "DRIFT_DETECTED"
+        assert "resource_usage" in result["data"]
+
+
+class TestMultivariateDriftEndpoint:
+
+    def test_multivariate_drift_over_api(self, client):
+        response = client.post("/api/v1/analyze/drift/multivariate", json={
+            "baseline_data": correlated(400, 0.8, seed=0).to_dict("records"),
+            "current_data": correlated(400, -0.8, seed=1).to_dict("records"),
+            "methods": ["domain_classifier"],
+        })
+        assert response.status_code == 200
+        assert response.json()["drift_detected_by"] == ["domain_classifier"]
+
+    def test_invalid_method_returns_400(self, client):
+        frame = correlated(50, 0.5, seed=0).to_dict("records")
+        response = client.post("/api/v1/analyze/drift/multivariate",
+                               json={"baseline_data": frame, "current_data": frame, "methods": ["kde"]})
+        assert response.status_code == 400
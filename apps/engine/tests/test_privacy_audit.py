@@ -0,0 +1,69 @@
+"""
+Unit tests for schema- and value-level privacy audits.
+"""
+
+import numpy as np
+import pandas as pd
+
+from app.services.privacy_audit import PrivacyAuditor, audit_privacy_values, sample_columns
+
+
+def make_records(n=400):
+    return pd.DataFrame({
+        "notes": ["patient is diabetic" if i % 4 == 0 else "no issues" for i in range(n)],
+        "remarks": ["attends the mosque on fridays" if i % 10 == 0 else None for i in range(n)],
+        "contact": [f"user{i}@example.co.za" for i in range(n)],
+        "ref": [9001015009087 + i for i in range(n)],
+        "income": np.linspace(1000, 9000, n),
+        "approved": [i % 2 == 0 for i in range(n)],
+    })
+
+
+class TestValueLevelAudit:
+
+    def test_spi_in_innocuous_column(self):
+        result = audit_privacy_values(make_records())
+        spi = {(d["field"], d["type"]) for d in result["spi_detected"]}
+        assert spi == {("notes", "health_biometrics"), ("remarks", "religious_beliefs")}
+        assert result["compliance_status"] == "FAIL"
+        # the name-based audit misses both
+        assert PrivacyAuditor().audit_data_schema(["notes", "remarks"])["compliance_status"] == "PASS"
+
+    def test_pii_values(self):
+        result = audit_privacy_values(make_records())
+        pii = {(d["field"], d["type"]) for d in result["pii_detected"]}
+        assert ("contact", "email") in pii
+        assert ("ref", "sa_id") in pii
+        assert "income" in result["columns_skipped"]
+        assert "approved" in result["columns_skipped"]
+
+    def test_match_rate_threshold(self):
+        result = audit_privacy_values(make_records(), min_match_rate=0.5)
+        # a quarter of notes mention a diagnosis; every non-null remark mentions a mosque
+        assert [d["field"] for d in result["spi_detected"]] == ["remarks"]
+
+    def test_clean_data_passes(self):
+        df = pd.DataFrame({"comment": ["fine", "late payment", "approved"] * 50, "score": range(150)})
+        result = audit_privacy_values(df)
+        assert result["compliance_status"] == "PASS"
+        assert result["integrity_score"] == 100
+
+    def test_parallel_matches_serial(self):
+        df = pd.concat([make_records().add_suffix(f"_{i}") for i in range(20)], axis=1)
+        auditor = PrivacyAuditor()
+        serial = auditor.audit_data_values(df, n_jobs=1)
+        assert auditor.audit_data_values(df, n_jobs=2) == serial
+
+
+class TestColumnSampling:
+
+    def test_samples_non_null_values_up_to_size(self):
+        samples, numeric, skipped = sample_columns(make_records(), sample_size=25)
+        assert len(samples["notes"]) == 25
+        assert len(samples["remarks"]) == 25
+        assert all(v == "attends the mosque on fridays" for v in samples["remarks"])
+        assert numeric["ref"] and not numeric["notes"]
+
+    def test_sparse_column_keeps_every_value(self):
+        samples, _, _ = sample_columns(make_records(), sample_size=1000)
+        assert len(samples["remarks"]) == 40
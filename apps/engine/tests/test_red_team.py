@@ -0,0 +1,99 @@
+"""
+Unit tests for proxy discovery and the association matrix.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from app.services.red_team import association_matrix, red_team_audit
+
+
+def make_applicants(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    gender = rng.choice(["F", "M"], n)
+    return pd.DataFrame({
+        "gender": gender,
+        "suburb": np.where(gender == "F", rng.choice(["a", "b"], n, p=[0.95, 0.05]), rng.choice(["a", "b"], n, p=[0.05, 0.95])),
+        "height": np.where(gender == "F", 160.0, 178.0) + rng.normal(0, 2, n),
+        "income": rng.normal(50_000, 8_000, n),
+        "region": rng.choice(["north", "south", "east"], n),
+        "applicant_id": [f"id{i}" for i in range(n)],
+    })
+
+
+class TestAssociationMatrix:
+
+    def test_measures_match_references(self):
+        df = make_applicants()
+        df.loc[::7, "income"] = np.nan
+        df.loc[::11, "region"] = None
+        df["score"] = df["income"] * 0.5 + np.random.default_rng(0).normal(0, 4_000, len(df))
+        matrix, rows, cols = association_matrix(df, ["income", "score", "height", "region", "suburb"])
+
+        pearson = abs(df["income"].corr(df["score"]))
+        assert np.isclose(matrix[rows.index("income"), cols.index("score")], pearson)
+
+        table = pd.crosstab(df["region"].fillna("NA"), df["suburb"])
+        chi2 = stats.chi2_contingency(table, correction=False)[0]
+        cramers_v = np.sqrt(chi2 / (table.values.sum() * (min(table.shape) - 1)))
+        assert np.isclose(matrix[rows.index("region"), cols.index("suburb")], cramers_v)
+
+        d = df[["income", "region"]].fillna({"region": "NA"}).dropna()
+        mean = d["income"].mean()
+        between = d.groupby("region")["income"].apply(lambda s: len(s) * (s.mean() - mean) ** 2).sum()
+        eta = np.sqrt(between / ((d["income"] - mean) ** 2).sum())
+        assert np.isclose(matrix[rows.index("income"), cols.index("region")], eta)
+        assert np.isclose(matrix[rows.index("region"), cols.index("income")], eta)
+
+    def test_rectangular_rows_match_square_matrix(self):
+        df = make_applicants()
+        columns = ["suburb", "height", "income", "region"]
+        square, rows, cols = association_matrix(df, ["gender"] + columns)
+        row, _, row_cols = association_matrix(df, columns, against=["gender"])
+        expected = square[rows.index("gender"), [cols.index(c) for c in row_cols]]
+        assert np.allclose(row[0], expected)
+
+    def test_constant_column_is_undefined(self):
+        df = pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": [5.0, 5.0, 5.0]})
+        matrix, _, _ = association_matrix(df, ["a", "b"])
+        assert np.isnan(matrix[0, 1])
+
+
+class TestProxyDiscovery:
+
+    def test_finds_categorical_and_numeric_proxies(self):
+        result = red_team_audit(make_applicants(), "gender", ["suburb", "height", "income", "region"])
+        found = {p["column"]: p for p in result["proxies_identified"]}
+        assert set(found) == {"suburb", "height"}
+        assert found["suburb"]["measure"] == "cramers_v"
+        assert found["height"]["measure"] == "correlation_ratio"
+        assert found["height"]["risk"] == "CRITICAL"
+        assert result["red_team_score"] == 60
+
+    def test_high_cardinality_and_missing_columns_skipped(self):
+        result = red_team_audit(make_applicants(), "gender", ["applicant_id", "nope", "suburb"])
+        assert result["columns_skipped"] == ["nope", "applicant_id"]
+        assert [p["column"] for p in result["proxies_identified"]] == ["suburb"]
+
+    def test_does_not_modify_input(self):
+        df = make_applicants()
+        red_team_audit(df, "gender", ["suburb"])
+        assert list(df.columns) == ["gender", "suburb", "height", "income", "region", "applicant_id"]
+
+    def test_include_matrix(self):
+        result = red_team_audit(make_applicants(), "gender", ["suburb", "income"], include_matrix=True)
+        matrix = result["association_matrix"]
+        assert matrix["columns"] == ["income", "gender", "suburb"]
+        assert matrix["values"][1][1] == 1.0
+
+    def test_high_cardinality_protected_attribute_kept_in_both_modes(self):
+        df = make_applicants()
+        scan = red_team_audit(df, "applicant_id", ["suburb", "income"])
+        with_matrix = red_team_audit(df, "applicant_id", ["suburb", "income"], include_matrix=True)
+        assert "applicant_id" in with_matrix["association_matrix"]["columns"]
+        assert with_matrix["proxies_identified"] == scan["proxies_identified"]
+        assert with_matrix["columns_skipped"] == scan["columns_skipped"]
+
+    def test_missing_protected_attribute(self):
+        assert "error" in red_team_audit(make_applicants(), "race", ["suburb"])
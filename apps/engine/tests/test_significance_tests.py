@@ -0,0 +1,57 @@
+"""
+Unit tests for the permutation / exact significance engine.
+"""
+
+import numpy as np
+from scipy import stats
+
+from app.services.significance_tests import exact_test, permutation_test, random_tables
+
+
+class TestRandomTables:
+
+    def test_margins_preserved(self):
+        rows, cols = np.array([20, 17, 11]), np.array([17, 16, 13, 2])
+        tables = random_tables(np.random.default_rng(0), rows, cols, 500)
+        assert (tables.sum(axis=2) == rows).all()
+        assert (tables.sum(axis=1) == cols).all()
+        assert (tables >= 0).all()
+
+    def test_cell_means_match_independence(self):
+        rows, cols = np.array([30, 10]), np.array([25, 15])
+        tables = random_tables(np.random.default_rng(1), rows, cols, 50000)
+        expected = np.outer(rows, cols) / rows.sum()
+        assert np.allclose(tables.mean(axis=0), expected, atol=0.05)
+
+
+class TestPermutationTest:
+
+    def test_agrees_with_fisher_on_2x2(self):
+        table = np.array([[3, 1], [1, 3]])
+        result = permutation_test(table, n_permutations=100_000)
+        assert abs(result["p_value"] - stats.fisher_exact(table)[1]) < 0.01
+        assert result["permutations"] == 100_000
+        assert result["time_budget_exhausted"] is False
+
+    def test_reproducible_with_seed(self):
+        table = np.array([[12, 5, 3], [4, 9, 2], [1, 2, 8]])
+        assert permutation_test(table, 5000, random_state=3) == permutation_test(table, 5000, random_state=3)
+
+    def test_time_budget_stops_early(self):
+        table = np.array([[12, 5, 3], [4, 9, 2], [1, 2, 8]])
+        result = permutation_test(table, n_permutations=1_000_000, time_budget_seconds=0.0)
+        assert 0 < result["permutations"] < 1_000_000
+        assert result["time_budget_exhausted"] is True
+
+    def test_process_pool_matches_serial(self):
+        table = np.array([[12, 5, 3], [4, 9, 2], [1, 2, 8]])
+        serial = permutation_test(table, n_permutations=60_000, n_jobs=1)
+        parallel = permutation_test(table, n_permutations=60_000, n_jobs=2)
+        assert parallel["permutations"] == serial["permutations"]
+        assert parallel["p_value"] == serial["p_value"]
+
+
+class TestExactTest:
+
+    def test_rejects_larger_tables(self):
+        assert "error" in exact_test(np.ones((3, 2)))
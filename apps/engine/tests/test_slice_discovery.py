@@ -0,0 +1,96 @@
+"""
+Unit tests for Apriori fairness slice discovery.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from app.services.slice_discovery import analyze_slice_discovery, discover_slices
+
+
+def make_frame(n=2000, seed=0):
+    """Selection rate drops for region=north + channel=web only."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "region": rng.choice(["north", "south", "east"], n),
+        "channel": rng.choice(["web", "branch"], n),
+        "tier": rng.choice(["a", "b", "c", "d"], n),
+        "income": rng.normal(50_000, 10_000, n),
+    })
+    biased = (df["region"] == "north") & (df["channel"] == "web")
+    df["approved"] = (rng.random(n) < np.where(biased, 0.2, 0.6)).astype(int)
+    return df
+
+
+def brute_force_scores(df, y, features, min_support, max_order, top_k):
+    overall = y.mean()
+    scores = {}
+    for order in range(1, max_order + 1):
+        for combo in itertools.combinations(features, order):
+            for _, idx in df.groupby(list(combo), observed=True).indices.items():
+                if len(idx) >= min_support:
+                    score = (overall - y[idx].mean()) * np.sqrt(len(idx))
+                    if score > 0:
+                        scores[frozenset(idx)] = score
+    return sorted(scores.values(), reverse=True)[:top_k]
+
+
+class TestDiscoverSlices:
+
+    def test_matches_exhaustive_search(self):
+        rng = np.random.default_rng(3)
+        for _ in range(10):
+            df = pd.DataFrame({f"f{i}": rng.integers(0, 3, 400).astype(str) for i in range(4)})
+            y = (rng.random(400) < 0.5).astype(float)
+            found = discover_slices(df, y, list(df.columns), min_support=15, max_order=3, top_k=5)
+            got = [s["gap"] * np.sqrt(s["size"]) for s in found["slices"]]
+            assert np.allclose(got, brute_force_scores(df, y, list(df.columns), 15, 3, 5))
+
+    def test_bound_prunes_error_search(self):
+        df = make_frame()
+        y = (df["tier"] == "d").to_numpy(dtype=float)
+        found = discover_slices(df, y, ["region", "channel", "tier"], worse_is_lower=False, min_support=30)
+        assert found["slices"][0]["items"] == [("tier", "d")]
+        assert found["search"]["pruned_bound"] > 0
+
+
+class TestAnalyzeSliceDiscovery:
+
+    def test_finds_planted_slice(self):
+        result = analyze_slice_discovery(make_frame(), "approved")
+        worst = result["slices"][0]
+        assert worst["slice"] == {"region": "north", "channel": "web"}
+        assert worst["status"] == "FAIL"
+        assert result["overall_status"] == "BIASED"
+        assert "income" in result["features_searched"]
+        assert len(result["audit_hash"]) == 64
+
+    def test_error_rate_with_predictions(self):
+        df = make_frame()
+        df["predicted"] = df["approved"]
+        wrong = df["tier"] == "d"
+        df.loc[wrong, "predicted"] = 1 - df.loc[wrong, "approved"]
+        result = analyze_slice_discovery(df, "approved", ["region", "channel", "tier"], predicted_outcome="predicted")
+        assert result["metric"] == "error_rate"
+        assert result["slices"][0]["slice"] == {"tier": "d"}
+        assert result["slices"][0]["error_rate"] == 1.0
+
+    def test_min_support_respected(self):
+        result = analyze_slice_discovery(make_frame(), "approved", min_support=200)
+        assert all(s["size"] >= 200 for s in result["slices"])
+
+    def test_missing_column(self):
+        assert "error" in analyze_slice_discovery(make_frame(), "approved", ["zip"])
+
+    def test_api_endpoint(self, client):
+        df = make_frame(500)
+        response = client.post("/api/v1/analyze/slices", json={
+            "data": df.drop(columns="income").to_dict("records"), "outcome_variable": "approved", "max_order": 2,
+        })
+        assert response.status_code == 200
+        body = response.json()
+        assert body["search"]["max_order"] == 2
+        assert all(s["order"] <= 2 for s in body["slices"])
+        assert "signature" in body
@@ -0,0 +1,202 @@
+"""
+Tests for chunked audit sessions: merged per-chunk statistics must reproduce
+the single-request reports exactly, audit hash included.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.bias_analysis import (
+    analyze_atkinson_index, analyze_disparate_impact, analyze_equalized_odds,
+    analyze_statistical_significance, analyze_theil_index,
+)
+from app.services import streaming_audit
+from app.services.fairness_metrics import statistical_parity_difference
+from app.services.streaming_audit import (
+    AuditSession, EqualizedOddsAccumulator, GroupStatsAccumulator,
+    add_audit_chunk, audit_file, create_audit_session, finalize_audit_session,
+)
+
+
+def make_rows(n=900, seed=0, labels=(0, 1)):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "gender": rng.choice(["F", "M", "X"], n),
+        "hired": rng.integers(0, 2, n),
+        "actual": rng.choice(labels, n),
+        "predicted": rng.choice(labels, n),
+    }).to_dict("records")
+
+
+def chunks(rows, size):
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+
+def canonical(result):
+    return json.dumps(result, sort_keys=True, default=str)
+
+
+class TestAccumulators:
+
+    def test_group_stats_merge_matches_single_pass(self):
+        rows = make_rows()
+        merged = GroupStatsAccumulator("gender", "hired")
+        for chunk in chunks(rows, 250):
+            part = GroupStatsAccumulator("gender", "hired")
+            part.update(pd.DataFrame(chunk))
+            merged.merge(part)
+        full = GroupStatsAccumulator("gender", "hired")
+        full.update(pd.DataFrame(rows))
+        assert list(merged.cube.groups) == list(full.cube.groups)
+        assert (merged.cube.counts == full.cube.counts).all()
+
+    def test_session_metrics_match_single_pass(self):
+        rows = make_rows()
+        session = AuditSession("gender", "hired", metrics=[
+            "disparate_impact", "statistical", "statistical_parity", "theil_index", "atkinson_index",
+        ], previous_hash="abc")
+        for chunk in chunks(rows, 250):
+            session.add(pd.DataFrame(chunk))
+        result = session.finalize()
+        assert canonical(result["disparate_impact"]) == canonical(analyze_disparate_impact(rows, "gender", "hired", "abc"))
+        assert result["statistical"] == analyze_statistical_significance(rows, "gender", "hired")
+        assert result["statistical_parity"] == statistical_parity_difference(rows, "gender", "hired")
+        assert result["theil_index"] == analyze_theil_index(rows, "gender", "hired")
+        assert result["atkinson_index"] == analyze_atkinson_index(rows, "gender", "hired")
+
+    def test_equalized_odds_labels_resolved_at_finalize(self):
+        # First chunk is binary-only, later chunks introduce a third class
+        rows = make_rows(labels=(0, 1))[:300] + make_rows(seed=1, labels=(0, 1, 2))[:600]
+        acc = EqualizedOddsAccumulator("gender", "actual", "predicted")
+        for chunk in chunks(rows, 300):
+            acc.update(pd.DataFrame(chunk))
+        expected = analyze_equalized_odds(rows, "gender", "actual", "predicted", 0.1)
+        result = acc.finalize(0.1)
+        assert "per_class_differences" in result
+        assert canonical(result) == canonical(expected)
+
+
+class TestAuditSessions:
+
+    def test_session_lifecycle(self):
+        rows = make_rows()
+        session = create_audit_session("gender", "hired", "actual", "predicted", 0.1)
+        assert session["metrics"] == ["disparate_impact", "equalized_odds"]
+        for chunk in chunks(rows, 200):
+            status = add_audit_chunk(session["session_id"], chunk)
+        assert status["rows_received"] == len(rows)
+        assert status["chunks_received"] == 5
+
+        result = finalize_audit_session(session["session_id"])
+        assert result["rows"] == len(rows)
+        assert result["disparate_impact"]["audit_hash"] == \
+            analyze_disparate_impact(rows, "gender", "hired")["audit_hash"]
+        assert result["equalized_odds"]["audit_hash"] == \
+            analyze_equalized_odds(rows, "gender", "actual", "predicted", 0.1)["audit_hash"]
+
+    def test_session_requires_a_metric(self):
+        assert "error" in create_audit_session("gender")
+        assert "error" in create_audit_session("gender", "hired", metrics=["bogus"])
+        assert "error" in create_audit_session("gender", "hired", metrics=["equalized_odds"])
+
+    def test_missing_column_rejected(self):
+        session = create_audit_session("gender", "hired")
+        result = add_audit_chunk(session["session_id"], [{"gender": "F"}])
+        assert "not found" in result["error"]
+
+    def test_finalized_session_is_closed(self):
+        session = create_audit_session("gender", "hired")
+        add_audit_chunk(session["session_id"], make_rows(10))
+        finalize_audit_session(session["session_id"])
+        assert "error" in finalize_audit_session(session["session_id"])
+        assert "error" in add_audit_chunk(session["session_id"], make_rows(10))
+
+    def test_score_column_discards_session(self):
+        session = create_audit_session("gender", actual_outcome="actual", predicted_outcome="predicted")
+        rows = [{**row, "predicted": i / 100} for i, row in enumerate(make_rows(100))]
+        result = add_audit_chunk(session["session_id"], rows)
+        assert "Too many distinct outcome labels" in result["error"]
+        assert "discarded" in result["error"]
+        assert "error" in finalize_audit_session(session["session_id"])
+
+
+class TestFileAudit:
+
+    @pytest.fixture(autouse=True)
+    def audit_root(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(streaming_audit, "AUDIT_FILE_ROOT", str(tmp_path))
+
+    def test_csv_matches_single_request(self, tmp_path):
+        rows = make_rows(2500)
+        path = tmp_path / "decisions.csv"
+        pd.DataFrame(rows).to_csv(path, index=False)
+        result = audit_file(str(path), "gender", "hired", "actual", "predicted", chunk_rows=400)
+        assert result["rows"] == 2500
+        assert result["chunks"] == 7
+        assert result["disparate_impact"]["audit_hash"] == analyze_disparate_impact(rows, "gender", "hired")["audit_hash"]
+        assert result["equalized_odds"]["audit_hash"] == \
+            analyze_equalized_odds(rows, "gender", "actual", "predicted", 0.1)["audit_hash"]
+
+    def test_parquet(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        rows = make_rows(1200)
+        path = tmp_path / "decisions.parquet"
+        pd.DataFrame(rows).to_parquet(path, row_group_size=300)
+        result = audit_file(str(path), "gender", "hired", metrics=["disparate_impact", "statistical_parity"],
+                            chunk_rows=250)
+        assert result["rows"] == 1200
+        assert result["statistical_parity"] == statistical_parity_difference(rows, "gender", "hired")
+
+    def test_missing_column(self, tmp_path):
+        path = tmp_path / "decisions.csv"
+        pd.DataFrame(make_rows(10)).to_csv(path, index=False)
+        assert audit_file(str(path), "race", "hired")["error"] == "Column 'race' not found"
+
+    def test_unsupported_and_missing_files(self, tmp_path):
+        path = tmp_path / "decisions.json"
+        path.write_text("[]")
+        assert "Unsupported" in audit_file(str(path), "gender", "hired")["error"]
+        assert "not found" in audit_file(str(tmp_path / "nope.csv"), "gender", "hired")["error"]
+
+    def test_path_outside_root_rejected(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(streaming_audit, "AUDIT_FILE_ROOT", str(tmp_path / "allowed"))
+        path = tmp_path / "decisions.csv"
+        pd.DataFrame(make_rows(10)).to_csv(path, index=False)
+        assert "outside" in audit_file(str(path), "gender", "hired")["error"]
+
+
+    def test_refused_without_root(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(streaming_audit, "AUDIT_FILE_ROOT", "")
+        path = tmp_path / "decisions.csv"
+        pd.DataFrame(make_rows(10)).to_csv(path, index=False)
+        assert "AUDIT_FILE_ROOT" in audit_file(str(path), "gender", "hired")["error"]
+
+
+class TestAuditSessionEndpoints:
+
+    def test_chunked_audit_over_api(self, client):
+        rows = make_rows()
+        opened = client.post("/api/v1/analyze/stream/sessions", json={
+            "protected_attribute": "gender", "outcome_variable": "hired",
+        })
+        assert opened.status_code == 200
+        session_id = opened.json()["session_id"]
+        for chunk in chunks(rows, 300):
+            pushed = client.post(f"/api/v1/analyze/stream/sessions/{session_id}/chunks", json={"data": chunk})
+            assert pushed.status_code == 200
+
+        final = client.post(f"/api/v1/analyze/stream/sessions/{session_id}/finalize")
+        assert final.status_code == 200
+        report = final.json()["disparate_impact"]
+        single = client.post("/api/v1/analyze", json={
+            "data": rows, "protected_attribute": "gender", "outcome_variable": "hired",
+        }).json()
+        assert report["audit_hash"] == single["audit_hash"]
+        assert "signature" in report
+
+    def test_unknown_session_returns_400(self, client):
+        response = client.post("/api/v1/analyze/stream/sessions/nope/chunks", json={"data": [{"a": 1}]})
+        assert response.status_code == 400
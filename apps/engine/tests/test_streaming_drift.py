@@ -0,0 +1,170 @@
+"""
+Tests for sketch-based drift streams: exact while the sketches have not
+compacted, and within the reported error bounds once they have.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from app.services.drift_monitoring import compare_to_baseline, register_baseline
+from app.services.streaming_drift import (
+    QuantileSketch, add_drift_baseline, add_drift_current, close_drift_stream,
+    create_drift_stream, drift_stream_report,
+)
+
+
+def make_frame(n, shift=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "income": rng.normal(50 + shift, 10, n),
+        "tenure": rng.exponential(3, n),
+    })
+
+
+def chunks(df, size):
+    return [df.iloc[i:i + size] for i in range(0, len(df), size)]
+
+
+class TestQuantileSketch:
+
+    def test_exact_below_capacity(self):
+        values = np.random.default_rng(0).normal(size=500)
+        sketch = QuantileSketch(k=1024)
+        sketch.update(values)
+        queries = np.linspace(-3, 3, 50)
+        assert sketch.epsilon == 0
+        assert np.array_equal(sketch.rank(queries), np.searchsorted(np.sort(values), queries, side="right"))
+
+    def test_rank_error_within_bound(self):
+        values = np.random.default_rng(1).normal(size=200_000)
+        sketch = QuantileSketch(k=256, seed=0)
+        for chunk in np.array_split(values, 40):
+            sketch.update(chunk)
+        queries = np.quantile(values, np.linspace(0, 1, 201))
+        true = np.searchsorted(np.sort(values), queries, side="right")
+        assert sketch.n == len(values)
+        assert 0 < sketch.epsilon <= np.log2(len(values) / 256) / 256 * 2
+        assert np.abs(sketch.rank(queries) - true).max() <= sketch.rank_error
+        assert sketch.size < 256 * 12
+
+    def test_merge_matches_single_stream_counts(self):
+        values = np.random.default_rng(2).uniform(size=50_000)
+        left, right = QuantileSketch(k=128, seed=0), QuantileSketch(k=128, seed=1)
+        left.update(values[:20_000])
+        right.update(values[20_000:])
+        left.merge(right)
+        assert left.n == len(values)
+        assert (left.min, left.max) == (values.min(), values.max())
+        true = np.searchsorted(np.sort(values), [0.25, 0.5, 0.75], side="right")
+        assert np.abs(left.rank(np.array([0.25, 0.5, 0.75])) - true).max() <= left.rank_error
+
+    def test_nan_ignored(self):
+        sketch = QuantileSketch()
+        sketch.update(np.array([1.0, np.nan, 3.0]))
+        assert sketch.n == 2
+
+
+class TestDriftStreams:
+
+    def test_exact_against_profile_below_capacity(self):
+        baseline, current = make_frame(800), make_frame(400, shift=2, seed=1)
+        profile = register_baseline(baseline, n_bins=12)
+        expected = compare_to_baseline(profile["profile_id"], current)
+
+        stream = create_drift_stream(["income", "tenure"], n_bins=12)
+        for chunk in chunks(baseline, 300):
+            assert "error" not in add_drift_baseline(stream["stream_id"], chunk)
+        for chunk in chunks(current, 150):
+            assert "error" not in add_drift_current(stream["stream_id"], chunk)
+        result = drift_stream_report(stream["stream_id"])
+
+        for streamed, exact in zip(result["features"], expected["features"]):
+            assert streamed["psi"]["value"] == exact["psi"]["value"]
+            assert streamed["psi"]["bounds"] == [exact["psi"]["value"]] * 2
+            assert streamed["js_divergence"]["value"] == exact["js_divergence"]["value"]
+            assert streamed["ks_test"]["statistic"] == exact["ks_test"]["statistic"]
+            assert streamed["ks_test"]["error_bound"] == 0
+            assert streamed["status"] == exact["status"]
+
+    def test_bounds_hold_for_long_streams(self):
+        baseline, current = make_frame(60_000), make_frame(60_000, shift=1, seed=1)
+        stream = create_drift_stream(["income", "tenure"], n_bins=10, sketch_k=128)
+        for chunk in chunks(baseline, 5_000):
+            add_drift_baseline(stream["stream_id"], chunk)
+        for chunk in chunks(current, 5_000):
+            add_drift_current(stream["stream_id"], chunk)
+        result = drift_stream_report(stream["stream_id"])
+        assert result["current_rows"] == 60_000
+
+        for feature in result["features"]:
+            name = feature["feature"]
+            ks = feature["ks_test"]
+            exact = stats.ks_2samp(baseline[name], current[name]).statistic
+            assert abs(ks["statistic"] - exact) <= ks["error_bound"] + 1e-4
+            lo, hi = feature["psi"]["bounds"]
+            assert lo <= feature["psi"]["value"] <= hi
+            assert feature["baseline_rank_error"] > 0
+
+    def test_seeded_from_profile(self):
+        baseline = make_frame(500)
+        profile = register_baseline(baseline, n_bins=8)
+        stream = create_drift_stream(profile_id=profile["profile_id"])
+        assert stream["baseline_fixed"] and stream["n_bins"] == 8
+        assert "error" in add_drift_baseline(stream["stream_id"], baseline)
+        add_drift_current(stream["stream_id"], make_frame(300, shift=15, seed=3))
+        result = drift_stream_report(stream["stream_id"])
+        assert result["drifted_features"] == ["income"]
+
+    def test_reset_window(self):
+        stream = create_drift_stream(["income"])
+        add_drift_baseline(stream["stream_id"], make_frame(500))
+        add_drift_current(stream["stream_id"], make_frame(200, shift=20, seed=1))
+        assert drift_stream_report(stream["stream_id"], reset_window=True)["status"] == "DRIFT_DETECTED"
+        assert "error" in drift_stream_report(stream["stream_id"])
+        add_drift_current(stream["stream_id"], make_frame(500, seed=2))
+        report = drift_stream_report(stream["stream_id"])
+        assert report["current_rows"] == 500
+        assert report["status"] == "STABLE"
+
+    def test_baseline_fixed_after_current_data(self):
+        stream = create_drift_stream(["income"])
+        add_drift_baseline(stream["stream_id"], make_frame(100))
+        add_drift_current(stream["stream_id"], make_frame(100, seed=1))
+        assert "error" in add_drift_baseline(stream["stream_id"], make_frame(100))
+
+    def test_errors(self):
+        assert "error" in create_drift_stream()
+        assert "error" in create_drift_stream(profile_id="unknown")
+        stream = create_drift_stream(["income"])
+        assert "error" in add_drift_current(stream["stream_id"], make_frame(10))  # no baseline yet
+        assert "error" in add_drift_baseline(stream["stream_id"], pd.DataFrame({"other": [1.0]}))
+        assert "error" in add_drift_baseline("unknown", make_frame(10))
+        assert close_drift_stream(stream["stream_id"])["closed"]
+        assert "error" in drift_stream_report(stream["stream_id"])
+
+
+class TestDriftStreamEndpoints:
+
+    def test_stream_over_api(self, client):
+        opened = client.post("/api/v1/analyze/drift/streams", json={"features": ["income", "tenure"]})
+        assert opened.status_code == 200
+        stream_id = opened.json()["stream_id"]
+        for chunk in chunks(make_frame(600), 200):
+            pushed = client.post(f"/api/v1/analyze/drift/streams/{stream_id}/baseline",
+                                 json={"data": chunk.to_dict("records")})
+            assert pushed.status_code == 200
+        pushed = client.post(f"/api/v1/analyze/drift/streams/{stream_id}/current",
+                             json={"data": make_frame(300, shift=10, seed=1).to_dict("records")})
+        assert pushed.json()["baseline_fixed"]
+
+        report = client.post(f"/api/v1/analyze/drift/streams/{stream_id}/report?reset_window=true")
+        assert report.status_code == 200
+        assert report.json()["drifted_features"] == ["income"]
+        assert client.post(f"/api/v1/analyze/drift/streams/{stream_id}/report").status_code == 400
+        assert client.delete(f"/api/v1/analyze/drift/streams/{stream_id}").status_code == 200
+
+    def test_unknown_stream_returns_400(self, client):
+        response = client.post("/api/v1/analyze/drift/streams/nope/current", json={"data": [{"a": 1}]})
+        assert response.status_code == 400